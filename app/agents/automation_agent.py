@@ -4,10 +4,20 @@ automation_agent.py
 Defines the AutomationAgent class for simulating automated actions based on recommended pipeline actions.
 
 - execute_action: Enriches a lead with an automation_status field based on recommended_action.
+- execute_actions: Same rules applied column-wise to a DataFrame of leads.
 """
 
 from typing import Dict
 
+import pandas as pd
+
+AUTOMATION_STATUS = {
+    "Move to Contract Stage": "CRM task created",
+    "Schedule Follow-Up Call": "Follow-up call scheduled",
+    "Send Discount Offer": "Discount email sent",
+    "Nurture — Low Priority": "Nurture task scheduled",
+}
+
 class AutomationAgent:
     """
     Simulates automation of actions for leads based on recommended_action.
@@ -51,6 +61,19 @@ class AutomationAgent:
 
         return lead
 
+    def execute_actions(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vectorized execute_action: returns a copy of df with an
+        automation_status column.
+        """
+        df = df.copy(deep=False)
+        if "recommended_action" in df.columns:
+            status = df["recommended_action"].map(AUTOMATION_STATUS).fillna("No action taken")
+        else:
+            status = pd.Series("No action taken", index=df.index)
+        df["automation_status"] = status.astype(object)
+        return df
+
 
 def automate_action(payload):
     """
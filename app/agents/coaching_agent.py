@@ -4,10 +4,23 @@ coaching_agent.py
 Defines the CoachingAgent class for generating sales coaching tips for leads.
 
 - generate_coaching_tip: Enriches a lead with a coaching_tip field based on market_signal_detected and win_probability.
+- generate_coaching_tips: Same rules applied column-wise to a DataFrame of leads.
 """
 
 from typing import Dict
 
+import numpy as np
+import pandas as pd
+
+from app.agents.frame_utils import column_or_default, truthy
+
+COACHING_TIPS = np.array([
+    "Use market momentum to close quickly.",
+    "Highlight lead's internal motivation to close deal.",
+    "Address objections early and reinforce value proposition.",
+    "Focus on building relationship and understanding lead’s deeper needs.",
+], dtype=object)
+
 class CoachingAgent:
     """
     Provides simple rule-based coaching tips for sales reps based on lead context.
@@ -48,6 +61,21 @@ class CoachingAgent:
 
         return lead
 
+    def generate_coaching_tips(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vectorized generate_coaching_tip: returns a copy of df with a
+        coaching_tip column.
+        """
+        df = df.copy(deep=False)
+        win_prob = column_or_default(df, "win_probability", 0)
+        signal = truthy(df, "market_signal_detected")
+        # Pick an index into COACHING_TIPS per row, then look the strings up once
+        choice = np.select(
+            [signal & (win_prob >= 80), win_prob >= 80, (win_prob >= 50) & (win_prob < 80)], [0, 1, 2], default=3
+        )
+        df["coaching_tip"] = COACHING_TIPS[choice]
+        return df
+
 
 def generate_coaching(payload):
     """
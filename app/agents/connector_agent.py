@@ -3,12 +3,11 @@ connector_agent.py
 ------------------
 Agent for fetching structured data from third-party APIs (HubSpot, Shopify, Stripe, etc.).
 Saves normalized data to /data/raw/{source}/timestamped_file.json or .csv.
-Logs each pull to /logs/connector_log.csv.
+Logs each pull to /logs/connector_log.csv through the buffered pipeline log.
 """
 
 import os
 import json
-import csv
 import httpx
 from datetime import datetime
 from pathlib import Path
@@ -16,6 +15,8 @@ from typing import Dict, Any, Optional
 
 from pydantic import BaseModel, Field, validator
 
+from etl.pipeline_log import get_log
+
 # --- Pydantic Input Model ---
 
 class ConnectorFetchRequest(BaseModel):
@@ -89,15 +90,8 @@ def save_data(source: str, data: Any):
     return str(out_path)
 
 def log_pull(source: str, success: bool, record_count: int):
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    log_path = log_dir / "connector_log.csv"
-    exists = log_path.exists()
-    with open(log_path, "a", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        if not exists:
-            writer.writerow(["timestamp", "source", "success", "record_count"])
-        writer.writerow([datetime.utcnow().isoformat(), source, "success" if success else "fail", record_count])
+    log = get_log("connector_log", ["timestamp", "source", "success", "record_count"], "logs")
+    log.write({"source": source, "success": "success" if success else "fail", "record_count": record_count})
 
 def connector_agent(payload: Dict[str, Any]) -> Dict[str, Any]:
     try:
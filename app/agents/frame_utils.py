@@ -0,0 +1,27 @@
+"""
+frame_utils.py
+--------------
+Column helpers shared by the agents' vectorized (DataFrame) methods, so that
+a column lookup behaves like lead.get(name, default) on every row.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def column_or_default(df: pd.DataFrame, name: str, default) -> np.ndarray:
+    """
+    Values of column name, or default for every row when the column is absent.
+    """
+    if name not in df.columns:
+        return np.full(len(df), default)
+    return df[name].to_numpy()
+
+
+def truthy(df: pd.DataFrame, name: str) -> np.ndarray:
+    """
+    Truthiness of lead.get(name, False) for every row (missing values are False).
+    """
+    if name not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    return df[name].fillna(False).astype(bool).to_numpy()
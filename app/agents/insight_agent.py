@@ -20,7 +20,7 @@ class InsightSummarizationAgent:
         """
         self.openai_service = openai_service
 
-    def generate_insight(self, lead_data: Dict) -> str:
+    async def generate_insight(self, lead_data: Dict) -> str:
         """
         Generates a 3–5 sentence summary of the lead's opportunity potential using GPT-4.
         Considers fields like company size, title, email domain, and enrichment fields.
@@ -35,8 +35,7 @@ class InsightSummarizationAgent:
         prompt = self._build_prompt(lead_data)
 
         # Call the OpenAI service layer to get the summary
-        # Assumes openai_service.ask_gpt(prompt: str) -> str
-        summary = self.openai_service.ask_gpt(prompt)
+        summary = await self.openai_service.ask_gpt(prompt)
 
         # Ensure the summary is a clean, readable string
         return summary.strip()
@@ -77,13 +76,11 @@ class InsightSummarizationAgent:
         return prompt
 
 # Example usage (in FastAPI route):
-# from app.services.openai_service import OpenAIService
-# openai_service = OpenAIService(api_key="YOUR_KEY")
-# agent = InsightSummarizationAgent(openai_service)
-# summary = agent.generate_insight(lead_data)
+# from app.services.openai_service import get_openai_service
+# agent = InsightSummarizationAgent(get_openai_service())
+# summary = await agent.generate_insight(lead_data)
 
-import openai
-import os
+from app.services.openai_service import get_openai_service
 from app.services.supabase_service import log_agent_activity
 
 def load_dataset_from_supabase(dataset_id):
@@ -98,10 +95,14 @@ def load_dataset_from_supabase(dataset_id):
             "age": [30, 25, 35],
             "score": [88, 92, 85]
         })
-    # In production, replace with real Supabase fetch
-    raise ValueError("Dataset not found")
+    # Uploaded datasets come from the columnar store
+    from app.services.dataset_ingestion import load_dataset
+    try:
+        return load_dataset(dataset_id)
+    except FileNotFoundError:
+        raise ValueError("Dataset not found")
 
-def run_insight_agent(payload):
+async def run_insight_agent(payload):
     """
     Function to run the insight agent with the provided payload.
     Accepts: { "dataset_id": ..., "query": ... }
@@ -139,13 +140,14 @@ def run_insight_agent(payload):
             f"User query: {query}"
         )
 
-        openai.api_key = os.getenv("OPENAI_API_KEY")
-        if not openai.api_key:
+        openai_service = get_openai_service()
+        if not openai_service.api_key:
             raise ValueError("Missing OPENAI_API_KEY environment variable")
 
         print("Sending to OpenAI...")
-        gpt_response = openai.ChatCompletion.create(
+        generated_text = await openai_service.chat_completion(
             model="gpt-4",
+            agent="insight",
             messages=[
                 {"role": "system", "content": "You are a business analyst. Generate actionable insights from user-provided business data or statements."},
                 {"role": "user", "content": prompt}
@@ -153,7 +155,6 @@ def run_insight_agent(payload):
             max_tokens=300
         )
 
-        generated_text = gpt_response["choices"][0]["message"]["content"]
         print("OpenAI returned:", generated_text)
 
         response["insight"] = generated_text
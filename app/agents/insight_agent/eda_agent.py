@@ -1,14 +1,27 @@
+import os
 import logging
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from app.services.eda_profile import chunk_rows, default_workers, profile_chunks, profile_csv, profile_dataset, profile_frame
+from app.services.dataset_ingestion import parse_upload
 from .base_agent import BaseAgent
 
 class EDAAgent(BaseAgent):
     """
     Exploratory Data Analysis Agent.
-    Implements the sense-plan-act loop for EDA tasks.
+    Implements the sense-plan-act loop for EDA tasks: sense records what to
+    profile, plan picks how to read it, act builds a streaming profile (see
+    app.services.eda_profile) and stores it in shared memory as "eda_profile".
     """
 
-    def __init__(self, shared_memory=None):
+    def __init__(self, shared_memory=None, workers: Optional[int] = None, chunk_rows: Optional[int] = None):
         super().__init__(shared_memory)
+        self.workers = workers
+        self.chunk_rows = chunk_rows
+        self.source = None
+        self.current_plan: Optional[Dict[str, Any]] = None
         self.logger = logging.getLogger("EDAAgent")
         self.logger.setLevel(logging.INFO)
         if not self.logger.handlers:
@@ -17,20 +30,73 @@ class EDAAgent(BaseAgent):
             handler.setFormatter(formatter)
             self.logger.addHandler(handler)
 
-    def sense(self, *args, **kwargs):
-        self.logger.info("EDAAgent: Sensing data (placeholder).")
-        # Placeholder: gather data for EDA
+    def sense(self, source=None, *args, **kwargs):
+        """
+        Record the data to profile: a DataFrame, an iterable of DataFrame
+        chunks, a path to an uploaded file, or a dataset id.
+        """
+        self.logger.info("EDAAgent: Sensing data.")
+        if source is not None:
+            self.source = source
+            self.current_plan = None
         if self.shared_memory:
-            self.shared_memory.write_memory("eda_sense", "Sensed data")
+            self.shared_memory.write_memory("eda_sense", {"source": _describe(self.source)})
 
-    def plan(self, *args, **kwargs):
-        self.logger.info("EDAAgent: Planning analysis (placeholder).")
-        # Placeholder: plan EDA steps
+    def plan(self, *args, **kwargs) -> Dict[str, Any]:
+        self.logger.info("EDAAgent: Planning analysis.")
+        source = self.source
+        if source is None:
+            method = None
+        elif isinstance(source, pd.DataFrame):
+            method = "frame"
+        elif isinstance(source, str) and os.path.exists(source):
+            # Delimited files stream through worker processes; other types are parsed whole
+            method = "csv" if os.path.splitext(source)[1].lower() in (".csv", ".tsv") else "file"
+        elif isinstance(source, str):
+            method = "dataset"
+        else:
+            method = "chunks"
+        self.current_plan = {
+            "method": method,
+            "chunk_rows": self.chunk_rows or chunk_rows(),
+            "workers": self.workers or default_workers(),
+        }
         if self.shared_memory:
-            self.shared_memory.write_memory("eda_plan", "Planned EDA steps")
+            self.shared_memory.write_memory("eda_plan", self.current_plan)
+        return self.current_plan
 
-    def act(self, *args, **kwargs):
-        self.logger.info("EDAAgent: Acting on plan (placeholder).")
-        # Placeholder: execute EDA plan
+    def act(self, *args, **kwargs) -> Optional[Dict[str, Any]]:
+        self.logger.info("EDAAgent: Acting on plan.")
+        plan = self.current_plan or self.plan()
+        method, rows, workers = plan["method"], plan["chunk_rows"], plan["workers"]
+        source = self.source
+        if method is None:
+            self.logger.info("EDAAgent: No data to profile.")
+            if self.shared_memory:
+                self.shared_memory.write_memory("eda_act", "No data to profile")
+            return None
+        if method == "frame":
+            profile = profile_frame(source, rows).result()
+        elif method == "csv":
+            sep = "\t" if source.lower().endswith(".tsv") else ","
+            profile = profile_csv(source, sep, rows, workers).result()
+        elif method == "file":
+            profile = profile_frame(parse_upload(source), rows).result()
+        elif method == "dataset":
+            profile = profile_dataset(source, rows, workers)
+        else:
+            profile = profile_chunks(source).result()
         if self.shared_memory:
-            self.shared_memory.write_memory("eda_act", "Executed EDA actions")
+            self.shared_memory.write_memory("eda_profile", profile)
+            self.shared_memory.write_memory(
+                "eda_act", f"Profiled {profile['rows']} rows and {profile['columns']} columns"
+            )
+        return profile
+
+
+def _describe(source) -> Optional[str]:
+    if source is None or isinstance(source, str):
+        return source
+    if isinstance(source, pd.DataFrame):
+        return f"DataFrame ({len(source)} rows, {len(source.columns)} columns)"
+    return type(source).__name__
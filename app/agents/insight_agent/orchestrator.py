@@ -1,16 +1,142 @@
+"""
+orchestrator.py
+---------------
+HarmonyOrchestrator runs the agents' sense-plan-act steps as a dependency graph.
+
+A run is a list of AgentSteps, each naming the steps it depends on. Steps whose
+dependencies have finished run concurrently in a thread pool (or a process
+pool for picklable, module-level callables), e.g. EDA profiling of different
+column groups or training candidate models side by side. Each step receives
+its dependencies' results as positional arguments, in depends_on order.
+
+A step that outlives its timeout is marked timed_out and abandoned. Python
+cannot stop a running thread, so it keeps its worker until it returns, but
+nothing waits for it. In a process pool an abandoned step also holds its
+worker for the rest of the run (stopping one worker would break the pool for
+the others); when the run ends, workers still busy are terminated. Steps
+downstream of a failed or timed out step are skipped. cancel() stops the run
+in progress, or the next one if called before it starts: steps not started
+yet are cancelled and running ones abandoned.
+
+Every run's per-step timings (relative to the start of the run) and its
+critical path are returned and appended to SharedMemory under
+"orchestrator_runs".
+"""
+
+import time
+import uuid
 import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
 from .eda_agent import EDAAgent
 from .model_agent import ModelAgent
 from .eval_agent import EvalAgent
 # ReportAgent will be a placeholder for now
 
+# Longest the scheduler blocks between checks for timeouts and cancel()
+POLL_SECONDS = 0.05
+
+
+class AgentStep:
+    """
+    One node of the orchestration graph.
+    """
+
+    def __init__(self, name: str, fn: Callable[..., Any], depends_on: Sequence[str] = (), timeout: Optional[float] = None):
+        self.name = name
+        self.fn = fn
+        self.depends_on = list(depends_on)
+        self.timeout = timeout
+
+    def __repr__(self):
+        return f"AgentStep({self.name!r}, depends_on={self.depends_on})"
+
+
+def _call_step(fn: Callable[..., Any], args: Sequence[Any]) -> Any:
+    return fn(*args)
+
+
+def _terminate_workers(pool: ProcessPoolExecutor):
+    """
+    Shut the pool down without waiting and terminate its worker processes,
+    including ones still running abandoned steps.
+    """
+    # ProcessPoolExecutor only grew a public terminate_workers() in Python 3.14
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+def _ordered(steps: Sequence[AgentStep]) -> List[AgentStep]:
+    """
+    Steps in a topological order; raises ValueError on duplicate names,
+    unknown dependencies or cycles.
+    """
+    by_name = {}
+    for step in steps:
+        if step.name in by_name:
+            raise ValueError(f"Duplicate step name: {step.name}")
+        by_name[step.name] = step
+    for step in steps:
+        unknown = [d for d in step.depends_on if d not in by_name]
+        if unknown:
+            raise ValueError(f"Step {step.name} depends on unknown steps: {', '.join(unknown)}")
+    order, state = [], {}
+
+    def visit(step, path):
+        if state.get(step.name) == "done":
+            return
+        if state.get(step.name) == "visiting":
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + [step.name])}")
+        state[step.name] = "visiting"
+        for dependency in step.depends_on:
+            visit(by_name[dependency], path + [step.name])
+        state[step.name] = "done"
+        order.append(step)
+
+    for step in steps:
+        visit(step, [])
+    return order
+
+
+def critical_path(timings: Dict[str, Dict[str, Any]], steps: Sequence[AgentStep]) -> List[str]:
+    """
+    The chain of dependencies that ends last: from the step that finished
+    last, follow the dependency that finished last, back to a root.
+    """
+    finished = {name: t["finished_at"] for name, t in timings.items() if t.get("finished_at") is not None}
+    if not finished:
+        return []
+    by_name = {step.name: step for step in steps}
+    name = max(finished, key=finished.get)
+    path = [name]
+    while True:
+        dependencies = [d for d in by_name[name].depends_on if d in finished]
+        if not dependencies:
+            break
+        name = max(dependencies, key=finished.get)
+        path.append(name)
+    return path[::-1]
+
+
 class HarmonyOrchestrator:
     """
     Orchestrates the sense-plan-act loop across agents.
     """
 
-    def __init__(self, shared_memory=None):
+    def __init__(self, shared_memory=None, max_workers: int = 4, use_processes: bool = False,
+                 step_timeout: Optional[float] = None):
         self.shared_memory = shared_memory
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.step_timeout = step_timeout
+        # Cancel token of the current (or next) run; replaced when a run ends
+        self._cancelled = threading.Event()
+        self._token_lock = threading.Lock()
         self.logger = logging.getLogger("HarmonyOrchestrator")
         self.logger.setLevel(logging.INFO)
         if not self.logger.handlers:
@@ -24,25 +150,155 @@ class HarmonyOrchestrator:
         self.eval_agent = EvalAgent(shared_memory)
         self.report_agent = None  # Placeholder
 
-    def run(self, *args, **kwargs):
+    def default_steps(self) -> List[AgentStep]:
+        """
+        The sense-plan-act chain of each agent; modeling follows EDA and
+        evaluation follows modeling.
+        """
+        steps, previous = [], None
+        for prefix, agent in (("eda", self.eda_agent), ("model", self.model_agent), ("eval", self.eval_agent)):
+            for phase in ("sense", "plan", "act"):
+                name = f"{prefix}.{phase}"
+                steps.append(AgentStep(name, getattr(agent, phase), [previous] if previous else []))
+                previous = name
+        return steps
+
+    def cancel(self):
+        """
+        Stop the current run: no further steps start and running ones are abandoned.
+        Called between runs, it cancels the next run.
+        """
+        with self._token_lock:
+            self._cancelled.set()
+
+    def run(self, steps: Optional[Sequence[AgentStep]] = None, *args, **kwargs) -> Dict[str, Any]:
+        """
+        Run steps (default_steps() if omitted) as a dependency graph.
+
+        Returns:
+            dict: run_id, status ("completed", "failed" or "cancelled"), duration,
+            per-step results and timings, and the critical path.
+        """
         self.logger.info("Starting HarmonyOrchestrator sense-plan-act loop.")
+        with self._token_lock:
+            cancelled = self._cancelled
+        try:
+            return self._run(_ordered(list(steps) if steps is not None else self.default_steps()), cancelled)
+        finally:
+            with self._token_lock:
+                if self._cancelled is cancelled:
+                    self._cancelled = threading.Event()
+
+    def _run(self, steps: List[AgentStep], cancelled: threading.Event) -> Dict[str, Any]:
+        by_name = {step.name: step for step in steps}
+        dependents: Dict[str, List[str]] = {step.name: [] for step in steps}
+        for step in steps:
+            for dependency in dict.fromkeys(step.depends_on):
+                dependents[dependency].append(step.name)
+        waiting = {step.name: len(set(step.depends_on)) for step in steps}
+        ready = [step.name for step in steps if not step.depends_on]
+        timings = {step.name: {"status": "pending", "depends_on": step.depends_on} for step in steps}
+        results: Dict[str, Any] = {}
+        running: Dict[Any, str] = {}
+        abandoned = []
+        started = time.monotonic()
 
-        self.logger.info("Activating EDAAgent.")
-        self.eda_agent.sense()
-        self.eda_agent.plan()
-        self.eda_agent.act()
+        def finish(name: str, status: str, error: Optional[str] = None):
+            timing = timings[name]
+            timing["status"] = status
+            if "started_at" in timing:
+                timing["finished_at"] = round(time.monotonic() - started, 6)
+                timing["duration"] = round(timing["finished_at"] - timing["started_at"], 6)
+            if error:
+                timing["error"] = error
+            if status == "completed":
+                for dependent in dependents[name]:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        ready.append(dependent)
+            else:
+                self.logger.warning("Step %s %s%s", name, status, f": {error}" if error else "")
+                skip = list(dependents[name])
+                while skip:
+                    dependent = skip.pop()
+                    if timings[dependent]["status"] == "pending":
+                        timings[dependent]["status"] = "skipped"
+                        skip.extend(dependents[dependent])
 
-        self.logger.info("Activating ModelAgent.")
-        self.model_agent.sense()
-        self.model_agent.plan()
-        self.model_agent.act()
+        pool_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        pool = pool_class(max_workers=self.max_workers)
+        try:
+            while ready or running:
+                if cancelled.is_set():
+                    break
+                # Abandoned steps still hold a worker until they return
+                abandoned = [future for future in abandoned if not future.done()]
+                while ready and len(running) + len(abandoned) < self.max_workers:
+                    name = ready.pop(0)
+                    step = by_name[name]
+                    self.logger.info("Starting step %s.", name)
+                    timings[name]["status"] = "running"
+                    timings[name]["started_at"] = round(time.monotonic() - started, 6)
+                    future = pool.submit(_call_step, step.fn, [results[d] for d in step.depends_on])
+                    running[future] = name
+                if not running:
+                    # Every worker is held by an abandoned step
+                    time.sleep(POLL_SECONDS)
+                    continue
+                now = time.monotonic() - started
+                deadlines = [
+                    timings[name]["started_at"] + timeout
+                    for name in running.values()
+                    for timeout in [by_name[name].timeout or self.step_timeout]
+                    if timeout
+                ]
+                block = min([POLL_SECONDS] + [max(deadline - now, 0) for deadline in deadlines])
+                done, _ = wait(list(running), timeout=block, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        finish(name, "failed", f"{type(e).__name__}: {e}")
+                    else:
+                        finish(name, "completed")
+                now = time.monotonic() - started
+                for future, name in list(running.items()):
+                    timeout = by_name[name].timeout or self.step_timeout
+                    if timeout and now - timings[name]["started_at"] >= timeout:
+                        del running[future]
+                        if not future.cancel():
+                            abandoned.append(future)
+                        finish(name, "timed_out", f"exceeded {timeout}s")
+            if cancelled.is_set():
+                for name, timing in timings.items():
+                    if timing["status"] == "pending":
+                        timing["status"] = "cancelled"
+                for future, name in running.items():
+                    future.cancel()
+                    finish(name, "cancelled")
+        finally:
+            busy = bool(running) or any(not future.done() for future in abandoned)
+            if busy and self.use_processes:
+                _terminate_workers(pool)
+            else:
+                pool.shutdown(wait=not (busy or cancelled.is_set()), cancel_futures=True)
 
-        self.logger.info("Activating EvalAgent.")
-        self.eval_agent.sense()
-        self.eval_agent.plan()
-        self.eval_agent.act()
+        statuses = {timing["status"] for timing in timings.values()}
+        status = "cancelled" if cancelled.is_set() else ("completed" if statuses == {"completed"} else "failed")
+        record = {
+            "run_id": uuid.uuid4().hex,
+            "status": status,
+            "duration": round(time.monotonic() - started, 6),
+            "steps": timings,
+            "critical_path": critical_path(timings, steps),
+        }
+        if self.shared_memory:
+            self.shared_memory.append_memory("orchestrator_runs", record)
 
         self.logger.info("Activating ReportAgent (placeholder).")
         # Placeholder for ReportAgent logic
 
-        self.logger.info("HarmonyOrchestrator loop complete.")
+        self.logger.info("HarmonyOrchestrator loop %s in %.3fs.", status, record["duration"])
+        record["results"] = results
+        return record
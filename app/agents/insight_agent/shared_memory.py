@@ -1,51 +1,324 @@
+"""
+shared_memory.py
+----------------
+Shared memory for the Harmony Engine agents: metadata, past decisions,
+insights, logs and any other keyed values.
+
+Memory lives in one SQLite database in WAL mode, so every thread and process
+using the same path sees the same memory. Writing a key upserts that key
+only, and append_memory adds one item to a list key (decisions, insights,
+logs) as a new row, so the cost of a write does not grow with the memory.
+Writes take the database write lock up front (BEGIN IMMEDIATE).
+
+Recently used keys are cached in memory. Each write bumps a global change
+sequence. A reader checks PRAGMA data_version, which only changes when
+another connection committed, and then refreshes just the keys changed since
+it last looked. For list keys it fetches only the appended items.
+get_context() therefore costs a few dictionary lookups while nothing
+changed. Values returned from the cache are shared, so callers must not
+modify them in place.
+
+A legacy shared_memory.json next to this module is imported once into an
+empty database.
+
+Configuration (environment variables):
+- SHARED_MEMORY_PATH: SQLite file (default ./data/shared_memory.sqlite3)
+- SHARED_MEMORY_CACHE_KEYS: number of hot keys cached per process (default 256)
+"""
+
+import os
 import json
+import sqlite3
 import threading
-import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app.config import get_env_variable
+
+# Keys every memory has, with their empty values
+DEFAULT_MEMORY = {"metadata": {}, "decisions": [], "insights": [], "logs": []}
+# Most recent logs included in get_context()
+CONTEXT_LOGS = 100
+LEGACY_JSON_PATH = os.path.join(os.path.dirname(__file__), "shared_memory.json")
+_MISSING = object()
+
+
+def _empty(key: str) -> Any:
+    default = DEFAULT_MEMORY.get(key)
+    return type(default)() if default is not None else None
+
+
+class _ListEntry:
+    """
+    Cached list key: its items, the write epoch they belong to and the last item id.
+    """
+
+    __slots__ = ("items", "epoch", "last_id")
+
+    def __init__(self, items: List[Any], epoch: int, last_id: int):
+        self.items = items
+        self.epoch = epoch
+        self.last_id = last_id
+
 
 class SharedMemory:
     """
-    Singleton class for lightweight shared memory using a JSON file.
-    Stores metadata, past decisions, insights, and logs.
+    SQLite-backed shared memory with an in-process cache of hot keys.
+    One instance per database path.
     """
 
-    _instance = None
+    _instances: Dict[str, "SharedMemory"] = {}
     _lock = threading.Lock()
-    _memory_file = os.path.join(os.path.dirname(__file__), "shared_memory.json")
 
-    def __new__(cls, *args, **kwargs):
+    def __new__(cls, path: Optional[str] = None, *args, **kwargs):
+        path = os.path.abspath(path or get_env_variable("SHARED_MEMORY_PATH", "./data/shared_memory.sqlite3"))
         with cls._lock:
-            if cls._instance is None:
-                cls._instance = super(SharedMemory, cls).__new__(cls)
-        return cls._instance
-
-    def __init__(self):
-        # Only initialize once
-        if not hasattr(self, "_initialized"):
-            self._initialized = True
-            if not os.path.exists(self._memory_file):
-                with open(self._memory_file, "w") as f:
-                    json.dump({"metadata": {}, "decisions": [], "insights": [], "logs": []}, f)
-
-    def read_memory(self):
-        with self._lock:
-            with open(self._memory_file, "r") as f:
-                return json.load(f)
-
-    def write_memory(self, key, value):
-        with self._lock:
-            data = self.read_memory()
-            data[key] = value
-            with open(self._memory_file, "w") as f:
-                json.dump(data, f, indent=2)
-
-    def get_context(self):
-        """
-        Returns a summary of the current memory context.
-        """
-        data = self.read_memory()
-        return {
-            "metadata": data.get("metadata", {}),
-            "last_decision": data.get("decisions", [])[-1] if data.get("decisions") else None,
-            "last_insight": data.get("insights", [])[-1] if data.get("insights") else None,
-            "logs": data.get("logs", [])
-        }
+            instance = cls._instances.get(path)
+            if instance is None:
+                instance = super(SharedMemory, cls).__new__(cls)
+                instance._path = path
+                cls._instances[path] = instance
+        return instance
+
+    def __init__(self, path: Optional[str] = None, cache_keys: Optional[int] = None):
+        # Only initialize once per path
+        if getattr(self, "_initialized", False):
+            return
+        self.path = self._path
+        self.cache_keys = cache_keys or int(get_env_variable("SHARED_MEMORY_CACHE_KEYS", 256))
+        self._mutex = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = None
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._seq = 0
+        self._data_version = None
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._mutex:
+            conn = self._connection()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS memory ("
+                "key TEXT PRIMARY KEY, kind TEXT NOT NULL, value TEXT, epoch INTEGER NOT NULL, seq INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS memory_items ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, epoch INTEGER NOT NULL, value TEXT NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS memory_seq (id INTEGER PRIMARY KEY CHECK (id = 1), seq INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO memory_seq (id, seq) VALUES (1, 0)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_seq ON memory (seq)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_items_key ON memory_items (key, id)")
+            self._import_legacy_json()
+        self._initialized = True
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per process; a forked child opens its own and starts with an empty cache
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA busy_timeout=30000")
+            self._pid = os.getpid()
+            self._cache.clear()
+            self._seq = 0
+            self._data_version = None
+        return self._conn
+
+    def _import_legacy_json(self):
+        conn = self._connection()
+        if not os.path.exists(LEGACY_JSON_PATH) or conn.execute("SELECT 1 FROM memory LIMIT 1").fetchone():
+            return
+        try:
+            with open(LEGACY_JSON_PATH, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for key, value in data.items():
+            self.write_memory(key, value)
+
+    # Writes
+
+    def _begin(self, conn: sqlite3.Connection) -> int:
+        # BEGIN IMMEDIATE takes the write lock up front, so concurrent processes serialize cleanly
+        conn.execute("BEGIN IMMEDIATE")
+        return conn.execute("SELECT seq FROM memory_seq WHERE id = 1").fetchone()[0]
+
+    def _commit(self, conn: sqlite3.Connection, seq_before: int) -> bool:
+        """
+        Commit the write; True when nobody else wrote since the last sync, so
+        the cache is still complete and can be updated in place.
+        """
+        conn.execute("UPDATE memory_seq SET seq = ? WHERE id = 1", (seq_before + 1,))
+        conn.execute("COMMIT")
+        if seq_before != self._seq:
+            return False
+        self._seq = seq_before + 1
+        return True
+
+    def write_memory(self, key: str, value: Any):
+        """
+        Set key to value, replacing any previous value (lists included).
+        """
+        with self._mutex:
+            self._sync()
+            conn = self._connection()
+            seq_before = self._begin(conn)
+            try:
+                row = conn.execute("SELECT epoch FROM memory WHERE key = ?", (key,)).fetchone()
+                epoch = (row[0] if row else 0) + 1
+                conn.execute("DELETE FROM memory_items WHERE key = ?", (key,))
+                last_id = 0
+                if isinstance(value, list):
+                    conn.execute(
+                        "INSERT OR REPLACE INTO memory (key, kind, value, epoch, seq) VALUES (?, 'list', NULL, ?, ?)",
+                        (key, epoch, seq_before + 1),
+                    )
+                    for item in value:
+                        last_id = conn.execute(
+                            "INSERT INTO memory_items (key, epoch, value) VALUES (?, ?, ?)",
+                            (key, epoch, json.dumps(item, default=str)),
+                        ).lastrowid
+                else:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO memory (key, kind, value, epoch, seq) VALUES (?, 'value', ?, ?, ?)",
+                        (key, json.dumps(value, default=str), epoch, seq_before + 1),
+                    )
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self._commit(conn, seq_before)
+            # Cache what readers would decode from the database
+            cached = json.loads(json.dumps(value, default=str))
+            self._remember(key, _ListEntry(cached, epoch, last_id) if isinstance(value, list) else cached)
+
+    def append_memory(self, key: str, item: Any):
+        """
+        Append item to the list stored under key (created empty if missing).
+        """
+        encoded = json.dumps(item, default=str)
+        with self._mutex:
+            self._sync()
+            conn = self._connection()
+            seq_before = self._begin(conn)
+            try:
+                row = conn.execute("SELECT kind, epoch FROM memory WHERE key = ?", (key,)).fetchone()
+                if row is not None and row[0] != "list":
+                    raise ValueError(f"Shared memory key {key!r} does not hold a list")
+                epoch = row[1] if row else 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO memory (key, kind, value, epoch, seq) VALUES (?, 'list', NULL, ?, ?)",
+                    (key, epoch, seq_before + 1),
+                )
+                item_id = conn.execute(
+                    "INSERT INTO memory_items (key, epoch, value) VALUES (?, ?, ?)", (key, epoch, encoded)
+                ).lastrowid
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            current = self._commit(conn, seq_before)
+            entry = self._cache.get(key)
+            if not current:
+                self._cache.pop(key, None)
+            elif isinstance(entry, _ListEntry) and entry.epoch == epoch:
+                entry.items.append(json.loads(encoded))
+                entry.last_id = item_id
+                self._cache.move_to_end(key)
+            elif row is None:
+                self._remember(key, _ListEntry([json.loads(encoded)], epoch, item_id))
+            else:
+                self._cache.pop(key, None)
+
+    # Reads
+
+    def _sync(self):
+        """
+        Bring the cache up to date with commits made by other connections.
+        """
+        conn = self._connection()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+        self._data_version = data_version
+        seq = conn.execute("SELECT seq FROM memory_seq WHERE id = 1").fetchone()[0]
+        if seq == self._seq:
+            return
+        changed = conn.execute("SELECT key, kind, epoch FROM memory WHERE seq > ?", (self._seq,)).fetchall()
+        for key, kind, epoch in changed:
+            entry = self._cache.get(key)
+            if isinstance(entry, _ListEntry) and kind == "list" and entry.epoch == epoch:
+                self._extend(conn, key, entry)
+            else:
+                self._cache.pop(key, None)
+        self._seq = seq
+
+    def _extend(self, conn: sqlite3.Connection, key: str, entry: _ListEntry):
+        # Lists only grow within an epoch, so only items after last_id are new
+        for item_id, value in conn.execute(
+            "SELECT id, value FROM memory_items WHERE key = ? AND epoch = ? AND id > ? ORDER BY id",
+            (key, entry.epoch, entry.last_id),
+        ):
+            entry.items.append(json.loads(value))
+            entry.last_id = item_id
+
+    def _remember(self, key: str, value: Any):
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_keys:
+            self._cache.popitem(last=False)
+
+    def _load(self, key: str) -> Any:
+        conn = self._connection()
+        row = conn.execute("SELECT kind, value, epoch FROM memory WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return _MISSING
+        kind, value, epoch = row
+        if kind != "list":
+            return json.loads(value)
+        entry = _ListEntry([], epoch, 0)
+        self._extend(conn, key, entry)
+        return entry
+
+    def get_memory(self, key: str, default: Any = None) -> Any:
+        """
+        Value stored under key, or default when the key was never written.
+        """
+        with self._mutex:
+            self._sync()
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                value = self._cache[key]
+            else:
+                value = self._load(key)
+                if value is _MISSING:
+                    return default if default is not None else _empty(key)
+                self._remember(key, value)
+        return value.items if isinstance(value, _ListEntry) else value
+
+    def read_memory(self) -> Dict[str, Any]:
+        """
+        Every key and its value.
+        """
+        with self._mutex:
+            conn = self._connection()
+            data = {key: _empty(key) for key in DEFAULT_MEMORY}
+            for key, kind, value in conn.execute("SELECT key, kind, value FROM memory ORDER BY key"):
+                data[key] = [] if kind == "list" else json.loads(value)
+            for key, value in conn.execute("SELECT key, value FROM memory_items ORDER BY id"):
+                data[key].append(json.loads(value))
+            return data
+
+    def get_context(self, log_limit: int = CONTEXT_LOGS) -> Dict[str, Any]:
+        """
+        Returns a summary of the current memory context (metadata, the last
+        decision and insight, and the most recent log_limit logs).
+        """
+        with self._mutex:
+            decisions = self.get_memory("decisions")
+            insights = self.get_memory("insights")
+            logs = self.get_memory("logs")
+            return {
+                "metadata": self.get_memory("metadata"),
+                "last_decision": decisions[-1] if decisions else None,
+                "last_insight": insights[-1] if insights else None,
+                "logs": logs[-log_limit:] if log_limit else [],
+            }
@@ -6,9 +6,173 @@ Implements the LeadIntelligenceAgent class for lead scoring and enrichment.
 - score_lead: Scores a lead from 0 to 100 based on weighted fields.
 - enrich_lead: Simulates enrichment by adding fields like industry and employee size.
 - _calculate_field_weight: Helper for field-specific scoring logic.
+- score_leads / enrich_leads: The same scoring and enrichment over a DataFrame of leads.
+- classify_title / is_free_domain: The title and email domain rules, memoized by get_classification_cache().
+
+The DataFrame methods classify whole columns at once: titles and email
+domains are factorized and each distinct value is looked up once, and
+company size goes through np.digitize over the tier boundaries. Their output
+matches the per-lead methods row by row.
+
+Title and free-domain classifications are memoized in one process-wide
+ClassificationCache (app/services/classification_cache.py) shared by every
+agent instance and by both the per-lead and DataFrame methods. A cache miss
+falls through to the rules: one compiled regex per title tier, and a set
+lookup of the domain before the substring scan over FREE_EMAIL_DOMAINS. The
+rule lists below are tuples; assigning new ones clears the cache on its next
+lookup and recompiles the tiers.
+
+Industry is deliberately not memoized: enrich_lead's rule matches keywords
+anywhere in the address, including the local part, so a domain table would
+not be enough, and the three substring checks cost less than a memo lookup.
+
+Configuration (environment variables):
+- CLASSIFICATION_CACHE_MAX_ENTRIES: capacity of the domain and title tables (default 10000)
+- CLASSIFICATION_CACHE_WARM_PATH: JSON or CSV file of domains/titles to pre-warm the tables with (unset = none)
 """
 
-from typing import Dict
+import re
+import functools
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.agents.frame_utils import truthy
+from app.config import get_env_variable
+from app.services.classification_cache import ClassificationCache
+
+SCORE_WEIGHTS = {"company_size": 40, "title": 30, "email": 20, "phone": 10}
+
+SENIOR_TITLES = ("chief", "ceo", "cfo", "coo", "cto", "cmo")
+MID_TITLES = ("vp", "vice president", "director")
+MANAGER_TITLES = ("manager",)
+OTHER_TITLE_WEIGHT = 0.1
+FREE_EMAIL_DOMAINS = ("gmail.com", "yahoo.com", "hotmail.com", "outlook.com")
+# (substrings of the email, industry), first match wins
+INDUSTRY_RULES = (
+    (("finance",), "Finance"),
+    (("tech", "software"), "Technology"),
+    (("health",), "Healthcare"),
+)
+GENERAL_INDUSTRY = "General"
+
+# Text after the last "@", like email.split("@")[-1]
+EMAIL_DOMAIN_PATTERN = re.compile(r"@([^@]*)\Z")
+
+# np.digitize(int(company_size), COMPANY_SIZE_BINS) indexes COMPANY_SIZE_WEIGHTS
+COMPANY_SIZE_BINS = np.array([1, 50, 250, 1000])
+COMPANY_SIZE_WEIGHTS = np.array([0.0, 0.1, 0.4, 0.7, 1.0])
+EMPLOYEE_SIZE_BINS = np.array([50, 250, 1000])
+EMPLOYEE_SIZE_LABELS = np.array(["Small Business", "SMB", "Mid-Market", "Enterprise"], dtype=object)
+
+
+def title_tiers() -> Tuple:
+    """
+    (pattern over the lowercased title, weight) per seniority tier, most
+    senior first, compiled once per set of title lists.
+    """
+    return _compile_title_tiers(SENIOR_TITLES, MID_TITLES, MANAGER_TITLES)
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_title_tiers(senior: Tuple[str, ...], mid: Tuple[str, ...], manager: Tuple[str, ...]) -> Tuple:
+    return tuple(
+        (re.compile("|".join(map(re.escape, keywords))), weight)
+        for keywords, weight in ((senior, 1.0), (mid, 0.7), (manager, 0.4))
+        if keywords
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _free_domain_set(domains: Tuple[str, ...]) -> frozenset:
+    return frozenset(domains)
+
+
+def classification_rules() -> Tuple:
+    """
+    The rule lists the classification cache depends on.
+    """
+    return (SENIOR_TITLES, MID_TITLES, MANAGER_TITLES, OTHER_TITLE_WEIGHT, FREE_EMAIL_DOMAINS)
+
+
+def classify_title(title: str) -> float:
+    """
+    Seniority weight of a (non-empty) job title.
+    """
+    title = title.lower()
+    for pattern, weight in title_tiers():
+        if pattern.search(title):
+            return weight
+    return OTHER_TITLE_WEIGHT
+
+
+def classify_industry(text: str) -> str:
+    """
+    Industry of the first INDUSTRY_RULES entry with a keyword in text.
+    """
+    for keywords, industry in INDUSTRY_RULES:
+        for keyword in keywords:
+            if keyword in text:
+                return industry
+    return GENERAL_INDUSTRY
+
+
+def is_free_domain(domain: str) -> bool:
+    """
+    Whether an email domain contains a FREE_EMAIL_DOMAINS entry (case-insensitively).
+    """
+    lowered = domain.lower()
+    return lowered in _free_domain_set(FREE_EMAIL_DOMAINS) or any(free in lowered for free in FREE_EMAIL_DOMAINS)
+
+
+_classification_cache: Optional[ClassificationCache] = None
+
+
+def get_classification_cache() -> ClassificationCache:
+    """
+    Return the process-wide domain/title classification cache, pre-warmed
+    from CLASSIFICATION_CACHE_WARM_PATH on first use.
+    """
+    global _classification_cache
+    if _classification_cache is None:
+        cache = ClassificationCache(
+            classification_rules,
+            is_free_domain,
+            classify_title,
+            max_entries=int(get_env_variable("CLASSIFICATION_CACHE_MAX_ENTRIES", 10000)),
+        )
+        warm_path = get_env_variable("CLASSIFICATION_CACHE_WARM_PATH")
+        if warm_path:
+            try:
+                cache.warm_from_file(warm_path)
+            except (OSError, ValueError, AttributeError) as e:
+                print("Classification cache warm-up failed:", str(e))
+        _classification_cache = cache
+    return _classification_cache
+
+
+def _company_size_ints(df: pd.DataFrame) -> np.ndarray:
+    """
+    int(company_size) per row as floats, NaN where the value is missing or int() rejects it.
+    """
+    if "company_size" not in df.columns:
+        return np.full(len(df), np.nan)
+    column = df["company_size"]
+    if pd.api.types.is_numeric_dtype(column.dtype):
+        size = np.trunc(column.to_numpy(dtype=float, na_value=np.nan))
+        size[~np.isfinite(size)] = np.nan
+        return size
+    # Mixed or string values go through int() once per distinct value
+    codes, uniques = pd.factorize(column)
+    table = np.full(len(uniques) + 1, np.nan)
+    for i, value in enumerate(uniques):
+        try:
+            table[i] = int(value)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return table[codes]
+
 
 class LeadIntelligenceAgent:
     """
@@ -65,15 +229,8 @@ class LeadIntelligenceAgent:
         enriched = lead_data.copy()
 
         # Simulate industry enrichment from email domain
-        email = lead_data.get("email", "")
-        if "finance" in email:
-            enriched["industry"] = "Finance"
-        elif "tech" in email or "software" in email:
-            enriched["industry"] = "Technology"
-        elif "health" in email:
-            enriched["industry"] = "Healthcare"
-        else:
-            enriched["industry"] = "General"
+        # The rule reads the whole address (not only the domain), so it is not memoized
+        enriched["industry"] = classify_industry(lead_data.get("email", ""))
 
         # Employee size category
         size = lead_data.get("company_size", 0)
@@ -88,6 +245,80 @@ class LeadIntelligenceAgent:
 
         return enriched
 
+    def score_leads(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Scores every lead in df; matches score_lead row by row.
+
+        Field weights are computed column-wise (see _title_weights,
+        _email_weights and _company_size_weights) and combined in score_lead's
+        order. Missing values (absent column, None or NaN) weigh like a missing key.
+        """
+        weights = {
+            "company_size": self._company_size_weights(df),
+            "title": self._title_weights(df),
+            "email": self._email_weights(df),
+            "phone": truthy(df, "phone").astype(float),
+        }
+        score = np.zeros(len(df))
+        for field, weight in SCORE_WEIGHTS.items():
+            score = score + weights[field] * weight
+        score = np.clip(np.floor_divide(score, 100), 0, 100)
+        return pd.Series(score.astype(np.int64), index=df.index, name="score")
+
+    def _title_weights(self, df: pd.DataFrame) -> np.ndarray:
+        # Look each distinct title up in the shared classification cache,
+        # as str(title) like score_lead
+        present = truthy(df, "title")
+        weights = np.zeros(len(df))
+        if not present.any():
+            return weights
+        codes, uniques = pd.factorize(df["title"][present])
+        cache = get_classification_cache()
+        table = np.array([cache.title(title) for title in pd.Series(uniques, dtype=object).astype(str)])
+        weights[present] = table[codes]
+        return weights
+
+    def _email_weights(self, df: pd.DataFrame) -> np.ndarray:
+        # Extract the domain column once (NaN without an "@"), then look each
+        # distinct domain up in the shared classification cache
+        if "email" not in df.columns or pd.api.types.is_numeric_dtype(df["email"].dtype):
+            return np.zeros(len(df))
+        domains = df["email"].str.extract(EMAIL_DOMAIN_PATTERN, expand=False)
+        codes, uniques = pd.factorize(domains)
+        cache = get_classification_cache()
+        table = np.array([0.3 if cache.free_domain(domain) else 1.0 for domain in uniques] + [0.0])
+        return table[codes]
+
+    def _company_size_weights(self, df: pd.DataFrame) -> np.ndarray:
+        # int(company_size) bucketed with np.digitize; values int() rejects weigh 0
+        size = _company_size_ints(df)
+        weights = COMPANY_SIZE_WEIGHTS[np.digitize(np.nan_to_num(size, nan=0.0), COMPANY_SIZE_BINS)]
+        weights[np.isnan(size)] = 0.0
+        return weights
+
+    def enrich_leads(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Enriches every lead in df; matches enrich_lead row by row, and returns
+        a copy of df with industry and employee_size columns.
+        """
+        df = df.copy(deep=False)
+        email = df["email"] if "email" in df.columns else pd.Series("", index=df.index)
+        email = email.where(email.notna(), "").astype(str)
+        codes = np.select(
+            [
+                np.logical_or.reduce([email.str.contains(word, regex=False).to_numpy(dtype=bool) for word in words])
+                for words, _ in INDUSTRY_RULES
+            ],
+            np.arange(1, len(INDUSTRY_RULES) + 1),
+            default=0,
+        )
+        labels = np.array([GENERAL_INDUSTRY] + [industry for _, industry in INDUSTRY_RULES], dtype=object)
+        df["industry"] = labels[codes]
+        size = pd.to_numeric(df["company_size"], errors="coerce").to_numpy(dtype=float) if "company_size" in df.columns else np.zeros(len(df))
+        codes = np.digitize(np.nan_to_num(size, nan=0.0), EMPLOYEE_SIZE_BINS)
+        df["employee_size"] = EMPLOYEE_SIZE_LABELS[codes]
+        return df
+
     def _calculate_field_weight(self, field_name: str, field_value) -> float:
         """
         Helper to assign a normalized weight (0.0-1.0) for a given field and value.
@@ -116,25 +347,13 @@ class LeadIntelligenceAgent:
         elif field_name == "title":
             if not field_value:
                 return 0.0
-            title = str(field_value).lower()
-            if any(senior in title for senior in ["chief", "ceo", "cfo", "coo", "cto", "cmo"]):
-                return 1.0
-            elif any(mid in title for mid in ["vp", "vice president", "director"]):
-                return 0.7
-            elif "manager" in title:
-                return 0.4
-            else:
-                return 0.1
+            return get_classification_cache().title(str(field_value))
 
         elif field_name == "email":
             if not field_value or "@" not in field_value:
                 return 0.0
-            domain = field_value.split("@")[-1].lower()
-            free_domains = ["gmail.com", "yahoo.com", "hotmail.com", "outlook.com"]
-            if any(free in domain for free in free_domains):
-                return 0.3
-            else:
-                return 1.0
+            is_free = get_classification_cache().free_domain(field_value.split("@")[-1])
+            return 0.3 if is_free else 1.0
 
         elif field_name == "phone":
             return 1.0 if field_value else 0.0
@@ -142,11 +361,10 @@ class LeadIntelligenceAgent:
         return 0.0
 
 
-import openai
-import os
+from app.services.openai_service import get_openai_service
 from app.services.supabase_service import log_agent_activity
 
-def analyze_lead(payload):
+async def analyze_lead(payload):
     """
     Function to analyze a lead with the provided payload.
     
@@ -172,13 +390,10 @@ def analyze_lead(payload):
     }
     
     try:
-        openai.api_key = os.getenv("OPENAI_API_KEY")
-        if not openai.api_key:
-            raise ValueError("Missing OPENAI_API_KEY")
-
         print("Sending lead data to OpenAI...")
-        summary = openai.ChatCompletion.create(
+        generated = await get_openai_service().chat_completion(
             model="gpt-4",
+            agent="lead_score",
             messages=[
                 {"role": "system", "content": "You are a lead scoring assistant. Use provided lead data to generate a brief assessment and lead quality score."},
                 {"role": "user", "content": str(input_data)}
@@ -186,7 +401,6 @@ def analyze_lead(payload):
             max_tokens=300
         )
         
-        generated = summary["choices"][0]["message"]["content"]
         print("OpenAI returned lead analysis:", generated)
         response["analysis"] = generated
     except Exception as e:
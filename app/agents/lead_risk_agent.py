@@ -2,6 +2,12 @@
 
 # TODO: Implement risk scoring for leads
 
+import numpy as np
+import pandas as pd
+
+from app.agents.frame_utils import truthy
+
+
 class LeadRiskAgent:
     def __init__(self):
         pass
@@ -18,3 +24,16 @@ class LeadRiskAgent:
         if lead_data.get('score', 100) < 50:
             risk_score += 0.5
         return min(risk_score, 1.0)
+
+    def run_frame(self, leads):
+        """
+        Risk scores for a whole table of leads (a DataFrame or a dict of
+        columns); matches run() row by row. Missing values (absent column,
+        None or NaN) count like a missing key.
+        """
+        df = leads if isinstance(leads, pd.DataFrame) else pd.DataFrame(leads)
+        risk_score = np.where(truthy(df, 'email'), 0.0, 0.5)
+        if 'score' in df.columns:
+            score = pd.to_numeric(df['score'], errors='coerce').to_numpy(dtype=float)
+            risk_score = risk_score + np.where(score < 50, 0.5, 0.0)
+        return pd.Series(np.minimum(risk_score, 1.0), index=df.index, name='risk_score')
@@ -2,6 +2,32 @@
 
 # TODO: Implement lifetime value (LTV) scoring for leads
 
+import numpy as np
+import pandas as pd
+
+
+def _column(df, name, default):
+    # Numeric column with default for an absent column or a missing value
+    if name not in df.columns:
+        return np.full(len(df), float(default))
+    values = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=float)
+    return np.where(np.isnan(values), float(default), values)
+
+
+def _round2(values):
+    """
+    round(value, 2) for a float array. np.round scales by 100 first, which can
+    differ from Python's correctly rounded round() right at a half cent, so
+    those few values are rounded with round() itself.
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_half = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in near_half.tolist():
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+
 class LtvAgent:
     def __init__(self):
         pass
@@ -17,12 +43,24 @@ class LtvAgent:
         projected_ltv = base_value * company_size * score_multiplier
         return round(projected_ltv, 2)
 
+    def run_frame(self, leads):
+        """
+        Projected LTV for a whole table of leads (a DataFrame or a dict of
+        columns); matches run() row by row. Missing values (absent column,
+        None or NaN) fall back to run()'s defaults.
+        """
+        df = leads if isinstance(leads, pd.DataFrame) else pd.DataFrame(leads)
+        base_value = 1000
+        company_size = _column(df, 'company_size', 1)
+        score_multiplier = _column(df, 'score', 50) / 100
+        projected_ltv = base_value * company_size * score_multiplier
+        return pd.Series(_round2(projected_ltv), index=df.index, name='projected_ltv')
+
 
-import openai
-import os
+from app.services.openai_service import get_openai_service
 from app.services.supabase_service import log_agent_activity
 
-def estimate_lifetime_value(payload):
+async def estimate_lifetime_value(payload):
     """
     Function to estimate the lifetime value of a lead with the provided payload.
     
@@ -48,13 +86,10 @@ def estimate_lifetime_value(payload):
     }
     
     try:
-        openai.api_key = os.getenv("OPENAI_API_KEY")
-        if not openai.api_key:
-            raise ValueError("Missing OPENAI_API_KEY")
-
         print("Sending lead data to OpenAI for LTV estimation...")
-        summary = openai.ChatCompletion.create(
+        generated = await get_openai_service().chat_completion(
             model="gpt-4",
+            agent="ltv",
             messages=[
                 {"role": "system", "content": "You are a financial forecasting assistant. Analyze the provided lead data to estimate lifetime value (LTV) based on deal amount, frequency, contract length, and other relevant factors."},
                 {"role": "user", "content": str(input_data)}
@@ -62,7 +97,6 @@ def estimate_lifetime_value(payload):
             max_tokens=300
         )
         
-        generated = summary["choices"][0]["message"]["content"]
         print("OpenAI returned LTV estimate:", generated)
         response["ltv_estimate"] = generated
     except Exception as e:
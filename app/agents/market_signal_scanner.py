@@ -3,28 +3,125 @@ market_signal_scanner.py
 ------------------------
 Defines the MarketSignalScanner class for analyzing market signals in leads.
 
-- scan_lead: Adds a market_signal field to the lead dictionary based on keyword matches in simulated news headlines.
-- fetch_news_headlines: Returns a static list of example news headlines.
+- scan_lead: Adds market_signal (and the list of relevant market_signals) to a lead.
+- scan_leads: Batch version of scan_lead sharing one signal index.
+- scan_frame: Column-wise version over a DataFrame of leads.
+- signal_index: Returns the SignalIndex for the current headlines, rebuilt at most once per TTL window.
+- fetch_news_headlines: Returns the cached news feed snapshot, or a static list of example headlines when no feed is configured.
+
+Headlines are matched against all keywords at once with one compiled,
+case-insensitive regex alternation when the index is built, not per lead.
+Matched headlines are indexed by their word tokens, so a lead's company and
+industry tokens look up its relevant signals directly. A lead with no
+relevant signal falls back to the first matching headline, as before.
+Headlines come from the news feed's on-disk snapshot (app/services/news_feed.py),
+which a background task refreshes; scanning never fetches a feed itself.
+
+Configuration (environment variables):
+- MARKET_SIGNAL_TTL_SECONDS: How long fetched headlines and their index are reused (default 900)
 """
 
-from typing import Dict, List
+import re
+import time
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.config import get_env_variable
+from app.services.news_feed import NewsFeed, get_news_feed
+
+NO_SIGNAL = "No significant signals detected."
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[&'][a-z0-9]+)*")
+# Tokens too generic to tie a headline to a company or industry
+STOPWORDS = frozenset({
+    "a", "an", "and", "by", "co", "company", "corp", "for", "from", "group", "in", "inc",
+    "into", "llc", "ltd", "new", "of", "on", "the", "to", "with",
+})
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Lowercase word tokens of text, without stopwords.
+    """
+    if not text:
+        return []
+    return [t for t in TOKEN_PATTERN.findall(str(text).lower()) if t not in STOPWORDS]
+
+
+class SignalIndex:
+    """
+    Keyword matches over a fixed set of headlines, indexed by headline token.
+    """
+
+    def __init__(self, headlines: Sequence[str], keywords: Sequence[str]):
+        self.headlines = list(headlines)
+        self.keywords = list(keywords)
+        # Longest keywords first, so the alternation prefers the most specific match
+        ordered = sorted({k for k in self.keywords if k}, key=len, reverse=True)
+        self.pattern = re.compile("|".join(re.escape(k) for k in ordered), re.IGNORECASE) if ordered else None
+        self.matches: List[int] = []
+        self.keywords_by_headline: Dict[int, List[str]] = {}
+        self.by_token: Dict[str, List[int]] = {}
+        canonical = {k.lower(): k for k in self.keywords}
+        for i, headline in enumerate(self.headlines):
+            found = [canonical[m.group(0).lower()] for m in self.pattern.finditer(headline)] if self.pattern else []
+            if not found:
+                continue
+            self.matches.append(i)
+            self.keywords_by_headline[i] = list(dict.fromkeys(found))
+            for token in set(tokenize(headline)):
+                self.by_token.setdefault(token, []).append(i)
+
+    def relevant(self, tokens: Iterable[str]) -> List[int]:
+        """
+        Matching headlines sharing any of tokens, in headline order.
+        """
+        found = set()
+        for token in tokens:
+            found.update(self.by_token.get(token, ()))
+        return sorted(found)
+
+    def signals_for(self, lead: Dict) -> List[Dict]:
+        tokens = tokenize(lead.get("company")) + tokenize(lead.get("industry"))
+        return [
+            {"headline": self.headlines[i], "keywords": self.keywords_by_headline[i]}
+            for i in self.relevant(tokens)
+        ]
+
+    def first_match(self) -> Optional[str]:
+        return self.headlines[self.matches[0]] if self.matches else None
+
 
 class MarketSignalScanner:
     """
-    Scans a lead for market signals using keyword matching in simulated news headlines.
+    Scans leads for market signals using keyword matching in simulated news headlines.
     """
 
-    def __init__(self):
+    def __init__(self, ttl_seconds: Optional[float] = None, feed: Optional[NewsFeed] = None):
         # Example keywords for signal detection
         self.keywords = [
             "AI", "M&A", "layoffs", "expansion", "partnership", "fundraising"
         ]
+        if ttl_seconds is None:
+            ttl_seconds = float(get_env_variable("MARKET_SIGNAL_TTL_SECONDS", "900"))
+        self.ttl_seconds = ttl_seconds
+        self.feed = feed
+        self._index: Optional[SignalIndex] = None
+        self._index_keywords: Optional[List[str]] = None
+        self._index_version = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
 
     def fetch_news_headlines(self) -> List[str]:
         """
-        Returns a static list of simulated news headlines.
-        In a real implementation, this would fetch from a news API.
+        Returns the headlines of the cached news feed snapshot, or a static list
+        of simulated news headlines when no feed source is configured.
         """
+        feed = self.feed or get_news_feed()
+        if feed.sources:
+            return feed.headlines()
         return [
             "Tech company raises $50 million in Series B funding.",
             "Major layoffs expected in retail sector.",
@@ -38,11 +135,50 @@ class MarketSignalScanner:
             "Company invests in AI-driven analytics."
         ]
 
+    def signal_index(self) -> SignalIndex:
+        """
+        Return the signal index, fetching headlines and rebuilding it only when
+        the TTL window has passed, the keywords changed or the feed snapshot
+        was refreshed.
+        """
+        with self._lock:
+            expired = time.monotonic() - self._built_at >= self.ttl_seconds
+            version = self._feed_version()
+            if self._index is None or expired or self._index_keywords != self.keywords or version != self._index_version:
+                self._index = SignalIndex(self.fetch_news_headlines(), self.keywords)
+                self._index_keywords = list(self.keywords)
+                self._index_version = version
+                self._built_at = time.monotonic()
+            return self._index
+
+    def _feed_version(self):
+        # A new feed snapshot also invalidates the index (one stat() while unchanged)
+        feed = self.feed or get_news_feed()
+        return feed.load_snapshot().get("refreshed_at") if feed.sources else None
+
+    def invalidate(self):
+        """
+        Drop the cached index so the next scan fetches headlines again.
+        """
+        with self._lock:
+            self._index = None
+
+    def _apply(self, lead: Dict, index: SignalIndex) -> Dict:
+        lead = lead.copy()
+        signals = index.signals_for(lead)
+        lead["market_signals"] = signals
+        if signals:
+            lead["market_signal"] = signals[0]["headline"]
+        else:
+            lead["market_signal"] = index.first_match() or NO_SIGNAL
+        return lead
+
     def scan_lead(self, lead: Dict) -> Dict:
         """
-        Scans news headlines for keywords and updates the lead with a market signal.
-        If a keyword is found in any headline, sets market_signal to the matched headline.
-        Otherwise, sets market_signal to 'No significant signals detected.'
+        Updates the lead with market signals from the headline index.
+        market_signals lists the keyword-matching headlines that mention the
+        lead's company or industry; market_signal is the first of them, else
+        the first keyword-matching headline, else 'No significant signals detected.'
 
         Args:
             lead (dict): The lead dictionary.
@@ -50,34 +186,61 @@ class MarketSignalScanner:
         Returns:
             dict: The updated lead dictionary.
         """
-        lead = lead.copy()
-        headlines = self.fetch_news_headlines()
-        found_signal = False
-
-        # Check each headline for any keyword match
-        for headline in headlines:
-            for keyword in self.keywords:
-                if keyword.lower() in headline.lower():
-                    lead["market_signal"] = headline
-                    found_signal = True
-                    break
-            if found_signal:
-                break
-
-        if not found_signal:
-            lead["market_signal"] = "No significant signals detected."
-
         # The /scan_market_signals endpoint will add market_signal_detected field
-        return lead
+        return self._apply(lead, self.signal_index())
+
+    def scan_leads(self, leads: Iterable[Dict]) -> List[Dict]:
+        """
+        Scans a batch of leads against one snapshot of the signal index.
+        """
+        index = self.signal_index()
+        return [self._apply(lead, index) for lead in leads]
+
+
+    def scan_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Scans every lead in df against one snapshot of the signal index and
+        returns a copy of df with market_signals and market_signal columns.
+
+        Signals only depend on a lead's (company, industry) pair, so they are
+        looked up once per distinct pair. Leads with the same pair share one
+        market_signals list.
+        """
+        index = self.signal_index()
+        df = df.copy(deep=False)
+        fallback = index.first_match() or NO_SIGNAL
+        # One code per distinct (company, industry) pair; 0 stands for a missing value
+        codes, values = [], []
+        for name in ("company", "industry"):
+            if name in df.columns:
+                column_codes, uniques = pd.factorize(df[name])
+            else:
+                column_codes, uniques = np.full(len(df), -1), []
+            codes.append(column_codes.astype(np.int64) + 1)
+            values.append([None] + list(uniques))
+        pairs, inverse = np.unique(codes[0] * len(values[1]) + codes[1], return_inverse=True)
+        signals, headline = [], []
+        for pair in pairs.tolist():
+            company, industry = values[0][pair // len(values[1])], values[1][pair % len(values[1])]
+            found = index.signals_for({"company": company, "industry": industry})
+            signals.append(found)
+            headline.append(found[0]["headline"] if found else fallback)
+        signal_table = np.empty(len(signals), dtype=object)
+        for i, found in enumerate(signals):
+            signal_table[i] = found
+        codes = inverse.reshape(-1)
+        df["market_signals"] = signal_table[codes]
+        df["market_signal"] = np.asarray(headline, dtype=object)[codes]
+        return df
 
 
 def scan_market_signals(payload):
     """
     Function to scan for market signals with the provided payload.
-    
+
     Args:
         payload (dict): The lead data to scan for market signals.
-        
+
     Returns:
         dict: A dictionary containing the status and echoed payload.
     """
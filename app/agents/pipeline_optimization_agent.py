@@ -4,10 +4,23 @@ pipeline_optimization_agent.py
 Defines the PipelineOptimizationAgent class for recommending pipeline actions.
 
 - recommend_action: Enriches a lead with a recommended_action field based on win_probability and market_signal_detected.
+- recommend_actions: Same rules applied column-wise to a DataFrame of leads.
 """
 
 from typing import Dict
 
+import numpy as np
+import pandas as pd
+
+from app.agents.frame_utils import column_or_default, truthy
+
+RECOMMENDED_ACTIONS = np.array([
+    "Move to Contract Stage",
+    "Schedule Follow-Up Call",
+    "Send Discount Offer",
+    "Nurture — Low Priority",
+], dtype=object)
+
 class PipelineOptimizationAgent:
     """
     Provides simple rule-based recommendations for pipeline movement.
@@ -48,6 +61,20 @@ class PipelineOptimizationAgent:
 
         return lead
 
+    def recommend_actions(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vectorized recommend_action: returns a copy of df with a
+        recommended_action column.
+        """
+        df = df.copy(deep=False)
+        win_prob = column_or_default(df, "win_probability", 0)
+        signal = truthy(df, "market_signal_detected")
+        choice = np.select(
+            [win_prob >= 80, (win_prob >= 50) & (win_prob < 80), signal & (win_prob < 50)], [0, 1, 2], default=3
+        )
+        df["recommended_action"] = RECOMMENDED_ACTIONS[choice]
+        return df
+
 
 def optimize_pipeline(payload):
     """
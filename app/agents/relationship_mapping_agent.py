@@ -1,37 +1,215 @@
 # relationship_mapping_agent.py
 
-# TODO: Implement relationship mapping and graph data extraction for leads
+"""
+Relationship mapping between leads.
+
+Two leads are connected when they share any of the mapped fields (by default
+industry or location) and have different ids. Rather than comparing every
+pair of leads, RelationshipIndex builds an inverted index from each field
+value to the positions of the leads holding it (group membership stored as
+CSR arrays), which is O(n) to build and store. Connection counts come from
+group sizes by inclusion-exclusion; explicit neighbor lists are only
+materialized on demand, optionally capped per lead.
+
+Missing values follow the == of the original pairwise implementation: None
+matches None, so leads without a value share one group, while NaN (or NaT)
+matches nothing, not even itself, so each such lead gets a group of its own.
+"""
+
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_FIELDS = ("industry", "location")
+
+
+def _factorize(values: Sequence[Any]) -> np.ndarray:
+    series = pd.Series(values, dtype=object)
+    missing = np.flatnonzero(series.isna().to_numpy())
+    if len(missing):
+        # A fresh sentinel per NaN keeps it out of every shared group; None stays one group
+        series = series.copy()
+        for i in missing:
+            if series.iat[i] is not None:
+                series.iat[i] = object()
+    codes, _ = pd.factorize(series, use_na_sentinel=False)
+    return codes.astype(np.int64, copy=False)
+
+
+def _combine(codes: Sequence[np.ndarray]) -> np.ndarray:
+    # One dense code per distinct tuple of codes, re-densified after every step
+    # so the mixed-radix key never overflows
+    combined = codes[0]
+    for other in codes[1:]:
+        key = combined * (int(other.max(initial=0)) + 1) + other
+        _, combined = np.unique(key, return_inverse=True)
+    return combined.astype(np.int64, copy=False)
+
+
+def _shared_counts(codes: Sequence[np.ndarray]) -> np.ndarray:
+    # For every lead, how many leads (itself included) share all of the given codes
+    combined = _combine(codes)
+    return np.bincount(combined)[combined]
+
+
+class FieldGroups:
+    """
+    Group membership for one field: codes[i] is lead i's group, and the members
+    of group g are indices[indptr[g]:indptr[g + 1]] in input order.
+    """
+
+    def __init__(self, field: str, values: Sequence[Any]):
+        self.field = field
+        self.codes = _factorize(values)
+        _, first = np.unique(self.codes, return_index=True)
+        self.values = [values[i] for i in first]
+        sizes = np.bincount(self.codes, minlength=len(self.values))
+        self.indptr = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self.indices = np.argsort(self.codes, kind="stable").astype(np.int64)
+
+    def members(self, group: int) -> np.ndarray:
+        return self.indices[self.indptr[group]:self.indptr[group + 1]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "values": [None if pd.isna(v) else v for v in self.values],
+            "indptr": self.indptr.tolist(),
+            "indices": self.indices.tolist(),
+        }
+
+
+class RelationshipIndex:
+    """
+    Inverted index over leads for the fields that define a relationship.
+    """
+
+    def __init__(self, leads: Iterable[Dict[str, Any]], fields: Sequence[str] = DEFAULT_FIELDS):
+        leads = leads if isinstance(leads, list) else list(leads)
+        self.fields = tuple(fields)
+        self.lead_ids = [lead.get("id") for lead in leads]
+        self._id_codes = _factorize(self.lead_ids)
+        self.groups = {field: FieldGroups(field, [lead.get(field) for lead in leads]) for field in self.fields}
+
+    def __len__(self) -> int:
+        return len(self.lead_ids)
+
+    def degree(self, max_connections: Optional[int] = None) -> np.ndarray:
+        """
+        Number of connections per lead, without materializing any of them.
+
+        |union of the lead's groups| minus the leads sharing its id within that
+        union, both by inclusion-exclusion over the per-field group sizes.
+        """
+        degree = np.zeros(len(self), dtype=np.int64)
+        field_codes = [self.groups[f].codes for f in self.fields]
+        for size in range(1, len(field_codes) + 1):
+            sign = 1 if size % 2 else -1
+            for subset in combinations(field_codes, size):
+                degree += sign * (_shared_counts(subset) - _shared_counts([self._id_codes, *subset]))
+        if max_connections is not None:
+            np.minimum(degree, max_connections, out=degree)
+        return degree
+
+    def neighbors(self, position: int, max_connections: Optional[int] = None) -> np.ndarray:
+        """
+        Positions connected to the lead at position, in input order.
+        """
+        limit = None if max_connections is None else max_connections + int(
+            np.count_nonzero(self._id_codes == self._id_codes[position])
+        )
+        candidates = np.empty(0, dtype=np.int64)
+        for field in self.fields:
+            groups = self.groups[field]
+            candidates = np.union1d(candidates, groups.members(groups.codes[position])[:limit])
+        candidates = candidates[:limit]
+        candidates = candidates[self._id_codes[candidates] != self._id_codes[position]]
+        return candidates[:max_connections]
+
+    def connections(self, lead_id: Any, max_connections: Optional[int] = None) -> List[Any]:
+        """
+        Ids of the leads connected to lead_id (first lead with that id).
+        """
+        position = self.lead_ids.index(lead_id)
+        return [self.lead_ids[j] for j in self.neighbors(position, max_connections)]
+
+    def to_csr(self, max_connections: Optional[int] = None):
+        """
+        Adjacency as CSR arrays (indptr, indices) over lead positions, with each
+        lead's neighbors in input order and at most max_connections of them.
+
+        Without a cap the result holds every connection, which is O(n^2) for
+        large groups; prefer group membership or a cap for big inputs.
+        """
+        n = len(self)
+        if n == 0:
+            return np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int64)
+        degree = self.degree(max_connections)
+        # Leads that share every field value share one candidate list
+        combo = _combine([self.groups[f].codes for f in self.fields])
+        _, representative = np.unique(combo, return_index=True)
+        dup_ids = int(np.bincount(self._id_codes).max())
+        width = int(degree.max(initial=0)) + dup_ids
+        table = np.full((len(representative), width), -1, dtype=np.int64)
+        for c, position in enumerate(representative):
+            candidates = np.empty(0, dtype=np.int64)
+            for field in self.fields:
+                groups = self.groups[field]
+                candidates = np.union1d(candidates, groups.members(groups.codes[position])[:width])
+            candidates = candidates[:width]
+            table[c, :len(candidates)] = candidates
+        # Per lead: drop padding and same-id leads, then keep the first degree[i]
+        rows = table[combo]
+        valid = rows >= 0
+        valid[valid] = self._id_codes[rows[valid]] != np.repeat(self._id_codes, valid.sum(axis=1))
+        valid &= np.cumsum(valid, axis=1) <= degree[:, None]
+        indptr = np.concatenate([[0], np.cumsum(degree)]).astype(np.int64)
+        return indptr, rows[valid]
+
+    def to_dict(self, max_connections: Optional[int] = None) -> Dict[str, Any]:
+        """
+        JSON-friendly relationship map: lead ids, per-field group membership and
+        connection counts, plus capped CSR adjacency when max_connections is set.
+        """
+        result = {
+            "lead_ids": self.lead_ids,
+            "fields": list(self.fields),
+            "membership": {f: self.groups[f].codes.tolist() for f in self.fields},
+            "groups": {f: self.groups[f].to_dict() for f in self.fields},
+            "degree": self.degree(max_connections).tolist(),
+        }
+        if max_connections is not None:
+            indptr, indices = self.to_csr(max_connections)
+            result["adjacency"] = {"indptr": indptr.tolist(), "indices": indices.tolist()}
+        return result
+
 
 class RelationshipMappingAgent:
-    def __init__(self):
-        pass
+    def __init__(self, fields: Sequence[str] = DEFAULT_FIELDS):
+        self.fields = tuple(fields)
+
+    def build_index(self, leads_list) -> RelationshipIndex:
+        return RelationshipIndex(leads_list, self.fields)
 
-    def run(self, leads_list):
+    def run(self, leads_list, max_connections: Optional[int] = None):
         """
-        Constructs a simple relationship map between leads based on shared industries or locations.
+        Constructs a relationship map between leads based on shared industries or locations.
+
+        Returns group membership (O(n)) rather than per-lead connection lists;
+        with max_connections, also a CSR adjacency holding at most that many
+        connections per lead.
         """
-        # TODO: Refine relationship mapping (e.g., graph algorithms, OpenAI, etc.)
-        relationships = {}
-        for i, lead in enumerate(leads_list):
-            lead_id = lead.get('id')
-            connections = []
-            for other_lead in leads_list:
-                if other_lead['id'] != lead_id and (
-                    lead.get('industry') == other_lead.get('industry') or
-                    lead.get('location') == other_lead.get('location')
-                ):
-                    connections.append(other_lead['id'])
-            relationships[lead_id] = {"connections": connections}
-        return relationships
+        return self.build_index(leads_list).to_dict(max_connections)
 
 
 def map_relationships(payload):
     """
     Function to map relationships between leads with the provided payload.
-    
+
     Args:
         payload (dict): The lead data to map relationships for.
-        
+
     Returns:
         dict: A dictionary containing the status and echoed payload.
     """
@@ -4,10 +4,16 @@ revenue_forecasting_agent.py
 Defines the RevenueForecastingAgent class for simple rule-based revenue forecasting.
 
 - forecast: Enriches a lead with win_probability and estimated_revenue based on score and market_signal_detected.
+- forecast_leads: Same rules applied column-wise to a DataFrame of leads.
 """
 
 from typing import Dict
 
+import numpy as np
+import pandas as pd
+
+from app.agents.frame_utils import column_or_default, truthy
+
 class RevenueForecastingAgent:
     """
     Provides a simple rule-based forecast for lead win probability and estimated revenue.
@@ -52,6 +58,19 @@ class RevenueForecastingAgent:
 
         return lead
 
+    def forecast_leads(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vectorized forecast: returns a copy of df with win_probability and
+        estimated_revenue columns, matching forecast() row by row.
+        """
+        df = df.copy(deep=False)
+        score = column_or_default(df, "score", 0)
+        signal = truthy(df, "market_signal_detected")
+        conditions = [(score > 80) & signal, score > 80, signal]
+        df["win_probability"] = np.select(conditions, [90, 75, 60], default=35)
+        df["estimated_revenue"] = np.select(conditions, [50000, 40000, 30000], default=15000)
+        return df
+
 
 def forecast_revenue(payload):
     """
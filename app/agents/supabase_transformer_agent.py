@@ -6,7 +6,7 @@ Agent to dynamically create tables in Supabase based on the schema of enriched J
 - Infers schema and maps types to PostgreSQL
 - Checks/creates tables in Supabase
 - Inserts data
-- Logs to /logs/supabase_transform_log.csv
+- Logs to /logs/supabase_transform_log.csv through the buffered pipeline log
 - Supports optional table_overrides.yaml and "target_table" tag
 """
 
@@ -15,14 +15,14 @@ load_dotenv()
 
 import os
 import json
-import csv
 import glob
 import yaml
 import httpx
-from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from etl.pipeline_log import get_log
+
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 SUPABASE_SCHEMA = "public"
@@ -134,15 +134,8 @@ def insert_rows(table_name: str, records: List[Dict[str, Any]]):
         raise Exception(f"Failed to insert rows: {resp.text}")
 
 def log_transform(file: str, table: str, status: str, count: int, error: Optional[str] = None):
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    log_path = log_dir / "supabase_transform_log.csv"
-    exists = log_path.exists()
-    with open(log_path, "a", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        if not exists:
-            writer.writerow(["timestamp", "file", "table", "status", "count", "error"])
-        writer.writerow([datetime.utcnow().isoformat(), file, table, status, count, error or ""])
+    log = get_log("supabase_transform_log", ["timestamp", "file", "table", "status", "count", "error"], "logs")
+    log.write({"file": file, "table": table, "status": status, "count": count, "error": error or ""})
 
 def process_file(file_path: Path, overrides: Dict[str, Any]):
     try:
@@ -3,19 +3,20 @@ webhook_listener_agent.py
 -------------------------
 Agent for listening to incoming webhooks from third-party platforms (Stripe, Facebook Lead Ads, Zapier, etc.).
 Saves payloads to /data/raw/webhooks/{source}/{timestamp}.json.
-Logs events to /logs/webhook_log.csv.
+Logs events to /logs/webhook_log.csv through the buffered pipeline log.
 Handles Stripe signature verification and challenge verification (basic stubs).
 """
 
 import os
 import json
-import csv
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional
 
 from fastapi import Request, HTTPException
 
+from etl.pipeline_log import get_log
+
 def save_webhook_payload(source: str, payload: Dict[str, Any]):
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     out_dir = Path(f"data/raw/webhooks/{source}")
@@ -26,15 +27,8 @@ def save_webhook_payload(source: str, payload: Dict[str, Any]):
     return str(out_path)
 
 def log_webhook_event(source: str, status_code: int):
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    log_path = log_dir / "webhook_log.csv"
-    exists = log_path.exists()
-    with open(log_path, "a", newline="") as csvfile:
-        writer = csv.writer(csvfile)
-        if not exists:
-            writer.writerow(["timestamp", "source", "status_code"])
-        writer.writerow([datetime.utcnow().isoformat(), source, status_code])
+    log = get_log("webhook_log", ["timestamp", "source", "status_code"], "logs")
+    log.write({"source": source, "status_code": status_code})
 
 def verify_stripe_signature(request: Request) -> bool:
     # Placeholder for Stripe signature verification
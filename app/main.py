@@ -10,8 +10,12 @@ from fastapi.middleware.cors import CORSMiddleware
 
 # Import routers (to be implemented in the routes package)
 from app.routes import auth_routes, lead_routes, insight_routes, utility_routes, connector_routes, webhook_routes
-from app.routes import dataset_routes
+from app.routes import dataset_routes, job_routes
 from app.routes import auto_analysis_routes, strategy_routes, report_routes, forecast_routes, analysis_routes
+from app.services.openai_service import get_openai_service
+from app.services import log_shipper, job_service
+from app.services.news_feed import get_news_feed
+from etl import pipeline_log
 
 app = FastAPI(
     title="Lead Commander Backend",
@@ -42,6 +46,7 @@ api_router.include_router(strategy_routes.router, tags=["strategy"])
 api_router.include_router(report_routes.router, tags=["reports"])
 api_router.include_router(forecast_routes.router, tags=["forecast"])
 api_router.include_router(analysis_routes.router, prefix="/analysis", tags=["analysis"])
+api_router.include_router(job_routes.router, prefix="/jobs", tags=["jobs"])
 
 # Mount the API router at /api
 app.include_router(api_router, prefix="/api")
@@ -55,6 +60,41 @@ async def log_routes():
             print(f"{list(route.methods)} {route.path}")
     print("=================================")
 
+# Fail jobs left queued or running by a previous crash or restart
+@app.on_event("startup")
+async def recover_jobs():
+    await job_service.start()
+
+# Keep the cached news feed snapshot (read by MarketSignalScanner) up to date
+@app.on_event("startup")
+async def start_news_feed():
+    get_news_feed().start()
+
+@app.on_event("shutdown")
+async def stop_news_feed():
+    await get_news_feed().stop()
+
+# Write out buffered agent logs (connector, webhook, transform) before exiting
+@app.on_event("shutdown")
+async def flush_pipeline_logs():
+    pipeline_log.shutdown()
+
+# Deliver queued Supabase activity/prediction logs before exiting
+@app.on_event("shutdown")
+async def flush_log_shipper():
+    import asyncio
+    await asyncio.to_thread(log_shipper.shutdown)
+
+# Stop the background job pool
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await job_service.ashutdown()
+
+# Close pooled OpenAI connections
+@app.on_event("shutdown")
+async def close_openai_client():
+    await get_openai_service().aclose()
+
 # Root endpoint for health check (optional, /health is also available)
 @app.get("/")
 async def root():
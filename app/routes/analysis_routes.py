@@ -1,42 +1,34 @@
 from fastapi import APIRouter, Request
-import pandas as pd
-
-# Import the in-memory registry from dataset_routes for demo purposes
-from app.routes.dataset_routes import DATASET_REGISTRY
-
 import os
-import time
+import asyncio
 
 router = APIRouter()
 
-# Track last analysis run (in-memory for demo)
-LAST_ANALYSIS_RUN = {"dataset_id": None, "timestamp": None}
+from app.services.job_service import LastRunView, get_job_store, submit_job
+from app.services.dataset_ingestion import SUPPORTED_FILE_TYPES, load_dataset, uploads_dir
+from app.services.eda_profile import profile_frame
+
+# Last completed analysis run, read from the job store
+LAST_ANALYSIS_RUN = LastRunView("analysis", get_job_store)
 
 def load_dataset_by_id(dataset_id):
-    # Try in-memory registry first
-    for ds in DATASET_REGISTRY.values():
-        if ds["dataset_id"] == dataset_id:
-            print(f"[LOAD] Dataset loaded from memory: {dataset_id}")
-            # In production, load from disk or DB
-            # Here, return a dummy DataFrame
-            return pd.DataFrame({
-                "col1": [1, 2, 3],
-                "col2": ["a", "b", "c"]
-            })
-    # Fallback: try loading from disk
-    import os
-    disk_path = f"./data/uploads/{dataset_id}.csv"
-    if os.path.exists(disk_path):
-        print(f"[LOAD] Dataset loaded from disk: {dataset_id}")
-        return pd.read_csv(disk_path)
-    raise ValueError("Dataset not found")
+    # Ingested datasets load from the columnar copy, others from the raw upload
+    try:
+        df = load_dataset(dataset_id)
+    except FileNotFoundError:
+        raise ValueError("Dataset not found")
+    print(f"[LOAD] Dataset loaded: {dataset_id}")
+    return df
 
 def run_eda_agent(df):
-    # Stub: return example EDA results
+    # Per-column profile built chunk by chunk from mergeable sketches
+    profile = profile_frame(df).result()
+    missing = f"{profile['missing']} missing values." if profile["missing"] else "No missing values."
     return {
-        "summary": "3 rows, 2 columns. No missing values.",
+        "summary": f"{profile['rows']} rows, {profile['columns']} columns. {missing}",
         "columns": list(df.columns),
-        "head": df.head(3).to_dict(orient="records")
+        "head": df.head(3).to_dict(orient="records"),
+        "profile": profile
     }
 
 def run_modeling_pipeline(df):
@@ -70,43 +62,60 @@ def compose_markdown_report(eda, modeling, evaluation):
     md += f"Notes: {evaluation['notes']}\n"
     return md
 
-@router.post("/start")
-async def run_full_analysis(payload: dict):
-    dataset_id = payload.get("dataset_id")
-    if not dataset_id:
-        return {"status": "failed", "error": "No dataset_id provided"}
-    try:
+def run_analysis_job(ctx, dataset_id):
+    """
+    Full analysis pipeline, run as a background job.
+    """
+    with ctx.stage("load"):
+        ctx.progress(0.05, "Loading dataset")
         df = load_dataset_by_id(dataset_id)
+    with ctx.stage("eda"):
+        ctx.progress(0.2, "Running EDA")
         eda_results = run_eda_agent(df)
+    with ctx.stage("modeling"):
+        ctx.progress(0.5, "Training models")
         model_results = run_modeling_pipeline(df)
+    with ctx.stage("evaluation"):
+        ctx.progress(0.8, "Evaluating models")
         evaluation = evaluate_models(model_results)
+    with ctx.stage("report"):
+        ctx.progress(0.9, "Composing report")
         markdown = compose_markdown_report(eda_results, model_results, evaluation)
-        # Log last analysis run
-        LAST_ANALYSIS_RUN["dataset_id"] = dataset_id
-        LAST_ANALYSIS_RUN["timestamp"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-        return {
-            "status": "completed",
-            "eda": eda_results,
-            "modeling": model_results,
-            "evaluation": evaluation,
-            "markdown": markdown
-        }
-    except Exception as e:
-        return {"status": "failed", "error": str(e)}
+    return {
+        "status": "completed",
+        "eda": eda_results,
+        "modeling": model_results,
+        "evaluation": evaluation,
+        "markdown": markdown
+    }
+
+@router.post("/start")
+async def run_full_analysis(payload: dict, wait: bool = False):
+    """
+    Queue a full analysis of a dataset and return its job id.
+    Poll /api/jobs/{job_id} (or stream /api/jobs/{job_id}/events) for the result,
+    or pass wait=true to block until the analysis finishes.
+    """
+    dataset_id = payload.get("dataset_id")
+    if not dataset_id:
+        return {"status": "failed", "error": "No dataset_id provided"}
+    return await submit_job(
+        "analysis", run_analysis_job, dataset_id, params={"dataset_id": dataset_id}, wait=wait
+    )
 
 @router.get("/logs")
 async def analysis_logs():
     # List available dataset files
-    uploads_dir = "./data/uploads"
+    uploads = uploads_dir()
     try:
         files = []
-        if os.path.exists(uploads_dir):
-            for fname in os.listdir(uploads_dir):
-                if fname.endswith(".csv"):
+        if os.path.exists(uploads):
+            for fname in os.listdir(uploads):
+                if os.path.splitext(fname)[1][1:].lower() in SUPPORTED_FILE_TYPES:
                     files.append(fname)
         logs = {
             "available_datasets": files,
-            "last_analysis_run": LAST_ANALYSIS_RUN
+            "last_analysis_run": await asyncio.to_thread(LAST_ANALYSIS_RUN.snapshot)
         }
         print(f"[LOGS] Analysis logs requested: {logs}")
         return logs
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Request
 import pandas as pd
+from app.services.job_service import submit_job
+from app.services.dataset_cache import load_csv
 
 router = APIRouter()
 
@@ -20,34 +22,47 @@ def run_modeling_pipeline(df):
         "visuals": ["histogram.png", "heatmap.png"]
     }
 
-@router.post("/ml/auto")
-async def auto_analysis(request: Request):
-    try:
-        data = await request.json()
-        # Simulate loading a dataset from a path or inline data
+def auto_analysis_job(ctx, data):
+    """
+    Load the dataset and run the modeling pipeline, as a background job.
+    """
+    with ctx.stage("load"):
+        ctx.progress(0.1, "Loading dataset")
         if "dataset_path" in data:
             try:
-                df = pd.read_csv(data["dataset_path"])
+                df = load_csv(data["dataset_path"])
             except Exception as e:
                 print(f"Dataset loading failed: {e}")
-                return {"status": "failed", "error": "Dataset not found"}
-        elif "data" in data:
+                raise ValueError("Dataset not found")
+        else:
             try:
                 df = pd.DataFrame(data["data"])
             except Exception as e:
                 print(f"Data parsing failed: {e}")
-                return {"status": "failed", "error": "Invalid data format"}
-        else:
-            print("No dataset_path or data provided in request.")
-            return {"status": "failed", "error": "No dataset provided"}
+                raise ValueError("Invalid data format")
 
-        # Run modeling pipeline
+    with ctx.stage("modeling"):
+        ctx.progress(0.4, "Running modeling pipeline")
         result = run_modeling_pipeline(df)
-        # Validate output structure
-        if not isinstance(result, dict) or "summary" not in result or "metrics" not in result:
-            print("Modeling pipeline returned invalid structure.")
-            return {"status": "failed", "error": "Modeling pipeline error"}
-        return result
+    # Validate output structure
+    if not isinstance(result, dict) or "summary" not in result or "metrics" not in result:
+        print("Modeling pipeline returned invalid structure.")
+        raise ValueError("Modeling pipeline error")
+    return result
+
+@router.post("/ml/auto")
+async def auto_analysis(request: Request, wait: bool = False):
+    """
+    Queue automatic modeling for a dataset path or inline data and return the job id
+    (or the result, with wait=true).
+    """
+    try:
+        data = await request.json()
+        if "dataset_path" not in data and "data" not in data:
+            print("No dataset_path or data provided in request.")
+            return {"status": "failed", "error": "No dataset provided"}
+        params = {"dataset_path": data["dataset_path"]} if "dataset_path" in data else {"rows": len(data["data"] or [])}
+        return await submit_job("ml_auto", auto_analysis_job, data, params=params, wait=wait)
     except Exception as exc:
         print(f"Auto analysis error: {exc}")
         return {"status": "failed", "error": str(exc)}
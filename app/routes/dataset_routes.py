@@ -1,52 +1,60 @@
 """
 dataset_routes.py
 -----------------
-Endpoint for uploading datasets, inferring schema, and dynamic table creation in Supabase.
+Endpoint for uploading datasets, ingesting them into the columnar store, inferring schema,
+and dynamic table creation in Supabase.
 """
 
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, UploadFile, File, HTTPException
 import pandas as pd
 import os
+import asyncio
 from app.agents import supabase_transformer_agent
+from app.services.dataset_ingestion import ingest_dataset_job, load_profile, uploads_dir
+from app.services.dataset_registry import get_dataset_registry
+from app.services.upload_stream import StreamingUpload
+from app.services.job_service import JobQueueFull, get_job_manager
 
 router = APIRouter()
 
-# In-memory dataset registry for demonstration (replace with DB/Supabase in production)
+# Persistent dataset registry (SQLite, shared across workers)
 from datetime import datetime
-import uuid
-
-DATASET_REGISTRY = {}
+from typing import Optional
 
 def canonicalize_datasets():
     """
     Return only the most current version of each dataset_id.
-    Prefer status 'ready', else most recent timestamp.
+    Prefer status 'ready', else most recent timestamp (precomputed by the registry).
     """
-    by_id = {}
-    for ds in DATASET_REGISTRY.values():
-        ds_id = ds["dataset_id"]
-        if ds_id not in by_id:
-            by_id[ds_id] = ds
-        else:
-            # Prefer 'ready' status, else latest timestamp
-            current = by_id[ds_id]
-            if ds["status"] == "ready" and current["status"] != "ready":
-                by_id[ds_id] = ds
-            elif ds["status"] == current["status"]:
-                if ds["created_at"] > current["created_at"]:
-                    by_id[ds_id] = ds
-    return list(by_id.values())
+    datasets, _ = get_dataset_registry().list_current()
+    return datasets
 
 @router.get("/datasets/list")
-async def list_datasets():
+async def list_datasets(
+    status: Optional[str] = None,
+    file_type: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0
+):
     print("Received request for /datasets/list")
-    datasets = canonicalize_datasets()
-    return {"datasets": datasets}
+    limit = min(max(limit, 1), 1000)
+    offset = max(offset, 0)
+    datasets, total = await asyncio.to_thread(
+        get_dataset_registry().list_current, status, file_type, q, limit, offset
+    )
+    return {"datasets": datasets, "total": total, "limit": limit, "offset": offset}
 
 @router.get("/")
-async def list_datasets_alias():
+async def list_datasets_alias(
+    status: Optional[str] = None,
+    file_type: Optional[str] = None,
+    q: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0
+):
     print("Received request for /datasets (alias for /datasets/list)")
-    return await list_datasets()
+    return await list_datasets(status, file_type, q, limit, offset)
 
 @router.post("/upload_dataset")
 @router.post("/upload-files")
@@ -54,37 +62,110 @@ async def upload_dataset(file: UploadFile = File(...)):
     import os
     from time import time
     start_time = time()
-    filename = os.path.splitext(file.filename)[0]
+    filename = os.path.splitext(os.path.basename(file.filename))[0]
     dataset_id = f"{filename}".lower()
     timestamp = datetime.utcnow().isoformat() + "Z"
-    file_type = os.path.splitext(file.filename)[1][1:]
+    file_type = (os.path.splitext(file.filename)[1][1:] or "csv").lower()
 
-    # Save file to disk (streaming)
-    os.makedirs("./data/uploads", exist_ok=True)
-    disk_path = f"./data/uploads/{dataset_id}.csv"
-    with open(disk_path, "wb") as out_file:
+    # Stream to a temp file, hashing, counting bytes and sniffing CSV shape on the way
+    upload = StreamingUpload(uploads_dir(), file_type)
+    try:
         while True:
             chunk = await file.read(1024 * 1024)
             if not chunk:
                 break
-            out_file.write(chunk)
-    print(f"[UPLOAD] Dataset saved to disk: {disk_path}")
+            upload.write(chunk)
+        metadata = upload.finish()
+    except Exception:
+        upload.abort()
+        raise
 
     elapsed = time() - start_time
     if elapsed > 5:
         print(f"[UPLOAD] WARNING: Upload+save took {elapsed:.2f}s for {file.filename}")
 
-    # Register minimal metadata (status: processing)
-    DATASET_REGISTRY[uuid.uuid4().hex] = {
+    # Identical re-upload of the latest version: keep it instead of registering a copy
+    registry = get_dataset_registry()
+    existing = await asyncio.to_thread(registry.find_by_hash, dataset_id, metadata["content_hash"])
+    if existing is not None:
+        upload.abort()
+        print(f"[UPLOAD] Duplicate upload of {dataset_id} ({metadata['content_hash'][:12]}), reusing version {existing['version_id']}")
+        return {
+            "dataset_id": dataset_id,
+            "version_id": existing["version_id"],
+            "status": existing["status"],
+            "job_id": existing["job_id"],
+            "content_hash": metadata["content_hash"],
+            "deduplicated": True
+        }
+
+    # Content-addressed name, so a new upload never overwrites a file that is being read
+    disk_path = upload.commit(
+        os.path.join(uploads_dir(), f"{dataset_id}.{metadata['content_hash'][:16]}.{file_type}")
+    )
+    print(f"[UPLOAD] Dataset saved to disk: {disk_path} ({metadata['size_bytes']} bytes)")
+
+    # Register minimal metadata (status: processing) until ingestion finishes;
+    # rows/columns are the sniffed values for CSV until ingestion fills in exact ones
+    version_id = await asyncio.to_thread(registry.register, {
         "dataset_id": dataset_id,
         "filename": file.filename,
         "status": "processing",
         "created_at": timestamp,
         "file_type": file_type,
-        "disk_path": disk_path
-    }
+        "disk_path": disk_path,
+        "content_hash": metadata["content_hash"],
+        "size_bytes": metadata["size_bytes"],
+        "rows": metadata.get("rows"),
+        "columns": metadata.get("columns")
+    })
+
+    # Parse, profile and convert to the columnar store in the background;
+    # the job flips the registry entry to ready (or failed) when it finishes
+    manager = get_job_manager()
+    try:
+        job_id = await manager.submit(
+            "ingest", ingest_dataset_job, dataset_id, disk_path, file_type,
+            registry_path=registry.path, version_id=version_id,
+            params={"dataset_id": dataset_id, "version_id": version_id}
+        )
+    except JobQueueFull as e:
+        await asyncio.to_thread(registry.update, version_id, status="failed", error=str(e))
+        return {"dataset_id": dataset_id, "status": "failed", "error": str(e)}
+    await asyncio.to_thread(registry.update, version_id, job_id=job_id)
 
     return {
         "dataset_id": dataset_id,
-        "status": "processing"
+        "version_id": version_id,
+        "status": "processing",
+        "job_id": job_id,
+        "content_hash": metadata["content_hash"],
+        "size_bytes": metadata["size_bytes"],
+        "rows": metadata.get("rows"),
+        "columns": metadata.get("columns"),
+        "deduplicated": False
     }
+
+@router.get("/{dataset_id}")
+async def get_dataset(dataset_id: str, versions: bool = False):
+    """
+    Return the current version of a dataset (and optionally every version).
+    """
+    registry = get_dataset_registry()
+    dataset = await asyncio.to_thread(registry.get, dataset_id)
+    if dataset is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    response = {"dataset": dataset}
+    if versions:
+        response["versions"] = await asyncio.to_thread(registry.versions, dataset_id)
+    return response
+
+@router.get("/{dataset_id}/profile")
+async def dataset_profile(dataset_id: str):
+    """
+    Return the precomputed profile of an ingested dataset.
+    """
+    profile = await asyncio.to_thread(load_profile, dataset_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found (dataset missing or still processing)")
+    return {"dataset_id": dataset_id, "profile": profile}
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Request
 import pandas as pd
+from app.services.job_service import submit_job
+from app.services.dataset_ingestion import load_dataset
 
 router = APIRouter()
 
@@ -25,7 +27,11 @@ def load_dataset_from_supabase(dataset_id):
     Raises ValueError if dataset_id is invalid.
     """
     if dataset_id != "demo":
-        raise ValueError("Invalid or missing dataset ID")
+        # Uploaded datasets come from the columnar store
+        try:
+            return load_dataset(dataset_id)
+        except FileNotFoundError:
+            raise ValueError("Invalid or missing dataset ID")
     # Dummy quarterly revenue data
     return pd.DataFrame({
         "period": ["2025-Q1", "2025-Q2"],
@@ -74,25 +80,36 @@ def simple_forecast(df, time_col, target_col):
         "summary": summary
     }
 
+def forecast_job(ctx, dataset_id):
+    """
+    Detect the time/target columns and project the next periods, as a background job.
+    """
+    with ctx.stage("load"):
+        ctx.progress(0.1, "Loading dataset")
+        df = load_dataset_from_supabase(dataset_id)
+    with ctx.stage("detect_columns"):
+        ctx.progress(0.4, "Detecting time and target columns")
+        time_col = detect_time_column(df)
+        target_col = detect_target_column(df)
+    if not time_col or not target_col:
+        print("Could not detect a valid time or numeric target column.")
+        raise ValueError("Could not detect a valid time or numeric target column.")
+    with ctx.stage("forecast"):
+        ctx.progress(0.7, "Forecasting")
+        return simple_forecast(df, time_col, target_col)
+
 @router.post("/forecast/generate")
-async def generate_forecast(request: Request):
+async def generate_forecast(request: Request, wait: bool = False):
+    """
+    Queue a forecast for a dataset and return the job id (or the result, with wait=true).
+    """
     try:
         data = await request.json()
         dataset_id = data.get("dataset_id")
         if not dataset_id:
             print("Missing dataset_id in request.")
             return {"status": "failed", "error": "Invalid or missing dataset ID"}
-        df = load_dataset_from_supabase(dataset_id)
-        time_col = detect_time_column(df)
-        target_col = detect_target_column(df)
-        if not time_col or not target_col:
-            print("Could not detect a valid time or numeric target column.")
-            return {
-                "status": "failed",
-                "error": "Could not detect a valid time or numeric target column."
-            }
-        result = simple_forecast(df, time_col, target_col)
-        return result
+        return await submit_job("forecast", forecast_job, dataset_id, params={"dataset_id": dataset_id}, wait=wait)
     except Exception as e:
         print(f"Forecast generation error: {e}")
         return {"status": "failed", "error": str(e)}
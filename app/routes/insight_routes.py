@@ -6,6 +6,7 @@ Defines insight generation API routes.
 
 from fastapi import APIRouter, HTTPException
 from app.models.schemas import InsightRequest, InsightResponse
+from app.services.single_flight import coalesce
 
 router = APIRouter()
 
@@ -23,6 +24,7 @@ async def generate_insight(payload: InsightRequest):
     """
     try:
         from app.agents.insight_agent import run_insight_agent
-        return run_insight_agent(payload.dict())
+        data = payload.dict()
+        return await coalesce("insight", data, lambda: run_insight_agent(data))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,78 @@
+"""
+job_routes.py
+-------------
+Status endpoints for background jobs (polling, listing, SSE and cancellation).
+"""
+
+import json
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.services.job_service import TERMINAL_STATUSES, get_job_manager
+
+router = APIRouter()
+
+
+@router.get("/")
+async def list_jobs(kind: Optional[str] = None, status: Optional[str] = None, limit: int = 50, offset: int = 0):
+    """
+    List jobs, newest first, optionally filtered by kind and status.
+    """
+    jobs = await asyncio.to_thread(
+        get_job_manager().store.list, kind, status, min(max(limit, 1), 500), max(offset, 0)
+    )
+    return {"jobs": jobs, "limit": limit, "offset": offset}
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """
+    Return a job's status, progress, timings and (once completed) result.
+    """
+    job = await asyncio.to_thread(get_job_manager().store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str, poll_seconds: float = 0.5):
+    """
+    Server-sent events stream of a job's progress; ends with a "done" event.
+    """
+    store = get_job_manager().store
+    if await asyncio.to_thread(store.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def stream():
+        last = None
+        while True:
+            job = await asyncio.to_thread(store.get, job_id)
+            snapshot = (job["status"], job["progress"], job["message"], json.dumps(job["timings"]))
+            if snapshot != last:
+                last = snapshot
+                event = "done" if job["status"] in TERMINAL_STATUSES else "progress"
+                if event == "progress":
+                    job.pop("result", None)
+                yield f"event: {event}\ndata: {json.dumps(job, default=str)}\n\n"
+                if event == "done":
+                    return
+            await asyncio.sleep(max(poll_seconds, 0.05))
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancel a job that is still queued.
+    """
+    manager = get_job_manager()
+    if await asyncio.to_thread(manager.store.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not await manager.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Only queued jobs can be cancelled")
+    return {"job_id": job_id, "status": "cancelling"}
@@ -4,7 +4,9 @@ lead_routes.py
 Defines lead management API routes.
 """
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request
 from app.schemas.lead_schema import LeadAnalysisRequest
 from app.models.schemas import (
     LeadAnalysisResponse,
@@ -12,6 +14,9 @@ from app.models.schemas import (
     LtvEstimateResponse,
 )
 from typing import List
+from app.services.single_flight import coalesce
+from app.config import get_env_variable
+from app.services.lead_pipeline import run_lead_pipeline
 
 router = APIRouter()
 
@@ -36,25 +41,17 @@ async def get_leads():
 
 
 from pydantic import BaseModel
-import os
-import openai
-
-# You may want to tune these weights for your use case
-STAGE_WEIGHT = {
-    "Prospecting": 2,
-    "Qualification": 4,
-    "Proposal": 6,
-    "Negotiation": 8,
-    "Closed Won": 10,
-    "Closed Lost": -5,
-}
-INDUSTRY_WEIGHT = {
-    "B2B SaaS": 5,
-    "E-Commerce": 3,
-    "Healthcare": 4,
-    "Finance": 2,
-    "Other": 1,
-}
+from app.services.openai_service import get_openai_service
+
+from app.services.lead_scoring import (
+    classify_score,
+    score_lead,
+    score_leads,
+    parse_leads,
+    summary_prompt,
+    batch_summary_prompt,
+    parse_batch_summaries,
+)
 
 class LeadPredictRequest(BaseModel):
     lead_name: str
@@ -69,49 +66,23 @@ class LeadPredictResponse(BaseModel):
     classification: str
     gpt_summary: str
 
-def classify_score(score):
-    if score >= 80:
-        return "High Priority"
-    elif score >= 60:
-        return "Medium Priority"
-    else:
-        return "Low Priority"
-
-from app.services.db_service import log_prediction
+from app.services.db_service import log_prediction, log_predictions, prediction_row
 
 @router.post("/leads/predict", response_model=LeadPredictResponse)
 async def predict_lead(payload: LeadPredictRequest):
     try:
         # Rule-based scoring
-        deal_amt = payload.deal_amount or 0
-        engagement = payload.engagement_score or 0
-        stage = payload.stage or "Other"
-        industry = payload.industry or "Other"
-        score = (
-            (deal_amt / 1000) * 0.25 +
-            engagement * 0.5 +
-            STAGE_WEIGHT.get(stage, 0) +
-            INDUSTRY_WEIGHT.get(industry, 0)
-        )
+        score = score_lead(payload.deal_amount, payload.engagement_score, payload.stage, payload.industry)
         classification = classify_score(score)
 
         # GPT prompt
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        gpt_prompt = (
-            f"Given a lead with a score of {int(score)} and the following attributes:\n"
-            f"Lead Name: {payload.lead_name}\n"
-            f"Company: {payload.company}\n"
-            f"Deal Amount: {payload.deal_amount}\n"
-            f"Engagement Score: {payload.engagement_score}\n"
-            f"Industry: {payload.industry}\n"
-            f"Stage: {payload.stage}\n"
-            "Explain their likelihood of converting and suggest an outreach strategy."
-        )
+        openai_service = get_openai_service()
+        gpt_prompt = summary_prompt(payload.dict(), score)
         gpt_summary = "No GPT response."
-        if openai_api_key:
-            client = openai.OpenAI(api_key=openai_api_key)
-            completion = client.chat.completions.create(
+        if openai_service.api_key:
+            completion = await openai_service.chat_completion(
                 model="gpt-3.5-turbo",
+                agent="lead_predict",
                 messages=[
                     {"role": "system", "content": "You are a B2B sales strategist."},
                     {"role": "user", "content": gpt_prompt}
@@ -119,7 +90,7 @@ async def predict_lead(payload: LeadPredictRequest):
                 max_tokens=120,
                 temperature=0.7,
             )
-            gpt_summary = completion.choices[0].message.content.strip()
+            gpt_summary = completion.strip()
         else:
             gpt_summary = "No OpenAI API key configured."
 
@@ -135,7 +106,104 @@ async def predict_lead(payload: LeadPredictRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-import traceback
+SUMMARY_BATCH_SIZE = 20
+
+async def _batch_summaries(leads, scores, batch_size=SUMMARY_BATCH_SIZE, concurrency=None):
+    """
+    Generate GPT summaries for many leads, batch_size leads per completion,
+    with at most concurrency completions in flight (LEAD_SUMMARY_CONCURRENCY,
+    default 4).
+    """
+    openai_service = get_openai_service()
+    if not openai_service.api_key:
+        return ["No OpenAI API key configured."] * len(leads)
+    limit = asyncio.Semaphore(max(1, concurrency or int(get_env_variable("LEAD_SUMMARY_CONCURRENCY", 4))))
+
+    async def summarize(start):
+        chunk, chunk_scores = leads[start:start + batch_size], scores[start:start + batch_size]
+        try:
+            async with limit:
+                completion = await openai_service.chat_completion(
+                    model="gpt-3.5-turbo",
+                    agent="lead_predict",
+                    messages=[
+                        {"role": "system", "content": "You are a B2B sales strategist."},
+                        {"role": "user", "content": batch_summary_prompt(chunk, chunk_scores)}
+                    ],
+                    max_tokens=120 * len(chunk),
+                    temperature=0.7,
+                )
+        except Exception as e:
+            print(f"Batch summary failed for leads {start}-{start + len(chunk) - 1}: {e}")
+            completion = ""
+        return parse_batch_summaries(completion, len(chunk)) or ["No GPT response."] * len(chunk)
+
+    results = await asyncio.gather(*[summarize(start) for start in range(0, len(leads), batch_size)])
+    return [summary for batch in results for summary in batch]
+
+@router.post("/leads/predict/batch")
+async def predict_leads_batch(request: Request, summarize: bool = False, log: bool = True):
+    """
+    Score many leads in one call.
+
+    Accepts a JSON array of LeadPredictRequest objects (or {"leads": [...]}),
+    an NDJSON or CSV body, or a multipart upload with a .csv/.ndjson/.json file.
+    Scores are computed in one vectorized pass. GPT summaries are only generated
+    when summarize=true, and prediction logs are inserted in bulk unless log=false.
+    """
+    content_type = request.headers.get("content-type", "")
+    filename = None
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or not hasattr(upload, "read"):
+            raise HTTPException(status_code=400, detail="Multipart upload must include a 'file' field")
+        filename = upload.filename
+        content_type = upload.content_type
+        body = await upload.read()
+    else:
+        body = await request.body()
+
+    try:
+        df = parse_leads(body, content_type, filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        scored = score_leads(df)
+        scores = scored["lead_score"].tolist()
+        classifications = scored["classification"].tolist()
+        leads = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+        if summarize and leads:
+            summaries = await _batch_summaries(leads, scores)
+        else:
+            summaries = [""] * len(leads)
+
+        predictions = [
+            {
+                "lead_name": lead.get("lead_name"),
+                "company": lead.get("company"),
+                "lead_score": round(score, 2),
+                "classification": classification,
+                "gpt_summary": summary,
+            }
+            for lead, score, classification, summary in zip(leads, scores, classifications, summaries)
+        ]
+
+        logged = 0
+        if log and predictions:
+            rows = [prediction_row(lead, prediction) for lead, prediction in zip(leads, predictions)]
+            logged = await asyncio.to_thread(log_predictions, rows)
+
+        return {
+            "count": len(predictions),
+            "classification_counts": scored["classification"].value_counts().to_dict(),
+            "logged": logged,
+            "predictions": predictions,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 import traceback
 
@@ -152,7 +220,8 @@ async def analyze_lead(payload: LeadAnalysisRequest):
             print("Warning: OPENAI_API_KEY is missing or empty.")
         from app.agents.lead_intelligence_agent import analyze_lead as agent_analyze_lead
         try:
-            result = agent_analyze_lead(payload.dict())
+            data = payload.dict()
+            result = await coalesce("lead_score", data, lambda: agent_analyze_lead(data))
             # Ensure recommendations array is always present
             if isinstance(result, dict):
                 if "recommendations" not in result or result["recommendations"] is None:
@@ -174,6 +243,28 @@ async def estimate_ltv(payload: LtvEstimateRequest):
     """
     try:
         from app.agents.ltv_agent import estimate_lifetime_value as agent_estimate_ltv
-        return agent_estimate_ltv(payload.dict())
+        data = payload.dict()
+        return await coalesce("ltv", data, lambda: agent_estimate_ltv(data))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/leads/pipeline")
+async def run_pipeline(request: Request):
+    """
+    Run the rule-agent chain (lead intelligence, market signals, revenue forecast,
+    pipeline action, coaching, automation) over a batch of leads.
+
+    Accepts a JSON array of lead objects or {"leads": [...]}. The chain runs
+    column-wise over the whole batch and returns the same fields as the
+    per-lead agents.
+    """
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array of leads or {\"leads\": [...]}")
+    leads = payload.get("leads") if isinstance(payload, dict) else payload
+    if not isinstance(leads, list) or not all(isinstance(lead, dict) for lead in leads):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array of leads or {\"leads\": [...]}")
+
+    enriched = await asyncio.to_thread(run_lead_pipeline, leads)
+    return {"count": len(enriched), "leads": enriched}
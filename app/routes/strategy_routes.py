@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Request
 import pandas as pd
 from datetime import datetime
+from app.services.job_service import submit_job
+from app.services.dataset_ingestion import load_dataset
 
 router = APIRouter()
 
@@ -11,7 +13,11 @@ def load_dataset_from_supabase(dataset_id):
     """
     # For demonstration, accept only "demo" as a valid ID
     if dataset_id != "demo":
-        raise ValueError("Invalid or missing dataset ID")
+        # Uploaded datasets come from the columnar store
+        try:
+            return load_dataset(dataset_id)
+        except FileNotFoundError:
+            raise ValueError("Invalid or missing dataset ID")
     # Return a dummy DataFrame
     return pd.DataFrame({
         "lead_source": ["web", "referral", "web", "event"],
@@ -38,8 +44,19 @@ def scan_strategy(dataset_id):
         "dataset_summary": summary
     }
 
+def strategy_job(ctx, dataset_id):
+    """
+    Run a strategy scan as a background job.
+    """
+    with ctx.stage("scan"):
+        ctx.progress(0.1, "Scanning dataset")
+        return scan_strategy(dataset_id)
+
 @router.post("/strategy/scan")
-async def strategy_scan(request: Request):
+async def strategy_scan(request: Request, wait: bool = False):
+    """
+    Queue a strategy scan and return the job id (or the result, with wait=true).
+    """
     try:
         data = await request.json()
         dataset_id = data.get("dataset_id")
@@ -47,9 +64,8 @@ async def strategy_scan(request: Request):
             print("Missing dataset_id in request.")
             return {"status": "failed", "error": "Invalid or missing dataset ID"}
         # Log scan timestamp
-        print(f"Strategy scan started for dataset_id={dataset_id} at {datetime.now().isoformat()}")
-        result = scan_strategy(dataset_id)
-        return result
+        print(f"Strategy scan queued for dataset_id={dataset_id} at {datetime.now().isoformat()}")
+        return await submit_job("strategy", strategy_job, dataset_id, params={"dataset_id": dataset_id}, wait=wait)
     except Exception as e:
         print(f"Strategy scan error: {e}")
         return {"status": "failed", "error": str(e)}
@@ -1,11 +1,21 @@
 """
 utility_routes.py
 -----------------
-Defines utility endpoints: health check and report section addition.
+Defines utility endpoints: health check, service metrics and report section addition.
 """
 
+import os
+import asyncio
+
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from app.services.llm_cache import get_llm_cache
+from app.services.single_flight import single_flight
+from app.services.log_shipper import get_log_shipper
+from app.services.dataset_cache import aggregate_metrics, cache_enabled, process_budget_bytes, process_cache_metrics
+from app.services.job_service import get_job_store
+from app.services.news_feed import get_news_feed
+from app.agents.lead_intelligence_agent import get_classification_cache
 
 router = APIRouter()
 
@@ -32,3 +42,39 @@ async def health_check():
     Health check endpoint.
     """
     return {"status": "ok"}
+
+@router.get("/metrics")
+async def service_metrics():
+    """
+    Runtime metrics for shared service layers (LLM response cache, request coalescing, log shipper, dataset cache, news feed,
+    lead classification cache).
+    """
+    cache = get_llm_cache()
+    shipper = get_log_shipper()
+    return {
+        "llm_cache": cache.metrics() if cache is not None else {"enabled": False},
+        "single_flight": single_flight.metrics(),
+        "log_shipper": shipper.metrics() if shipper is not None else {"enabled": False},
+        "dataset_cache": await dataset_cache_metrics() if cache_enabled() else {"enabled": False},
+        "news_feed": get_news_feed().metrics(),
+        "classification_cache": get_classification_cache().metrics()
+    }
+
+async def dataset_cache_metrics():
+    """
+    Dataset cache metrics of every process that holds one: the job pool
+    workers (published to the job store after each job) and this API process.
+    Each process has its own cache and budget.
+    """
+    workers = await asyncio.to_thread(get_job_store().worker_metrics, "dataset_cache")
+    processes = [{"pid": w["pid"], "role": "job_worker", **w["metrics"]} for w in workers]
+    local = process_cache_metrics()
+    if local is not None and all(w["pid"] != os.getpid() for w in workers):
+        processes.append({"pid": os.getpid(), "role": "api", **local})
+    return {
+        "enabled": True,
+        "scope": "per_process",
+        "process_max_bytes": process_budget_bytes(),
+        "processes": processes,
+        "total": aggregate_metrics(processes),
+    }
@@ -0,0 +1,175 @@
+"""
+classification_cache.py
+-----------------------
+Bounded LRU memo tables for lead classification rules.
+
+The same email domains and job titles show up on thousands of leads, and each
+occurrence used to be classified again with substring scans. ClassificationCache
+keeps two memo tables, domain -> is_free and title -> seniority weight, that
+are shared by every caller in the process. The classifiers and the rule lists
+come from the owner (see LeadIntelligenceAgent). Both tables are cleared when
+the rule lists change, and entries are keyed by the rules generation they were
+computed under, so a lookup racing a rule change cannot leave a stale entry
+behind. Known domains and titles can be pre-warmed from a file, and hit/miss
+counters are exposed through metrics().
+
+Industry is not memoized here: the agent's industry rule reads the whole email
+address rather than the domain, so a domain-keyed table cannot answer it.
+"""
+
+import csv
+import json
+import functools
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+
+
+class MemoTable:
+    """
+    Thread-safe, bounded LRU memo of compute(key) (functools.lru_cache, so a
+    hit costs one C-level dict lookup).
+    """
+
+    def __init__(self, compute: Callable[[Any], Any], max_entries: int = 10000):
+        self.compute = compute
+        self.max_entries = max_entries
+        self.get = functools.lru_cache(maxsize=max_entries)(compute)
+        self._warm_hits = 0
+        self._warm_misses = 0
+
+    def warm(self, keys: Iterable[Hashable]) -> int:
+        """
+        Compute and memoize keys; returns how many were added. Warm-up lookups
+        are left out of the hit/miss counters.
+        """
+        before = self.get.cache_info()
+        for key in keys:
+            self.get(key)
+        after = self.get.cache_info()
+        self._warm_hits += after.hits - before.hits
+        self._warm_misses += after.misses - before.misses
+        return after.misses - before.misses
+
+    def clear(self):
+        self.get.cache_clear()
+        self._warm_hits = self._warm_misses = 0
+
+    def __len__(self) -> int:
+        return self.get.cache_info().currsize
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters, the hit rate and the number of entries.
+        """
+        info = self.get.cache_info()
+        hits, misses = info.hits - self._warm_hits, info.misses - self._warm_misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "warmed": self._warm_misses,
+            "entries": info.currsize,
+            "max_entries": self.max_entries,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class ClassificationCache:
+    """
+    Memoized domain and title classification, invalidated when the rules change.
+
+    rules() returns the current rule lists (a tuple of tuples); the tables are
+    cleared whenever it no longer equals the snapshot they were filled under.
+    Keys are (generation, value) pairs, so an entry computed under old rules
+    and inserted after the clear is never read again.
+    """
+
+    def __init__(
+        self,
+        rules: Callable[[], Tuple],
+        is_free_domain: Callable[[str], bool],
+        classify_title: Callable[[str], float],
+        max_entries: int = 10000,
+    ):
+        self.rules = rules
+        self.domains = MemoTable(lambda key: is_free_domain(key[1]), max_entries)
+        self.titles = MemoTable(lambda key: classify_title(key[1]), max_entries)
+        self._snapshot = rules()
+        self._invalidations = 0
+        self._lock = threading.Lock()
+
+    def _generation(self) -> int:
+        # Rule lists are tuples, so comparing is an identity check while unchanged
+        rules = self.rules()
+        if rules != self._snapshot:
+            with self._lock:
+                if rules != self._snapshot:
+                    self.domains.clear()
+                    self.titles.clear()
+                    self._snapshot = rules
+                    self._invalidations += 1
+        return self._invalidations
+
+    def free_domain(self, domain: str) -> bool:
+        """
+        Whether an email domain belongs to a free email provider.
+        """
+        return self.domains.get((self._generation(), domain))
+
+    def title(self, title: str) -> float:
+        """
+        Seniority weight for a job title.
+        """
+        return self.titles.get((self._generation(), title))
+
+    def invalidate(self):
+        """
+        Drop every memoized classification.
+        """
+        with self._lock:
+            self.domains.clear()
+            self.titles.clear()
+            self._snapshot = self.rules()
+            self._invalidations += 1
+
+    def warm(self, domains: Iterable[str] = (), titles: Iterable[str] = ()) -> Dict[str, int]:
+        """
+        Pre-compute classifications for known domains and titles.
+        """
+        generation = self._generation()
+        return {
+            "domains": self.domains.warm((generation, domain) for domain in domains),
+            "titles": self.titles.warm((generation, title) for title in titles),
+        }
+
+    def warm_from_file(self, path: str) -> Dict[str, int]:
+        """
+        Pre-warm from a JSON file ({"domains": [...], "titles": [...]}) or from a
+        CSV export with domain, email and/or title columns.
+        """
+        domains, titles = [], []
+        if path.lower().endswith(".json"):
+            with open(path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+            domains = [d for d in data.get("domains", []) if isinstance(d, str)]
+            titles = [t for t in data.get("titles", []) if isinstance(t, str) and t]
+        else:
+            with open(path, "r", encoding="utf-8", newline="") as handle:
+                for row in csv.DictReader(handle):
+                    if row.get("domain"):
+                        domains.append(row["domain"])
+                    elif "@" in (row.get("email") or ""):
+                        domains.append(row["email"].split("@")[-1])
+                    if row.get("title"):
+                        titles.append(row["title"])
+        return self.warm(dict.fromkeys(domains), dict.fromkeys(titles))
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return per-table hit/miss counters and the number of rule invalidations.
+        """
+        return {
+            "domains": self.domains.metrics(),
+            "titles": self.titles.metrics(),
+            "invalidations": self._invalidations,
+        }
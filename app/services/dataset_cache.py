@@ -0,0 +1,270 @@
+"""
+dataset_cache.py
+----------------
+Per-process cache of parsed datasets for the dataset-consuming routes
+(analysis, auto analysis, forecast, strategy, reports).
+
+Frames are stored after dtype optimization (int64 to int32 where the values
+fit, low-cardinality strings as categoricals; floats stay float64 so means and
+sums match the source). The cache evicts least recently used frames to stay
+under a memory budget. Entries are keyed by dataset id plus the source file's
+mtime and size (or a content hash when requested), so a re-uploaded file is
+parsed again rather than served stale. Hit/miss counters are exposed through
+metrics().
+
+The cache lives in each process, and is not shared between them. Dataset
+loads run inside job pool workers (see job_service), so a frame is reused
+only when the same worker picks up a later job for that dataset; sharing
+across processes comes from the memory-mapped columnar store
+(dataset_ingestion), not from this cache. To keep the pool's total bounded,
+each process gets DATASET_CACHE_MAX_MB / JOB_MAX_WORKERS. Job workers publish
+their cache metrics to the job store after every job, and /metrics
+aggregates them. Callers get a shallow copy and must not modify values in
+place.
+
+Configuration (environment variables):
+- DATASET_CACHE_ENABLED: "false" disables caching (default true)
+- DATASET_CACHE_MAX_MB: memory budget in megabytes across the job pool (default 512)
+- JOB_MAX_WORKERS: job pool size the budget is divided by (default 2)
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config import get_env_variable
+
+# Object columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+# Integers are never narrowed below this: callers do arithmetic on loaded
+# frames, and int8/uint8 products wrap around silently
+MIN_INT_DTYPE = np.int32
+
+
+def optimize_dtypes(
+    df: pd.DataFrame,
+    category_max_unique_ratio: float = CATEGORY_MAX_UNIQUE_RATIO,
+    downcast_floats: bool = False,
+) -> pd.DataFrame:
+    """
+    Return df with compact dtypes: integers that fit stored as int32 and
+    low-cardinality string columns as categoricals.
+
+    Floats are left as float64 unless downcast_floats is set. Even when every
+    value survives the round trip, aggregates over float32 columns (means,
+    sums of products) accumulate in lower precision and drift from the source.
+    """
+    optimized = {}
+    rows = len(df)
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series):
+            optimized[column] = series
+        elif pd.api.types.is_integer_dtype(series):
+            info = np.iinfo(MIN_INT_DTYPE)
+            fits = not rows or (info.min <= series.min() and series.max() <= info.max)
+            if fits and isinstance(series.dtype, np.dtype) and series.dtype.itemsize > info.bits // 8:
+                optimized[column] = series.astype(MIN_INT_DTYPE)
+            else:
+                optimized[column] = series
+        elif pd.api.types.is_float_dtype(series) and downcast_floats:
+            downcast = pd.to_numeric(series, downcast="float")
+            # Keep float64 when float32 would lose precision
+            if downcast.dtype != series.dtype and not np.allclose(
+                downcast.to_numpy(dtype=float), series.to_numpy(dtype=float), equal_nan=True, rtol=0, atol=0
+            ):
+                downcast = series
+            optimized[column] = downcast
+        elif series.dtype == object and rows:
+            non_null = series.dropna()
+            if len(non_null) and non_null.map(type).eq(str).all() and series.nunique() <= rows * category_max_unique_ratio:
+                optimized[column] = series.astype("category")
+            else:
+                optimized[column] = series
+        else:
+            optimized[column] = series
+    return pd.DataFrame(optimized, index=df.index)
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def file_version(path: str, content_hash: bool = False) -> Tuple:
+    """
+    Version key for a source file: (mtime_ns, size), or its SHA-256 when content_hash is set.
+    """
+    if content_hash:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return ("sha256", digest.hexdigest())
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class DatasetCache:
+    """
+    LRU cache of parsed DataFrames bounded by total memory usage.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._frames: "OrderedDict[Tuple, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Tuple, threading.Lock] = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "uncacheable": 0}
+
+    def get_or_load(self, dataset_id: str, version: Any, loader: Callable[[], pd.DataFrame], optimize: bool = True) -> pd.DataFrame:
+        """
+        Return the cached frame for (dataset_id, version), calling loader() on a miss.
+
+        Concurrent misses for the same key share one load. Older versions of
+        the same dataset are dropped when a new version is cached.
+        """
+        key = (dataset_id, version)
+        frame = self._get(key)
+        if frame is not None:
+            return frame
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            frame = self._get(key, count_miss=False)
+            if frame is not None:
+                return frame
+            with self._lock:
+                self._stats["misses"] += 1
+            try:
+                df = loader()
+                if optimize:
+                    df = optimize_dtypes(df)
+                self._put(key, df)
+            finally:
+                with self._lock:
+                    self._load_locks.pop(key, None)
+        return df.copy(deep=False)
+
+    def load_csv(self, path: str, dataset_id: Optional[str] = None, content_hash: bool = False, **read_options) -> pd.DataFrame:
+        """
+        Parse a CSV through the cache, keyed by dataset_id (default: the absolute path)
+        and the file's version.
+        """
+        return self.get_or_load(
+            dataset_id or os.path.abspath(path),
+            file_version(path, content_hash),
+            lambda: pd.read_csv(path, **read_options),
+        )
+
+    def _get(self, key: Tuple, count_miss: bool = True) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                return None
+            self._frames.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[0].copy(deep=False)
+
+    def _put(self, key: Tuple, df: pd.DataFrame):
+        nbytes = frame_nbytes(df)
+        with self._lock:
+            for stale in [k for k in self._frames if k[0] == key[0] and k != key]:
+                self._drop(stale)
+            if nbytes > self.max_bytes:
+                self._stats["uncacheable"] += 1
+                return
+            if key in self._frames:
+                self._drop(key)
+            self._frames[key] = (df, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._frames:
+                self._drop(next(iter(self._frames)))
+                self._stats["evictions"] += 1
+
+    def _drop(self, key: Tuple):
+        _, nbytes = self._frames.pop(key)
+        self._bytes -= nbytes
+
+    def invalidate(self, dataset_id: Optional[str] = None):
+        """
+        Drop every cached version of dataset_id, or everything when no id is given.
+        """
+        with self._lock:
+            for key in [k for k in self._frames if dataset_id is None or k[0] == dataset_id]:
+                self._drop(key)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters, hit rate and memory usage.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._frames)
+            stats["bytes"] = self._bytes
+        stats["max_bytes"] = self.max_bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache: Optional[DatasetCache] = None
+
+
+def process_budget_bytes() -> int:
+    """
+    Memory budget of one process's cache: the pool budget split across the job workers.
+    """
+    total = float(get_env_variable("DATASET_CACHE_MAX_MB", 512)) * 1024 * 1024
+    workers = max(1, int(get_env_variable("JOB_MAX_WORKERS", 2)))
+    return int(total / workers)
+
+
+def cache_enabled() -> bool:
+    return str(get_env_variable("DATASET_CACHE_ENABLED", "true")).lower() not in ("0", "false", "no")
+
+
+def get_dataset_cache() -> Optional[DatasetCache]:
+    """
+    Return this process's dataset cache, or None if caching is disabled.
+    """
+    global _cache
+    if not cache_enabled():
+        return None
+    if _cache is None:
+        _cache = DatasetCache(max_bytes=process_budget_bytes())
+    return _cache
+
+
+def process_cache_metrics() -> Optional[Dict[str, Any]]:
+    """
+    Metrics of this process's cache, or None if it was never used.
+    """
+    return _cache.metrics() if _cache is not None else None
+
+
+def aggregate_metrics(processes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Sum per-process cache metrics into pool-wide totals.
+    """
+    total = {key: sum(m.get(key, 0) for m in processes)
+             for key in ("hits", "misses", "evictions", "uncacheable", "entries", "bytes", "max_bytes")}
+    lookups = total["hits"] + total["misses"]
+    total["hit_rate"] = round(total["hits"] / lookups, 4) if lookups else 0.0
+    return total
+
+
+def load_csv(path: str, dataset_id: Optional[str] = None, **read_options) -> pd.DataFrame:
+    """
+    Parse a CSV through the shared cache (or directly when caching is disabled).
+    """
+    cache = get_dataset_cache()
+    if cache is None:
+        return pd.read_csv(path, **read_options)
+    return cache.load_csv(path, dataset_id=dataset_id, **read_options)
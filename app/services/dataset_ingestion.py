@@ -0,0 +1,456 @@
+"""
+dataset_ingestion.py
+--------------------
+Upload-time ingestion of datasets into a memory-mappable columnar store.
+
+After an upload is saved, an "ingest" background job parses the file once
+(according to its file type) and infers compact dtypes (see
+dataset_cache.optimize_dtypes; floats stay float64). It then writes:
+
+- a columnar copy: one .npy file per column plus manifest.json. Numeric, boolean,
+  datetime and categorical-code columns are opened with np.load(mmap_mode="r").
+- profile.json: per-column dtype, null and distinct counts, numeric summaries
+  and top values.
+
+Both are written to a staging directory and swapped in together. For registry
+versions the swap happens under the registry's write lock, and is skipped when
+a newer version is already ready (see DatasetRegistry.publish), so a slow
+ingest of an older upload never replaces a newer copy.
+
+Downstream routes call load_dataset(dataset_id). It reads the columnar copy
+when there is one, and falls back to parsing the raw upload otherwise. Both
+paths go through the shared dataset cache.
+
+Configuration (environment variables):
+- DATASET_UPLOADS_DIR: raw uploads (default ./data/uploads)
+- DATASET_COLUMNAR_DIR: columnar copies (default ./data/columnar)
+"""
+
+import os
+import json
+import shutil
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.config import get_env_variable
+from app.services.dataset_cache import file_version, get_dataset_cache, optimize_dtypes
+
+MANIFEST = "manifest.json"
+PROFILE = "profile.json"
+FORMAT_VERSION = 1
+# Excel workbooks are read with openpyxl; legacy .xls is not supported
+SUPPORTED_FILE_TYPES = ("csv", "tsv", "json", "ndjson", "jsonl", "xlsx")
+TOP_VALUES = 5
+
+
+def uploads_dir() -> str:
+    return get_env_variable("DATASET_UPLOADS_DIR", "./data/uploads")
+
+
+def columnar_dir() -> str:
+    return get_env_variable("DATASET_COLUMNAR_DIR", "./data/columnar")
+
+
+def columnar_path(dataset_id: str) -> str:
+    return os.path.join(columnar_dir(), dataset_id)
+
+
+def parse_upload(path: str, file_type: Optional[str] = None) -> pd.DataFrame:
+    """
+    Parse an uploaded file according to its type (defaults to the file extension).
+
+    Raises:
+        ValueError: If the file type is not supported.
+    """
+    file_type = (file_type or os.path.splitext(path)[1][1:] or "csv").lower()
+    if file_type == "csv":
+        return pd.read_csv(path)
+    if file_type == "tsv":
+        return pd.read_csv(path, sep="\t")
+    if file_type in ("ndjson", "jsonl"):
+        return pd.read_json(path, lines=True)
+    if file_type == "json":
+        with open(path) as f:
+            data = json.load(f)
+        # Accept the {"data": [...], "metadata": {...}} envelope used by the ETL pipeline
+        if isinstance(data, dict):
+            data = data.get("data", data.get("records", [data]))
+        return pd.DataFrame.from_records(data)
+    if file_type == "xlsx":
+        return pd.read_excel(path, engine="openpyxl")
+    raise ValueError(f"Unsupported file type: {file_type}")
+
+
+def write_columnar(df: pd.DataFrame, directory: str, profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Write df as one .npy file per column plus a manifest (and profile.json when
+    a profile is given). The directory is written under a temporary name and
+    swapped in, so readers never see a partial copy.
+
+    Returns:
+        dict: The manifest.
+    """
+    staging, manifest = stage_columnar(df, directory, profile)
+    swap_columnar(staging, directory)
+    return manifest
+
+
+def stage_columnar(df: pd.DataFrame, directory: str, profile: Optional[Dict[str, Any]] = None):
+    """
+    Write the columnar copy of df into a staging directory next to directory.
+
+    Returns:
+        (staging, manifest): The staging path, to be passed to swap_columnar, and the manifest.
+    """
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    staging = os.path.join(parent, f".{os.path.basename(directory)}.{uuid.uuid4().hex}.tmp")
+    os.makedirs(staging)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        entry = {"name": str(name), "file": f"c{i}.npy", "dtype": str(series.dtype)}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            entry["kind"] = "category"
+            np.save(os.path.join(staging, entry["file"]), series.cat.codes.to_numpy())
+            entry["categories"] = _json_values(series.cat.categories)
+        elif isinstance(series.dtype, pd.DatetimeTZDtype):
+            entry["kind"] = "datetime"
+            entry["tz"] = str(series.dt.tz)
+            np.save(os.path.join(staging, entry["file"]), series.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy().view("i8"))
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            entry["kind"] = "datetime"
+            np.save(os.path.join(staging, entry["file"]), series.to_numpy(dtype="datetime64[ns]").view("i8"))
+        elif pd.api.types.is_bool_dtype(series) and series.dtype == bool:
+            entry["kind"] = "numeric"
+            np.save(os.path.join(staging, entry["file"]), series.to_numpy())
+        elif pd.api.types.is_numeric_dtype(series):
+            entry["kind"] = "numeric"
+            if isinstance(series.dtype, np.dtype):
+                values = series.to_numpy()
+            else:
+                # Nullable extension dtypes are stored as float64 with NaN
+                values = series.to_numpy(dtype="float64", na_value=np.nan)
+            np.save(os.path.join(staging, entry["file"]), values)
+        elif series.dropna().map(type).eq(str).all():
+            # Strings are dictionary-encoded so the codes can be memory-mapped
+            entry["kind"] = "string"
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            np.save(os.path.join(staging, entry["file"]), codes.astype(_code_dtype(len(uniques))))
+            entry["categories"] = [str(u) for u in uniques]
+        else:
+            # Mixed Python objects are kept as JSON (not memory-mapped)
+            entry["kind"] = "json"
+            entry["file"] = f"c{i}.json"
+            with open(os.path.join(staging, entry["file"]), "w") as f:
+                json.dump(_json_values(series), f)
+        columns.append(entry)
+
+    manifest = {"format_version": FORMAT_VERSION, "rows": int(len(df)), "columns": columns}
+    with open(os.path.join(staging, MANIFEST), "w") as f:
+        json.dump(manifest, f)
+    if profile is not None:
+        with open(os.path.join(staging, PROFILE), "w") as f:
+            json.dump(profile, f)
+    return staging, manifest
+
+
+def swap_columnar(staging: str, directory: str):
+    """
+    Replace directory with a staging directory written by stage_columnar.
+    """
+    previous = None
+    if os.path.exists(directory):
+        previous = f"{staging}.old"
+        os.replace(directory, previous)
+    os.replace(staging, directory)
+    if previous:
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+class ColumnarReader:
+    """
+    An open columnar copy. The manifest is parsed, arrays mapped and category
+    lists built once, so ranges of rows can be read repeatedly at the cost of
+    the range alone. json columns are not memory-mapped and load whole on open.
+    """
+
+    def __init__(self, directory: str, columns: Optional[List[str]] = None, mmap: bool = True):
+        with open(os.path.join(directory, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.rows = self.manifest["rows"]
+        mode = "r" if mmap else None
+        self._columns = []
+        for entry in self.manifest["columns"]:
+            if columns is not None and entry["name"] not in columns:
+                continue
+            path = os.path.join(directory, entry["file"])
+            if entry["kind"] == "json":
+                with open(path) as f:
+                    values = json.load(f)
+            else:
+                values = np.load(path, mmap_mode=mode)
+            dtype = pd.CategoricalDtype(entry["categories"]) if entry["kind"] in ("category", "string") else None
+            self._columns.append((entry, values, dtype))
+
+    def read(self, rows: Optional[slice] = None) -> pd.DataFrame:
+        data = {}
+        for entry, values, dtype in self._columns:
+            kind = entry["kind"]
+            if rows is not None:
+                values = values[rows]
+            if kind == "json":
+                data[entry["name"]] = pd.Series(values, dtype=object)
+            elif kind == "numeric":
+                # Plain ndarray view over the mapped file (pandas should not see the memmap subclass)
+                data[entry["name"]] = values.view(np.ndarray)
+            elif kind == "datetime":
+                stamps = pd.to_datetime(np.asarray(values).view("M8[ns]"))
+                if entry.get("tz"):
+                    stamps = stamps.tz_localize("UTC").tz_convert(entry["tz"])
+                data[entry["name"]] = stamps
+            elif kind == "category":
+                data[entry["name"]] = pd.Categorical.from_codes(np.asarray(values), dtype=dtype)
+            elif kind == "string":
+                categorical = pd.Categorical.from_codes(np.asarray(values), dtype=dtype)
+                data[entry["name"]] = np.asarray(categorical, dtype=object)
+        return pd.DataFrame(data, copy=False)
+
+
+def read_columnar(
+    directory: str, columns: Optional[List[str]] = None, mmap: bool = True, rows: Optional[slice] = None
+) -> pd.DataFrame:
+    """
+    Load a columnar copy written by write_columnar. Numeric columns are
+    memory-mapped read-only arrays when mmap is set. rows selects a range of
+    rows; with mmap, only that range of each column is read. To read many
+    ranges, open a ColumnarReader once instead.
+    """
+    return ColumnarReader(directory, columns, mmap).read(rows)
+
+
+def build_profile(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Precompute per-column summaries for a dataset.
+    """
+    fields = {}
+    for name in df.columns:
+        series = df[name]
+        field = {
+            "dtype": str(series.dtype),
+            "nulls": int(series.isna().sum()),
+            "unique": int(series.nunique(dropna=True)),
+        }
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            non_null = series.dropna()
+            if len(non_null):
+                field.update({
+                    "min": _scalar(non_null.min()),
+                    "max": _scalar(non_null.max()),
+                    "mean": float(non_null.mean()),
+                    "std": float(non_null.std()) if len(non_null) > 1 else 0.0,
+                })
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            non_null = series.dropna()
+            if len(non_null):
+                field.update({"min": str(non_null.min()), "max": str(non_null.max())})
+        else:
+            counts = series.value_counts(dropna=True).head(TOP_VALUES)
+            field["top"] = [{"value": _scalar(value), "count": int(count)} for value, count in counts.items() if count]
+        fields[str(name)] = field
+    return {
+        "rows": int(len(df)),
+        "columns": int(len(df.columns)),
+        "memory_bytes": int(df.memory_usage(deep=True).sum()),
+        "fields": fields,
+    }
+
+
+def ingest_dataset(
+    dataset_id: str,
+    source_path: str,
+    file_type: Optional[str] = None,
+    ctx=None,
+    publish: Optional[Callable[[Callable[[], None], Dict[str, Any]], bool]] = None,
+) -> Dict[str, Any]:
+    """
+    Parse, optimize, profile and write the columnar copy of an uploaded dataset.
+
+    Args:
+        dataset_id: Dataset identifier (the columnar directory name).
+        source_path: Path of the raw upload.
+        file_type: Upload file type; defaults to the file extension.
+        ctx: Optional JobContext for progress and stage timings.
+        publish: Optional publish(swap, result) that calls swap() if this copy
+            may replace the current one and returns whether it did. By default
+            the copy is always swapped in.
+
+    Returns:
+        dict: columnar_path (None when not published), rows, columns, the
+        profile and whether the copy was published.
+    """
+    def stage(name, fraction, message):
+        if ctx is None:
+            return _NullStage()
+        ctx.progress(fraction, message)
+        return ctx.stage(name)
+
+    with stage("parse", 0.1, "Parsing upload"):
+        df = parse_upload(source_path, file_type)
+    with stage("optimize", 0.4, "Inferring compact dtypes"):
+        df = optimize_dtypes(df)
+    with stage("profile", 0.6, "Profiling"):
+        profile = build_profile(df)
+    target = columnar_path(dataset_id)
+    result = {
+        "columnar_path": target,
+        "rows": profile["rows"],
+        "columns": list(map(str, df.columns)),
+        "profile": profile,
+    }
+    with stage("columnar", 0.8, "Writing columnar copy"):
+        staging, _ = stage_columnar(df, target, profile)
+        try:
+            if publish is None:
+                swap_columnar(staging, target)
+                published = True
+            else:
+                published = publish(lambda: swap_columnar(staging, target), result)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    if not published:
+        result["columnar_path"] = None
+    result["published"] = published
+    return result
+
+
+def ingest_dataset_job(
+    ctx,
+    dataset_id: str,
+    source_path: str,
+    file_type: Optional[str] = None,
+    registry_path: Optional[str] = None,
+    version_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Job-service entry point for ingest_dataset. When a registry version is
+    given, it is flipped to ready (or failed) from inside the job.
+    """
+    from datetime import datetime
+    from app.services.dataset_registry import DatasetRegistry
+
+    registry = DatasetRegistry(registry_path) if registry_path and version_id else None
+
+    def publish(swap, result):
+        # Swap and flip to ready in one registry transaction
+        return registry.publish(
+            version_id,
+            swap,
+            status="ready",
+            columnar_path=result["columnar_path"],
+            rows=result["rows"],
+            columns=result["columns"],
+            ingested_at=datetime.utcnow().isoformat() + "Z",
+        )
+
+    try:
+        result = ingest_dataset(dataset_id, source_path, file_type, ctx=ctx, publish=publish if registry else None)
+    except Exception as e:
+        if registry is not None:
+            registry.update(version_id, status="failed", error=str(e))
+        print(f"[INGEST] Dataset ingestion failed: {dataset_id}: {e}")
+        raise
+    if not result["published"]:
+        print(f"[INGEST] Newer version of {dataset_id} already ready, keeping its columnar copy")
+    print(f"[INGEST] Dataset ready: {dataset_id} ({result['rows']} rows)")
+    return result
+
+
+def load_profile(dataset_id: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(columnar_path(dataset_id), PROFILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def find_upload(dataset_id: str) -> Optional[str]:
+    """
+    Return the raw upload path for dataset_id, if any: the registry's current
+    version first, then the legacy {dataset_id}.{file_type} location.
+    """
+    from app.services.dataset_registry import get_dataset_registry
+
+    try:
+        current = get_dataset_registry().get(dataset_id)
+    except Exception:
+        current = None
+    if current and current.get("disk_path") and os.path.exists(current["disk_path"]):
+        return current["disk_path"]
+    for file_type in SUPPORTED_FILE_TYPES:
+        path = os.path.join(uploads_dir(), f"{dataset_id}.{file_type}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_dataset(dataset_id: str) -> pd.DataFrame:
+    """
+    Load a dataset for analysis: the columnar copy when ingested, else the raw upload.
+
+    Raises:
+        FileNotFoundError: If the dataset has neither a columnar copy nor an upload.
+    """
+    cache = get_dataset_cache()
+    directory = columnar_path(dataset_id)
+    manifest = os.path.join(directory, MANIFEST)
+    if os.path.exists(manifest):
+        if cache is None:
+            return read_columnar(directory)
+        return cache.get_or_load(
+            f"columnar:{dataset_id}", file_version(manifest), lambda: read_columnar(directory), optimize=False
+        )
+    upload = find_upload(dataset_id)
+    if upload is None:
+        raise FileNotFoundError(f"Dataset not found: {dataset_id}")
+    if cache is None:
+        return optimize_dtypes(parse_upload(upload))
+    return cache.get_or_load(dataset_id, file_version(upload), lambda: parse_upload(upload))
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _code_dtype(n: int):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _scalar(value):
+    if hasattr(value, "item"):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return str(value)
+    return value
+
+
+def _json_values(values) -> list:
+    return [None if _is_missing(v) else _scalar(v) for v in values]
+
+
+def _is_missing(value) -> bool:
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
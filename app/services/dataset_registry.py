@@ -0,0 +1,287 @@
+"""
+dataset_registry.py
+-------------------
+Persistent registry of uploaded datasets, shared by every API worker and job
+process through one SQLite database in WAL mode.
+
+Each upload is a version row. The dataset_current table holds a precomputed
+pointer to the current version of each dataset_id (the newest ready version,
+else the newest version), so lookups by id are a primary-key read and listing
+is an indexed, paginated query instead of a scan over every version.
+
+Configuration (environment variables):
+- DATASET_REGISTRY_PATH: SQLite file (default ./data/datasets.sqlite3)
+"""
+
+import os
+import json
+import uuid
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.config import get_env_variable
+
+COLUMNS = (
+    "version_id", "dataset_id", "filename", "status", "created_at", "file_type", "disk_path",
+    "job_id", "columnar_path", "rows", "columns", "error", "ingested_at", "content_hash", "size_bytes",
+)
+JSON_COLUMNS = ("columns",)
+
+
+class DatasetRegistry:
+    """
+    SQLite-backed dataset registry with a current-version pointer per dataset.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS datasets ("
+                "version_id TEXT PRIMARY KEY, dataset_id TEXT NOT NULL, filename TEXT, "
+                "status TEXT NOT NULL, created_at TEXT NOT NULL, file_type TEXT, disk_path TEXT, "
+                "job_id TEXT, columnar_path TEXT, rows INTEGER, columns TEXT, error TEXT, "
+                "ingested_at TEXT, content_hash TEXT, size_bytes INTEGER)"
+            )
+            self._migrate(conn)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS dataset_current ("
+                "dataset_id TEXT PRIMARY KEY, version_id TEXT NOT NULL, status TEXT NOT NULL, "
+                "created_at TEXT NOT NULL, file_type TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_datasets_id_status_created ON datasets (dataset_id, status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_datasets_status ON datasets (status)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_datasets_created ON datasets (created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_datasets_id_hash ON datasets (dataset_id, content_hash)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_current_status_created ON dataset_current (status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_current_created ON dataset_current (created_at)")
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        # Add columns introduced after a registry file was created
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(datasets)")}
+        for column, sql_type in (("content_hash", "TEXT"), ("size_bytes", "INTEGER")):
+            if column not in existing:
+                conn.execute(f"ALTER TABLE datasets ADD COLUMN {column} {sql_type}")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA busy_timeout=30000")
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes the write lock up front, so concurrent workers serialize cleanly
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def register(self, entry: Dict[str, Any]) -> str:
+        """
+        Insert a new dataset version and return its version_id.
+        """
+        record = {k: entry.get(k) for k in COLUMNS}
+        record["version_id"] = record["version_id"] or uuid.uuid4().hex
+        record["created_at"] = record["created_at"] or datetime.utcnow().isoformat() + "Z"
+        record["status"] = record["status"] or "processing"
+        values = [_encode(k, record[k]) for k in COLUMNS]
+        with self._write() as conn:
+            conn.execute(
+                f"INSERT INTO datasets ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})", values
+            )
+            self._refresh_current(conn, record["dataset_id"])
+        return record["version_id"]
+
+    def update(self, version_id: str, **fields):
+        """
+        Update columns of a version and refresh its dataset's current pointer.
+        """
+        unknown = set(fields) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown registry fields: {', '.join(sorted(unknown))}")
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        with self._write() as conn:
+            row = conn.execute("SELECT dataset_id FROM datasets WHERE version_id = ?", (version_id,)).fetchone()
+            if row is None:
+                return
+            conn.execute(
+                f"UPDATE datasets SET {assignments} WHERE version_id = ?",
+                (*[_encode(k, v) for k, v in fields.items()], version_id),
+            )
+            self._refresh_current(conn, row[0])
+
+    def publish(self, version_id: str, swap: Callable[[], None], **fields) -> bool:
+        """
+        Run swap() to install version_id's columnar copy, unless a newer version
+        of the dataset is already ready, and update the version's fields in the
+        same transaction. Holding the write lock across the check and the swap
+        keeps an older ingest from replacing a newer copy.
+
+        Returns:
+            bool: True if swap() ran; otherwise the version is updated with
+            columnar_path cleared, since the shared copy belongs to the newer version.
+        """
+        unknown = set(fields) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown registry fields: {', '.join(sorted(unknown))}")
+        with self._write() as conn:
+            row = conn.execute(
+                "SELECT dataset_id, created_at FROM datasets WHERE version_id = ?", (version_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            superseded = conn.execute(
+                "SELECT 1 FROM datasets WHERE dataset_id = ? AND status = 'ready' AND created_at > ? LIMIT 1",
+                row,
+            ).fetchone() is not None
+            if superseded:
+                fields["columnar_path"] = None
+            else:
+                swap()
+            if fields:
+                conn.execute(
+                    f"UPDATE datasets SET {', '.join(f'{k} = ?' for k in fields)} WHERE version_id = ?",
+                    (*[_encode(k, v) for k, v in fields.items()], version_id),
+                )
+            self._refresh_current(conn, row[0])
+        return not superseded
+
+    def _refresh_current(self, conn: sqlite3.Connection, dataset_id: str):
+        # Prefer the newest ready version, else the newest version
+        row = conn.execute(
+            "SELECT version_id, status, created_at, file_type FROM datasets WHERE dataset_id = ? "
+            "ORDER BY status = 'ready' DESC, created_at DESC LIMIT 1",
+            (dataset_id,),
+        ).fetchone()
+        if row is None:
+            conn.execute("DELETE FROM dataset_current WHERE dataset_id = ?", (dataset_id,))
+        else:
+            conn.execute(
+                "INSERT OR REPLACE INTO dataset_current (dataset_id, version_id, status, created_at, file_type) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (dataset_id, *row),
+            )
+
+    def get_version(self, version_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM datasets WHERE version_id = ?", (version_id,)
+            ).fetchone()
+        return _decode(row)
+
+    def get(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the current version of dataset_id.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join('d.' + c for c in COLUMNS)} FROM dataset_current c "
+                "JOIN datasets d ON d.version_id = c.version_id WHERE c.dataset_id = ?",
+                (dataset_id,),
+            ).fetchone()
+        return _decode(row)
+
+    def find_by_hash(self, dataset_id: str, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the latest version of dataset_id if it has the given content hash
+        and has not failed. Older versions with the same content are not
+        matched: a newer upload has replaced them (or will, once it is ready),
+        so reusing one would hand out a version load_dataset does not serve.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM datasets WHERE dataset_id = ? "
+                "AND status != 'failed' ORDER BY created_at DESC LIMIT 1",
+                (dataset_id,),
+            ).fetchone()
+        match = _decode(row)
+        if match is None or match["content_hash"] != content_hash:
+            return None
+        return match
+
+    def versions(self, dataset_id: str) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM datasets WHERE dataset_id = ? ORDER BY created_at DESC",
+                (dataset_id,),
+            ).fetchall()
+        return [_decode(row) for row in rows]
+
+    def list_current(
+        self,
+        status: Optional[str] = None,
+        file_type: Optional[str] = None,
+        search: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        List current versions, newest first, with filtering and pagination.
+
+        Returns:
+            (datasets, total): The requested page and the total number of matches.
+        """
+        clauses, args = [], []
+        if status:
+            clauses.append("c.status = ?")
+            args.append(status)
+        if file_type:
+            clauses.append("c.file_type = ?")
+            args.append(file_type)
+        if search:
+            clauses.append("c.dataset_id LIKE ? ESCAPE '\\'")
+            args.append("%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM dataset_current c {where}", args).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {', '.join('d.' + c for c in COLUMNS)} FROM dataset_current c "
+                f"JOIN datasets d ON d.version_id = c.version_id {where} "
+                "ORDER BY c.created_at DESC LIMIT ? OFFSET ?",
+                (*args, -1 if limit is None else limit, offset),
+            ).fetchall()
+        return [_decode(row) for row in rows], total
+
+
+def _encode(column: str, value: Any) -> Any:
+    if column in JSON_COLUMNS and value is not None:
+        return json.dumps(value)
+    return value
+
+
+def _decode(row) -> Optional[Dict[str, Any]]:
+    if row is None:
+        return None
+    record = dict(zip(COLUMNS, row))
+    for column in JSON_COLUMNS:
+        if record[column] is not None:
+            record[column] = json.loads(record[column])
+    return record
+
+
+_registry: Optional[DatasetRegistry] = None
+
+
+def get_dataset_registry() -> DatasetRegistry:
+    """
+    Return the process-wide dataset registry.
+    """
+    global _registry
+    if _registry is None:
+        _registry = DatasetRegistry(get_env_variable("DATASET_REGISTRY_PATH", "./data/datasets.sqlite3"))
+    return _registry
@@ -27,40 +27,65 @@ def get_db():
     finally:
         db.close()
 
-def get_supabase_client():
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_KEY")
-    return create_client(url, key)
+_supabase_client = None
 
-def log_prediction(data, result):
-    from app.services.db_service import get_supabase_client
-    supabase = get_supabase_client()
+def get_supabase_client():
+    """
+    Return the shared Supabase client, created on first use.
+    """
+    global _supabase_client
+    if _supabase_client is None:
+        url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_KEY")
+        _supabase_client = create_client(url, key)
+    return _supabase_client
 
-    def safe_str(val):
-        return str(val) if val is not None else ""
+def _safe_str(val):
+    return str(val) if val is not None else ""
 
-    def safe_float(val):
-        try:
-            return float(val)
-        except:
-            return 0.0
+def _safe_float(val):
+    try:
+        return float(val)
+    except:
+        return 0.0
 
-    payload = {
-        "lead_name": safe_str(data.get("lead_name")),
-        "company": safe_str(data.get("company")),
-        "deal_amount": safe_float(data.get("deal_amount")),
-        "engagement_score": safe_float(data.get("engagement_score")),
-        "industry": safe_str(data.get("industry")),
-        "stage": safe_str(data.get("stage")),
-        "lead_score": safe_float(result.get("lead_score")),
-        "classification": safe_str(result.get("classification")),
-        "gpt_summary": safe_str(result.get("gpt_summary"))
+def prediction_row(data, result):
+    """
+    Build a lead_predictions row from the request data and the prediction result.
+    """
+    return {
+        "lead_name": _safe_str(data.get("lead_name")),
+        "company": _safe_str(data.get("company")),
+        "deal_amount": _safe_float(data.get("deal_amount")),
+        "engagement_score": _safe_float(data.get("engagement_score")),
+        "industry": _safe_str(data.get("industry")),
+        "stage": _safe_str(data.get("stage")),
+        "lead_score": _safe_float(result.get("lead_score")),
+        "classification": _safe_str(result.get("classification")),
+        "gpt_summary": _safe_str(result.get("gpt_summary"))
     }
 
-    print("📦 Cleaned prediction payload:", payload)
+def log_prediction(data, result):
+    """
+    Queue a prediction for insertion into lead_predictions by the background log shipper.
+    """
+    log_predictions([prediction_row(data, result)])
 
-    try:
-        supabase.table("lead_predictions").insert(payload).execute()
-        print("✅ Prediction logged successfully")
-    except Exception as e:
-        print("❌ Supabase insert failed:", e)
+def log_predictions(rows):
+    """
+    Queue prediction rows (see prediction_row) for insertion into lead_predictions.
+    The log shipper batches them into bulk inserts off the request path.
+
+    Returns:
+        int: Number of rows queued.
+    """
+    from app.services.log_shipper import get_log_shipper
+
+    shipper = get_log_shipper()
+    if not shipper:
+        print("❌ Supabase credentials not configured, skipping prediction logs")
+        return 0
+    queued = 0
+    for row in rows:
+        queued += shipper.enqueue("lead_predictions", row)
+    return queued
@@ -0,0 +1,684 @@
+"""
+eda_profile.py
+--------------
+Streaming per-column profiling for EDA, built from mergeable sketches.
+
+A DatasetProfile is updated one chunk of rows at a time. It keeps the
+following for each column:
+
+- count, nulls, mean, variance, min and max. Moments are accumulated with
+  Welford's update per chunk and Chan's formula across chunks.
+- approximate quantiles, from a KLL sketch (numeric columns).
+- approximate distinct counts, from a HyperLogLog sketch.
+- the most frequent values, from a Misra-Gries summary.
+
+It also keeps pairwise Pearson correlations between numeric columns, as
+co-moment sums over the rows where both values are present.
+
+Every sketch has a fixed size, so memory is bounded by the chunk size, not
+the dataset size. Two profiles of disjoint row sets merge into the profile
+of their union, so chunks can be profiled in separate processes and the
+partial profiles combined (profile_csv, profile_columnar). Each column's
+kind (numeric, datetime or text) is fixed once, from the frame's dtypes, the
+first chunk of a file or the columnar manifest, and every chunk is coerced to
+it, so the profile does not depend on how rows were split across workers.
+Counts, moments, min/max and correlations are exact up to floating point.
+Quantiles, distinct counts and top values are approximate: a quantile's rank
+is typically within 0.5% of the rows, distinct counts within about 1%, and a
+top value's count is low by at most the reported top_error. Top value counts
+are exact when a column has at most TOP_K distinct values.
+
+Configuration (environment variables):
+- EDA_CHUNK_ROWS: rows per chunk (default 100000)
+- EDA_WORKERS: processes used to profile files (default: one per CPU)
+"""
+
+import os
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config import get_env_variable
+from app.services.dataset_ingestion import (
+    MANIFEST,
+    ColumnarReader,
+    _scalar,
+    columnar_path,
+    find_upload,
+    parse_upload,
+)
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+QUANTILE_K = 400
+HLL_PRECISION = 14
+TOP_K = 50
+TOP_VALUES = 5
+MAX_CORRELATION_COLUMNS = 32
+# Profile kind of each columnar manifest kind
+MANIFEST_KINDS = {"numeric": "numeric", "datetime": "datetime"}
+
+
+def chunk_rows() -> int:
+    return int(get_env_variable("EDA_CHUNK_ROWS", "100000"))
+
+
+def default_workers() -> int:
+    return int(get_env_variable("EDA_WORKERS", str(os.cpu_count() or 1)))
+
+
+def _float(value) -> Optional[float]:
+    # JSON-safe float: NaN and +/-inf become None
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+class Moments:
+    """
+    Count, mean, sum of squared deviations (M2), min and max of a numeric column.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray):
+        if len(values):
+            with np.errstate(invalid="ignore", over="ignore"):
+                mean = values.mean()
+                self._combine(len(values), mean, ((values - mean) ** 2).sum(), values.min(), values.max())
+
+    def merge(self, other: "Moments"):
+        if other.n:
+            with np.errstate(invalid="ignore", over="ignore"):
+                self._combine(other.n, other.mean, other.m2, other.min, other.max)
+
+    def _combine(self, n, mean, m2, minimum, maximum):
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+        self.min = min(self.min, float(minimum))
+        self.max = max(self.max, float(maximum))
+
+    @property
+    def variance(self) -> float:
+        # Sample variance, as pandas' var()
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch: a stack of compactors. Level h holds items that each
+    stand for 2 ** h rows. A level over its capacity is sorted and every other
+    item (from a random offset) is promoted to the level above.
+    """
+
+    def __init__(self, k: int = QUANTILE_K, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        # Capacities shrink by 2/3 per level below the top one
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 8)
+
+    def update(self, values: np.ndarray):
+        if len(values):
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self.n += len(values)
+            self._compress()
+
+    def merge(self, other: "KLLSketch"):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+
+    def _compress(self):
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self.levels)):
+                items = self.levels[level]
+                if len(items) <= self._capacity(level):
+                    continue
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                even = len(items) - len(items) % 2
+                offset = int(self._rng.integers(2))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[offset:even:2]])
+                self.levels[level] = items[even:]
+                compacted = True
+
+    def quantiles(self, qs) -> List[Optional[float]]:
+        if not self.n:
+            return [None for _ in qs]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.asarray(qs, dtype=float) * cumulative[-1]
+        index = np.minimum(np.searchsorted(cumulative, ranks, side="left"), len(items) - 1)
+        return [_float(value) for value in items[index]]
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    # Bit length of uint64s; 32-bit halves convert to float64 exactly
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+def hash_values(values) -> np.ndarray:
+    """
+    64-bit hashes, stable across processes. Numbers hash as float64, so 3 and
+    3.0 are the same value whichever dtype a chunk was parsed as.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in "biuf":
+        return pd.util.hash_array(values.astype(np.float64) + 0.0)
+    try:
+        return pd.util.hash_array(values.astype(object))
+    except TypeError:
+        return pd.util.hash_array(values.astype(str).astype(object))
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter with 2 ** precision one-byte registers.
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values):
+        if len(values):
+            self.update_hashes(hash_values(values))
+
+    def update_hashes(self, hashes: np.ndarray):
+        shift = np.uint64(64 - self.precision)
+        index = (hashes >> shift).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        # Position of the first set bit in the remaining 64 - precision bits
+        rank = (64 - self.precision + 1 - _bit_length(rest)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting for small cardinalities
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class MisraGries:
+    """
+    Misra-Gries summary of frequent values: at most k counters, each low by
+    at most n / (k + 1). Merging two summaries adds the counters and subtracts
+    the (k + 1)-th largest count from all of them.
+    """
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        self.n = 0
+        self.counts: Dict[Any, int] = {}
+
+    def update(self, series: pd.Series):
+        try:
+            counts = series.value_counts(dropna=True, sort=True)
+        except TypeError:
+            # Unhashable values (lists, dicts) are counted by their text
+            counts = series.dropna().astype(str).value_counts(sort=True)
+        self.n += int(counts.sum())
+        if len(counts) > self.k:
+            # Summarize the chunk first so the dictionary merge is O(k)
+            threshold = counts.iloc[self.k]
+            counts = counts[counts > threshold] - threshold
+        self._merge(dict(zip(counts.index, counts.to_numpy().tolist())))
+
+    def merge(self, other: "MisraGries"):
+        self.n += other.n
+        self._merge(other.counts)
+
+    def _merge(self, counts: Dict[Any, int]):
+        combined = dict(self.counts)
+        for value, count in counts.items():
+            combined[value] = combined.get(value, 0) + count
+        if len(combined) > self.k:
+            threshold = sorted(combined.values(), reverse=True)[self.k]
+            combined = {value: count - threshold for value, count in combined.items() if count > threshold}
+        self.counts = combined
+
+    @property
+    def error(self) -> int:
+        # Most any counter can be below the value's true count
+        return (self.n - sum(self.counts.values())) // (self.k + 1)
+
+    def top(self, n: int = TOP_VALUES) -> List[Dict[str, Any]]:
+        ranked = sorted(self.counts.items(), key=lambda item: (-item[1], str(item[0])))[:n]
+        return [{"value": _scalar(value), "count": int(count)} for value, count in ranked]
+
+
+class CorrelationSketch:
+    """
+    Pairwise Pearson correlation of numeric columns. For each pair (i, j) it
+    keeps, over the rows where both are present: the row count and the sums of
+    x_i, x_i ** 2 and x_i * x_j. Values are shifted by a per-column constant
+    (the first chunk's mean) to keep the sums well conditioned.
+    """
+
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        d = len(self.columns)
+        self.shift: Optional[np.ndarray] = None
+        self.n = np.zeros((d, d))
+        self.sx = np.zeros((d, d))
+        self.sxx = np.zeros((d, d))
+        self.sxy = np.zeros((d, d))
+
+    def update(self, values: np.ndarray):
+        if self.shift is None:
+            present = ~np.isnan(values)
+            sums = np.where(present, values, 0.0).sum(axis=0)
+            self.shift = np.divide(sums, present.sum(axis=0), out=np.zeros(len(self.columns)), where=present.any(axis=0))
+        # Infinite values make the sums, and so the correlations, undefined
+        with np.errstate(invalid="ignore", over="ignore"):
+            centered = values - self.shift
+            present = (~np.isnan(centered)).astype(np.float64)
+            centered = np.nan_to_num(centered, nan=0.0, posinf=np.inf, neginf=-np.inf)
+            self.n += present.T @ present
+            self.sx += centered.T @ present
+            self.sxx += (centered * centered).T @ present
+            self.sxy += centered.T @ centered
+
+    def merge(self, other: "CorrelationSketch"):
+        if other.shift is None:
+            return
+        if other.columns != self.columns:
+            # Only columns both profiles correlated stay in the matrix
+            shared = [name for name in self.columns if name in other.columns]
+            self.__dict__.update(self._select(shared).__dict__)
+            other = other._select(shared)
+        if self.shift is None:
+            self.shift = other.shift.copy()
+            self.n, self.sx, self.sxx, self.sxy = (other.n.copy(), other.sx.copy(), other.sxx.copy(), other.sxy.copy())
+            return
+        # Re-express other's sums around self.shift: z = z_other + delta
+        delta = other.shift - self.shift
+        di, dj = delta[:, None], delta[None, :]
+        self.sxy += other.sxy + dj * other.sx + di * other.sx.T + other.n * di * dj
+        self.sxx += other.sxx + 2 * di * other.sx + other.n * di * di
+        self.sx += other.sx + other.n * di
+        self.n += other.n
+
+    def _select(self, columns: List[str]) -> "CorrelationSketch":
+        keep = [self.columns.index(name) for name in columns if name in self.columns]
+        selected = CorrelationSketch([self.columns[i] for i in keep])
+        if self.shift is not None:
+            grid = np.ix_(keep, keep)
+            selected.shift = self.shift[keep]
+            selected.n, selected.sx, selected.sxx, selected.sxy = (
+                self.n[grid], self.sx[grid], self.sxx[grid], self.sxy[grid]
+            )
+        return selected
+
+    def matrix(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            covariance = self.sxy - self.sx * self.sx.T / self.n
+            var_i = self.sxx - self.sx * self.sx / self.n
+            var_j = var_i.T
+            r = covariance / np.sqrt(var_i * var_j)
+        # Fewer than two shared rows or a constant column leaves r undefined
+        r[(self.n < 2) | ~(var_i > 0) | ~(var_j > 0)] = np.nan
+        return np.clip(r, -1.0, 1.0)
+
+    def result(self) -> Dict[str, Any]:
+        if self.shift is None:
+            return {"columns": self.columns, "matrix": [[None] * len(self.columns) for _ in self.columns]}
+        return {
+            "columns": self.columns,
+            "matrix": [[_float(value) for value in row] for row in self.matrix()],
+        }
+
+
+class ColumnProfile:
+    """
+    Sketches for one column. kind is "numeric" (numbers and booleans),
+    "datetime" or "text"; it is fixed when the column is created and every
+    chunk is coerced to it.
+    """
+
+    def __init__(self, name: str, kind: str, dtype: str, top_k: int = TOP_K,
+                 hll_precision: int = HLL_PRECISION, quantile_k: int = QUANTILE_K):
+        self.name = name
+        self.kind = kind
+        self.dtype = dtype
+        self.count = 0
+        self.nulls = 0
+        self.invalid = 0
+        self.distinct = HyperLogLog(hll_precision)
+        self.top = MisraGries(top_k)
+        self.moments = Moments() if kind in ("numeric", "datetime") else None
+        self.quantiles = KLLSketch(quantile_k) if kind == "numeric" else None
+
+    @staticmethod
+    def kind_of(series: pd.Series) -> str:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return "datetime"
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            return "numeric"
+        return "text"
+
+    def update(self, series: pd.Series):
+        self.count += len(series)
+        missing = series.isna()
+        nulls = int(missing.sum())
+        self.nulls += nulls
+        if self.kind == "numeric":
+            values = self.numeric_values(series)
+            present = ~np.isnan(values)
+            # Text that does not parse as a number in a numeric column
+            self.invalid += len(series) - nulls - int(present.sum())
+            values = values[present]
+            self.moments.update(values)
+            self.quantiles.update(values)
+            self.distinct.update(values)
+            self.top.update(pd.Series(values))
+        elif self.kind == "datetime":
+            stamps = pd.to_datetime(series, errors="coerce", utc=isinstance(series.dtype, pd.DatetimeTZDtype))
+            stamps = stamps[stamps.notna()]
+            if isinstance(stamps.dtype, pd.DatetimeTZDtype):
+                stamps = stamps.dt.tz_localize(None)
+            self.moments.update(stamps.to_numpy(dtype="datetime64[ns]").view("i8").astype(np.float64))
+            self.distinct.update(stamps.to_numpy(dtype="datetime64[ns]").view("i8"))
+            self.top.update(stamps)
+        else:
+            present = series[~missing]
+            if present.dtype.kind in "biufmM":
+                # A text column parsed as numbers in this chunk counts its values as text
+                present = present.astype(str).astype(object)
+            self.distinct.update(present.to_numpy())
+            self.top.update(present)
+
+    @staticmethod
+    def numeric_values(series: pd.Series) -> np.ndarray:
+        if pd.api.types.is_bool_dtype(series) and series.dtype == bool:
+            return series.to_numpy(dtype=np.float64)
+        if pd.api.types.is_numeric_dtype(series):
+            return series.to_numpy(dtype=np.float64, na_value=np.nan)
+        return pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+    def merge(self, other: "ColumnProfile"):
+        if other.kind != self.kind:
+            # Chunks disagreed on the column's type: keep what applies to any kind
+            self.kind, self.moments, self.quantiles = "text", None, None
+            self.dtype = "object"
+        self.count += other.count
+        self.nulls += other.nulls
+        self.invalid += other.invalid
+        self.distinct.merge(other.distinct)
+        self.top.merge(other.top)
+        if self.moments is not None:
+            self.moments.merge(other.moments)
+        if self.quantiles is not None:
+            self.quantiles.merge(other.quantiles)
+
+    def result(self) -> Dict[str, Any]:
+        field = {
+            "kind": self.kind,
+            "dtype": self.dtype,
+            "count": self.count,
+            "nulls": self.nulls,
+            "distinct": min(self.distinct.estimate(), self.count - self.nulls),
+            "top": self.top.top(),
+            "top_error": self.top.error,
+        }
+        if self.invalid:
+            field["invalid"] = self.invalid
+        moments = self.moments
+        if self.kind == "numeric":
+            field["top"] = [{"value": _float(entry["value"]), "count": entry["count"]} for entry in field["top"]]
+        if self.kind == "numeric" and moments.n:
+            field.update({
+                "mean": _float(moments.mean),
+                "variance": _float(moments.variance),
+                "std": _float(np.sqrt(moments.variance)),
+                "min": _float(moments.min),
+                "max": _float(moments.max),
+                "quantiles": dict(zip((str(q) for q in QUANTILES), self.quantiles.quantiles(QUANTILES))),
+            })
+        elif self.kind == "datetime" and moments.n:
+            field.update({
+                "min": str(pd.Timestamp(int(moments.min))),
+                "max": str(pd.Timestamp(int(moments.max))),
+                "mean": str(pd.Timestamp(int(round(moments.mean)))),
+            })
+        return field
+
+
+class DatasetProfile:
+    """
+    Profile of a dataset, built chunk by chunk with update() and combined with
+    merge(). Column order is the order columns were first seen.
+
+    schema maps column names to (kind, dtype). Profiles that will be merged
+    should share one, so that a column is typed the same in every chunk;
+    columns missing from it are typed by the first chunk they appear in.
+    """
+
+    def __init__(self, top_k: int = TOP_K, hll_precision: int = HLL_PRECISION,
+                 quantile_k: int = QUANTILE_K, max_correlation_columns: int = MAX_CORRELATION_COLUMNS,
+                 schema: Optional[Dict[str, Tuple[str, str]]] = None):
+        self.options = {"top_k": top_k, "hll_precision": hll_precision, "quantile_k": quantile_k}
+        self.max_correlation_columns = max_correlation_columns
+        self.schema = dict(schema or {})
+        self.rows = 0
+        self.columns: Dict[str, ColumnProfile] = {}
+        self.correlation: Optional[CorrelationSketch] = None
+
+    def update(self, df: pd.DataFrame) -> "DatasetProfile":
+        self.rows += len(df)
+        for name in df.columns:
+            key = str(name)
+            column = self.columns.get(key)
+            if column is None:
+                kind, dtype = self.schema.get(key) or schema_of(df[[name]])[key]
+                column = ColumnProfile(key, kind, dtype, **self.options)
+                self.columns[key] = column
+            column.update(df[name])
+        if self.correlation is None:
+            names = list(dict.fromkeys(list(self.schema) + list(self.columns)))
+            numeric = [name for name in names if (self.schema.get(name) or (self.columns[name].kind,))[0] == "numeric"]
+            self.correlation = CorrelationSketch(numeric[:self.max_correlation_columns])
+        present = [name for name in self.correlation.columns if name in df.columns]
+        if present and len(df):
+            values = np.column_stack([
+                ColumnProfile.numeric_values(df[name]) if name in df.columns else np.full(len(df), np.nan)
+                for name in self.correlation.columns
+            ])
+            self.correlation.update(values)
+        return self
+
+    def merge(self, other: "DatasetProfile") -> "DatasetProfile":
+        self.rows += other.rows
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+        if other.correlation is not None:
+            if self.correlation is None:
+                self.correlation = other.correlation
+            else:
+                self.correlation.merge(other.correlation)
+        if self.correlation is not None:
+            # Columns that stopped being numeric in some chunk drop out of the matrix
+            numeric = [name for name in self.correlation.columns if self.columns[name].kind == "numeric"]
+            if numeric != self.correlation.columns:
+                self.correlation = self.correlation._select(numeric)
+        return self
+
+    def result(self) -> Dict[str, Any]:
+        fields = {name: column.result() for name, column in self.columns.items()}
+        return {
+            "rows": self.rows,
+            "columns": len(self.columns),
+            "missing": sum(field["nulls"] for field in fields.values()),
+            "fields": fields,
+            "correlation": (self.correlation or CorrelationSketch([])).result(),
+        }
+
+
+def schema_of(df: pd.DataFrame) -> Dict[str, Tuple[str, str]]:
+    """
+    (kind, dtype) of each column of df, for DatasetProfile's schema.
+    """
+    return {str(name): (ColumnProfile.kind_of(df[name]), str(df[name].dtype)) for name in df.columns}
+
+
+def profile_chunks(chunks: Iterable[pd.DataFrame], **options) -> DatasetProfile:
+    """
+    Profile an iterable of DataFrame chunks in this process.
+    """
+    profile = DatasetProfile(**options)
+    for chunk in chunks:
+        profile.update(chunk)
+    return profile
+
+
+def profile_frame(df: pd.DataFrame, rows: Optional[int] = None, **options) -> DatasetProfile:
+    """
+    Profile an in-memory DataFrame in chunks of rows (default EDA_CHUNK_ROWS).
+    """
+    rows = rows or chunk_rows()
+    options.setdefault("schema", schema_of(df))
+    if not len(df):
+        return DatasetProfile(**options).update(df)
+    return profile_chunks((df.iloc[start:start + rows] for start in range(0, len(df), rows)), **options)
+
+
+def _profile_chunk(chunk: pd.DataFrame, options: Dict[str, Any]) -> DatasetProfile:
+    return DatasetProfile(**options).update(chunk)
+
+
+def _profile_columnar_range(directory: str, start: int, stop: int, rows: int, options: Dict[str, Any]) -> DatasetProfile:
+    # Each worker opens the columnar copy once and reads its range chunk by
+    # chunk; only the profile is sent back
+    reader = ColumnarReader(directory)
+    if start >= stop:
+        return DatasetProfile(**options).update(reader.read(slice(0, 0)))
+    return profile_chunks((reader.read(slice(i, min(i + rows, stop))) for i in range(start, stop, rows)), **options)
+
+
+def _profile_parallel(tasks: Iterable, workers: int, options: Dict[str, Any]) -> DatasetProfile:
+    """
+    Run (fn, *args) tasks in a process pool and merge the partial profiles in
+    task order, so the result does not depend on which worker finishes first.
+    At most 2 * workers tasks are in flight, so chunks read ahead of the pool
+    stay bounded.
+    """
+    profile = DatasetProfile(**options)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for fn, *args in tasks:
+            if len(pending) >= 2 * workers:
+                profile.merge(pending.popleft().result())
+            pending.append(pool.submit(fn, *args))
+        while pending:
+            profile.merge(pending.popleft().result())
+    return profile
+
+
+def profile_csv(path: str, sep: str = ",", rows: Optional[int] = None, workers: Optional[int] = None,
+                **options) -> DatasetProfile:
+    """
+    Profile a delimited file in one pass. This process parses chunks of rows
+    and worker processes profile them.
+
+    Column kinds come from the first chunk; text columns are then read as
+    strings throughout, and a numeric column's unparseable values count as
+    invalid in any chunk. Each chunk is profiled on its own and merged in file
+    order whatever the number of workers, so workers=1 and workers=N give the
+    same profile.
+    """
+    rows = rows or chunk_rows()
+    workers = workers or default_workers()
+    with pd.read_csv(path, sep=sep, chunksize=rows) as reader:
+        first = next(iter(reader), None)
+    schema = schema_of(first) if first is not None else {}
+    options = {**options, "schema": schema}
+    text = {name: str for name, (kind, _) in schema.items() if kind == "text"}
+    with pd.read_csv(path, sep=sep, chunksize=rows, dtype=text or None) as reader:
+        if workers <= 1:
+            profile = DatasetProfile(**options)
+            for chunk in reader:
+                profile.merge(_profile_chunk(chunk, options))
+            return profile
+        return _profile_parallel(((_profile_chunk, chunk, options) for chunk in reader), workers, options)
+
+
+def profile_columnar(directory: str, rows: Optional[int] = None, workers: Optional[int] = None,
+                     **options) -> DatasetProfile:
+    """
+    Profile a columnar copy written by dataset_ingestion.write_columnar. The
+    rows are split into one range per worker; each worker memory-maps the
+    copy and profiles its range chunk by chunk. Column kinds come from the
+    manifest.
+    """
+    rows = rows or chunk_rows()
+    workers = workers or default_workers()
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+    total = manifest["rows"]
+    schema = {entry["name"]: (MANIFEST_KINDS.get(entry["kind"], "text"), entry["dtype"]) for entry in manifest["columns"]}
+    options = {**options, "schema": schema}
+    if workers <= 1 or total <= rows:
+        return _profile_columnar_range(directory, 0, total, rows, options)
+    step = -(-total // workers)
+    tasks = ((_profile_columnar_range, directory, start, min(start + step, total), rows, options)
+             for start in range(0, total, step))
+    return _profile_parallel(tasks, workers, options)
+
+
+def profile_dataset(dataset_id: str, rows: Optional[int] = None, workers: Optional[int] = None,
+                    **options) -> Dict[str, Any]:
+    """
+    Profile a dataset by id: its columnar copy when ingested, else its raw upload
+    (streamed for csv, tsv and ndjson, parsed whole for the other types).
+
+    Raises:
+        FileNotFoundError: If the dataset has neither a columnar copy nor an upload.
+    """
+    directory = columnar_path(dataset_id)
+    if os.path.exists(os.path.join(directory, MANIFEST)):
+        return profile_columnar(directory, rows, workers, **options).result()
+    upload = find_upload(dataset_id)
+    if upload is None:
+        raise FileNotFoundError(f"Dataset not found: {dataset_id}")
+    file_type = os.path.splitext(upload)[1][1:].lower()
+    if file_type in ("csv", "tsv"):
+        return profile_csv(upload, "\t" if file_type == "tsv" else ",", rows, workers, **options).result()
+    if file_type in ("ndjson", "jsonl"):
+        with pd.read_json(upload, lines=True, chunksize=rows or chunk_rows()) as reader:
+            return profile_chunks(reader, **options).result()
+    return profile_frame(parse_upload(upload), rows, **options).result()
@@ -0,0 +1,647 @@
+"""
+job_service.py
+--------------
+Background jobs for long-running analysis routes (/analysis/start, /ml/auto,
+/forecast/generate, /strategy/scan).
+
+Routes submit work and return a job id immediately. The work runs in a process
+pool, with a global worker count, per-kind concurrency limits and a cap on
+queued jobs. Status, progress, per-stage timings, results and errors live in a
+SQLite (WAL) job store. Pool workers write to that store directly, so any API
+worker can serve polling and SSE requests. After each job, a worker also
+stores its dataset cache metrics there (worker_metrics), since the cache is
+per process and the API process never sees the workers' traffic.
+
+Each job row records the API process that owns it. On startup, queued and
+running jobs whose owner is no longer alive (left behind by a crash or
+restart) are marked failed, so they stop counting against JOB_MAX_QUEUED.
+
+Job functions are module-level callables taking a JobContext first:
+
+    def forecast_job(ctx, dataset_id):
+        with ctx.stage("load"):
+            df = load(dataset_id)
+        ctx.progress(0.5, "Fitting trend")
+        return {...}   # JSON-serializable result
+
+Configuration (environment variables):
+- JOB_STORE_PATH: SQLite file for the job store (default ./data/jobs.sqlite3)
+- JOB_EXECUTOR: "process" (default) or "thread"
+- JOB_MAX_WORKERS: pool size (default 2)
+- JOB_MAX_QUEUED: queued + running jobs accepted before submit is refused (default 100)
+- JOB_CONCURRENCY_<KIND>: concurrent jobs of one kind, e.g. JOB_CONCURRENCY_ANALYSIS=1
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import functools
+import multiprocessing
+from contextlib import contextmanager
+from collections.abc import Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.config import get_env_variable
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TERMINAL_STATUSES = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+def _to_json(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+
+    def default(obj):
+        if hasattr(obj, "item"):
+            return obj.item()
+        if hasattr(obj, "tolist"):
+            return obj.tolist()
+        return str(obj)
+
+    return json.dumps(value, default=default)
+
+
+class JobStore:
+    """
+    SQLite-backed job records, safe to share between processes.
+    """
+
+    COLUMNS = (
+        "job_id", "kind", "status", "params", "progress", "message", "result",
+        "error", "timings", "created_at", "started_at", "finished_at",
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, params TEXT, "
+                "progress REAL NOT NULL DEFAULT 0, message TEXT, result TEXT, error TEXT, timings TEXT, "
+                "created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+            )
+            # Owner column added after job stores were first created
+            if "owner" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_kind_status ON jobs (kind, status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS worker_metrics ("
+                "pid INTEGER NOT NULL, name TEXT NOT NULL, metrics TEXT NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (pid, name))"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA busy_timeout=30000")
+            yield conn
+        finally:
+            conn.close()
+
+    def create(
+        self,
+        kind: str,
+        params: Optional[Dict[str, Any]] = None,
+        max_active: Optional[int] = None,
+        owner: Optional[str] = None,
+    ) -> str:
+        """
+        Insert a queued job and return its id. owner identifies the API
+        process running the job (see process_owner).
+
+        Raises:
+            JobQueueFull: If max_active is given and that many jobs are already
+                queued or running (checked in the same transaction as the insert).
+        """
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if max_active is not None:
+                    active = conn.execute(
+                        "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+                    ).fetchone()[0]
+                    if active >= max_active:
+                        raise JobQueueFull(f"Job queue is full ({max_active} active jobs)")
+                conn.execute(
+                    "INSERT INTO jobs (job_id, kind, status, params, progress, timings, created_at, owner) "
+                    "VALUES (?, ?, ?, ?, 0, '{}', ?, ?)",
+                    (job_id, kind, QUEUED, _to_json(params or {}), time.time(), owner),
+                )
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        return job_id
+
+    def update(self, job_id: str, expect: Optional[tuple] = None, **fields) -> bool:
+        """
+        Update job columns; result, params and timings are JSON-encoded.
+
+        When expect is given, the row is only updated while its status is one
+        of those statuses, so status transitions are atomic across processes.
+
+        Returns:
+            bool: True if the row was updated.
+        """
+        for key in ("result", "params", "timings"):
+            if key in fields:
+                fields[key] = _to_json(fields[key])
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        sql, args = f"UPDATE jobs SET {assignments} WHERE job_id = ?", [*fields.values(), job_id]
+        if expect:
+            sql += f" AND status IN ({', '.join('?' for _ in expect)})"
+            args.extend(expect)
+        with self._connect() as conn:
+            return conn.execute(sql, args).rowcount > 0
+
+    def record_timing(self, job_id: str, stage: str, seconds: float):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET timings = json_set(COALESCE(timings, '{}'), ?, ?) WHERE job_id = ?",
+                (f"$.{stage}", round(seconds, 6), job_id),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(
+        self,
+        kind: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        include_result: bool = False,
+    ) -> List[Dict[str, Any]]:
+        clauses, args = [], []
+        if kind:
+            clauses.append("kind = ?")
+            args.append(kind)
+        if status:
+            clauses.append("status = ?")
+            args.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (*args, limit, offset),
+            ).fetchall()
+        jobs = [self._to_dict(row) for row in rows]
+        if not include_result:
+            for job in jobs:
+                job.pop("result", None)
+        return jobs
+
+    def latest(self, kind: str, status: str = COMPLETED) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE kind = ? AND status = ? "
+                "ORDER BY finished_at DESC LIMIT 1",
+                (kind, status),
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def count_active(self) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchone()[0]
+
+    def fail_orphaned(self, error: str = "interrupted") -> int:
+        """
+        Mark queued and running jobs whose owning process is gone as failed.
+
+        Returns:
+            int: The number of jobs marked failed.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT job_id, owner FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+                ).fetchall()
+                orphaned = [job_id for job_id, owner in rows if not _owner_alive(owner)]
+                conn.executemany(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE job_id = ? AND status IN (?, ?)",
+                    [(FAILED, error, time.time(), job_id, QUEUED, RUNNING) for job_id in orphaned],
+                )
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        return len(orphaned)
+
+    def record_worker_metrics(self, name: str, metrics: Dict[str, Any], pid: Optional[int] = None):
+        """
+        Store the latest metrics of a per-process service (e.g. "dataset_cache") for a worker.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO worker_metrics (pid, name, metrics, updated_at) VALUES (?, ?, ?, ?)",
+                (pid or os.getpid(), name, _to_json(metrics), time.time()),
+            )
+
+    def worker_metrics(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Latest metrics of each live worker process for name; rows of exited
+        processes are dropped.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT pid, metrics, updated_at FROM worker_metrics WHERE name = ? ORDER BY pid", (name,)
+            ).fetchall()
+            dead = [pid for pid, _, _ in rows if not _pid_alive(pid)]
+            if dead:
+                conn.executemany("DELETE FROM worker_metrics WHERE pid = ? AND name = ?", [(pid, name) for pid in dead])
+        return [
+            {"pid": pid, "updated_at": updated_at, "metrics": json.loads(metrics)}
+            for pid, metrics, updated_at in rows if pid not in dead
+        ]
+
+    def _to_dict(self, row) -> Dict[str, Any]:
+        job = dict(zip(self.COLUMNS, row))
+        for key in ("params", "result", "timings"):
+            job[key] = json.loads(job[key]) if job[key] else None
+        started, finished = job["started_at"], job["finished_at"]
+        job["queue_seconds"] = round(started - job["created_at"], 6) if started else None
+        job["run_seconds"] = round(finished - started, 6) if started and finished else None
+        return job
+
+
+class JobContext:
+    """
+    Handle passed to job functions for reporting progress and stage timings.
+    """
+
+    def __init__(self, job_id: str, store_path: str):
+        self.job_id = job_id
+        self.store = JobStore(store_path)
+
+    def progress(self, fraction: float, message: Optional[str] = None):
+        """
+        Record progress as a fraction between 0 and 1 with an optional message.
+        """
+        fields = {"progress": max(0.0, min(1.0, float(fraction)))}
+        if message is not None:
+            fields["message"] = message
+        self.store.update(self.job_id, **fields)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time a named stage; the duration is stored under the job's timings.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.store.record_timing(self.job_id, name, time.perf_counter() - start)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _process_started(pid: int) -> str:
+    # Start time from /proc (Linux), so a reused pid is not taken for the old process
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[19]
+    except (OSError, IndexError):
+        return ""
+
+
+def process_owner(pid: Optional[int] = None) -> str:
+    """
+    Owner id of a process: its pid plus its start time where available.
+    """
+    pid = pid or os.getpid()
+    return f"{pid}:{_process_started(pid)}"
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    pid, _, started = (owner or "").partition(":")
+    if not pid.isdigit():
+        return False
+    return _pid_alive(int(pid)) and _process_started(int(pid)) == started
+
+
+def _publish_worker_metrics(store: JobStore):
+    # The dataset cache lives in this worker; make its traffic visible to /metrics
+    from app.services.dataset_cache import process_cache_metrics
+
+    try:
+        metrics = process_cache_metrics()
+        if metrics is not None:
+            store.record_worker_metrics("dataset_cache", metrics)
+    except Exception:
+        pass
+
+
+def _execute_job(store_path: str, job_id: str, fn: Callable, args: tuple, kwargs: dict):
+    """
+    Run a job function inside a pool worker and record the outcome.
+    """
+    ctx = JobContext(job_id, store_path)
+    # Claim the job atomically; a job cancelled while queued is skipped
+    if not ctx.store.update(job_id, expect=(QUEUED,), status=RUNNING, started_at=time.time()):
+        return
+    try:
+        result = fn(ctx, *args, **kwargs)
+    except Exception as e:
+        ctx.store.update(job_id, expect=(RUNNING,), status=FAILED, error=str(e), finished_at=time.time())
+        return
+    finally:
+        _publish_worker_metrics(ctx.store)
+    ctx.store.update(job_id, expect=(RUNNING,), status=COMPLETED, progress=1.0, result=result, finished_at=time.time())
+
+
+class JobManager:
+    """
+    Submits jobs to a worker pool and tracks them in a JobStore.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        executor: str = "process",
+        max_workers: int = 2,
+        max_queued: int = 100,
+        concurrency: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Args:
+            store: Job store shared with the pool workers.
+            executor: "process" for a ProcessPoolExecutor, "thread" for a ThreadPoolExecutor.
+            max_workers: Pool size.
+            max_queued: Queued + running jobs accepted before submit raises JobQueueFull.
+            concurrency: Per-kind limits on concurrently running jobs.
+
+        Raises:
+            ValueError: If the executor type is not supported.
+        """
+        if executor not in ("process", "thread"):
+            raise ValueError(f"Unsupported executor: {executor}")
+        self.store = store
+        self.executor_type = executor
+        self.max_workers = max(1, max_workers)
+        self.max_queued = max_queued
+        self.concurrency = dict(concurrency or {})
+        self._executor: Optional[Executor] = None
+        self._semaphores: Dict[tuple, asyncio.Semaphore] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.owner = process_owner()
+
+    def recover(self) -> int:
+        """
+        Fail jobs left queued or running by API processes that are no longer
+        alive. Returns the number of jobs marked failed.
+        """
+        return self.store.fail_orphaned()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                # Spawned workers do not inherit the server's threads and locks
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        return self._executor
+
+    def _semaphore(self, kind: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        key = (id(loop), kind)
+        if key not in self._semaphores:
+            limit = self.concurrency.get(kind) or int(
+                get_env_variable(f"JOB_CONCURRENCY_{kind.upper()}", self.max_workers)
+            )
+            self._semaphores[key] = asyncio.Semaphore(max(1, limit))
+        return self._semaphores[key]
+
+    async def submit(self, kind: str, fn: Callable, *args, params: Optional[Dict[str, Any]] = None, **kwargs) -> str:
+        """
+        Queue fn(ctx, *args, **kwargs) and return its job id. The job store
+        write runs in a thread, off the event loop.
+
+        Raises:
+            JobQueueFull: If max_queued jobs are already queued or running.
+        """
+        job_id = await asyncio.to_thread(self.store.create, kind, params, self.max_queued, self.owner)
+        task = asyncio.get_running_loop().create_task(self._run(kind, job_id, fn, args, kwargs))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        return job_id
+
+    async def _run(self, kind: str, job_id: str, fn: Callable, args: tuple, kwargs: dict):
+        try:
+            async with self._semaphore(kind):
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(
+                    self._get_executor(), _execute_job, self.store.path, job_id, fn, args, kwargs
+                )
+        except asyncio.CancelledError:
+            await self._finish(job_id, status=CANCELLED, finished_at=time.time())
+            raise
+        except Exception as e:
+            # The worker died or the job could not be pickled
+            await self._finish(job_id, status=FAILED, error=str(e), finished_at=time.time())
+
+    async def _finish(self, job_id: str, **fields):
+        # Submitted to the default executor right away and shielded, so a second
+        # cancellation (e.g. loop shutdown) cannot drop the write before it runs
+        update = functools.partial(self.store.update, job_id, expect=(QUEUED, RUNNING), **fields)
+        await asyncio.shield(asyncio.get_running_loop().run_in_executor(None, update))
+
+    async def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job that has not started running yet. The queued -> cancelled
+        transition is atomic, so a worker can no longer claim the job afterwards.
+        """
+        task = self._tasks.get(job_id)
+        if task is None:
+            return False
+        cancelled = await asyncio.to_thread(
+            self.store.update, job_id, expect=(QUEUED,), status=CANCELLED, finished_at=time.time()
+        )
+        if cancelled:
+            task.cancel()
+        return cancelled
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None, poll_seconds: float = 0.1) -> Dict[str, Any]:
+        """
+        Wait until a job reaches a terminal status and return its record.
+        """
+        task = self._tasks.get(job_id)
+        if task is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(task), timeout)
+            except asyncio.CancelledError:
+                pass
+            return await asyncio.to_thread(self.store.get, job_id)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = await asyncio.to_thread(self.store.get, job_id)
+            if job is None or job["status"] in TERMINAL_STATUSES:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                raise asyncio.TimeoutError()
+            await asyncio.sleep(poll_seconds)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop the worker pool; queued jobs that have not started are cancelled.
+        Call from the event loop's thread (or once the loop has stopped), since
+        it cancels the loop's tasks; aclose() is the variant for app shutdown.
+        """
+        for task in list(self._tasks.values()):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    async def aclose(self):
+        """
+        Shut down from the event loop without waiting for running jobs: job
+        tasks are cancelled on the loop, queued work is dropped from the pool,
+        and running jobs are left to finish in their workers.
+        """
+        for task in list(self._tasks.values()):
+            task.cancel()
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=False, cancel_futures=True)
+
+
+class LastRunView(Mapping):
+    """
+    Read-only {"dataset_id", "timestamp"} view of the latest completed job of a kind.
+
+    Each item lookup queries the job store; use snapshot() (off the event loop)
+    to read both fields with one query.
+    """
+
+    KEYS = ("dataset_id", "timestamp")
+
+    def __init__(self, kind: str, store_getter: Callable[[], JobStore]):
+        self.kind = kind
+        self._store_getter = store_getter
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Load the latest completed job once and return it as a plain dict.
+        """
+        job = self._store_getter().latest(self.kind)
+        if job is None:
+            return {"dataset_id": None, "timestamp": None}
+        return {
+            "dataset_id": (job["params"] or {}).get("dataset_id"),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(job["finished_at"])),
+        }
+
+    def __getitem__(self, key):
+        return self.snapshot()[key]
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def __repr__(self):
+        return repr(self.snapshot())
+
+
+_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    """
+    Return the process-wide JobManager.
+    """
+    global _manager
+    if _manager is None:
+        _manager = JobManager(
+            store=JobStore(get_env_variable("JOB_STORE_PATH", "./data/jobs.sqlite3")),
+            executor=get_env_variable("JOB_EXECUTOR", "process"),
+            max_workers=int(get_env_variable("JOB_MAX_WORKERS", 2)),
+            max_queued=int(get_env_variable("JOB_MAX_QUEUED", 100)),
+        )
+    return _manager
+
+
+def get_job_store() -> JobStore:
+    return get_job_manager().store
+
+
+async def start():
+    """
+    Recover the job store on startup: jobs orphaned by a crash or restart are marked failed.
+    """
+    recovered = await asyncio.to_thread(get_job_manager().recover)
+    if recovered:
+        print(f"[JOBS] Marked {recovered} interrupted job(s) as failed")
+
+
+def shutdown():
+    """
+    Stop the process-wide job manager, if it was created.
+    """
+    if _manager is not None:
+        _manager.shutdown()
+
+
+async def ashutdown():
+    """
+    Stop the process-wide job manager from the event loop without blocking on running jobs.
+    """
+    if _manager is not None:
+        await _manager.aclose()
+
+
+async def submit_job(kind: str, fn: Callable, *args, params: Optional[Dict[str, Any]] = None, wait: bool = False, **kwargs):
+    """
+    Submit a job for a route. Returns {"status": "queued", "job_id": ...}, or the
+    job's result when wait=True (legacy synchronous behaviour), or a
+    {"status": "failed", "error": ...} dict if the job failed or was refused.
+    """
+    manager = get_job_manager()
+    try:
+        job_id = await manager.submit(kind, fn, *args, params=params, **kwargs)
+    except JobQueueFull as e:
+        return {"status": "failed", "error": str(e)}
+    if not wait:
+        return {"status": QUEUED, "job_id": job_id, "status_url": f"/api/jobs/{job_id}"}
+    job = await manager.wait(job_id)
+    if job["status"] != COMPLETED:
+        return {"status": "failed", "error": job["error"] or job["status"], "job_id": job_id}
+    return job["result"]
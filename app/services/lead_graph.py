@@ -0,0 +1,380 @@
+"""
+lead_graph.py
+-------------
+Sparse graph analytics over lead relationships: account-level clustering
+(connected components), degree and PageRank-style influence, and shortest
+paths between leads.
+
+Leads are linked by shared company domain, industry and location, and by
+explicit interaction edges. A shared attribute value would be a clique among
+all of its leads (O(group^2) edges), so it is stored as group membership
+instead: a sparse lead x attribute incidence matrix B. The clique graph is
+then A = B W B^T - diag(B W 1) + I, where W holds per-field weights and I
+holds the interaction edges. Algorithms use that form directly:
+
+- connected components run on the bipartite lead/attribute graph (same
+  components as the clique graph, restricted to leads);
+- degree and PageRank use sparse matrix-vector products with B and I, so each
+  iteration is O(memberships + interactions);
+- shortest paths run Dijkstra on the bipartite graph, where a lead-attribute
+  hop costs 0.5, so two leads sharing an attribute are 1 hop apart like an
+  interaction.
+
+add_leads / add_interactions update the graph incrementally: new edges are
+merged into the existing components with a union-find over component roots,
+and PageRank warm-starts from the previous ranks.
+
+Missing attribute values (None, "", NaN) and free email domains do not link
+leads.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse import csgraph
+
+ATTRIBUTE_FIELDS = ("domain", "industry", "location")
+DEFAULT_WEIGHTS = {"domain": 1.0, "industry": 1.0, "location": 1.0, "interaction": 1.0}
+FREE_EMAIL_DOMAINS = frozenset({"gmail.com", "yahoo.com", "hotmail.com", "outlook.com"})
+
+
+def lead_domain(lead: Dict[str, Any]) -> Optional[str]:
+    """
+    Company domain of a lead: its domain field, else the domain of its email
+    (free email providers are not company domains).
+    """
+    domain = lead.get("domain")
+    # NaN (a missing value in a DataFrame row) is truthy and would stringify to "nan"
+    if _is_missing(domain) or not str(domain).strip():
+        email = lead.get("email")
+        if _is_missing(email) or "@" not in str(email):
+            return None
+        domain = str(email).split("@")[-1]
+    domain = str(domain).strip().lower()
+    if not domain or domain in FREE_EMAIL_DOMAINS:
+        return None
+    return domain
+
+
+def _is_missing(value: Any) -> bool:
+    if value is None or value == "":
+        return True
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
+class _GrowableArray:
+    """
+    Append-only numpy buffer with amortized O(1) appends.
+    """
+
+    def __init__(self, dtype):
+        self._data = np.empty(1024, dtype=dtype)
+        self._size = 0
+
+    def extend(self, values: np.ndarray):
+        values = np.asarray(values, dtype=self._data.dtype)
+        needed = self._size + len(values)
+        if needed > len(self._data):
+            grown = np.empty(max(needed, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:needed] = values
+        self._size = needed
+
+    def view(self) -> np.ndarray:
+        return self._data[:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class LeadGraph:
+    """
+    Incrementally updated lead relationship graph with sparse-matrix analytics.
+    """
+
+    def __init__(self, attribute_fields: Sequence[str] = ATTRIBUTE_FIELDS, weights: Optional[Dict[str, float]] = None):
+        self.attribute_fields = tuple(attribute_fields)
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.lead_ids: List[Any] = []
+        self._positions: Dict[Any, int] = {}
+        self._attributes: List[Tuple[str, Any]] = []
+        self._attribute_index: Dict[Tuple[str, Any], int] = {}
+        self._member_lead = _GrowableArray(np.int64)
+        self._member_attr = _GrowableArray(np.int64)
+        self._edge_src = _GrowableArray(np.int64)
+        self._edge_dst = _GrowableArray(np.int64)
+        self._edge_weight = _GrowableArray(np.float64)
+        # Union-find over leads and attributes, kept in sync with every new edge
+        # once connected_components() has been computed
+        self._parent: Optional[np.ndarray] = None
+        self._matrices = None
+        self._ranks: Optional[np.ndarray] = None
+
+    # ----- building -------------------------------------------------------
+
+    @property
+    def num_leads(self) -> int:
+        return len(self.lead_ids)
+
+    @property
+    def num_attributes(self) -> int:
+        return len(self._attributes)
+
+    def _lead_position(self, lead_id: Any) -> int:
+        position = self._positions.get(lead_id)
+        if position is None:
+            position = self._positions[lead_id] = len(self.lead_ids)
+            self.lead_ids.append(lead_id)
+        return position
+
+    def _attribute_value(self, lead: Dict[str, Any], field: str) -> Any:
+        value = lead_domain(lead) if field == "domain" else lead.get(field)
+        return None if _is_missing(value) else value
+
+    def add_leads(self, leads: Iterable[Dict[str, Any]]) -> List[int]:
+        """
+        Add (or extend) leads and link them to their attribute groups.
+        Returns the positions of the given leads.
+        """
+        positions, leads_col, attrs_col = [], [], []
+        for lead in leads:
+            position = self._lead_position(lead.get("id"))
+            positions.append(position)
+            for field in self.attribute_fields:
+                value = self._attribute_value(lead, field)
+                if value is None:
+                    continue
+                key = (field, value)
+                attr = self._attribute_index.get(key)
+                if attr is None:
+                    attr = self._attribute_index[key] = len(self._attributes)
+                    self._attributes.append(key)
+                leads_col.append(position)
+                attrs_col.append(attr)
+        self._member_lead.extend(leads_col)
+        self._member_attr.extend(attrs_col)
+        self._on_edges(2 * np.asarray(leads_col, dtype=np.int64), 2 * np.asarray(attrs_col, dtype=np.int64) + 1)
+        return positions
+
+    def add_interactions(self, pairs: Iterable[Tuple[Any, Any]], weight: Optional[float] = None):
+        """
+        Add undirected interaction edges between lead ids (unknown ids become
+        leads without attributes).
+        """
+        weight = self.weights["interaction"] if weight is None else weight
+        src, dst = [], []
+        for a, b in pairs:
+            pa, pb = self._lead_position(a), self._lead_position(b)
+            if pa != pb:
+                src.append(pa)
+                dst.append(pb)
+        self._edge_src.extend(src)
+        self._edge_dst.extend(dst)
+        self._edge_weight.extend(np.full(len(src), weight))
+        self._on_edges(2 * np.asarray(src, dtype=np.int64), 2 * np.asarray(dst, dtype=np.int64))
+
+    def _on_edges(self, src: np.ndarray, dst: np.ndarray):
+        self._matrices = None
+        if self._parent is None:
+            return
+        # Union the new edges' roots into the existing components; union-find
+        # nodes interleave leads (2 * position) and attributes (2 * index + 1),
+        # so growing either side never renumbers existing nodes
+        size = 2 * max(self.num_leads, self.num_attributes)
+        if len(self._parent) < size:
+            self._parent = np.concatenate([self._parent, np.arange(len(self._parent), size, dtype=np.int64)])
+        parent = self._parent
+        for a, b in zip(src.tolist(), dst.tolist()):
+            ra, rb = self._find(a), self._find(b)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+
+    def _find(self, node: int) -> int:
+        parent = self._parent
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    # ----- sparse matrices ------------------------------------------------
+
+    def _build(self):
+        if self._matrices is not None:
+            return self._matrices
+        n, m = self.num_leads, self.num_attributes
+        lead, attr = self._member_lead.view(), self._member_attr.view()
+        # Re-adding a lead with the same attribute must not double the membership
+        keys = np.unique(lead * max(m, 1) + attr)
+        lead, attr = keys // max(m, 1), keys % max(m, 1)
+        incidence = sparse.csr_matrix((np.ones(len(lead)), (lead, attr)), shape=(n, m))
+        attr_weight = np.array([self.weights[field] for field, _ in self._attributes], dtype=np.float64)
+        src, dst, w = self._edge_src.view(), self._edge_dst.view(), self._edge_weight.view()
+        interactions = sparse.coo_matrix((np.concatenate([w, w]), (np.concatenate([src, dst]), np.concatenate([dst, src]))), shape=(n, n)).tocsr()
+        self._matrices = (incidence, attr_weight, interactions)
+        return self._matrices
+
+    def _bipartite(self, membership_cost: float = 1.0, interaction_cost: Optional[float] = None) -> sparse.csr_matrix:
+        incidence, _, interactions = self._build()
+        n = self.num_leads
+        memberships = incidence.tocoo()
+        rows = [memberships.row, memberships.col + n]
+        cols = [memberships.col + n, memberships.row]
+        data = [np.full(memberships.nnz, membership_cost)] * 2
+        if interactions.nnz:
+            inter = interactions.tocoo()
+            rows.append(inter.row)
+            cols.append(inter.col)
+            data.append(inter.data if interaction_cost is None else np.full(inter.nnz, interaction_cost))
+        total = n + self.num_attributes
+        return sparse.csr_matrix((np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))), shape=(total, total))
+
+    # ----- analytics ------------------------------------------------------
+
+    def connected_components(self) -> np.ndarray:
+        """
+        Component label (0..k-1, in order of first lead) of every lead.
+        """
+        n, m = self.num_leads, self.num_attributes
+        if self._parent is None:
+            _, labels = csgraph.connected_components(self._bipartite(), directed=False)
+            nodes = np.concatenate([2 * np.arange(n), 2 * np.arange(m) + 1]).astype(np.int64)
+            # Smallest union-find node of each component is its root
+            roots = np.full(labels.max(initial=-1) + 1, 2 * max(n, m), dtype=np.int64)
+            np.minimum.at(roots, labels, nodes)
+            self._parent = np.arange(2 * max(n, m), dtype=np.int64)
+            self._parent[nodes] = roots[labels]
+        if len(self._parent) < 2 * max(n, m):
+            self._on_edges(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        # Full path compression, vectorized
+        parent = self._parent
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+        self._parent = parent
+        _, labels = np.unique(parent[0:2 * n:2], return_inverse=True)
+        # Relabel by first appearance so labels are stable across updates
+        _, first_seen = np.unique(labels, return_index=True)
+        order = np.argsort(np.argsort(first_seen))
+        return order[labels]
+
+    def components(self) -> List[List[Any]]:
+        """
+        Lead ids of every component, largest first.
+        """
+        labels = self.connected_components()
+        members = np.argsort(labels, kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(labels))])
+        groups = [[self.lead_ids[i] for i in members[bounds[k]:bounds[k + 1]]] for k in range(len(bounds) - 1)]
+        return sorted(groups, key=len, reverse=True)
+
+    def _adjacency_matvec(self, x: np.ndarray) -> np.ndarray:
+        # A x = B W (B^T x) - diag(B W 1) x + I x, without materializing A
+        incidence, attr_weight, interactions = self._build()
+        y = incidence @ (attr_weight * (incidence.T @ x))
+        y -= (incidence @ attr_weight) * x
+        y += interactions @ x
+        return y
+
+    def degree(self) -> np.ndarray:
+        """
+        Weighted degree of every lead: each shared attribute and interaction counts.
+        """
+        return self._adjacency_matvec(np.ones(self.num_leads))
+
+    def pagerank(self, alpha: float = 0.85, tol: float = 1e-10, max_iter: int = 200) -> np.ndarray:
+        """
+        PageRank over the weighted clique graph by power iteration, warm-started
+        from the previous result when the graph has grown.
+        """
+        n = self.num_leads
+        if n == 0:
+            return np.empty(0)
+        degree = self.degree()
+        dangling = degree <= 0
+        inv_degree = np.divide(1.0, degree, out=np.zeros(n), where=~dangling)
+        if self._ranks is not None and len(self._ranks) <= n:
+            ranks = np.concatenate([self._ranks, np.full(n - len(self._ranks), 1.0 / n)])
+            ranks /= ranks.sum()
+        else:
+            ranks = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            spread = self._adjacency_matvec(ranks * inv_degree)
+            updated = alpha * spread + (alpha * ranks[dangling].sum() + 1.0 - alpha) / n
+            delta = np.abs(updated - ranks).sum()
+            ranks = updated
+            if delta < tol:
+                break
+        self._ranks = ranks
+        return ranks
+
+    def shortest_path(self, source_id: Any, target_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Fewest-hop path between two leads, or None if they are not connected.
+        Returns the lead ids on the path and, for each hop, the shared attribute
+        ("field=value") or "interaction" that links them.
+        """
+        if source_id not in self._positions or target_id not in self._positions:
+            return None
+        source, target = self._positions[source_id], self._positions[target_id]
+        distances, predecessors = csgraph.dijkstra(
+            self._bipartite(membership_cost=0.5, interaction_cost=1.0),
+            directed=False, indices=source, return_predecessors=True,
+        )
+        if not np.isfinite(distances[target]):
+            return None
+        nodes = [target]
+        while nodes[-1] != source:
+            nodes.append(int(predecessors[nodes[-1]]))
+        nodes.reverse()
+        n = self.num_leads
+        path, via = [self.lead_ids[nodes[0]]], []
+        for node in nodes[1:]:
+            if node >= n:
+                field, value = self._attributes[node - n]
+                via.append(f"{field}={value}")
+            else:
+                if len(via) < len(path):
+                    via.append("interaction")
+                path.append(self.lead_ids[node])
+        return {"path": path, "via": via, "hops": float(distances[target])}
+
+    def connections(self, lead_id: Any, limit: Optional[int] = None) -> List[Any]:
+        """
+        Neighbor ids of a lead in the {"connections": [...]} shape of
+        Lead.relationship_map, in lead insertion order.
+        """
+        position = self._positions.get(lead_id)
+        if position is None:
+            return []
+        incidence, _, interactions = self._build()
+        attrs = incidence[position].indices
+        neighbors = np.union1d(incidence[:, attrs].tocsc().indices if len(attrs) else np.empty(0, dtype=np.int64),
+                               interactions[position].indices)
+        neighbors = neighbors[neighbors != position]
+        return [self.lead_ids[i] for i in neighbors[:limit]]
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """
+        JSON-friendly overview: sizes, component count and the most influential leads.
+        """
+        labels = self.connected_components()
+        ranks = self.pagerank()
+        best = np.argsort(-ranks, kind="stable")[:top]
+        return {
+            "leads": self.num_leads,
+            "attributes": self.num_attributes,
+            "interactions": len(self._edge_src),
+            "components": int(labels.max(initial=-1) + 1),
+            "largest_component": int(np.bincount(labels).max(initial=0)) if len(labels) else 0,
+            "top_influence": [{"id": self.lead_ids[i], "pagerank": float(ranks[i])} for i in best],
+        }
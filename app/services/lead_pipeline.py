@@ -0,0 +1,116 @@
+"""
+lead_pipeline.py
+----------------
+Fused lead enrichment chain over a columnar table.
+
+The per-lead chain is LeadIntelligenceAgent.score_lead / enrich_lead ->
+MarketSignalScanner.scan_lead -> RevenueForecastingAgent.forecast ->
+PipelineOptimizationAgent.recommend_action -> CoachingAgent.generate_coaching_tip
+-> AutomationAgent.execute_action. Every step copies the lead dict.
+LeadPipeline.run_frame runs the same rules once per column instead, using each
+agent's vectorized method. run() takes and returns lead dicts and produces
+output identical to run_lead() applied to every lead.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from app.agents.automation_agent import AutomationAgent
+from app.agents.coaching_agent import CoachingAgent
+from app.agents.lead_intelligence_agent import LeadIntelligenceAgent
+from app.agents.market_signal_scanner import NO_SIGNAL, MarketSignalScanner
+from app.agents.pipeline_optimization_agent import PipelineOptimizationAgent
+from app.agents.revenue_forecasting_agent import RevenueForecastingAgent
+
+# Fields added by the chain, in the order the per-lead chain sets them
+OUTPUT_FIELDS = (
+    "score", "industry", "employee_size", "market_signals", "market_signal", "market_signal_detected",
+    "win_probability", "estimated_revenue", "recommended_action", "coaching_tip", "automation_status",
+)
+
+
+class LeadPipeline:
+    """
+    Runs the rule agents over many leads at once.
+    """
+
+    def __init__(
+        self,
+        intelligence: Optional[LeadIntelligenceAgent] = None,
+        scanner: Optional[MarketSignalScanner] = None,
+        forecaster: Optional[RevenueForecastingAgent] = None,
+        optimizer: Optional[PipelineOptimizationAgent] = None,
+        coach: Optional[CoachingAgent] = None,
+        automation: Optional[AutomationAgent] = None,
+    ):
+        self.intelligence = intelligence or LeadIntelligenceAgent()
+        self.scanner = scanner or MarketSignalScanner()
+        self.forecaster = forecaster or RevenueForecastingAgent()
+        self.optimizer = optimizer or PipelineOptimizationAgent()
+        self.coach = coach or CoachingAgent()
+        self.automation = automation or AutomationAgent()
+
+    def run_lead(self, lead: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        The per-lead chain (reference for run and run_frame).
+        """
+        lead = dict(lead)
+        lead["score"] = self.intelligence.score_lead(lead)
+        lead = self.intelligence.enrich_lead(lead)
+        lead = self.scanner.scan_lead(lead)
+        lead["market_signal_detected"] = lead["market_signal"] != NO_SIGNAL
+        lead = self.forecaster.forecast(lead)
+        lead = self.optimizer.recommend_action(lead)
+        lead = self.coach.generate_coaching_tip(lead)
+        return self.automation.execute_action(lead)
+
+    def run_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Run the whole chain column-wise; returns a copy of df with OUTPUT_FIELDS added.
+        """
+        df = df.copy(deep=False)
+        df["score"] = self.intelligence.score_leads(df)
+        df = self.intelligence.enrich_leads(df)
+        df = self.scanner.scan_frame(df)
+        df["market_signal_detected"] = (df["market_signal"] != NO_SIGNAL).to_numpy()
+        df = self.forecaster.forecast_leads(df)
+        df = self.optimizer.recommend_actions(df)
+        df = self.coach.generate_coaching_tips(df)
+        return self.automation.execute_actions(df)
+
+    def run(self, leads: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run the chain for a list of lead dicts; same output as run_lead per lead.
+        """
+        leads = leads if isinstance(leads, list) else list(leads)
+        if not leads:
+            return []
+        result = self.run_frame(pd.DataFrame.from_records(leads))
+        columns = [result[field].tolist() for field in OUTPUT_FIELDS]
+        enriched = []
+        for lead, *values in zip(leads, *columns):
+            lead = dict(lead)
+            lead.update(zip(OUTPUT_FIELDS, values))
+            enriched.append(lead)
+        return enriched
+
+
+_pipeline: Optional[LeadPipeline] = None
+
+
+def get_lead_pipeline() -> LeadPipeline:
+    """
+    Return the process-wide pipeline (shares one market signal index).
+    """
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = LeadPipeline()
+    return _pipeline
+
+
+def run_lead_pipeline(leads: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Library entry point: enrich leads through the full rule-agent chain.
+    """
+    return get_lead_pipeline().run(leads)
@@ -0,0 +1,203 @@
+"""
+lead_scoring.py
+---------------
+Rule-based lead scoring shared by /leads/predict and /leads/predict/batch.
+
+The batch path scores a whole DataFrame in one NumPy pass. Stage and industry
+weights are looked up through categorical codes rather than one dict.get per
+row. Results are identical to the single-lead formula:
+
+    (deal_amount / 1000) * 0.25 + engagement_score * 0.5 + STAGE_WEIGHT + INDUSTRY_WEIGHT
+"""
+
+import io
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# You may want to tune these weights for your use case
+STAGE_WEIGHT = {
+    "Prospecting": 2,
+    "Qualification": 4,
+    "Proposal": 6,
+    "Negotiation": 8,
+    "Closed Won": 10,
+    "Closed Lost": -5,
+}
+INDUSTRY_WEIGHT = {
+    "B2B SaaS": 5,
+    "E-Commerce": 3,
+    "Healthcare": 4,
+    "Finance": 2,
+    "Other": 1,
+}
+
+PREDICT_FIELDS = ["lead_name", "company", "deal_amount", "engagement_score", "industry", "stage"]
+
+
+def score_lead(deal_amount, engagement_score, stage, industry) -> float:
+    """
+    Score a single lead.
+    """
+    deal_amt = deal_amount or 0
+    engagement = engagement_score or 0
+    stage = stage or "Other"
+    industry = industry or "Other"
+    return (
+        (deal_amt / 1000) * 0.25 +
+        engagement * 0.5 +
+        STAGE_WEIGHT.get(stage, 0) +
+        INDUSTRY_WEIGHT.get(industry, 0)
+    )
+
+
+def classify_score(score):
+    if score >= 80:
+        return "High Priority"
+    elif score >= 60:
+        return "Medium Priority"
+    else:
+        return "Low Priority"
+
+
+def _weight_lookup(values: pd.Series, weights: Dict[str, float]) -> np.ndarray:
+    # Unknown categories get code -1, which indexes the trailing 0 weight
+    codes = pd.Categorical(values, categories=list(weights)).codes
+    table = np.append(np.asarray(list(weights.values()), dtype=float), 0.0)
+    return table[codes]
+
+
+def _label_column(df: pd.DataFrame, column: str) -> pd.Series:
+    # Mirrors `value or "Other"`: missing and empty labels fall back to "Other"
+    values = df[column].astype(object).where(df[column].notna(), "")
+    values = values.astype(str)
+    return values.mask(values == "", "Other")
+
+
+def score_leads(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Score and classify every lead in df.
+
+    Args:
+        df: DataFrame with deal_amount, engagement_score, stage and industry columns.
+
+    Returns:
+        pd.DataFrame: Columns lead_score (unrounded) and classification, indexed like df.
+    """
+    deal_amt = pd.to_numeric(df["deal_amount"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    engagement = pd.to_numeric(df["engagement_score"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    scores = (
+        (deal_amt / 1000) * 0.25 +
+        engagement * 0.5 +
+        _weight_lookup(_label_column(df, "stage"), STAGE_WEIGHT) +
+        _weight_lookup(_label_column(df, "industry"), INDUSTRY_WEIGHT)
+    )
+    classification = np.select(
+        [scores >= 80, scores >= 60],
+        ["High Priority", "Medium Priority"],
+        default="Low Priority",
+    )
+    return pd.DataFrame({"lead_score": scores, "classification": classification}, index=df.index)
+
+
+def parse_leads(body: bytes, content_type: Optional[str] = None, filename: Optional[str] = None) -> pd.DataFrame:
+    """
+    Parse a batch of leads from a JSON array, a JSON object with a "leads" array,
+    NDJSON or CSV.
+
+    Raises:
+        ValueError: If the body cannot be parsed or required columns are missing.
+    """
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    extension = (filename or "").rsplit(".", 1)[-1].lower() if filename and "." in filename else ""
+
+    try:
+        if extension == "csv" or content_type in ("text/csv", "application/csv"):
+            df = pd.read_csv(io.BytesIO(body))
+        elif extension in ("ndjson", "jsonl") or content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+            records = [json.loads(line) for line in body.decode("utf-8").splitlines() if line.strip()]
+            _check_records(records)
+            df = pd.DataFrame.from_records(records)
+        else:
+            parsed = json.loads(body.decode("utf-8") or "[]")
+            if isinstance(parsed, dict):
+                parsed = parsed.get("leads", [])
+            if not isinstance(parsed, list):
+                raise ValueError("Expected a JSON array of leads")
+            _check_records(parsed)
+            df = pd.DataFrame.from_records(parsed)
+    except (UnicodeDecodeError, json.JSONDecodeError, pd.errors.ParserError) as e:
+        raise ValueError(f"Could not parse leads: {e}")
+
+    if df.empty:
+        return pd.DataFrame(columns=PREDICT_FIELDS)
+    missing = [field for field in PREDICT_FIELDS if field not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+    for field in ("deal_amount", "engagement_score"):
+        numeric = pd.to_numeric(df[field], errors="coerce")
+        invalid = numeric.isna() & df[field].notna()
+        if invalid.any():
+            rows = [int(i) for i in np.flatnonzero(invalid.to_numpy())[:10]]
+            raise ValueError(f"Non-numeric {field} in rows {rows}")
+    return df.reset_index(drop=True)
+
+
+def _check_records(records: List[Any]):
+    # from_records raises TypeError/ValueError on scalars; report them as bad input instead
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            raise ValueError(f"Lead {i} is not a JSON object")
+
+
+def summary_prompt(lead: Dict[str, Any], score: float) -> str:
+    """
+    Build the per-lead GPT prompt used by /leads/predict.
+    """
+    return (
+        f"Given a lead with a score of {int(score)} and the following attributes:\n"
+        f"Lead Name: {lead.get('lead_name')}\n"
+        f"Company: {lead.get('company')}\n"
+        f"Deal Amount: {lead.get('deal_amount')}\n"
+        f"Engagement Score: {lead.get('engagement_score')}\n"
+        f"Industry: {lead.get('industry')}\n"
+        f"Stage: {lead.get('stage')}\n"
+        "Explain their likelihood of converting and suggest an outreach strategy."
+    )
+
+
+def batch_summary_prompt(leads: List[Dict[str, Any]], scores: List[float]) -> str:
+    """
+    Build one GPT prompt that asks for a summary of each lead in a batch.
+    """
+    lines = [
+        f"{i + 1}. Score {int(score)} | Lead Name: {lead.get('lead_name')} | Company: {lead.get('company')} | "
+        f"Deal Amount: {lead.get('deal_amount')} | Engagement Score: {lead.get('engagement_score')} | "
+        f"Industry: {lead.get('industry')} | Stage: {lead.get('stage')}"
+        for i, (lead, score) in enumerate(zip(leads, scores))
+    ]
+    return (
+        "For each lead below, explain their likelihood of converting and suggest an outreach strategy "
+        "in two or three sentences.\n"
+        + "\n".join(lines)
+        + f"\nRespond with only a JSON array of exactly {len(leads)} strings, in the same order."
+    )
+
+
+def parse_batch_summaries(content: str, expected: int) -> Optional[List[str]]:
+    """
+    Extract the JSON array of summaries from a batch completion, or None if it is malformed.
+    """
+    start, end = content.find("["), content.rfind("]")
+    if start == -1 or end <= start:
+        return None
+    try:
+        summaries = json.loads(content[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(summaries, list) or len(summaries) != expected:
+        return None
+    return [str(s).strip() for s in summaries]
@@ -0,0 +1,133 @@
+"""
+lead_store.py
+-------------
+Set-based writes of computed lead columns (risk_score, projected_ltv) to the
+leads table.
+
+Saving each scored Lead through the ORM issues one UPDATE per row. Instead,
+bulk_update_leads sends the new values as a VALUES list and applies them with
+a single UPDATE ... FROM joined on id, in one transaction. Rows go out in
+chunks of chunk_rows so each statement stays under the driver's bind
+parameter limit. The statement works on PostgreSQL and on SQLite 3.33+.
+
+update_risk_and_ltv scores a table of leads with LeadRiskAgent and LtvAgent
+(column-wise) and writes both columns this way.
+"""
+
+from typing import Any, Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.agents.lead_risk_agent import LeadRiskAgent
+from app.agents.ltv_agent import LtvAgent
+from app.models.lead import Lead
+
+# Columns bulk_update_leads may write, with the SQL type their values are cast to
+UPDATABLE_COLUMNS = {"risk_score": "DOUBLE PRECISION", "projected_ltv": "DOUBLE PRECISION"}
+DEFAULT_CHUNK_ROWS = 1000
+
+
+def _sql_value(value: Any) -> Any:
+    # NaN and None become NULL; numpy scalars become Python numbers
+    if value is None:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def _update_statement(table: str, columns: Sequence[str], rows: int):
+    # VALUES columns are named column1, column2, ... on both PostgreSQL and SQLite
+    names = ["id"] + list(columns)
+    values = ", ".join(
+        "(" + ", ".join(f":{name}_{i}" for name in names) + ")" for i in range(rows)
+    )
+    assignments = ", ".join(
+        f"{name} = CAST(v.column{position} AS {UPDATABLE_COLUMNS[name]})"
+        for position, name in enumerate(columns, start=2)
+    )
+    return text(
+        f"UPDATE {table} SET {assignments} FROM (VALUES {values}) AS v "
+        f"WHERE {table}.id = CAST(v.column1 AS INTEGER)"
+    )
+
+
+def bulk_update_leads(
+    bind: Union[Engine, Connection],
+    ids: Sequence[Any],
+    columns: Dict[str, Sequence[Any]],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> int:
+    """
+    Set columns (name -> values aligned with ids) on the leads with those ids.
+
+    Args:
+        bind: Engine (runs in its own transaction) or Connection (runs in the caller's).
+        ids: Lead ids.
+        columns: New values per column; names must be in UPDATABLE_COLUMNS.
+        chunk_rows: Rows per UPDATE statement.
+
+    Returns:
+        int: Number of rows updated.
+    """
+    unknown = set(columns) - set(UPDATABLE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Columns not updatable: {', '.join(sorted(unknown))}")
+    names = list(columns)
+    ids = [_sql_value(i) for i in ids]
+    values = {name: list(columns[name]) for name in names}
+    for name in names:
+        if len(values[name]) != len(ids):
+            raise ValueError(f"Column {name} has {len(values[name])} values for {len(ids)} ids")
+    if not ids or not names:
+        return 0
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            return bulk_update_leads(conn, ids, values, chunk_rows)
+
+    table = Lead.__tablename__
+    updated = 0
+    statements = {}
+    for start in range(0, len(ids), chunk_rows):
+        chunk = ids[start:start + chunk_rows]
+        if len(chunk) not in statements:
+            statements[len(chunk)] = _update_statement(table, names, len(chunk))
+        params = {}
+        for i, lead_id in enumerate(chunk):
+            params[f"id_{i}"] = lead_id
+            for name in names:
+                params[f"{name}_{i}"] = _sql_value(values[name][start + i])
+        updated += bind.execute(statements[len(chunk)], params).rowcount
+    return updated
+
+
+def update_risk_and_ltv(
+    bind: Union[Engine, Connection],
+    leads: Union[pd.DataFrame, Dict[str, Sequence[Any]]],
+    risk_agent: Optional[LeadRiskAgent] = None,
+    ltv_agent: Optional[LtvAgent] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> int:
+    """
+    Score a table of leads (with an id column) and store risk_score and
+    projected_ltv for all of them with set-based updates.
+
+    Returns:
+        int: Number of rows updated.
+    """
+    df = leads if isinstance(leads, pd.DataFrame) else pd.DataFrame(leads)
+    if "id" not in df.columns:
+        raise ValueError("Leads need an id column")
+    risk_score = (risk_agent or LeadRiskAgent()).run_frame(df)
+    projected_ltv = (ltv_agent or LtvAgent()).run_frame(df)
+    return bulk_update_leads(
+        bind,
+        df["id"].tolist(),
+        {"risk_score": risk_score.to_numpy(), "projected_ltv": projected_ltv.to_numpy()},
+        chunk_rows,
+    )
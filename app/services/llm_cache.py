@@ -0,0 +1,207 @@
+"""
+llm_cache.py
+------------
+Content-addressed cache for LLM responses.
+
+Responses are keyed on a SHA-256 of the normalized (model, messages, params)
+request, so identical prompts are answered from the cache instead of calling the
+API again. There is an in-memory LRU tier and an optional on-disk SQLite tier
+that survives restarts and is shared by workers on the same host. TTLs are set
+per agent, and hit/miss counters are exposed through metrics().
+
+Configuration (environment variables):
+- LLM_CACHE_ENABLED: "false" disables caching (default true)
+- LLM_CACHE_MAX_ENTRIES: in-memory LRU capacity (default 1024)
+- LLM_CACHE_SQLITE_PATH: path of the SQLite tier (unset = memory only)
+- LLM_CACHE_TTL_SECONDS: default TTL (default 3600)
+- LLM_CACHE_TTL_<AGENT>: per-agent TTL, e.g. LLM_CACHE_TTL_LEAD_SCORE=86400
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import get_env_variable
+
+# Default TTLs (seconds) by agent type, overridable with LLM_CACHE_TTL_<AGENT>
+AGENT_TTLS = {
+    "lead_score": 24 * 3600,
+    "ltv": 24 * 3600,
+    "lead_predict": 24 * 3600,
+    "insight": 3600,
+}
+
+
+def make_cache_key(model: str, messages: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build a content-addressed cache key for a chat completion request.
+
+    Message contents are stripped of surrounding whitespace, params are sorted and
+    None values dropped, so equivalent requests hash to the same key.
+    """
+    normalized = {
+        "model": model,
+        "messages": [
+            {"role": m.get("role"), "content": (m.get("content") or "").strip()}
+            for m in messages
+        ],
+        "params": {k: v for k, v in sorted((params or {}).items()) if v is not None},
+    }
+    payload = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def ttl_for_agent(agent: Optional[str]) -> float:
+    """
+    Return the TTL in seconds for an agent type.
+    """
+    default = float(get_env_variable("LLM_CACHE_TTL_SECONDS", 3600))
+    if not agent:
+        return default
+    override = get_env_variable(f"LLM_CACHE_TTL_{agent.upper()}")
+    if override:
+        return float(override)
+    return float(AGENT_TTLS.get(agent, default))
+
+
+class LLMResponseCache:
+    """
+    Two-tier (memory LRU + optional SQLite) TTL cache for LLM responses.
+    """
+
+    def __init__(self, max_entries: int = 1024, sqlite_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.sqlite_path = sqlite_path
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        if sqlite_path:
+            directory = os.path.dirname(sqlite_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    @property
+    def persistent(self) -> bool:
+        return self._db is not None
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return the cached response for key, or None on a miss or expired entry.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+                self._stats["expirations"] += 1
+
+        if self._db is not None:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] <= now:
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    row = None
+                    with self._lock:
+                        self._stats["expirations"] += 1
+            if row is not None:
+                value, expires_at = row
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                    self._put_memory(key, value, expires_at)
+                return value
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: str, ttl: float):
+        """
+        Store a response for ttl seconds in every tier.
+        """
+        if ttl <= 0:
+            return
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            self._put_memory(key, value, expires_at)
+            self._stats["sets"] += 1
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)",
+                    (key, value, expires_at, now),
+                )
+
+    def _put_memory(self, key: str, value: str, expires_at: float):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def clear(self):
+        """
+        Drop every entry from both tiers.
+        """
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters and the hit rate.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        stats["persistent"] = self.persistent
+        return stats
+
+
+_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Return the process-wide LLM cache, or None if caching is disabled.
+    """
+    global _cache
+    if str(get_env_variable("LLM_CACHE_ENABLED", "true")).lower() in ("0", "false", "no"):
+        return None
+    if _cache is None:
+        _cache = LLMResponseCache(
+            max_entries=int(get_env_variable("LLM_CACHE_MAX_ENTRIES", 1024)),
+            sqlite_path=get_env_variable("LLM_CACHE_SQLITE_PATH"),
+        )
+    return _cache
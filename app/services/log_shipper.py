@@ -0,0 +1,356 @@
+"""
+log_shipper.py
+--------------
+Background shipper for Supabase log tables (agent_logs, lead_predictions).
+
+Agents and routes enqueue rows and return immediately. A daemon thread batches
+rows per table by size and time and inserts each batch with one request, over a
+single reused Supabase client (db_service.get_supabase_client). The queue is bounded; when it is full, or a batch
+cannot be delivered, the overflow policy either drops the rows or spills them to
+NDJSON files on local disk. Spilled rows are replayed once inserts succeed again;
+lines that cannot be decoded are moved to {table}.rejected in the spill directory.
+Pending rows are flushed on shutdown.
+
+Configuration (environment variables):
+- SUPABASE_URL / SUPABASE_KEY: target project (the shipper is disabled without them)
+- LOG_SHIPPER_BATCH_SIZE: rows per insert (default 100)
+- LOG_SHIPPER_FLUSH_SECONDS: maximum time a row waits before being sent (default 2)
+- LOG_SHIPPER_MAX_QUEUE: bounded queue size (default 10000)
+- LOG_SHIPPER_OVERFLOW: "spill" (default) or "drop"
+- LOG_SHIPPER_SPILL_DIR: spill directory (default logs/log_spill)
+- LOG_SHIPPER_REPLAY_SECONDS: minimum interval between spill replays (default 30)
+"""
+
+import os
+import json
+import glob
+import time
+import queue
+import atexit
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import get_env_variable
+
+OVERFLOW_POLICIES = ("spill", "drop")
+
+
+class LogShipper:
+    """
+    Bounded, batching, background writer for Supabase tables.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        batch_size: int = 100,
+        flush_seconds: float = 2.0,
+        max_queue: int = 10000,
+        overflow: str = "spill",
+        spill_dir: str = os.path.join("logs", "log_spill"),
+        replay_seconds: float = 30.0,
+    ):
+        """
+        Args:
+            client_factory: Returns the Supabase client; called once, on the first insert.
+            batch_size: Maximum rows per insert request.
+            flush_seconds: Maximum time a row waits in the queue before being sent.
+            max_queue: Maximum number of queued rows.
+            overflow: "spill" to write undeliverable rows to disk, or "drop".
+            spill_dir: Directory for spilled rows (one NDJSON file per table).
+            replay_seconds: Minimum interval between attempts to replay spilled rows.
+
+        Raises:
+            ValueError: If the overflow policy is not supported.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unsupported overflow policy: {overflow}")
+        self._client_factory = client_factory
+        self._client = None
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.overflow = overflow
+        self.spill_dir = spill_dir
+        self.replay_seconds = replay_seconds
+
+        self._queue: "queue.Queue[Tuple[str, Dict[str, Any]]]" = queue.Queue(maxsize=max(1, max_queue))
+        self._pending = 0
+        self._pending_cond = threading.Condition()
+        self._flush_requested = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._last_replay = 0.0
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0,
+            "shipped": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "dropped": 0,
+            "spilled": 0,
+            "replayed": 0,
+            "rejected": 0,
+        }
+
+    def enqueue(self, table: str, row: Dict[str, Any]) -> bool:
+        """
+        Queue a row for insertion into table without blocking.
+
+        Returns:
+            bool: False if the queue was full and the row was dropped or spilled.
+        """
+        # Serialize now so the batch (and any spill) never fails on odd types
+        row = json.loads(json.dumps(row, default=str))
+        self._ensure_started()
+        with self._pending_cond:
+            self._pending += 1
+        try:
+            self._queue.put_nowait((table, row))
+        except queue.Full:
+            self._overflow(table, [row])
+            self._done(1)
+            return False
+        self._count("enqueued")
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Send every queued row now and wait until they are delivered (or overflowed).
+
+        Returns:
+            bool: True if the queue drained before the timeout.
+        """
+        self._ensure_started()
+        self._flush_requested.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._pending_cond:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._pending_cond.wait(remaining if remaining is not None else 0.5)
+            drained = self._pending == 0
+        self._flush_requested.clear()
+        return drained
+
+    def shutdown(self, timeout: float = 10.0):
+        """
+        Flush pending rows and stop the background thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self.flush(timeout)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return delivery counters and the current queue depth.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["overflow"] = self.overflow
+        stats["spill_files"] = len(self._spill_files())
+        return stats
+
+    # -- background thread -------------------------------------------------
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="log-shipper", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._step()
+            except Exception as e:
+                # Keep the thread alive; otherwise nothing is shipped again
+                print(f"Log shipper iteration failed: {e}")
+                time.sleep(min(0.5, self.flush_seconds))
+
+    def _step(self):
+        batch = self._collect()
+        if batch:
+            try:
+                self._ship(batch)
+            finally:
+                self._done(len(batch))
+        elif time.monotonic() - self._last_replay >= self.replay_seconds:
+            self._replay_spill()
+
+    def _collect(self) -> List[Tuple[str, Dict[str, Any]]]:
+        try:
+            batch = [self._queue.get(timeout=min(self.flush_seconds, 0.5))]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            try:
+                if self._flush_requested.is_set() or self._stop.is_set():
+                    batch.append(self._queue.get_nowait())
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    batch.append(self._queue.get(timeout=min(remaining, 0.05)))
+            except queue.Empty:
+                if self._flush_requested.is_set() or self._stop.is_set():
+                    break
+        return batch
+
+    def _ship(self, batch: List[Tuple[str, Dict[str, Any]]]) -> bool:
+        by_table: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for table, row in batch:
+            by_table[table].append(row)
+        ok = True
+        for table, rows in by_table.items():
+            if not self._insert(table, rows):
+                self._overflow(table, rows)
+                ok = False
+        return ok
+
+    def _insert(self, table: str, rows: List[Dict[str, Any]]) -> bool:
+        for attempt in range(2):
+            try:
+                if self._client is None:
+                    self._client = self._client_factory()
+                self._client.table(table).insert(rows).execute()
+                with self._stats_lock:
+                    self._stats["shipped"] += len(rows)
+                    self._stats["batches"] += 1
+                return True
+            except Exception as e:
+                if attempt:
+                    print(f"Log shipper insert into {table} failed ({len(rows)} rows): {e}")
+                else:
+                    time.sleep(min(0.5, self.flush_seconds))
+        self._count("failed_batches")
+        return False
+
+    def _done(self, count: int):
+        with self._pending_cond:
+            self._pending -= count
+            if self._pending <= 0:
+                self._pending = 0
+                self._pending_cond.notify_all()
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    # -- overflow ----------------------------------------------------------
+
+    def _overflow(self, table: str, rows: List[Dict[str, Any]]):
+        if self.overflow == "drop":
+            self._count("dropped", len(rows))
+            return
+        try:
+            with self._spill_lock:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                with open(os.path.join(self.spill_dir, f"{table}.ndjson"), "a") as f:
+                    f.write("".join(json.dumps(row) + "\n" for row in rows))
+            self._count("spilled", len(rows))
+        except OSError as e:
+            print(f"Log shipper could not spill {len(rows)} rows for {table}: {e}")
+            self._count("dropped", len(rows))
+
+    def _reject(self, table: str, lines: List[str]):
+        # Undecodable spill lines are set aside for inspection instead of being retried
+        print(f"Log shipper skipped {len(lines)} undecodable spilled rows for {table}")
+        try:
+            with self._spill_lock:
+                with open(os.path.join(self.spill_dir, f"{table}.rejected"), "a") as f:
+                    f.write("".join(lines))
+        except OSError as e:
+            print(f"Log shipper could not quarantine rows for {table}: {e}")
+        self._count("rejected", len(lines))
+
+    def _spill_files(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.spill_dir, "*.ndjson")))
+
+    def _replay_spill(self):
+        """
+        Re-send spilled rows; rows that still cannot be delivered are spilled again.
+        """
+        self._last_replay = time.monotonic()
+        for path in self._spill_files():
+            table = os.path.basename(path).split(".", 1)[0]
+            with self._spill_lock:
+                replaying = f"{path}.{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}.replay"
+                try:
+                    os.replace(path, replaying)
+                except OSError:
+                    continue
+            rows, rejected = [], []
+            try:
+                with open(replaying) as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            rows.append(json.loads(line))
+                        except ValueError:
+                            rejected.append(line if line.endswith("\n") else line + "\n")
+            finally:
+                os.remove(replaying)
+            if rejected:
+                self._reject(table, rejected)
+            for start in range(0, len(rows), self.batch_size):
+                chunk = rows[start:start + self.batch_size]
+                if self._insert(table, chunk):
+                    self._count("replayed", len(chunk))
+                else:
+                    # Still failing: put this and the remaining rows back and retry later
+                    self._overflow(table, rows[start:])
+                    with self._stats_lock:
+                        self._stats["spilled"] -= len(rows) - start
+                    return
+
+
+_shipper: Optional[LogShipper] = None
+_shipper_lock = threading.Lock()
+
+
+def get_log_shipper() -> Optional[LogShipper]:
+    """
+    Return the process-wide log shipper, or None if Supabase is not configured.
+    """
+    global _shipper
+    if not (get_env_variable("SUPABASE_URL") and get_env_variable("SUPABASE_KEY")):
+        return None
+    if _shipper is None:
+        with _shipper_lock:
+            if _shipper is None:
+                from app.services.db_service import get_supabase_client
+
+                _shipper = LogShipper(
+                    client_factory=get_supabase_client,
+                    batch_size=int(get_env_variable("LOG_SHIPPER_BATCH_SIZE", 100)),
+                    flush_seconds=float(get_env_variable("LOG_SHIPPER_FLUSH_SECONDS", 2)),
+                    max_queue=int(get_env_variable("LOG_SHIPPER_MAX_QUEUE", 10000)),
+                    overflow=get_env_variable("LOG_SHIPPER_OVERFLOW", "spill"),
+                    spill_dir=get_env_variable("LOG_SHIPPER_SPILL_DIR", os.path.join("logs", "log_spill")),
+                    replay_seconds=float(get_env_variable("LOG_SHIPPER_REPLAY_SECONDS", 30)),
+                )
+    return _shipper
+
+
+def shutdown():
+    """
+    Flush and stop the process-wide shipper, if it was started.
+    """
+    if _shipper is not None:
+        _shipper.shutdown()
+
+
+atexit.register(shutdown)
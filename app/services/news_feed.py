@@ -0,0 +1,366 @@
+"""
+news_feed.py
+------------
+Cached news feed subsystem for market signals.
+
+Feed sources are fetched concurrently by an async refresher. Each source
+keeps its ETag / Last-Modified validators, so an unchanged feed costs one
+conditional request that returns 304. New items are deduplicated by
+normalized headline and URL and merged into an on-disk snapshot, which is
+written atomically and capped at the newest items. The snapshot also keeps a
+bounded list of recently seen keys and URLs, so a headline that has been
+evicted from the items is not re-added as new on the next fetch. Readers such as
+MarketSignalScanner only read that snapshot (memoized by file mtime) and
+never hit a feed themselves.
+
+Sources:
+- HttpFeedSource: JSON (a list, or an object with "articles"/"items") or RSS/Atom over HTTP
+- FileFeedSource: local file stand-in (JSON, RSS/Atom or one headline per line) for offline use and tests
+
+Configuration (environment variables):
+- NEWS_FEED_SOURCES: comma-separated feed URLs or local file paths (no feed when empty)
+- NEWS_FEED_CACHE_PATH: snapshot file (default ./data/news_feed.json)
+- NEWS_FEED_TTL_SECONDS: minimum interval between refreshes (default 900)
+- NEWS_FEED_MAX_ITEMS: headlines kept in the snapshot (default 500)
+- NEWS_FEED_MAX_SEEN: headline keys and URLs remembered for deduplication (default 5000)
+- NEWS_FEED_TIMEOUT_SECONDS: per-request timeout (default 10)
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import formatdate
+from typing import Any, Dict, List, Optional, Sequence
+from xml.etree import ElementTree
+
+import httpx
+
+from app.config import get_env_variable
+
+
+@dataclass
+class FeedResult:
+    """
+    Outcome of one conditional fetch.
+    """
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
+
+def parse_feed(body: str, hint: str = "") -> List[Dict[str, Any]]:
+    """
+    Parse a feed body into items with title, url and published fields.
+    hint is a content type or file name used to pick the format.
+    """
+    text = body.lstrip("\ufeff").strip()
+    if not text:
+        return []
+    if "json" in hint or text[0] in "[{":
+        data = json.loads(text)
+        if isinstance(data, dict):
+            data = data.get("articles") or data.get("items") or data.get("headlines") or []
+        items = []
+        for entry in data:
+            if isinstance(entry, str):
+                entry = {"title": entry}
+            items.append({
+                "title": entry.get("title"),
+                "url": entry.get("url") or entry.get("link"),
+                "published": entry.get("publishedAt") or entry.get("published"),
+            })
+        return [item for item in items if item["title"]]
+    if text.startswith("<"):
+        root = ElementTree.fromstring(text)
+        items = []
+        for node in root.iter():
+            tag = node.tag.rsplit("}", 1)[-1]
+            if tag not in ("item", "entry"):
+                continue
+            values = {child.tag.rsplit("}", 1)[-1]: child for child in node}
+            link = values.get("link")
+            url = None
+            if link is not None:
+                url = (link.text or "").strip() or link.get("href")
+            published = values.get("pubDate") if "pubDate" in values else values.get("updated")
+            title = (values["title"].text or "").strip() if "title" in values else ""
+            if title:
+                items.append({"title": title, "url": url, "published": published.text if published is not None else None})
+        return items
+    return [{"title": line.strip(), "url": None, "published": None} for line in text.splitlines() if line.strip()]
+
+
+class HttpFeedSource:
+    """
+    Feed fetched over HTTP with conditional requests.
+    """
+
+    def __init__(self, url: str, name: Optional[str] = None):
+        self.url = url
+        self.name = name or url
+
+    async def fetch(self, client: httpx.AsyncClient, etag: Optional[str] = None, last_modified: Optional[str] = None) -> FeedResult:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        response = await client.get(self.url, headers=headers)
+        if response.status_code == 304:
+            return FeedResult(etag=etag, last_modified=last_modified, not_modified=True)
+        response.raise_for_status()
+        return FeedResult(
+            items=parse_feed(response.text, response.headers.get("content-type", "")),
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+        )
+
+
+class FileFeedSource:
+    """
+    Local file standing in for a feed, with mtime/size validators.
+    """
+
+    def __init__(self, path: str, name: Optional[str] = None):
+        self.path = path
+        self.name = name or path
+
+    async def fetch(self, client: Optional[httpx.AsyncClient] = None, etag: Optional[str] = None, last_modified: Optional[str] = None) -> FeedResult:
+        stat = await asyncio.to_thread(os.stat, self.path)
+        current = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        if etag == current:
+            return FeedResult(etag=etag, last_modified=last_modified, not_modified=True)
+
+        def read():
+            with open(self.path, "r", encoding="utf-8") as f:
+                return f.read()
+
+        body = await asyncio.to_thread(read)
+        return FeedResult(
+            items=parse_feed(body, self.path.lower()),
+            etag=current,
+            last_modified=formatdate(stat.st_mtime, usegmt=True),
+        )
+
+
+def make_source(spec: str):
+    spec = spec.strip()
+    if spec.startswith(("http://", "https://")):
+        return HttpFeedSource(spec)
+    return FileFeedSource(spec)
+
+
+def headline_key(item: Dict[str, Any]) -> str:
+    """
+    Deduplication key: the normalized headline text.
+    """
+    normalized = re.sub(r"[^a-z0-9]+", " ", str(item.get("title", "")).lower()).strip()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class NewsFeed:
+    """
+    Refreshes feed sources into an on-disk snapshot and serves cached headlines.
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[Any],
+        cache_path: str,
+        ttl_seconds: float = 900.0,
+        max_items: int = 500,
+        timeout_seconds: float = 10.0,
+        max_seen: int = 5000,
+    ):
+        self.sources = list(sources)
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self.max_seen = max(max_seen, max_items)
+        self.timeout_seconds = timeout_seconds
+        self._refresh_lock: Optional[tuple] = None
+        self._lock = threading.Lock()
+        self._memo: Optional[tuple] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"refreshes": 0, "fetched": 0, "not_modified": 0, "errors": 0, "new_items": 0}
+
+    # ----- snapshot -------------------------------------------------------
+
+    def load_snapshot(self) -> Dict[str, Any]:
+        """
+        Read the snapshot, reusing the parsed copy while the file is unchanged.
+        """
+        try:
+            stat = os.stat(self.cache_path)
+        except FileNotFoundError:
+            return {"refreshed_at": None, "sources": {}, "items": []}
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if self._memo is not None and self._memo[0] == version:
+                return self._memo[1]
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return {"refreshed_at": None, "sources": {}, "items": []}
+        with self._lock:
+            self._memo = (version, snapshot)
+        return snapshot
+
+    def headlines(self) -> List[str]:
+        """
+        Cached headlines, newest first. Never fetches.
+        """
+        return [item["title"] for item in self.load_snapshot()["items"]]
+
+    def _save_snapshot(self, snapshot: Dict[str, Any]):
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp, self.cache_path)
+
+    def is_fresh(self, snapshot: Optional[Dict[str, Any]] = None) -> bool:
+        refreshed_at = (snapshot or self.load_snapshot()).get("refreshed_at")
+        return refreshed_at is not None and time.time() - refreshed_at < self.ttl_seconds
+
+    # ----- refresh --------------------------------------------------------
+
+    async def refresh(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Fetch every source concurrently (conditionally) and merge new headlines
+        into the snapshot. Skipped while the snapshot is within its TTL.
+        """
+        # One refresh at a time per event loop
+        loop = asyncio.get_running_loop()
+        if self._refresh_lock is None or self._refresh_lock[0] is not loop:
+            self._refresh_lock = (loop, asyncio.Lock())
+        async with self._refresh_lock[1]:
+            snapshot = await asyncio.to_thread(self.load_snapshot)
+            if not force and self.is_fresh(snapshot):
+                return {"refreshed": False, "new_items": 0}
+            validators = snapshot.get("sources", {})
+            async with httpx.AsyncClient(timeout=self.timeout_seconds, follow_redirects=True) as client:
+                results = await asyncio.gather(
+                    *(
+                        source.fetch(client, validators.get(source.name, {}).get("etag"), validators.get(source.name, {}).get("last_modified"))
+                        for source in self.sources
+                    ),
+                    return_exceptions=True,
+                )
+            merged = self._merge(snapshot, results)
+            await asyncio.to_thread(self._save_snapshot, merged["snapshot"])
+            self.stats["refreshes"] += 1
+            return {"refreshed": True, "new_items": merged["new_items"], "errors": merged["errors"]}
+
+    def _merge(self, snapshot: Dict[str, Any], results: List[Any]) -> Dict[str, Any]:
+        now = time.time()
+        items = list(snapshot.get("items", []))
+        # Snapshots written before seen_keys/seen_urls existed fall back to their items
+        seen_keys = snapshot.get("seen_keys") or [item["key"] for item in items]
+        seen_url_list = snapshot.get("seen_urls") or [item["url"] for item in items if item.get("url")]
+        seen, seen_urls = set(seen_keys), set(seen_url_list)
+        sources = dict(snapshot.get("sources", {}))
+        fresh, errors = [], []
+        for source, result in zip(self.sources, results):
+            if isinstance(result, Exception):
+                self.stats["errors"] += 1
+                errors.append({"source": source.name, "error": str(result)})
+                continue
+            sources[source.name] = {"etag": result.etag, "last_modified": result.last_modified, "fetched_at": now}
+            if result.not_modified:
+                self.stats["not_modified"] += 1
+                continue
+            self.stats["fetched"] += 1
+            for item in result.items:
+                key = headline_key(item)
+                if key in seen or (item.get("url") and item["url"] in seen_urls):
+                    continue
+                seen.add(key)
+                if item.get("url"):
+                    seen_urls.add(item["url"])
+                fresh.append({**item, "key": key, "source": source.name, "first_seen": now})
+        self.stats["new_items"] += len(fresh)
+        return {
+            "snapshot": {
+                "refreshed_at": now,
+                "refreshed_at_iso": datetime.fromtimestamp(now, timezone.utc).isoformat().replace("+00:00", "Z"),
+                "sources": sources,
+                # Newest first; new items keep their feed order
+                "items": (fresh + items)[: self.max_items],
+                "seen_keys": ([item["key"] for item in fresh] + seen_keys)[: self.max_seen],
+                "seen_urls": ([item["url"] for item in fresh if item.get("url")] + seen_url_list)[: self.max_seen],
+            },
+            "new_items": len(fresh),
+            "errors": errors,
+        }
+
+    def refresh_sync(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Blocking refresh for scripts and tests (not for use inside an event loop).
+        """
+        return asyncio.run(self.refresh(force=force))
+
+    async def _refresh_forever(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"[NEWS FEED] Refresh failed: {e}")
+            await asyncio.sleep(max(self.ttl_seconds, 1.0))
+
+    def start(self):
+        """
+        Start the periodic background refresh on the running event loop.
+        """
+        if self.sources and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._refresh_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def metrics(self) -> Dict[str, Any]:
+        snapshot = self.load_snapshot()
+        return {
+            **self.stats,
+            "sources": len(self.sources),
+            "items": len(snapshot.get("items", [])),
+            "refreshed_at": snapshot.get("refreshed_at"),
+        }
+
+
+_feed: Optional[NewsFeed] = None
+
+
+def get_news_feed() -> NewsFeed:
+    """
+    Return the process-wide news feed configured from the environment.
+    """
+    global _feed
+    if _feed is None:
+        specs = [s for s in (get_env_variable("NEWS_FEED_SOURCES", "") or "").split(",") if s.strip()]
+        _feed = NewsFeed(
+            [make_source(spec) for spec in specs],
+            get_env_variable("NEWS_FEED_CACHE_PATH", "./data/news_feed.json"),
+            ttl_seconds=float(get_env_variable("NEWS_FEED_TTL_SECONDS", "900")),
+            max_items=int(get_env_variable("NEWS_FEED_MAX_ITEMS", "500")),
+            timeout_seconds=float(get_env_variable("NEWS_FEED_TIMEOUT_SECONDS", "10")),
+            max_seen=int(get_env_variable("NEWS_FEED_MAX_SEEN", "5000")),
+        )
+    return _feed
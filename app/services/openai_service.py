@@ -2,28 +2,217 @@
 openai_service.py
 -----------------
 Handles interactions with the OpenAI API.
+
+All agents and routes go through a shared OpenAIService so LLM calls are awaited
+on the event loop instead of blocking it, and reuse one pooled HTTP client.
+Responses are served from the content-addressed cache in llm_cache.py when the
+same model, messages and params were seen within the agent's TTL.
+
+Configuration (environment variables):
+- OPENAI_API_KEY: API key (read on each call, so it can be set after startup)
+- OPENAI_TIMEOUT_SECONDS: total request timeout (default 30)
+- OPENAI_CONNECT_TIMEOUT_SECONDS: connect timeout (default 5)
+- OPENAI_MAX_CONNECTIONS: connection pool size (default 100)
+- OPENAI_MAX_RETRIES: retries on connection errors/429/5xx (default 2)
 """
 
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Union
+
+import httpx
 import openai
 
+from app.config import get_env_variable
+from app.services.llm_cache import LLMResponseCache, get_llm_cache, make_cache_key, ttl_for_agent
+
+logger = logging.getLogger(__name__)
+
 class OpenAIService:
     """
-    Skeleton service for interacting with OpenAI's API.
+    Async service for interacting with OpenAI's chat completions API.
+    """
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        http_client: Union[httpx.AsyncClient, Callable[[], httpx.AsyncClient], None] = None,
+        cache: Optional[LLMResponseCache] = None,
+    ):
+        """
+        Args:
+            api_key: OpenAI API key; defaults to the OPENAI_API_KEY environment variable.
+            timeout: Total request timeout in seconds.
+            connect_timeout: Connection timeout in seconds.
+            max_connections: Maximum concurrent connections in the shared pool.
+            max_retries: Retries performed by the OpenAI client.
+            http_client: Pre-built httpx.AsyncClient, or a factory called once per
+                event loop (used by tests). A pre-built client is tied to the loop
+                it is first used on.
+            cache: Response cache; defaults to the process-wide cache from get_llm_cache().
+        """
+        self._api_key = api_key
+        self.timeout = timeout or float(get_env_variable("OPENAI_TIMEOUT_SECONDS", 30))
+        self.connect_timeout = connect_timeout or float(get_env_variable("OPENAI_CONNECT_TIMEOUT_SECONDS", 5))
+        self.max_connections = max_connections or int(get_env_variable("OPENAI_MAX_CONNECTIONS", 100))
+        self.max_retries = max_retries if max_retries is not None else int(get_env_variable("OPENAI_MAX_RETRIES", 2))
+        self._http_client = http_client
+        self._cache = cache
+        self._client: Optional[openai.AsyncOpenAI] = None
+        self._client_key: Optional[str] = None
+        self._client_loop = None
+        self._pool: Optional[httpx.AsyncClient] = None
+        self._owns_pool = False
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return self._api_key or get_env_variable("OPENAI_API_KEY")
+
+    async def _get_client(self) -> openai.AsyncOpenAI:
+        """
+        Return the shared AsyncOpenAI client, creating it on first use.
+        Pooled connections belong to an event loop, so a new client is built if the
+        running loop or the API key changed; a key change on the same loop keeps
+        the pool, and a pool left behind on an earlier loop is closed.
+
+        Raises:
+            ValueError: If no API key is configured.
+            RuntimeError: If a pre-built http_client is used from a second event loop.
+        """
+        api_key = self.api_key
+        if not api_key:
+            raise ValueError("Missing OPENAI_API_KEY")
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_key != api_key or self._client_loop is not loop:
+            previous = None
+            if self._client is not None and self._client_loop is loop:
+                # Only the API key changed, so the pooled connections are kept
+                pool = self._pool
+            elif isinstance(self._http_client, httpx.AsyncClient):
+                if self._client is not None:
+                    raise RuntimeError("A pre-built http_client cannot be shared across event loops")
+                pool = self._http_client
+            else:
+                previous = self._pool if self._owns_pool else None
+                pool = self._build_http_client()
+                self._owns_pool = True
+            self._client = openai.AsyncOpenAI(
+                api_key=api_key,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                max_retries=self.max_retries,
+                http_client=pool,
+            )
+            self._pool = pool
+            self._client_key = api_key
+            self._client_loop = loop
+            if previous is not None:
+                await _close_quietly(previous)
+        return self._client
+
+    def _build_http_client(self) -> httpx.AsyncClient:
+        if callable(self._http_client):
+            return self._http_client()
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+
+    @property
+    def cache(self) -> Optional[LLMResponseCache]:
+        return self._cache if self._cache is not None else get_llm_cache()
+
+    async def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = "gpt-4",
+        agent: Optional[str] = None,
+        **params,
+    ) -> str:
+        """
+        Run a chat completion and return the content of the first choice.
+
+        Args:
+            messages: Chat messages ({"role": ..., "content": ...}).
+            model: Model name.
+            agent: Agent type used to pick the cache TTL (e.g. "lead_score").
+            **params: Extra completion parameters (max_tokens, temperature, ...).
+
+        Returns:
+            str: The generated message content.
+
+        Raises:
+            ValueError: If no API key is configured and the response is not cached.
+            openai.OpenAIError: If the request fails or times out.
+        """
+        cache = self.cache
+        key = make_cache_key(model, messages, params) if cache is not None else None
+        if cache is not None:
+            cached = await self._cache_call(cache, cache.get, key)
+            if cached is not None:
+                return cached
+
+        # The client (and API key) is only needed on a cache miss
+        client = await self._get_client()
+        completion = await client.chat.completions.create(model=model, messages=messages, **params)
+        content = completion.choices[0].message.content or ""
+
+        if cache is not None and content:
+            await self._cache_call(cache, cache.set, key, content, ttl_for_agent(agent))
+        return content
+
+    @staticmethod
+    async def _cache_call(cache: LLMResponseCache, fn, *args):
+        # The SQLite tier does disk I/O, so keep it off the event loop
+        if cache.persistent:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def generate_completion(self, prompt: str, model: str = "gpt-3.5-turbo", **params) -> str:
+        """
+        Generate a completion for a single user prompt.
+        """
+        return await self.chat_completion([{"role": "user", "content": prompt}], model=model, **params)
+
+    async def ask_gpt(self, prompt: str, model: str = "gpt-4", **params) -> str:
+        """
+        Ask GPT-4 a single prompt (used by InsightSummarizationAgent).
+        """
+        return await self.generate_completion(prompt, model=model, **params)
+
+    async def aclose(self):
+        """
+        Close the pooled HTTP connections.
+        """
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._client_loop = None
+            self._pool = None
+            self._owns_pool = False
+
+
+async def _close_quietly(pool: httpx.AsyncClient):
+    # The replaced pool may belong to a loop that has since closed
+    try:
+        await pool.aclose()
+    except Exception as e:
+        logger.debug("Could not close replaced OpenAI connection pool: %s", e)
+
+
+_service: Optional[OpenAIService] = None
+
+
+def get_openai_service() -> OpenAIService:
+    """
+    Return the process-wide OpenAIService shared by all agents and routes.
     """
-    def __init__(self, api_key: str):
-        # Initialize with OpenAI API key
-        self.api_key = api_key
-        openai.api_key = api_key
-
-    def generate_completion(self, prompt: str, model: str = "gpt-3.5-turbo"):
-        """
-        Generate a completion using OpenAI's API.
-        """
-        # Implement OpenAI API call here
-        # Example (to be replaced with actual logic):
-        # response = openai.ChatCompletion.create(
-        #     model=model,
-        #     messages=[{"role": "user", "content": prompt}]
-        # )
-        # return response
-        pass
+    global _service
+    if _service is None:
+        _service = OpenAIService()
+    return _service
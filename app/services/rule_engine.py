@@ -0,0 +1,243 @@
+"""
+rule_engine.py
+--------------
+Declarative, vectorized rule scoring for lead tables (used by backend_server /optimize).
+
+Rules are declared as data and compiled once per field:
+
+- equality rules (eq / in) on a field become one categorical lookup: the
+  column's categorical codes index a points table;
+- numeric threshold rules (gt / ge / lt / le) coerce the column with
+  pd.to_numeric(errors="coerce") and combine the thresholds with np.select,
+  so a non-numeric or missing value simply scores no points.
+
+score(df) returns the same points as applying the rules row by row
+(score_row), and top_k_indices picks the best rows with np.argpartition
+instead of a full sort.
+
+For uploads too large to hold at once, score_chunks scores a chunked reader
+(pd.read_csv(..., chunksize=n)) one chunk at a time, and TopKRows keeps only
+the k best rows seen so far, so memory depends on the chunk size and k, not
+on the size of the upload.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_OPS = {
+    "gt": np.greater,
+    "ge": np.greater_equal,
+    "lt": np.less,
+    "le": np.less_equal,
+}
+EQUALITY_OPS = ("eq", "in")
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    Award points when field <op> value holds.
+    """
+    field: str
+    op: str
+    value: Any
+    points: float
+
+    def __post_init__(self):
+        if self.op not in NUMERIC_OPS and self.op not in EQUALITY_OPS:
+            raise ValueError(f"Unsupported rule operator: {self.op}")
+
+
+# Lead scoring rules for the /optimize endpoint
+LEAD_SCORING_RULES = [
+    Rule("Lead Source", "eq", "Organic Search", 20),
+    Rule("Lead Source", "eq", "Direct Traffic", 15),
+    Rule("Lead Source", "eq", "Olark Chat", 10),
+    Rule("TotalVisits", "gt", 3, 10),
+    Rule("Total Time Spent on Website", "gt", 300, 15),
+    Rule("Lead Profile", "eq", "Potential Lead", 25),
+    Rule("Asymmetrique Activity Score", "gt", 15, 10),
+    Rule("Asymmetrique Profile Score", "gt", 15, 10),
+    Rule("Last Notable Activity", "eq", "Email Opened", 15),
+]
+
+
+class _CategoricalLookup:
+    def __init__(self, field: str, rules: List[Rule], dtype):
+        self.field = field
+        points: Dict[Any, float] = {}
+        for rule in rules:
+            values = rule.value if rule.op == "in" else [rule.value]
+            for value in values:
+                points[value] = points.get(value, 0) + rule.points
+        self.categories = list(points)
+        # Code -1 (no matching category) indexes the trailing 0
+        self.table = np.append(np.asarray(list(points.values()), dtype=dtype), np.zeros(1, dtype=dtype))
+
+    def apply(self, column: pd.Series) -> np.ndarray:
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            column = column.astype(object)
+        codes = pd.Categorical(column, categories=self.categories).codes
+        return self.table[codes]
+
+
+class _NumericThresholds:
+    def __init__(self, field: str, rules: List[Rule], dtype):
+        self.field = field
+        self.rules = rules
+        self.dtype = dtype
+        ops = {rule.op for rule in rules}
+        # Same-direction thresholds are nested, so they collapse into one np.select
+        # over cumulative points (highest bar first)
+        self.tiered = ops <= {"gt", "ge"} or ops <= {"lt", "le"}
+        if self.tiered:
+            descending = bool(ops <= {"gt", "ge"})
+            ordered = sorted(rules, key=lambda r: (float(r.value), r.op == ("gt" if descending else "le")), reverse=descending)
+            self.ordered = ordered
+            self.cumulative = np.cumsum([r.points for r in ordered][::-1])[::-1].astype(dtype)
+
+    def apply(self, column: pd.Series) -> np.ndarray:
+        values = pd.to_numeric(column, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        with np.errstate(invalid="ignore"):
+            if self.tiered:
+                conditions = [NUMERIC_OPS[r.op](values, float(r.value)) for r in self.ordered]
+                return np.select(conditions, self.cumulative, default=0).astype(self.dtype, copy=False)
+            total = np.zeros(len(values), dtype=self.dtype)
+            for rule in self.rules:
+                total += np.where(NUMERIC_OPS[rule.op](values, float(rule.value)), rule.points, 0).astype(self.dtype)
+            return total
+
+
+class RuleEngine:
+    """
+    Compiled set of scoring rules.
+    """
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = list(rules)
+        points = [r.points for r in self.rules]
+        self.dtype = np.result_type(*points) if points else np.dtype(np.int64)
+        if np.issubdtype(self.dtype, np.integer):
+            self.dtype = np.dtype(np.int64)
+        by_field: Dict[tuple, List[Rule]] = {}
+        for rule in self.rules:
+            kind = "numeric" if rule.op in NUMERIC_OPS else "equality"
+            by_field.setdefault((rule.field, kind), []).append(rule)
+        self._compiled = [
+            _NumericThresholds(field, rules, self.dtype) if kind == "numeric" else _CategoricalLookup(field, rules, self.dtype)
+            for (field, kind), rules in by_field.items()
+        ]
+
+    def score(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Score every row of df. Missing equality fields never match; missing
+        numeric fields are treated as 0.
+        """
+        total = np.zeros(len(df), dtype=self.dtype)
+        for compiled in self._compiled:
+            if compiled.field in df.columns:
+                total += compiled.apply(df[compiled.field])
+            elif isinstance(compiled, _NumericThresholds):
+                # A missing numeric field counts as 0, like row.get(field, 0)
+                total += compiled.apply(pd.Series(np.zeros(len(df))))
+        return total
+
+    def score_row(self, row: Mapping[str, Any]):
+        """
+        Score one record with plain Python (reference implementation of score).
+        """
+        score = self.dtype.type(0)
+        for rule in self.rules:
+            if rule.op in NUMERIC_OPS:
+                try:
+                    hit = bool(NUMERIC_OPS[rule.op](float(row.get(rule.field, 0)), float(rule.value)))
+                except (TypeError, ValueError):
+                    hit = False
+                if hit:
+                    score += rule.points
+                continue
+            value = row.get(rule.field)
+            if rule.op == "eq":
+                hit = value == rule.value
+            else:
+                hit = any(value == v for v in rule.value)
+            if hit:
+                score += rule.points
+        return score
+
+
+def top_k_indices(scores: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+    """
+    Positions of the k highest scores, best first. Ties keep input order.
+    Without k (or with k >= len(scores)) this is a full stable descending sort.
+    """
+    n = len(scores)
+    if k is None or k >= n:
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    # Everything scoring above the k-th best, plus the earliest rows tied with it
+    kth = scores[np.argpartition(scores, n - k)[n - k]]
+    above = np.flatnonzero(scores > kth)
+    tied = np.flatnonzero(scores == kth)[: k - len(above)]
+    candidates = np.concatenate([above, tied])
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order]
+
+
+def score_chunks(chunks: Iterable[pd.DataFrame], engine: RuleEngine, column: str = "Score") -> Iterator[pd.DataFrame]:
+    """
+    Score each chunk of a chunked reader, yielding it with the score column added.
+    """
+    for chunk in chunks:
+        chunk[column] = engine.score(chunk)
+        yield chunk
+
+
+class TopKRows:
+    """
+    Bounded selection of the k best-scoring rows across a stream of chunks.
+
+    Ties keep input order: retained rows always precede the rows of a newer
+    chunk, and top_k_indices is stable for equal scores.
+    """
+
+    def __init__(self, k: int, column: str = "Score"):
+        if k < 0:
+            raise ValueError("k must be non-negative")
+        self.k = k
+        self.column = column
+        self.rows_seen = 0
+        self._best: Optional[pd.DataFrame] = None
+
+    def push(self, chunk: pd.DataFrame):
+        self.rows_seen += len(chunk)
+        scores = chunk[self.column].to_numpy()
+        candidates = chunk.take(top_k_indices(scores, self.k))
+        if self._best is not None:
+            candidates = pd.concat([self._best, candidates], ignore_index=True)
+        self._best = candidates.take(top_k_indices(candidates[self.column].to_numpy(), self.k)).reset_index(drop=True)
+
+    def result(self) -> pd.DataFrame:
+        """
+        The retained rows, best first.
+        """
+        if self._best is None:
+            return pd.DataFrame(columns=[self.column])
+        return self._best
+
+
+_lead_engine: Optional[RuleEngine] = None
+
+
+def get_lead_scoring_engine() -> RuleEngine:
+    """
+    Return the compiled engine for LEAD_SCORING_RULES.
+    """
+    global _lead_engine
+    if _lead_engine is None:
+        _lead_engine = RuleEngine(LEAD_SCORING_RULES)
+    return _lead_engine
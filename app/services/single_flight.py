@@ -0,0 +1,100 @@
+"""
+single_flight.py
+----------------
+Request coalescing for in-flight duplicate agent calls.
+
+When several identical requests arrive while the first is still running (e.g. a
+dashboard refresh from many tabs), only the first one executes the agent; the
+others await the same in-flight task and receive a copy of its result. The work
+runs in its own task, so a disconnecting caller does not cancel it for the rest.
+"""
+
+import asyncio
+import copy
+import json
+import hashlib
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+def request_fingerprint(namespace: str, payload: Any) -> str:
+    """
+    Build a normalized fingerprint for a request payload (key order and
+    surrounding whitespace in string values do not matter).
+    """
+    def normalize(value):
+        if isinstance(value, dict):
+            return {str(k): normalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(v) for v in value]
+        if isinstance(value, str):
+            return value.strip()
+        return value
+
+    body = json.dumps(normalize(payload), sort_keys=True, separators=(",", ":"), default=str)
+    return f"{namespace}:{hashlib.sha256(body.encode('utf-8')).hexdigest()}"
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Tuple[int, str], asyncio.Task] = {}
+        self._stats = defaultdict(lambda: {"executions": 0, "coalesced": 0})
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() unless an identical call is already in flight, in which case
+        wait for that call instead. Every caller receives its own deep copy of
+        the result; exceptions are propagated to every caller.
+
+        Args:
+            key: Request fingerprint (see request_fingerprint).
+            fn: Zero-argument coroutine function performing the work.
+        """
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        namespace = key.split(":", 1)[0]
+        task = self._inflight.get(slot)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(fn())
+            self._inflight[slot] = task
+            task.add_done_callback(lambda t: self._release(slot, t))
+            self._stats[namespace]["executions"] += 1
+        else:
+            self._stats[namespace]["coalesced"] += 1
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result)
+
+    def _release(self, slot: Tuple[int, str], task: asyncio.Task):
+        if self._inflight.get(slot) is task:
+            del self._inflight[slot]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every caller has gone away
+            task.exception()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return executions and coalesced counts per namespace.
+        """
+        per_namespace = {ns: dict(counts) for ns, counts in self._stats.items()}
+        executions = sum(c["executions"] for c in per_namespace.values())
+        coalesced = sum(c["coalesced"] for c in per_namespace.values())
+        return {
+            "executions": executions,
+            "coalesced": coalesced,
+            "in_flight": len(self._inflight),
+            "by_namespace": per_namespace,
+        }
+
+
+single_flight = SingleFlight()
+
+
+async def coalesce(namespace: str, payload: Any, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run fn() once for all concurrent requests with the same namespace and payload.
+    """
+    return await single_flight.do(request_fingerprint(namespace, payload), fn)
@@ -1,45 +1,33 @@
 """
 supabase_service.py
 ------------------
-Handles Supabase connections and operations for logging agent activities.
+Handles Supabase logging of agent activities.
 """
 
 import os
 import json
-from supabase import create_client
-from app.config import get_env_variable
-
-# Get Supabase credentials from environment variables
-SUPABASE_URL = get_env_variable("SUPABASE_URL")
-SUPABASE_KEY = get_env_variable("SUPABASE_KEY")
-
-# Initialize Supabase client
-supabase = None
-if SUPABASE_URL and SUPABASE_KEY:
-    try:
-        supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-        print("Supabase client initialized successfully")
-    except Exception as e:
-        print(f"Error initializing Supabase client: {str(e)}")
-else:
-    print("Supabase credentials not found in environment variables")
+from app.services.log_shipper import get_log_shipper
 
 def log_agent_activity(agent_type, input_payload, output):
     """
-    Log agent activity to Supabase.
-    
+    Queue an agent activity log for Supabase.
+
+    The row is inserted into agent_logs by the background log shipper, so the
+    agent call does not wait on a network round-trip.
+
     Args:
         agent_type (str): Type of agent (e.g., "insight", "ltv", "lead_score")
         input_payload (dict): Input payload received by the agent
         output (dict): Output generated by the agent
-        
+
     Returns:
-        dict: Response from Supabase or None if logging failed
+        dict: The queued log entry or None if logging is not configured
     """
-    if not supabase:
-        print("Supabase client not initialized, skipping log")
+    shipper = get_log_shipper()
+    if not shipper:
+        print("Supabase credentials not found in environment variables, skipping log")
         return None
-    
+
     try:
         # Ensure input_payload and output are JSON serializable
         if isinstance(input_payload, str):
@@ -47,18 +35,16 @@ def log_agent_activity(agent_type, input_payload, output):
                 input_payload = json.loads(input_payload)
             except:
                 input_payload = {"raw_input": input_payload}
-                
+
         # Create log entry
         log_data = {
             "agent_type": agent_type,
             "input_payload": input_payload,
             "output": output
         }
-        
-        # Insert into Supabase
-        response = supabase.table("agent_logs").insert(log_data).execute()
-        print(f"Agent activity logged to Supabase: {agent_type}")
-        return response.data
+
+        shipper.enqueue("agent_logs", log_data)
+        return log_data
     except Exception as e:
         print(f"Error logging to Supabase: {str(e)}")
         return None
@@ -0,0 +1,138 @@
+"""
+upload_stream.py
+----------------
+Single-pass handling of streamed uploads.
+
+As chunks arrive, StreamingUpload writes them to a temporary file next to the
+final destination. At the same time it updates a SHA-256 digest and a byte
+count, and for CSV/TSV files sniffs the delimiter and header and counts rows
+incrementally. Newlines inside quoted fields are not counted. The basic
+metadata of a large upload is therefore known when the last chunk lands,
+without reading the file a second time. commit() atomically renames the temp
+file into place, so readers never see a partial upload.
+"""
+
+import csv
+import os
+import uuid
+import hashlib
+from typing import Any, Dict, List, Optional
+
+SNIFF_BYTES = 64 * 1024
+DELIMITED_TYPES = {"csv": ",", "tsv": "\t"}
+
+
+class CsvSniffer:
+    """
+    Incremental delimiter/header detection and row counting for delimited text.
+    """
+
+    def __init__(self, default_delimiter: str = ","):
+        self.default_delimiter = default_delimiter
+        self.delimiter: Optional[str] = None
+        self.columns: Optional[List[str]] = None
+        self._sample = bytearray()
+        self._in_quotes = False
+        self._newlines = 0
+        self._last_byte: Optional[int] = None
+        self._bytes = 0
+
+    def feed(self, chunk: bytes):
+        if not chunk:
+            return
+        self._bytes += len(chunk)
+        if self.columns is None and len(self._sample) < SNIFF_BYTES:
+            self._sample.extend(chunk[:SNIFF_BYTES - len(self._sample)])
+            if len(self._sample) >= SNIFF_BYTES:
+                self._sniff()
+        if b'"' not in chunk:
+            if not self._in_quotes:
+                self._newlines += chunk.count(b"\n")
+        else:
+            # Segments between quote characters alternate between quoted and unquoted
+            # text ("" escapes produce an empty segment and toggle twice)
+            for i, segment in enumerate(chunk.split(b'"')):
+                if i:
+                    self._in_quotes = not self._in_quotes
+                if not self._in_quotes:
+                    self._newlines += segment.count(b"\n")
+        self._last_byte = chunk[-1]
+
+    def _sniff(self):
+        text = bytes(self._sample).decode("utf-8", errors="replace").lstrip("\ufeff")
+        # Only sniff complete lines, unless the whole file fits in the sample
+        if len(self._sample) >= SNIFF_BYTES and "\n" in text:
+            text = text[:text.rfind("\n") + 1]
+        try:
+            self.delimiter = csv.Sniffer().sniff(text, delimiters=",;\t|").delimiter
+        except csv.Error:
+            self.delimiter = self.default_delimiter
+        first = next(csv.reader(text.splitlines()[:1], delimiter=self.delimiter), [])
+        self.columns = [c.strip() for c in first]
+
+    def result(self) -> Dict[str, Any]:
+        if self.columns is None:
+            self._sniff()
+        lines = self._newlines
+        if self._bytes and self._last_byte != ord("\n"):
+            lines += 1
+        return {
+            "delimiter": self.delimiter,
+            "columns": self.columns,
+            # The header line is not a data row
+            "rows": max(lines - 1, 0) if self.columns else 0,
+        }
+
+
+class StreamingUpload:
+    """
+    Writes an upload to a temp file while hashing, counting and sniffing it.
+    """
+
+    def __init__(self, directory: str, file_type: Optional[str] = None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.file_type = (file_type or "").lower()
+        self.temp_path = os.path.join(directory, f".upload.{uuid.uuid4().hex}.part")
+        self._file = open(self.temp_path, "wb")
+        self._digest = hashlib.sha256()
+        self.size_bytes = 0
+        delimiter = DELIMITED_TYPES.get(self.file_type)
+        self._sniffer = CsvSniffer(delimiter) if delimiter else None
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+        self._digest.update(chunk)
+        self.size_bytes += len(chunk)
+        if self._sniffer is not None:
+            self._sniffer.feed(chunk)
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Close the temp file and return the content hash, size and sniffed shape.
+        """
+        if not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+        metadata = {"content_hash": self._digest.hexdigest(), "size_bytes": self.size_bytes}
+        if self._sniffer is not None:
+            metadata.update(self._sniffer.result())
+        return metadata
+
+    def commit(self, final_path: str) -> str:
+        """
+        Atomically move the finished upload to final_path.
+        """
+        self.finish()
+        os.replace(self.temp_path, final_path)
+        return final_path
+
+    def abort(self):
+        """
+        Discard the temp file.
+        """
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
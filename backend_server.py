@@ -1,7 +1,11 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 import pandas as pd
 import io
+import os
+import shutil
+import tempfile
+from app.services.rule_engine import TopKRows, get_lead_scoring_engine, score_chunks, top_k_indices
 
 app = Flask(__name__)
 CORS(app)
@@ -54,67 +58,84 @@ def get_leads():
 def optimize_pipeline():
     return jsonify({"message": "Pipeline optimized successfully"})
 
+# Rows per chunk when an uploaded CSV is scored in streaming mode
+OPTIMIZE_CHUNK_ROWS = 50000
+STREAM_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
 @app.route('/optimize', methods=['POST'])
 def optimize():
+    # Optional: top_k (keep only the best rows) and format=ndjson|csv (stream
+    # scored rows back in input order instead of one sorted JSON list)
+    top_k = request.args.get("top_k", type=int)
+    stream_format = request.args.get("format")
+    if stream_format is not None and stream_format not in STREAM_FORMATS:
+        return jsonify({"error": f"Unsupported format: {stream_format}"}), 400
+    chunksize = request.args.get("chunksize", default=OPTIMIZE_CHUNK_ROWS, type=int)
+    engine = get_lead_scoring_engine()
+
     # Accept JSON (list of leads) or CSV file upload
     if request.content_type and "application/json" in request.content_type:
         leads = request.get_json()
         df = pd.DataFrame(leads)
+        if stream_format is not None:
+            return _stream_scored(score_chunks([df], engine), stream_format)
     elif request.content_type and "multipart/form-data" in request.content_type:
         if "file" not in request.files:
             return jsonify({"error": "No file uploaded"}), 400
         file = request.files["file"]
+        # Score the upload chunk by chunk; memory stays bounded by chunksize (and top_k)
+        if stream_format is not None:
+            path = _spool_upload(file)
+            response = _stream_scored(_score_csv_file(path, engine, max(chunksize, 1)), stream_format)
+            # Also clean up if the client disconnects before the body is read
+            response.call_on_close(lambda: _remove_file(path))
+            return response
+        if top_k is not None:
+            best = TopKRows(max(top_k, 0))
+            for chunk in score_chunks(pd.read_csv(file.stream, chunksize=max(chunksize, 1)), engine):
+                best.push(chunk)
+            return jsonify(best.result().to_dict(orient="records"))
         df = pd.read_csv(file)
     else:
         return jsonify({"error": "Unsupported content type"}), 400
 
-    # Scoring rules
-    def score_lead(row):
-        score = 0
-        # Field: Lead Source
-        if row.get("Lead Source") == "Organic Search":
-            score += 20
-        if row.get("Lead Source") == "Direct Traffic":
-            score += 15
-        if row.get("Lead Source") == "Olark Chat":
-            score += 10
-        # Field: TotalVisits
-        try:
-            if float(row.get("TotalVisits", 0)) > 3:
-                score += 10
-        except Exception:
-            pass
-        # Field: Total Time Spent on Website
-        try:
-            if float(row.get("Total Time Spent on Website", 0)) > 300:
-                score += 15
-        except Exception:
-            pass
-        # Field: Lead Profile
-        if row.get("Lead Profile") == "Potential Lead":
-            score += 25
-        # Field: Asymmetrique Activity Score
-        try:
-            if float(row.get("Asymmetrique Activity Score", 0)) > 15:
-                score += 10
-        except Exception:
-            pass
-        # Field: Asymmetrique Profile Score
-        try:
-            if float(row.get("Asymmetrique Profile Score", 0)) > 15:
-                score += 10
-        except Exception:
-            pass
-        # Field: Last Notable Activity
-        if row.get("Last Notable Activity") == "Email Opened":
-            score += 15
-        return score
-
-    df["Score"] = df.apply(score_lead, axis=1)
-    # Return as JSON, sorted by Score descending
-    result = df.sort_values("Score", ascending=False).to_dict(orient="records")
+    # Declarative scoring rules, evaluated column-wise (see app/services/rule_engine.py)
+    df["Score"] = engine.score(df)
+
+    # Return as JSON, sorted by Score descending (or only the best top_k rows)
+    order = top_k_indices(df["Score"].to_numpy(), top_k)
+    result = df.take(order).to_dict(orient="records")
     return jsonify(result)
 
+def _spool_upload(file):
+    # Flask closes uploaded files when the view returns, before a streamed body is
+    # sent, so copy the upload to a temp file (block by block) and read that lazily
+    spool = tempfile.NamedTemporaryFile(suffix=".csv", delete=False)
+    with spool:
+        shutil.copyfileobj(file.stream, spool)
+    return spool.name
+
+def _score_csv_file(path, engine, chunksize):
+    try:
+        with open(path, "rb") as handle:
+            yield from score_chunks(pd.read_csv(handle, chunksize=chunksize), engine)
+    finally:
+        _remove_file(path)
+
+def _remove_file(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+def _stream_scored(chunks, stream_format):
+    def generate():
+        for i, chunk in enumerate(chunks):
+            if stream_format == "ndjson":
+                if len(chunk):
+                    yield chunk.to_json(orient="records", lines=True).rstrip("\n") + "\n"
+            else:
+                yield chunk.to_csv(index=False, header=(i == 0))
+    return Response(stream_with_context(generate()), mimetype=STREAM_FORMATS[stream_format])
+
 @app.route('/automate_actions', methods=['POST'])
 def automate_actions():
     return jsonify({"message": "Automation completed successfully"})
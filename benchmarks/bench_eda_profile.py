@@ -0,0 +1,103 @@
+"""
+bench_eda_profile.py
+--------------------
+Benchmark for profiling a CSV: loading it whole with pandas and computing
+describe / nunique / value_counts / corr, against the streaming profile
+(eda_profile.profile_csv) with one and with several worker processes.
+Each method runs in a freshly spawned process and peak memory is that
+process's peak RSS (Linux). The streaming profile's worker processes hold
+one chunk each and are not included.
+
+Usage:
+    python benchmarks/bench_eda_profile.py [--rows 200000 1000000] [--workers 4]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.eda_profile import profile_csv  # noqa: E402
+
+
+def synthetic_csv(path: str, rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "amount": rng.lognormal(3, 1, rows),
+        "units": rng.integers(0, 40, rows),
+        "region": rng.choice(["north", "south", "east", "west"], rows),
+        "email": [f"user{i}@example.com" for i in rng.integers(0, rows // 2, rows)],
+        "score": rng.normal(50, 10, rows),
+    })
+    df.to_csv(path, index=False)
+
+
+def whole_file(path):
+    df = pd.read_csv(path)
+    numeric = df.select_dtypes("number")
+    return {
+        "rows": len(df),
+        "describe": numeric.describe(percentiles=[0.05, 0.25, 0.5, 0.75, 0.95]),
+        "nunique": df.nunique(),
+        "top": {name: df[name].value_counts().head(5) for name in df.columns},
+        "corr": numeric.corr(),
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def measure(path: str, workers: int):
+    # workers=0 is the whole-file pandas baseline
+    if workers:
+        seconds, profile = timed(lambda: profile_csv(path, workers=workers).result())
+        rows = profile["rows"]
+    else:
+        seconds, result = timed(lambda: whole_file(path))
+        rows = result["rows"]
+    return seconds, rows, peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    # VmHWM starts over at exec, unlike getrusage's ru_maxrss
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def in_fresh_process(path: str, workers: int):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(measure, path, workers).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rows", type=int, nargs="+", default=[200000, 1000000])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "data.csv")
+    print(f"{'rows':>9} {'method':>18} {'seconds':>8} {'peak RSS MB':>11}")
+    for rows in args.rows:
+        synthetic_csv(path, rows)
+        for label, workers in (("pandas whole file", 0), ("streaming x1", 1), (f"streaming x{args.workers}", args.workers)):
+            seconds, counted, rss = in_fresh_process(path, workers)
+            assert counted == rows
+            print(f"{rows:>9} {label:>18} {seconds:8.2f} {rss:11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+bench_lead_intelligence.py
+--------------------------
+Benchmark for LeadIntelligenceAgent scoring and enrichment: score_lead /
+enrich_lead on every lead against the column-wise score_leads / enrich_leads.
+
+Usage:
+    python benchmarks/bench_lead_intelligence.py [--rows 10000 100000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.agents.lead_intelligence_agent import LeadIntelligenceAgent  # noqa: E402
+
+TITLES = np.array(["CEO", "Chief Revenue Officer", "VP Marketing", "Director of Sales", "Account Manager",
+                   "Engineer", "Analyst", None], dtype=object)
+DOMAINS = np.array(["gmail.com", "yahoo.com", "fintech-finance.com", "techsoft.io", "healthco.org", "acme.com"],
+                   dtype=object)
+
+
+def synthetic_leads(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "title": rng.choice(TITLES, rows),
+        "email": [f"user{i}@{d}" for i, d in enumerate(rng.choice(DOMAINS, rows))],
+        "company_size": rng.integers(1, 5000, rows),
+        "phone": np.where(rng.random(rows) < 0.6, "555-0100", None),
+    })
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--per-lead-max-rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    agent = LeadIntelligenceAgent()
+    print(f"{'rows':>9} {'per-lead':>9} {'score_leads':>12} {'enrich_leads':>13} {'speedup':>8}")
+    for rows in args.rows:
+        df = synthetic_leads(rows)
+        t_score, scores = timed(lambda: agent.score_leads(df))
+        t_enrich, enriched = timed(lambda: agent.enrich_leads(df))
+        if rows <= args.per_lead_max_rows:
+            leads = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+            def per_lead():
+                return [agent.enrich_lead({**lead, "score": agent.score_lead(lead)}) for lead in leads]
+
+            t_lead, expected = timed(per_lead)
+            assert scores.tolist() == [lead["score"] for lead in expected], "score_leads differs from score_lead"
+            assert enriched["industry"].tolist() == [lead["industry"] for lead in expected]
+            assert enriched["employee_size"].tolist() == [lead["employee_size"] for lead in expected]
+            per_lead_time, speedup = f"{t_lead:9.2f}", f"{t_lead / (t_score + t_enrich):7.1f}x"
+        else:
+            per_lead_time, speedup = f"{'-':>9}", f"{'-':>8}"
+        print(f"{rows:>9} {per_lead_time} {t_score:12.2f} {t_enrich:13.2f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
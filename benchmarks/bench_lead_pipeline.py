@@ -0,0 +1,71 @@
+"""
+bench_lead_pipeline.py
+----------------------
+Benchmark for the rule-agent chain: the per-lead chain (run_lead on every
+lead) against the fused column-wise pipeline, both from lead dicts (run) and
+from a DataFrame (run_frame).
+
+Usage:
+    python benchmarks/bench_lead_pipeline.py [--rows 10000 100000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.lead_pipeline import LeadPipeline  # noqa: E402
+
+TITLES = np.array(["CEO", "CTO", "VP Marketing", "Director of Sales", "Account Manager", "Engineer", "Analyst", None], dtype=object)
+DOMAINS = np.array(["gmail.com", "yahoo.com", "fintech-finance.com", "techsoft.io", "healthco.org", "acme.com"], dtype=object)
+COMPANIES = np.array(["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark"], dtype=object)
+
+
+def synthetic_leads(rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "id": np.arange(rows),
+        "title": rng.choice(TITLES, rows),
+        "email": [f"user{i}@{d}" for i, d in enumerate(rng.choice(DOMAINS, rows))],
+        "company_size": rng.integers(1, 5000, rows),
+        "phone": np.where(rng.random(rows) < 0.6, "555-0100", None),
+        "company": rng.choice(COMPANIES, rows),
+    })
+    return df
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--per-lead-max-rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    pipeline = LeadPipeline()
+    print(f"{'rows':>9} {'per-lead':>9} {'run':>8} {'run_frame':>10} {'speedup':>8}")
+    for rows in args.rows:
+        df = synthetic_leads(rows)
+        leads = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+        t_frame, _ = timed(lambda: pipeline.run_frame(df))
+        t_run, fused = timed(lambda: pipeline.run(leads))
+        if rows <= args.per_lead_max_rows:
+            t_lead, expected = timed(lambda: [pipeline.run_lead(lead) for lead in leads])
+            assert fused == expected, "fused pipeline output differs from the per-lead chain"
+            per_lead, speedup = f"{t_lead:9.2f}", f"{t_lead / t_run:7.1f}x"
+        else:
+            per_lead, speedup = f"{'-':>9}", f"{'-':>8}"
+        print(f"{rows:>9} {per_lead} {t_run:8.2f} {t_frame:10.2f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+bench_lead_risk_ltv.py
+----------------------
+Benchmark for populating leads.risk_score / leads.projected_ltv: per-lead
+LeadRiskAgent.run / LtvAgent.run with one ORM save per lead, against
+column-wise scoring with set-based updates (lead_store.update_risk_and_ltv).
+Runs against a SQLite file database.
+
+Usage:
+    python benchmarks/bench_lead_risk_ltv.py [--rows 10000 100000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.agents.lead_risk_agent import LeadRiskAgent  # noqa: E402
+from app.agents.ltv_agent import LtvAgent  # noqa: E402
+from app.models.lead import Base, Lead  # noqa: E402
+from app.services.lead_store import update_risk_and_ltv  # noqa: E402
+
+
+def synthetic_leads(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "name": [f"Lead {i}" for i in range(rows)],
+        "email": np.where(rng.random(rows) < 0.8, "lead@acme.com", None),
+        "score": rng.integers(0, 101, rows),
+        "company_size": rng.integers(1, 5000, rows),
+    })
+
+
+def fresh_engine(path: str, df: pd.DataFrame):
+    if os.path.exists(path):
+        os.remove(path)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO leads (id, name) VALUES (:id, :name)"), df[["id", "name"]].to_dict(orient="records"))
+    return engine
+
+
+def per_lead(engine, leads):
+    risk, ltv = LeadRiskAgent(), LtvAgent()
+    with Session(engine) as session:
+        for lead in leads:
+            row = session.get(Lead, lead["id"])
+            row.risk_score = risk.run(lead)
+            row.projected_ltv = ltv.run(lead)
+            session.flush()
+        session.commit()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "leads.db")
+    print(f"{'rows':>9} {'per-lead ORM':>13} {'set-based':>10} {'speedup':>8}")
+    for rows in args.rows:
+        df = synthetic_leads(rows)
+        leads = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+        engine = fresh_engine(path, df)
+        t_lead, _ = timed(lambda: per_lead(engine, leads))
+        engine = fresh_engine(path, df)
+        t_bulk, updated = timed(lambda: update_risk_and_ltv(engine, df))
+        assert updated == rows
+        print(f"{rows:>9} {t_lead:13.2f} {t_bulk:10.2f} {t_lead / t_bulk:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+bench_optimize_rules.py
+-----------------------
+Benchmark for /optimize lead scoring: the original row-by-row df.apply scoring
+against the vectorized rule engine, a full descending sort against
+argpartition top-k selection, and peak traced memory of scoring the whole
+upload at once against chunked scoring into a bounded TopKRows.
+
+The input is a synthetic CSV shaped like the Leads dataset (9k rows by
+default), scaled up to the requested sizes.
+
+Usage:
+    python benchmarks/bench_optimize_rules.py [--rows 9000 100000 1000000] [--top-k 100]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.rule_engine import TopKRows, get_lead_scoring_engine, score_chunks, top_k_indices  # noqa: E402
+
+SOURCES = ["Google", "Direct Traffic", "Olark Chat", "Organic Search", "Reference", "Welingak Website", None]
+PROFILES = ["Select", "Potential Lead", "Other Leads", "Student of SomeSchool", None]
+ACTIVITIES = ["Modified", "Email Opened", "SMS Sent", "Page Visited on Website", "Olark Chat Conversation"]
+
+
+def synthetic_leads_csv(rows: int, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    visits = rng.poisson(3.5, rows).astype(float)
+    visits[rng.random(rows) < 0.015] = np.nan
+    df = pd.DataFrame({
+        "Prospect ID": [f"p{i:08d}" for i in range(rows)],
+        "Lead Source": rng.choice(np.array(SOURCES, dtype=object), rows),
+        "TotalVisits": visits,
+        "Total Time Spent on Website": rng.integers(0, 2300, rows),
+        "Lead Profile": rng.choice(np.array(PROFILES, dtype=object), rows),
+        "Asymmetrique Activity Score": np.where(rng.random(rows) < 0.45, np.nan, rng.integers(7, 19, rows)),
+        "Asymmetrique Profile Score": np.where(rng.random(rows) < 0.45, np.nan, rng.integers(11, 21, rows)),
+        "Last Notable Activity": rng.choice(np.array(ACTIVITIES, dtype=object), rows),
+    })
+    return df.to_csv(index=False).encode()
+
+
+def legacy_score_lead(row):
+    score = 0
+    source = row.get("Lead Source")
+    score += {"Organic Search": 20, "Direct Traffic": 15, "Olark Chat": 10}.get(source, 0)
+    for field, threshold, points in (
+        ("TotalVisits", 3, 10),
+        ("Total Time Spent on Website", 300, 15),
+        ("Asymmetrique Activity Score", 15, 10),
+        ("Asymmetrique Profile Score", 15, 10),
+    ):
+        try:
+            if float(row.get(field, 0)) > threshold:
+                score += points
+        except Exception:
+            pass
+    if row.get("Lead Profile") == "Potential Lead":
+        score += 25
+    if row.get("Last Notable Activity") == "Email Opened":
+        score += 15
+    return score
+
+
+def timed(fn, repeat: int = 1):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_mb(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def score_whole(raw: bytes, k: int):
+    df = pd.read_csv(io.BytesIO(raw))
+    df["Score"] = get_lead_scoring_engine().score(df)
+    return df.take(top_k_indices(df["Score"].to_numpy(), k))
+
+
+def score_streamed(raw: bytes, k: int, chunksize: int):
+    best = TopKRows(k)
+    for chunk in score_chunks(pd.read_csv(io.BytesIO(raw), chunksize=chunksize), get_lead_scoring_engine()):
+        best.push(chunk)
+    return best.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rows", type=int, nargs="+", default=[9000, 100000, 1000000])
+    parser.add_argument("--top-k", type=int, default=100)
+    parser.add_argument("--chunksize", type=int, default=50000)
+    parser.add_argument("--legacy-max-rows", type=int, default=100000,
+                        help="Skip the slow df.apply baseline above this many rows")
+    args = parser.parse_args()
+
+    engine = get_lead_scoring_engine()
+    print(f"{'rows':>9} {'read_csv':>9} {'apply':>9} {'engine':>9} {'speedup':>8} {'sort':>9} {'top-k':>9}"
+          f" {'whole MB':>9} {'chunk MB':>9}")
+    for rows in args.rows:
+        raw = synthetic_leads_csv(rows)
+        t_read, df = timed(lambda: pd.read_csv(io.BytesIO(raw)))
+        t_engine, scores = timed(lambda: engine.score(df), repeat=3)
+        if rows <= args.legacy_max_rows:
+            t_apply, legacy = timed(lambda: df.apply(legacy_score_lead, axis=1))
+            assert np.array_equal(legacy.to_numpy(), scores), "vectorized scores differ from df.apply"
+            apply_col, speedup = f"{t_apply:9.3f}", f"{t_apply / t_engine:7.0f}x"
+        else:
+            apply_col, speedup = f"{'-':>9}", f"{'-':>8}"
+        series = pd.Series(scores)
+        t_sort, _ = timed(lambda: series.sort_values(ascending=False, kind="stable"), repeat=3)
+        t_topk, _ = timed(lambda: top_k_indices(scores, args.top_k), repeat=3)
+        whole_mb = peak_mb(lambda: score_whole(raw, args.top_k))
+        chunk_mb = peak_mb(lambda: score_streamed(raw, args.top_k, args.chunksize))
+        print(f"{rows:>9} {t_read:9.3f} {apply_col} {t_engine:9.4f} {speedup} {t_sort:9.4f} {t_topk:9.4f}"
+              f" {whole_mb:9.1f} {chunk_mb:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+bench_relationship_mapping.py
+-----------------------------
+Benchmark for RelationshipMappingAgent: the original pairwise comparison
+(only at small sizes) against the inverted index, including connection
+counts and capped CSR adjacency, on synthetic leads up to 1M rows.
+
+Usage:
+    python benchmarks/bench_relationship_mapping.py [--rows 1000 50000 1000000] [--cap 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.agents.relationship_mapping_agent import RelationshipIndex  # noqa: E402
+
+
+def synthetic_leads(rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    industries = rng.integers(0, 60, rows)
+    locations = rng.zipf(1.3, rows) % 5000
+    return [
+        {"id": f"lead-{i}", "industry": f"industry-{industries[i]}", "location": f"city-{locations[i]}"}
+        for i in range(rows)
+    ]
+
+
+def pairwise(leads_list):
+    relationships = {}
+    for lead in leads_list:
+        lead_id = lead.get("id")
+        relationships[lead_id] = {"connections": [
+            other["id"] for other in leads_list
+            if other["id"] != lead_id and (
+                lead.get("industry") == other.get("industry") or lead.get("location") == other.get("location")
+            )
+        ]}
+    return relationships
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 50000, 1000000])
+    parser.add_argument("--cap", type=int, default=20)
+    parser.add_argument("--pairwise-max-rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'pairwise':>9} {'index':>8} {'degree':>8} {'csr(cap)':>9} {'edges(all)':>12} {'csr MB':>7}")
+    for rows in args.rows:
+        leads = synthetic_leads(rows)
+        t_index, index = timed(lambda: RelationshipIndex(leads))
+        t_degree, degree = timed(index.degree)
+        t_csr, (indptr, indices) = timed(lambda: index.to_csr(args.cap))
+        if rows <= args.pairwise_max_rows:
+            t_pairwise, legacy = timed(lambda: pairwise(leads))
+            assert degree.tolist() == [len(legacy[lead["id"]]["connections"]) for lead in leads]
+            pairwise_col = f"{t_pairwise:9.3f}"
+        else:
+            pairwise_col = f"{'-':>9}"
+        csr_mb = (indptr.nbytes + indices.nbytes) / 1e6
+        print(f"{rows:>9} {pairwise_col} {t_index:8.3f} {t_degree:8.3f} {t_csr:9.3f} {int(degree.sum()):>12} {csr_mb:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ This module implements a Loading Agent for an ETL pipeline that:
 2. Loads each file into a PostgreSQL-compatible database (e.g., Supabase)
 3. Adds a load_status column with "loaded" value and timestamp
 4. Archives the file to /data/archived after successful load
-5. Maintains a loading log in /logs/loading_log.csv
+5. Maintains a loading log in /logs/loading_log.csv (buffered, see pipeline_log)
 
 The code is designed to be modular with clear separation between:
 - File monitoring
@@ -20,7 +20,6 @@ The code is designed to be modular with clear separation between:
 
 import os
 import json
-import csv
 import time
 import logging
 import datetime
@@ -54,6 +53,13 @@ except ImportError as e:
     print("  pip3 install pandas watchdog sqlalchemy python-dotenv")
     exit(1)
 
+try:
+    from etl.pipeline_log import get_log, utc_now
+except ImportError:
+    # Run as a script from etl/, where the package is not importable; the app
+    # and tests use etl.pipeline_log so there is only one set of buffers
+    from pipeline_log import get_log, utc_now
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -336,7 +342,7 @@ class DataLoader:
                 df = pd.DataFrame(content)
                 metadata = {
                     'filename': os.path.basename(file_path),
-                    'timestamp': datetime.now().isoformat(),
+                    'timestamp': utc_now(),
                     'source_format': 'json',
                     'row_count': len(df),
                     'column_count': len(df.columns),
@@ -367,7 +373,7 @@ class DataLoader:
             # Create metadata
             metadata = {
                 'filename': os.path.basename(file_path),
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': utc_now(),
                 'source_format': 'csv',
                 'row_count': len(df),
                 'column_count': len(df.columns),
@@ -430,31 +436,33 @@ class FileArchiver:
 class LoadingLogger:
     """
     Handles logging of loading operations.
+    
+    Events go through the shared buffered pipeline log, so logging a load
+    does not open the log file for every event.
     """
     
+    FIELDS = [
+        'timestamp',
+        'filename',
+        'table_name',
+        'row_count',
+        'status',
+        'archived_path'
+    ]
+    
     @staticmethod
     def initialize_log():
         """
-        Initialize the loading log file if it doesn't exist.
-        """
-        # Ensure the logs directory exists
-        os.makedirs(LOGS_DIR, exist_ok=True)
+        Initialize the shared loading log.
         
-        # Check if the log file exists
-        if not os.path.exists(LOADING_LOG_PATH):
-            logger.info(f"Creating loading log file: {LOADING_LOG_PATH}")
-            
-            # Create the log file with headers
-            with open(LOADING_LOG_PATH, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'timestamp',
-                    'filename',
-                    'table_name',
-                    'row_count',
-                    'status',
-                    'archived_path'
-                ])
+        Returns:
+            PipelineLog instance backing /logs/loading_log.csv
+        """
+        return get_log(
+            os.path.splitext(os.path.basename(LOADING_LOG_PATH))[0],
+            LoadingLogger.FIELDS,
+            os.path.dirname(LOADING_LOG_PATH)
+        )
     
     @staticmethod
     def log_loading(
@@ -465,7 +473,7 @@ class LoadingLogger:
         archived_path: str
     ):
         """
-        Log a loading operation to the loading log file.
+        Log a loading operation to the loading log.
         
         Args:
             filename: Name of the processed file
@@ -474,20 +482,14 @@ class LoadingLogger:
             status: Status of the loading operation (success or error message)
             archived_path: Path to the archived file
         """
-        # Ensure the log file exists
-        LoadingLogger.initialize_log()
-        
-        # Log the loading operation
-        with open(LOADING_LOG_PATH, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                datetime.now().isoformat(),
-                filename,
-                table_name,
-                row_count,
-                status,
-                archived_path
-            ])
+        LoadingLogger.initialize_log().write({
+            'timestamp': utc_now(),
+            'filename': filename,
+            'table_name': table_name,
+            'row_count': row_count,
+            'status': status,
+            'archived_path': archived_path
+        })
 
 
 class FileEventHandler(FileSystemEventHandler):
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Buffered Pipeline Log Writer
+
+Shared structured-log subsystem for the ETL agents and the app agents that keep
+local audit logs (connector pulls, webhook events, Supabase transforms).
+
+Instead of stat-ing and opening the log file for every event, each log keeps an
+in-memory ring buffer of pending records. A single background thread flushes
+every buffer on a fixed interval (or as soon as a buffer fills up), writing each
+batch with one open/append/close. Logs rotate by size and by age, and can be
+written as CSV (the historical format), NDJSON, or gzip-compressed NDJSON.
+Records of a failed flush are kept for the next one, up to a cap per log;
+past it the oldest are dropped so a log that cannot be written does not
+grow without bound.
+
+Import it as etl.pipeline_log: the buffers live in the module, so loading it
+under a second name would give a second, separately flushed set of logs.
+
+Usage:
+    from etl.pipeline_log import get_log, query_log
+
+    log = get_log('webhook_log', ['timestamp', 'source', 'status_code'], directory='logs')
+    log.write({'source': 'stripe', 'status_code': 200})
+
+    for record in query_log('webhook_log', directory='logs', where={'source': 'stripe'}):
+        ...
+
+Configuration (environment variables):
+- PIPELINE_LOG_FORMAT: csv (default), ndjson or ndjson.gz
+- PIPELINE_LOG_BUFFER_SIZE: records buffered per log before a forced flush (default 1000)
+- PIPELINE_LOG_MAX_PENDING: records kept per log while flushes fail; the oldest are dropped past it (default 100000)
+- PIPELINE_LOG_FLUSH_SECONDS: background flush interval (default 1.0)
+- PIPELINE_LOG_MAX_BYTES: rotate once the active file reaches this size (default 10 MB, 0 disables)
+- PIPELINE_LOG_ROTATE_SECONDS: rotate once the active file is this old (default 0, disabled)
+
+Timestamps are tz-aware UTC ISO 8601 strings (utc_now()); producers that stamp
+their own records should use the same helper. query_log compares timestamps as
+datetimes and reads naive ones, from logs written before this convention, as UTC.
+"""
+
+import os
+import csv
+import io
+import glob
+import gzip
+import json
+import atexit
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+logger = logging.getLogger('pipeline_log')
+
+FORMATS = {
+    'csv': '.csv',
+    'ndjson': '.ndjson',
+    'ndjson.gz': '.ndjson.gz'
+}
+
+DEFAULT_FORMAT = os.getenv('PIPELINE_LOG_FORMAT', 'csv')
+DEFAULT_BUFFER_SIZE = int(os.getenv('PIPELINE_LOG_BUFFER_SIZE', '1000'))
+DEFAULT_MAX_PENDING = int(os.getenv('PIPELINE_LOG_MAX_PENDING', '100000'))
+DEFAULT_FLUSH_SECONDS = float(os.getenv('PIPELINE_LOG_FLUSH_SECONDS', '1.0'))
+DEFAULT_MAX_BYTES = int(os.getenv('PIPELINE_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+DEFAULT_ROTATE_SECONDS = float(os.getenv('PIPELINE_LOG_ROTATE_SECONDS', '0'))
+
+
+class PipelineLog:
+    """
+    A single structured log with a bounded in-memory buffer.
+
+    ``write`` only appends to the buffer; records reach disk when the background
+    flusher runs, when the buffer is full, or when ``flush`` is called.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fields: List[str],
+        directory: str,
+        fmt: str = DEFAULT_FORMAT,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        rotate_seconds: float = DEFAULT_ROTATE_SECONDS,
+        max_pending: int = DEFAULT_MAX_PENDING
+    ):
+        """
+        Initialize the log.
+
+        Args:
+            name: Base file name of the log (without extension)
+            fields: Ordered record fields; 'timestamp' is filled in when missing
+            directory: Directory holding the active and rotated files
+            fmt: Output format, one of FORMATS
+            buffer_size: Number of pending records that forces a flush
+            max_bytes: Size at which the active file is rotated (0 disables)
+            rotate_seconds: Age at which the active file is rotated (0 disables)
+            max_pending: Records kept while flushes fail (at least buffer_size)
+
+        Raises:
+            ValueError: If the format is not supported
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported log format: {fmt}")
+        self.name = name
+        self.fields = list(fields)
+        self.directory = directory
+        self.fmt = fmt
+        self.buffer_size = max(1, buffer_size)
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.max_pending = max(max_pending, self.buffer_size)
+        self.dropped = 0
+        self.path = os.path.join(directory, f"{name}{FORMATS[fmt]}")
+
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._buffer_lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._opened_at: Optional[float] = None
+
+    def write(self, record: Dict[str, Any]):
+        """
+        Queue a record for writing.
+
+        Args:
+            record: Mapping of field name to value; unknown keys are ignored in CSV output
+        """
+        if 'timestamp' in self.fields and not record.get('timestamp'):
+            record = {'timestamp': utc_now(), **record}
+        with self._buffer_lock:
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.buffer_size
+        if full:
+            # Apply backpressure on the caller rather than growing without bound
+            self.flush()
+        else:
+            _flusher.ensure_started()
+
+    def flush(self):
+        """Write every pending record to disk in a single append."""
+        with self._file_lock:
+            with self._buffer_lock:
+                if not self._buffer:
+                    return
+                batch = list(self._buffer)
+                self._buffer.clear()
+            try:
+                self._append(batch)
+            except Exception as e:
+                logger.error(f"Error flushing log {self.path}: {e}")
+                # Put the batch back so it is retried on the next flush, keeping
+                # at most max_pending records
+                with self._buffer_lock:
+                    self._buffer.extendleft(reversed(batch))
+                    overflow = len(self._buffer) - self.max_pending
+                    for _ in range(max(overflow, 0)):
+                        self._buffer.popleft()
+                if overflow > 0:
+                    self.dropped += overflow
+                    logger.warning(f"Dropped {overflow} oldest records of log {self.path} ({self.dropped} in total)")
+
+    def _append(self, batch: List[Dict[str, Any]]):
+        os.makedirs(self.directory, exist_ok=True)
+        self._maybe_rotate()
+        exists = os.path.exists(self.path)
+        if self.fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if not exists:
+                writer.writerow(self.fields)
+            for record in batch:
+                writer.writerow([_csv_value(record.get(field)) for field in self.fields])
+            with open(self.path, 'a', newline='') as f:
+                f.write(buffer.getvalue())
+        else:
+            lines = ''.join(json.dumps(record, default=str) + '\n' for record in batch)
+            if self.fmt == 'ndjson':
+                with open(self.path, 'a') as f:
+                    f.write(lines)
+            else:
+                # Each batch is its own gzip member; readers handle concatenated members
+                with open(self.path, 'ab') as f:
+                    f.write(gzip.compress(lines.encode('utf-8')))
+        if self._opened_at is None:
+            self._opened_at = _now()
+
+    def _maybe_rotate(self):
+        if not os.path.exists(self.path):
+            self._opened_at = None
+            return
+        if self._opened_at is None:
+            # The age of a file left by a previous run is counted from now
+            self._opened_at = _now()
+        too_big = self.max_bytes and os.path.getsize(self.path) >= self.max_bytes
+        too_old = self.rotate_seconds and _now() - self._opened_at >= self.rotate_seconds
+        if too_big or too_old:
+            suffix = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+            rotated = os.path.join(self.directory, f"{self.name}.{suffix}{FORMATS[self.fmt]}")
+            os.replace(self.path, rotated)
+            self._opened_at = None
+            logger.info(f"Rotated log {self.path} -> {rotated}")
+
+    def files(self) -> List[str]:
+        """Return the rotated files (oldest first) followed by the active file."""
+        pattern = os.path.join(self.directory, f"{self.name}.*{FORMATS[self.fmt]}")
+        rotated = sorted(p for p in glob.glob(pattern) if p != self.path)
+        return rotated + ([self.path] if os.path.exists(self.path) else [])
+
+
+class _Flusher:
+    """Background daemon thread that periodically flushes every registered log."""
+
+    def __init__(self, interval: float = DEFAULT_FLUSH_SECONDS):
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='pipeline-log-flusher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            flush_all()
+
+    def stop(self):
+        self._stop.set()
+
+
+_registry: Dict[str, PipelineLog] = {}
+_registry_lock = threading.Lock()
+_flusher = _Flusher()
+
+
+def get_log(name: str, fields: List[str], directory: str, **options) -> PipelineLog:
+    """
+    Return the shared PipelineLog for ``directory/name``, creating it on first use.
+
+    Args:
+        name: Base file name of the log
+        fields: Ordered record fields
+        directory: Log directory
+        **options: Extra PipelineLog arguments (fmt, buffer_size, max_bytes, rotate_seconds, max_pending)
+
+    Returns:
+        PipelineLog instance
+    """
+    key = os.path.join(os.path.abspath(directory), name)
+    log = _registry.get(key)
+    if log is None:
+        with _registry_lock:
+            log = _registry.get(key)
+            if log is None:
+                log = PipelineLog(name, fields, directory, **options)
+                _registry[key] = log
+    return log
+
+
+def flush_all():
+    """Flush every registered log."""
+    for log in list(_registry.values()):
+        log.flush()
+
+
+def shutdown():
+    """Stop the background flusher and write out everything still buffered."""
+    _flusher.stop()
+    flush_all()
+
+
+atexit.register(shutdown)
+
+
+def query_log(
+    name: str,
+    directory: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    where: Optional[Dict[str, Any]] = None,
+    limit: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Read records back from a log, oldest first, across rotated files and formats.
+
+    Pending records of a registered log are flushed first so the result is current.
+
+    Args:
+        name: Base file name of the log
+        directory: Log directory
+        since: Only records with timestamp >= since (ISO 8601 string; naive means UTC)
+        until: Only records with timestamp < until (ISO 8601 string; naive means UTC)
+        where: Field/value pairs that must match (compared as strings)
+        limit: Maximum number of records to return
+
+    Yields:
+        Records as dictionaries (CSV values are returned as strings)
+    """
+    log = _registry.get(os.path.join(os.path.abspath(directory), name))
+    if log is not None:
+        log.flush()
+
+    files = []
+    for fmt, extension in FORMATS.items():
+        for path in glob.glob(os.path.join(directory, f"{name}*{extension}")):
+            base = os.path.basename(path)[:-len(extension)]
+            # Only the log itself (name or name.<rotation suffix>), not name_other.csv
+            if base == name or (base.startswith(name + '.') and '.' not in base[len(name) + 1:]):
+                files.append((base != name, base, fmt, path))
+    # Rotated files in suffix order, then the active files
+    files.sort(key=lambda item: (not item[0], item[1]))
+
+    where = {k: str(v) for k, v in (where or {}).items()}
+    since_at = _parse_timestamp(since) if since else None
+    until_at = _parse_timestamp(until) if until else None
+    if (since and since_at is None) or (until and until_at is None):
+        raise ValueError(f"Invalid since/until timestamp: {since!r}, {until!r}")
+    returned = 0
+    for _, _, fmt, path in files:
+        for record in _read_records(path, fmt):
+            if since_at or until_at:
+                timestamp = _parse_timestamp(record.get('timestamp'))
+                if timestamp is None:
+                    continue
+                if since_at and timestamp < since_at:
+                    continue
+                if until_at and timestamp >= until_at:
+                    continue
+            if any(str(record.get(k)) != v for k, v in where.items()):
+                continue
+            yield record
+            returned += 1
+            if limit is not None and returned >= limit:
+                return
+
+
+def _read_records(path: str, fmt: str) -> Iterator[Dict[str, Any]]:
+    if fmt == 'csv':
+        with open(path, 'r', newline='') as f:
+            yield from csv.DictReader(f)
+    else:
+        opener = gzip.open if fmt == 'ndjson.gz' else open
+        with opener(path, 'rt') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def utc_now() -> str:
+    """
+    Current time as a tz-aware UTC ISO 8601 string, the log's timestamp format.
+    """
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    text = str(value).strip()
+    if text.endswith('Z'):
+        text = text[:-1] + '+00:00'
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _now() -> float:
+    return datetime.now().timestamp()
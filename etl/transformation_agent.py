@@ -11,7 +11,13 @@ This module implements a Transformation Agent for an ETL pipeline that:
    - One-hot encodes categorical variables
    - Normalizes numeric ranges (0-1)
 5. Saves the transformed dataset into /data/enriched with the same base filename
-6. Maintains a transformation log in /logs/transformation_log.csv
+6. Maintains a transformation log in /logs/transformation_log.csv (buffered, see pipeline_log)
+
+Files larger than CHUNKED_MODE_THRESHOLD_BYTES are processed in chunked mode:
+a first lightweight pass fits the statistics the transformations need
+(min/max, mean/std, category sets), and a second pass transforms each chunk
+with those statistics and appends it to the enriched output. Memory use stays
+bounded by the chunk size and one-hot columns are identical across chunks.
 
 The code is designed to be modular with clear separation between:
 - File monitoring
@@ -25,16 +31,14 @@ The code is designed to be modular with clear separation between:
 import os
 import json
 import yaml
-import csv
 import time
 import logging
-import datetime
 import re
+import math
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Any, Union, Optional, Tuple
-from datetime import datetime
+from typing import Dict, List, Any, Union, Optional, Tuple, Iterator, Iterable, Callable
 
 # Check for required packages
 try:
@@ -56,6 +60,13 @@ except ImportError as e:
     print("  pip3 install pandas numpy pyyaml watchdog")
     exit(1)
 
+try:
+    from etl.pipeline_log import get_log, utc_now
+except ImportError:
+    # Run as a script from etl/, where the package is not importable; the app
+    # and tests use etl.pipeline_log so there is only one set of buffers
+    from pipeline_log import get_log, utc_now
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -72,6 +83,11 @@ CONFIG_DIR = os.path.join(SCRIPT_DIR, 'config')
 TAGS_CONFIG_PATH = os.path.join(CONFIG_DIR, 'tags.yaml')
 TRANSFORMATION_LOG_PATH = os.path.join(LOGS_DIR, 'transformation_log.csv')
 
+# Chunked mode settings: files at or above the threshold are streamed in
+# chunks of CHUNK_SIZE rows instead of being loaded into one DataFrame
+CHUNK_SIZE = int(os.getenv('TRANSFORMATION_CHUNK_SIZE', '50000'))
+CHUNKED_MODE_THRESHOLD_BYTES = int(os.getenv('TRANSFORMATION_CHUNK_THRESHOLD_MB', '256')) * 1024 * 1024
+
 
 class DataLoader:
     """
@@ -129,7 +145,7 @@ class DataLoader:
                 df = pd.DataFrame(content)
                 metadata = {
                     'filename': os.path.basename(file_path),
-                    'timestamp': datetime.now().isoformat(),
+                    'timestamp': utc_now(),
                     'source_format': 'json',
                     'row_count': len(df),
                     'column_count': len(df.columns),
@@ -160,7 +176,7 @@ class DataLoader:
             # Create metadata
             metadata = {
                 'filename': os.path.basename(file_path),
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': utc_now(),
                 'source_format': 'csv',
                 'row_count': len(df),
                 'column_count': len(df.columns),
@@ -200,6 +216,286 @@ class DataLoader:
         return datatypes
 
 
+class _JsonRecordStream:
+    """
+    Incremental reader for the JSON payloads produced by the extraction agent.
+
+    Yields the records of the top-level ``data`` array (or of a top-level list)
+    one at a time without loading the whole document, and keeps the small
+    ``metadata`` object aside when it is encountered.
+    """
+
+    def __init__(self, file_path: str, block_size: int = 1024 * 1024):
+        """
+        Initialize the reader.
+
+        Args:
+            file_path: Path to the JSON file
+            block_size: Number of characters read from disk at a time
+        """
+        self.file_path = file_path
+        self.block_size = block_size
+        self.metadata: Optional[Dict[str, Any]] = None
+        self._decoder = json.JSONDecoder()
+        self._file = None
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with open(self.file_path, 'r') as f:
+            self._file = f
+            self._buffer, self._pos, self._eof = '', 0, False
+
+            token = self._peek()
+            if token == '[':
+                yield from self._iter_array()
+            elif token == '{':
+                self._pos += 1
+                while True:
+                    token = self._peek()
+                    if token == '}':
+                        break
+                    if token == ',':
+                        self._pos += 1
+                        continue
+                    key = self._decode()
+                    if self._peek() != ':':
+                        raise ValueError(f"Malformed JSON object in {self.file_path}")
+                    self._pos += 1
+                    if key == 'data' and self._peek() == '[':
+                        yield from self._iter_array()
+                    else:
+                        value = self._decode()
+                        if key == 'metadata':
+                            self.metadata = value
+            else:
+                raise ValueError(f"Unsupported JSON structure in {self.file_path}")
+
+    def _iter_array(self) -> Iterator[Any]:
+        """Yield the elements of the array starting at the current position."""
+        self._pos += 1
+        while True:
+            token = self._peek()
+            if token == ']':
+                self._pos += 1
+                return
+            if token == ',':
+                self._pos += 1
+                continue
+            yield self._decode()
+
+    def _fill(self) -> bool:
+        """Read the next block from disk, returning False at end of file."""
+        if self._eof:
+            return False
+        block = self._file.read(self.block_size)
+        if not block:
+            self._eof = True
+            return False
+        # Drop consumed characters so the buffer stays bounded
+        self._buffer = self._buffer[self._pos:] + block
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError(f"Unexpected end of JSON file: {self.file_path}")
+
+    def _decode(self) -> Any:
+        """Decode one JSON value, reading more of the file until it is complete."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A value ending exactly at the buffer edge may be truncated (e.g. a number)
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            if not self._fill():
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                self._pos = end
+                return value
+
+
+class ChunkedFileReader:
+    """
+    Reads a processed file as a sequence of DataFrame chunks.
+
+    The reader can be iterated several times (each iteration re-opens the file),
+    which is what the two-pass chunked mode relies on.
+    """
+
+    def __init__(self, file_path: str, chunk_size: int = CHUNK_SIZE):
+        """
+        Initialize the chunked reader.
+
+        Args:
+            file_path: Path to the CSV or JSON file
+            chunk_size: Number of rows per chunk
+
+        Raises:
+            ValueError: If the file format is not supported
+        """
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.source_format = os.path.splitext(file_path)[1].lower().lstrip('.')
+        if self.source_format not in ('csv', 'json'):
+            raise ValueError(f"Unsupported file format: .{self.source_format}")
+        self.metadata: Dict[str, Any] = {
+            'filename': os.path.basename(file_path),
+            'timestamp': utc_now(),
+            'source_format': self.source_format
+        }
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        if self.source_format == 'csv':
+            with pd.read_csv(self.file_path, chunksize=self.chunk_size) as reader:
+                yield from reader
+        else:
+            stream = _JsonRecordStream(self.file_path)
+            records = []
+            for record in stream:
+                records.append(record)
+                if len(records) >= self.chunk_size:
+                    yield pd.DataFrame(records)
+                    records = []
+            if records:
+                yield pd.DataFrame(records)
+            if stream.metadata is not None:
+                # The extraction agent's metadata takes precedence, as in DataLoader
+                self.metadata = stream.metadata
+
+
+class StreamingStatistics:
+    """
+    Statistics fitted over all chunks of a file in the first pass of chunked mode.
+
+    Tracks, per column: the first non-null Python type (as DataLoader.inspect_datatypes
+    does), whether every non-null chunk was numeric, min/max, mean and sample standard
+    deviation (merged with Chan's parallel algorithm), and the set of categories up to
+    ``max_categories`` distinct values.
+    """
+
+    def __init__(self, max_categories: int = 20):
+        """
+        Initialize empty statistics.
+
+        Args:
+            max_categories: Category sets larger than this are not kept
+        """
+        self.max_categories = max_categories
+        self.row_count = 0
+        self.columns: List[str] = []
+        self.datatypes: Dict[str, str] = {}
+        self._resolved_types = set()
+        self.numeric: Dict[str, bool] = {}
+        self.minimum: Dict[str, float] = {}
+        self.maximum: Dict[str, float] = {}
+        self._count: Dict[str, int] = {}
+        self._mean: Dict[str, float] = {}
+        self._m2: Dict[str, float] = {}
+        self._categories: Dict[str, Optional[Dict[Any, None]]] = {}
+
+    def update(self, chunk: pd.DataFrame):
+        """
+        Fold one chunk into the statistics.
+
+        Args:
+            chunk: DataFrame chunk
+        """
+        self.row_count += len(chunk)
+
+        for column in chunk.columns:
+            if column not in self.numeric:
+                self.columns.append(column)
+                self.numeric[column] = True
+                self._categories[column] = {}
+            series = chunk[column]
+            non_null = series.dropna()
+
+            # Data type of the first non-null value, falling back to the pandas dtype
+            if column not in self._resolved_types:
+                if len(non_null) > 0:
+                    self.datatypes[column] = type(non_null.iloc[0]).__name__
+                    self._resolved_types.add(column)
+                else:
+                    self.datatypes[column] = str(series.dtype)
+
+            if len(non_null) == 0:
+                continue
+
+            # Category set, abandoned once it exceeds max_categories
+            categories = self._categories[column]
+            if categories is not None:
+                for value in non_null.unique():
+                    categories[value] = None
+                if len(categories) > self.max_categories:
+                    self._categories[column] = None
+
+            # Numeric moments
+            if not self.numeric[column]:
+                continue
+            if not pd.api.types.is_numeric_dtype(series):
+                self.numeric[column] = False
+                continue
+            values = non_null.astype('float64')
+            chunk_min, chunk_max = float(values.min()), float(values.max())
+            self.minimum[column] = min(self.minimum.get(column, chunk_min), chunk_min)
+            self.maximum[column] = max(self.maximum.get(column, chunk_max), chunk_max)
+
+            n_b = len(values)
+            mean_b = float(values.mean())
+            m2_b = float(((values - mean_b) ** 2).sum())
+            n_a = self._count.get(column, 0)
+            if n_a == 0:
+                self._count[column], self._mean[column], self._m2[column] = n_b, mean_b, m2_b
+            else:
+                n = n_a + n_b
+                delta = mean_b - self._mean[column]
+                self._mean[column] += delta * n_b / n
+                self._m2[column] += m2_b + delta * delta * n_a * n_b / n
+                self._count[column] = n
+
+    def is_numeric(self, column: str) -> bool:
+        """Return True if every non-null chunk of the column was numeric."""
+        return self.numeric.get(column, False) and column in self.minimum
+
+    def mean(self, column: str) -> float:
+        return self._mean[column]
+
+    def std(self, column: str) -> float:
+        """Sample standard deviation (ddof=1), matching pandas Series.std()."""
+        count = self._count.get(column, 0)
+        if count < 2:
+            return float('nan')
+        return math.sqrt(self._m2[column] / (count - 1))
+
+    def category_count(self, column: str) -> Optional[int]:
+        """Number of distinct non-null values, or None if it exceeds max_categories."""
+        categories = self._categories.get(column)
+        return None if categories is None else len(categories)
+
+    def categories(self, column: str) -> Optional[List[Any]]:
+        """Sorted category list (as pd.get_dummies orders it), or None if too many."""
+        categories = self._categories.get(column)
+        if categories is None:
+            return None
+        try:
+            return sorted(categories)
+        except TypeError:
+            return list(categories)
+
+
 class TaggingSystem:
     """
     Handles the application of the BIM-inspired tagging system to data fields.
@@ -295,13 +591,20 @@ class DataTransformer:
         self.tagging_system = tagging_system
         self.transformations = tagging_system.transformations
     
-    def transform_data(self, df: pd.DataFrame, field_tags: Dict[str, List[str]]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    def transform_data(
+        self,
+        df: pd.DataFrame,
+        field_tags: Dict[str, List[str]],
+        statistics: Optional[StreamingStatistics] = None
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         """
         Apply transformations to the data based on field tags.
         
         Args:
             df: DataFrame containing the data
             field_tags: Dictionary mapping column names to lists of assigned tags
+            statistics: Statistics fitted over the whole file (chunked mode). When
+                omitted, statistics are computed from ``df`` itself.
             
         Returns:
             tuple: (Transformed DataFrame, transformation metadata)
@@ -333,7 +636,8 @@ class DataTransformer:
             transformed_df, onehot_meta = self._one_hot_encode(
                 transformed_df, 
                 field_tags, 
-                self.transformations['one_hot_encoding']
+                self.transformations['one_hot_encoding'],
+                statistics
             )
             if onehot_meta:
                 transformation_metadata['applied_transformations']['one_hot_encoding'] = onehot_meta
@@ -345,7 +649,8 @@ class DataTransformer:
             transformed_df, norm_meta = self._normalize_numeric(
                 transformed_df, 
                 field_tags, 
-                self.transformations['numeric_normalization']
+                self.transformations['numeric_normalization'],
+                statistics
             )
             if norm_meta:
                 transformation_metadata['applied_transformations']['numeric_normalization'] = norm_meta
@@ -403,7 +708,8 @@ class DataTransformer:
         self, 
         df: pd.DataFrame, 
         field_tags: Dict[str, List[str]], 
-        config: Dict[str, Any]
+        config: Dict[str, Any],
+        statistics: Optional[StreamingStatistics] = None
     ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         """
         Apply one-hot encoding to categorical fields.
@@ -412,6 +718,8 @@ class DataTransformer:
             df: DataFrame containing the data
             field_tags: Dictionary mapping column names to lists of assigned tags
             config: Configuration for one-hot encoding
+            statistics: Fitted statistics; their category sets keep the dummy
+                columns identical across chunks
             
         Returns:
             tuple: (DataFrame with one-hot encoded columns, transformation metadata)
@@ -434,11 +742,20 @@ class DataTransformer:
         for column, tags in field_tags.items():
             if any(tag in applies_to_tags for tag in tags):
                 # Check if the column has a reasonable number of categories
-                unique_values = df[column].nunique()
-                if unique_values <= max_categories:
+                if statistics is not None:
+                    unique_values = statistics.category_count(column)
+                    if unique_values is None:
+                        unique_values = f">{statistics.max_categories}"
+                else:
+                    unique_values = df[column].nunique()
+                if not isinstance(unique_values, str) and unique_values <= max_categories:
                     try:
                         # Apply one-hot encoding
-                        dummies = pd.get_dummies(df[column], prefix=column)
+                        values = df[column]
+                        if statistics is not None:
+                            values = pd.Categorical(values, categories=statistics.categories(column))
+                        dummies = pd.get_dummies(values, prefix=column)
+                        dummies.index = df.index
                         
                         # Add the new columns to the result DataFrame
                         for dummy_col in dummies.columns:
@@ -469,7 +786,8 @@ class DataTransformer:
         self, 
         df: pd.DataFrame, 
         field_tags: Dict[str, List[str]], 
-        config: Dict[str, Any]
+        config: Dict[str, Any],
+        statistics: Optional[StreamingStatistics] = None
     ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         """
         Normalize numeric fields to a specified range.
@@ -478,6 +796,8 @@ class DataTransformer:
             df: DataFrame containing the data
             field_tags: Dictionary mapping column names to lists of assigned tags
             config: Configuration for numeric normalization
+            statistics: Fitted statistics; min/max or mean/std are taken from the
+                whole file instead of the current chunk
             
         Returns:
             tuple: (DataFrame with normalized numeric columns, transformation metadata)
@@ -501,15 +821,24 @@ class DataTransformer:
             if any(tag in applies_to_tags for tag in tags):
                 try:
                     # Check if the column is numeric
-                    if pd.api.types.is_numeric_dtype(df[column]):
+                    if statistics is not None:
+                        is_numeric = statistics.is_numeric(column)
+                    else:
+                        is_numeric = pd.api.types.is_numeric_dtype(df[column])
+                    if is_numeric:
+                        values = pd.to_numeric(df[column]) if statistics is not None else df[column]
                         if method == 'min-max':
                             # Min-max normalization
-                            min_val = df[column].min()
-                            max_val = df[column].max()
+                            if statistics is not None:
+                                min_val = statistics.minimum[column]
+                                max_val = statistics.maximum[column]
+                            else:
+                                min_val = values.min()
+                                max_val = values.max()
                             
                             # Avoid division by zero
                             if min_val != max_val:
-                                result_df[column] = (df[column] - min_val) / (max_val - min_val)
+                                result_df[column] = (values - min_val) / (max_val - min_val)
                                 
                                 # Scale to target range if different from [0, 1]
                                 if target_range != [0, 1]:
@@ -525,12 +854,16 @@ class DataTransformer:
                         
                         elif method == 'z-score':
                             # Z-score normalization
-                            mean_val = df[column].mean()
-                            std_val = df[column].std()
+                            if statistics is not None:
+                                mean_val = statistics.mean(column)
+                                std_val = statistics.std(column)
+                            else:
+                                mean_val = values.mean()
+                                std_val = values.std()
                             
                             # Avoid division by zero
                             if std_val > 0:
-                                result_df[column] = (df[column] - mean_val) / std_val
+                                result_df[column] = (values - mean_val) / std_val
                                 
                                 transformed_columns.append(column)
                                 normalization_ranges[column] = {
@@ -582,14 +915,51 @@ class MetadataManager:
         logger.info("Attaching metadata to transformed dataset")
         
         # Create enriched metadata
+        enriched_metadata = MetadataManager.build_enriched_metadata(
+            original_metadata,
+            len(df),
+            list(df.columns),
+            field_tags,
+            transformation_metadata
+        )
+        
+        # Create payload with data and metadata
+        payload = {
+            'metadata': enriched_metadata,
+            'data': df.to_dict(orient='records')
+        }
+        
+        return payload
+    
+    @staticmethod
+    def build_enriched_metadata(
+        original_metadata: Dict[str, Any],
+        row_count: int,
+        columns: List[str],
+        field_tags: Dict[str, List[str]],
+        transformation_metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Build the metadata block of an enriched dataset.
+        
+        Args:
+            original_metadata: Original metadata from the processed file
+            row_count: Number of rows in the transformed dataset
+            columns: Columns of the transformed dataset
+            field_tags: Dictionary mapping column names to lists of assigned tags
+            transformation_metadata: Metadata about the applied transformations
+            
+        Returns:
+            Dictionary containing the enriched metadata
+        """
         enriched_metadata = original_metadata.copy()
         
         # Update basic metadata
         enriched_metadata.update({
-            'transformation_timestamp': datetime.now().isoformat(),
-            'row_count': len(df),
-            'column_count': len(df.columns),
-            'columns': list(df.columns)
+            'transformation_timestamp': utc_now(),
+            'row_count': row_count,
+            'column_count': len(columns),
+            'columns': columns
         })
         
         # Add tagging and transformation metadata
@@ -604,13 +974,7 @@ class MetadataManager:
         
         enriched_metadata['tag_descriptions'] = tag_descriptions
         
-        # Create payload with data and metadata
-        payload = {
-            'metadata': enriched_metadata,
-            'data': df.to_dict(orient='records')
-        }
-        
-        return payload
+        return enriched_metadata
 
 
 class DataForwarder:
@@ -646,39 +1010,87 @@ class DataForwarder:
             json.dump(payload, f, indent=2)
         
         return output_filename
+    
+    @staticmethod
+    def stream_to_enriched(
+        chunks: Iterable[pd.DataFrame],
+        original_filename: str,
+        build_metadata: Callable[[int, List[str]], Dict[str, Any]]
+    ) -> str:
+        """
+        Append transformed chunks to the enriched directory as they are produced.
+        
+        The output keeps the same {"data": [...], "metadata": {...}} envelope as
+        forward_to_enriched, with the records written first so that the metadata
+        (which needs the final row count) can be appended at the end.
+        
+        Args:
+            chunks: Iterable of transformed DataFrame chunks
+            original_filename: Name of the original source file
+            build_metadata: Callback receiving (row_count, columns) once all
+                chunks are written and returning the metadata dictionary
+            
+        Returns:
+            Path to the saved file
+        """
+        os.makedirs(ENRICHED_DATA_DIR, exist_ok=True)
+        
+        base_filename = os.path.splitext(os.path.basename(original_filename))[0]
+        output_filename = os.path.join(ENRICHED_DATA_DIR, f"{base_filename}.json")
+        
+        logger.info(f"Streaming transformed data to {output_filename}")
+        
+        row_count = 0
+        columns: List[str] = []
+        with open(output_filename, 'w') as f:
+            f.write('{"data": [')
+            for chunk in chunks:
+                if not columns:
+                    columns = list(chunk.columns)
+                lines = [json.dumps(record) for record in chunk.to_dict(orient='records')]
+                if lines:
+                    f.write((',\n' if row_count else '\n') + ',\n'.join(lines))
+                row_count += len(lines)
+            f.write('\n], "metadata": ')
+            json.dump(build_metadata(row_count, columns), f, indent=2)
+            f.write('}\n')
+        
+        return output_filename
 
 
 class TransformationLogger:
     """
     Handles logging of transformation operations.
+    
+    Events go through the shared buffered pipeline log, so logging a
+    transformation does not open the log file for every event.
     """
     
+    FIELDS = [
+        'timestamp',
+        'filename',
+        'source_format',
+        'row_count',
+        'column_count',
+        'applied_tags',
+        'applied_transformations',
+        'status',
+        'output_path'
+    ]
+    
     @staticmethod
     def initialize_log():
         """
-        Initialize the transformation log file if it doesn't exist.
-        """
-        # Ensure the logs directory exists
-        os.makedirs(LOGS_DIR, exist_ok=True)
+        Initialize the shared transformation log.
         
-        # Check if the log file exists
-        if not os.path.exists(TRANSFORMATION_LOG_PATH):
-            logger.info(f"Creating transformation log file: {TRANSFORMATION_LOG_PATH}")
-            
-            # Create the log file with headers
-            with open(TRANSFORMATION_LOG_PATH, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'timestamp',
-                    'filename',
-                    'source_format',
-                    'row_count',
-                    'column_count',
-                    'applied_tags',
-                    'applied_transformations',
-                    'status',
-                    'output_path'
-                ])
+        Returns:
+            PipelineLog instance backing /logs/transformation_log.csv
+        """
+        return get_log(
+            os.path.splitext(os.path.basename(TRANSFORMATION_LOG_PATH))[0],
+            TransformationLogger.FIELDS,
+            os.path.dirname(TRANSFORMATION_LOG_PATH)
+        )
     
     @staticmethod
     def log_transformation(
@@ -692,7 +1104,7 @@ class TransformationLogger:
         output_path: str
     ):
         """
-        Log a transformation operation to the transformation log file.
+        Log a transformation operation to the transformation log.
         
         Args:
             filename: Name of the processed file
@@ -704,9 +1116,6 @@ class TransformationLogger:
             status: Status of the transformation (success or error)
             output_path: Path to the output file
         """
-        # Ensure the log file exists
-        TransformationLogger.initialize_log()
-        
         # Format the field tags for logging
         applied_tags = ';'.join([f"{col}:{','.join(tags)}" for col, tags in field_tags.items() if tags])
         
@@ -718,19 +1127,17 @@ class TransformationLogger:
         ])
         
         # Log the transformation
-        with open(TRANSFORMATION_LOG_PATH, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                datetime.now().isoformat(),
-                filename,
-                source_format,
-                row_count,
-                column_count,
-                applied_tags,
-                applied_transformations,
-                status,
-                output_path
-            ])
+        TransformationLogger.initialize_log().write({
+            'timestamp': utc_now(),
+            'filename': filename,
+            'source_format': source_format,
+            'row_count': row_count,
+            'column_count': column_count,
+            'applied_tags': applied_tags,
+            'applied_transformations': applied_transformations,
+            'status': status,
+            'output_path': output_path
+        })
 
 
 class FileEventHandler(FileSystemEventHandler):
@@ -738,10 +1145,23 @@ class FileEventHandler(FileSystemEventHandler):
     Handles file system events for the watchdog observer.
     """
     
-    def __init__(self):
-        """Initialize the file event handler."""
+    def __init__(
+        self,
+        chunk_size: int = CHUNK_SIZE,
+        chunked_threshold_bytes: int = CHUNKED_MODE_THRESHOLD_BYTES
+    ):
+        """
+        Initialize the file event handler.
+        
+        Args:
+            chunk_size: Number of rows per chunk in chunked mode
+            chunked_threshold_bytes: Files at least this large are processed in
+                chunked mode (0 forces chunked mode for every file)
+        """
         self.tagging_system = TaggingSystem(TAGS_CONFIG_PATH)
         self.data_transformer = DataTransformer(self.tagging_system)
+        self.chunk_size = chunk_size
+        self.chunked_threshold_bytes = chunked_threshold_bytes
     
     def on_created(self, event):
         """
@@ -767,6 +1187,9 @@ class FileEventHandler(FileSystemEventHandler):
             file_path: Path to the file to process
         """
         try:
+            if os.path.getsize(file_path) >= self.chunked_threshold_bytes:
+                return self._process_file_chunked(file_path)
+            
             # Load data from the file
             df, metadata = DataLoader.load_from_file(file_path)
             
@@ -824,6 +1247,76 @@ class FileEventHandler(FileSystemEventHandler):
                 )
             except Exception as log_error:
                 logger.error(f"Error logging transformation: {log_error}")
+    
+    def _process_file_chunked(self, file_path: str):
+        """
+        Process a file in two passes over bounded-size chunks.
+        
+        The first pass fits the statistics needed by the transformations; the
+        second pass transforms each chunk with them and streams it to the
+        enriched output.
+        
+        Args:
+            file_path: Path to the file to process
+        """
+        logger.info(f"Processing file in chunked mode ({self.chunk_size} rows per chunk): {file_path}")
+        reader = ChunkedFileReader(file_path, self.chunk_size)
+        
+        # Pass 1: fit statistics
+        one_hot_config = self.data_transformer.transformations.get('one_hot_encoding', {})
+        statistics = StreamingStatistics(one_hot_config.get('max_categories', 20))
+        for chunk in reader:
+            statistics.update(chunk)
+        columns = statistics.columns
+        metadata = reader.metadata
+        
+        # Apply semantic tags
+        field_tags = self.tagging_system.tag_fields(pd.DataFrame(columns=columns), statistics.datatypes)
+        
+        # Pass 2: transform chunk by chunk. Every chunk is transformed with the
+        # same fitted statistics, so the transformation metadata of the first
+        # chunk describes the whole file.
+        transformation_metadata: Dict[str, Any] = {}
+        
+        def transformed_chunks() -> Iterator[pd.DataFrame]:
+            for chunk in reader:
+                transformed, chunk_metadata = self.data_transformer.transform_data(
+                    chunk.reindex(columns=columns),
+                    field_tags,
+                    statistics
+                )
+                if not transformation_metadata:
+                    transformation_metadata.update(chunk_metadata)
+                yield transformed
+        
+        def build_metadata(row_count: int, output_columns: List[str]) -> Dict[str, Any]:
+            return MetadataManager.build_enriched_metadata(
+                metadata,
+                row_count,
+                output_columns,
+                field_tags,
+                transformation_metadata
+            )
+        
+        output_path = DataForwarder.stream_to_enriched(
+            transformed_chunks(),
+            os.path.basename(file_path),
+            build_metadata
+        )
+        
+        # Log the transformation
+        TransformationLogger.log_transformation(
+            os.path.basename(file_path),
+            metadata.get('source_format', 'unknown'),
+            statistics.row_count,
+            len(columns),
+            field_tags,
+            transformation_metadata,
+            'success',
+            output_path
+        )
+        
+        logger.info(f"File processed successfully: {file_path} -> {output_path}")
 
 
 class TransformationAgent:
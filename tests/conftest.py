@@ -0,0 +1,84 @@
+"""
+conftest.py
+-----------
+Shared fixtures: a seeded lead generator with one field profile per agent, and
+a market signal scanner that serves fixed headlines instead of fetching news.
+"""
+
+import random
+
+import pytest
+
+from app.agents.market_signal_scanner import MarketSignalScanner
+
+TITLES = ["CEO", "Chief of Staff", "cto", "VP Sales", "Vice President, Ops", "Sales Director", "Office Manager",
+          "Engineer", "", None, 42, 0, "  ", "DIRECTOR & CMO"]
+EMAILS = ["a@fintech-finance.com", "b@GMAIL.com", "c@techcorp.io", "d@healthplus.org", "e@yahoo.com.au",
+          "f@software.dev", "no-at-sign", "x@y@hotmail.com", "g@plain.com", "", None, "h@mygmail.com"]
+SIZES = [0, 5, 49, 50, 249, 250, 999, 1000, 5000, 120.5, 0.5, -3, 999.9, True, None]
+PHONES = ["555-0100", "", None, 0, 1]
+COMPANIES = ["Acme Robotics", "Globex", "Initech", None, "Umbrella Retail"]
+
+
+def _uniform(rng, i):
+    return rng.uniform(0, 100)
+
+
+# (field, values, probability the field is present); a callable value is drawn as value(rng, i).
+# Each profile only uses values the agent's per-lead path accepts.
+LEAD_PROFILES = {
+    "intelligence": [
+        ("title", TITLES, 0.9),
+        ("email", EMAILS, 0.9),
+        ("company_size", SIZES, 0.9),
+        ("phone", PHONES, 0.9),
+    ],
+    "pipeline": [
+        ("title", [t for t in TITLES if t not in (0, "  ")], 0.9),
+        ("email", [e for e in EMAILS if e is not None], 0.9),
+        ("company_size", [s for s in SIZES if s not in (True, None) and s >= 0], 0.85),
+        ("phone", ["555-0100", "", None], 0.7),
+        ("company", COMPANIES, 0.8),
+        ("industry", ["Unknown"], 0.3),
+    ],
+    "risk_ltv": [
+        ("company_size", [1, 7, 250, 4999, 12.5, _uniform], 0.9),
+        ("score", [0, 49, 50, 87, 100, 49.99, _uniform], 0.9),
+        ("email", [lambda rng, i: f"lead{i}@acme.com", ""], 0.8),
+    ],
+}
+
+
+def generate_leads(profile, n, seed=0, first_id=1):
+    rng = random.Random(seed)
+    leads = []
+    for i in range(n):
+        lead = {"id": first_id + i, "name": f"Lead {i}"}
+        for field, values, probability in LEAD_PROFILES[profile]:
+            if rng.random() < probability:
+                value = rng.choice(values)
+                lead[field] = value(rng, i) if callable(value) else value
+        leads.append(lead)
+    return leads
+
+
+@pytest.fixture
+def make_leads():
+    """generate_leads(profile, n, seed=0, first_id=1)."""
+    return generate_leads
+
+
+class StaticScanner(MarketSignalScanner):
+    def fetch_news_headlines(self):
+        return [
+            "Acme Robotics announces layoffs.",
+            "Retail chains plan expansion.",
+            "Healthcare AI partnership signed.",
+            "Quiet week for Globex.",
+            "Finance startups chase fundraising.",
+        ]
+
+
+@pytest.fixture
+def static_scanner():
+    return StaticScanner(ttl_seconds=3600)
@@ -0,0 +1,49 @@
+"""
+test_batch_parity.py
+--------------------
+Checks that each agent's column-wise batch path returns exactly what its
+per-lead path returns, on the same generated leads.
+"""
+
+import pandas as pd
+import pytest
+
+from app.agents.lead_intelligence_agent import LeadIntelligenceAgent
+from app.agents.lead_risk_agent import LeadRiskAgent
+from app.agents.ltv_agent import LtvAgent
+from app.services.lead_pipeline import LeadPipeline
+
+
+def _intelligence(leads, scanner):
+    agent = LeadIntelligenceAgent()
+    return agent.score_leads(pd.DataFrame(leads)).tolist(), [agent.score_lead(lead) for lead in leads]
+
+
+def _risk(leads, scanner):
+    agent = LeadRiskAgent()
+    return agent.run_frame(pd.DataFrame(leads)).tolist(), [agent.run(lead) for lead in leads]
+
+
+def _ltv(leads, scanner):
+    agent = LtvAgent()
+    return agent.run_frame(pd.DataFrame(leads)).tolist(), [agent.run(lead) for lead in leads]
+
+
+def _pipeline(leads, scanner):
+    pipeline = LeadPipeline(scanner=scanner)
+    return pipeline.run(leads), [pipeline.run_lead(lead) for lead in leads]
+
+
+@pytest.mark.parametrize(
+    "profile, n, paths",
+    [
+        ("intelligence", 2000, _intelligence),
+        ("risk_ltv", 5000, _risk),
+        ("risk_ltv", 5000, _ltv),
+        ("pipeline", 1500, _pipeline),
+    ],
+    ids=["lead_intelligence", "lead_risk", "ltv", "lead_pipeline"],
+)
+def test_batch_matches_per_lead(make_leads, static_scanner, profile, n, paths):
+    batch, per_lead = paths(make_leads(profile, n), static_scanner)
+    assert batch == per_lead
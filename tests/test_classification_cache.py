@@ -0,0 +1,127 @@
+"""
+test_classification_cache.py
+----------------------------
+Checks the bounded memo tables behind LeadIntelligenceAgent's domain and title
+classification: LRU bounds, hit metrics, pre-warming from a file and
+invalidation when the rule lists change.
+"""
+
+import json
+import threading
+
+import pandas as pd
+
+from app.agents import lead_intelligence_agent as agent_module
+from app.agents.lead_intelligence_agent import (
+    LeadIntelligenceAgent,
+    classification_rules,
+    classify_title,
+    get_classification_cache,
+    is_free_domain,
+)
+from app.services.classification_cache import ClassificationCache, MemoTable
+
+
+def _cache(max_entries=100):
+    return ClassificationCache(classification_rules, is_free_domain, classify_title, max_entries=max_entries)
+
+
+def test_memo_table_is_bounded_and_counts_hits():
+    calls = []
+    table = MemoTable(lambda key: calls.append(key) or key.upper(), max_entries=2)
+    assert table.get("a") == "A"
+    assert table.get("a") == "A"
+    table.get("b")
+    table.get("c")
+    assert len(table) == 2
+    table.get("a")
+    assert calls == ["a", "b", "c", "a"]
+    metrics = table.metrics()
+    assert metrics["hits"] == 1 and metrics["misses"] == 4
+    assert metrics["hit_rate"] == 0.2
+
+
+def test_classifications_match_rules():
+    cache = _cache()
+    assert cache.free_domain("fintech-finance.com") is False
+    assert cache.free_domain("Yahoo.com.au") is True
+    assert cache.title("Chief of Staff") == 1.0
+    assert cache.title("VP Sales") == 0.7
+    # "director" contains "cto", as in score_lead
+    assert cache.title("Sales Director") == 1.0
+    assert cache.title("Office Manager") == 0.4
+    assert cache.title("Engineer") == 0.1
+
+
+def test_rule_change_invalidates(monkeypatch):
+    cache = _cache()
+    assert cache.title("Head of Sales") == 0.1
+    assert cache.free_domain("proton.me") is False
+    monkeypatch.setattr(agent_module, "SENIOR_TITLES", agent_module.SENIOR_TITLES + ("head of",))
+    monkeypatch.setattr(agent_module, "FREE_EMAIL_DOMAINS", agent_module.FREE_EMAIL_DOMAINS + ("proton.me",))
+    assert cache.title("Head of Sales") == 1.0
+    assert cache.free_domain("proton.me") is True
+    assert cache.metrics()["invalidations"] == 1
+    # The shared cache behind the agent follows the new rules too
+    agent = LeadIntelligenceAgent()
+    assert agent._calculate_field_weight("title", "Head of Sales") == 1.0
+    assert agent._calculate_field_weight("email", "x@proton.me") == 0.3
+
+
+def test_warm_from_json_and_csv(tmp_path):
+    json_path = tmp_path / "warm.json"
+    json_path.write_text(json.dumps({"domains": ["acme.com", "gmail.com"], "titles": ["CEO", "", None]}))
+    csv_path = tmp_path / "leads.csv"
+    csv_path.write_text("email,title\na@acme.com,CEO\nb@health.org,Director\nnot-an-email,\n")
+    cache = _cache()
+    assert cache.warm_from_file(str(json_path)) == {"domains": 2, "titles": 1}
+    assert cache.warm_from_file(str(csv_path)) == {"domains": 1, "titles": 1}
+    assert cache.free_domain("acme.com") is False
+    metrics = cache.metrics()
+    assert metrics["domains"]["warmed"] == 3
+    assert metrics["domains"]["hits"] == 1 and metrics["domains"]["misses"] == 0
+    assert metrics["titles"]["entries"] == 2
+
+
+def test_shared_cache_and_metrics_endpoint():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.routes import utility_routes
+
+    agent = LeadIntelligenceAgent()
+    before = get_classification_cache().metrics()["titles"]["hits"]
+    for _ in range(3):
+        agent.score_lead({"title": "VP Sales", "email": "a@acme.com"})
+    assert get_classification_cache().metrics()["titles"]["hits"] >= before + 2
+    # The DataFrame path reads the same table
+    before = get_classification_cache().metrics()["titles"]["hits"]
+    agent.score_leads(pd.DataFrame({"title": ["VP Sales", "VP Sales"], "email": ["a@acme.com", None]}))
+    assert get_classification_cache().metrics()["titles"]["hits"] == before + 1
+    app = FastAPI()
+    app.include_router(utility_routes.router)
+    body = TestClient(app).get("/metrics").json()
+    assert set(body["classification_cache"]) == {"domains", "titles", "invalidations"}
+
+
+def test_lookup_racing_a_rule_change_is_not_kept():
+    rules = ["old"]
+    started, release = threading.Event(), threading.Event()
+
+    def classify(title):
+        value = rules[0]
+        if title == "slow":
+            started.set()
+            release.wait(5)
+        return value
+
+    cache = ClassificationCache(lambda: tuple(rules), lambda domain: False, classify)
+    worker = threading.Thread(target=cache.title, args=("slow",))
+    worker.start()
+    started.wait(5)
+    rules[0] = "new"
+    assert cache.title("other") == "new"
+    # The old-rules result lands after the tables were cleared
+    release.set()
+    worker.join()
+    assert cache.title("slow") == "new"
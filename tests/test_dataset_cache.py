@@ -0,0 +1,118 @@
+"""
+test_dataset_cache.py
+---------------------
+Tests for the shared parsed-dataset cache: hits, version keys, LRU eviction
+under the memory budget, and dtype optimization.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.dataset_cache import DatasetCache, frame_nbytes, optimize_dtypes, process_budget_bytes
+
+
+def _write_csv(path, rows=200, offset=0):
+    pd.DataFrame({
+        "region": ["north", "south"] * (rows // 2),
+        "visits": np.arange(rows) + offset,
+        "amount": np.arange(rows) * 0.5,
+    }).to_csv(path, index=False)
+
+
+def test_hits_and_reload_on_file_change(tmp_path):
+    path = tmp_path / "sales.csv"
+    _write_csv(path)
+    cache = DatasetCache()
+
+    first = cache.load_csv(str(path), dataset_id="sales")
+    second = cache.load_csv(str(path), dataset_id="sales")
+    assert first.equals(second)
+    assert cache.metrics()["hits"] == 1 and cache.metrics()["misses"] == 1
+
+    _write_csv(path, offset=1000)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    reloaded = cache.load_csv(str(path), dataset_id="sales")
+    assert reloaded["visits"].iloc[0] == 1000
+    # The stale version was replaced, not kept alongside
+    assert cache.metrics()["entries"] == 1
+    assert cache.metrics()["hit_rate"] == round(1 / 3, 4)
+
+
+def test_lru_eviction_respects_budget(tmp_path):
+    frames = {}
+    for name in ("a", "b", "c"):
+        _write_csv(tmp_path / f"{name}.csv")
+        frames[name] = optimize_dtypes(pd.read_csv(tmp_path / f"{name}.csv"))
+    budget = frame_nbytes(frames["a"]) * 2
+    cache = DatasetCache(max_bytes=budget)
+
+    cache.load_csv(str(tmp_path / "a.csv"), dataset_id="a")
+    cache.load_csv(str(tmp_path / "b.csv"), dataset_id="b")
+    cache.load_csv(str(tmp_path / "a.csv"), dataset_id="a")  # a becomes most recent
+    cache.load_csv(str(tmp_path / "c.csv"), dataset_id="c")  # evicts b
+
+    metrics = cache.metrics()
+    assert metrics["evictions"] == 1
+    assert metrics["bytes"] <= budget
+    cache.load_csv(str(tmp_path / "a.csv"), dataset_id="a")
+    assert cache.metrics()["hits"] == 2
+
+
+def test_optimize_dtypes_is_lossless():
+    df = pd.DataFrame({
+        "region": ["north", "south", "north", None],
+        "small": [1, 2, 3, 4],
+        "negative": [-1, 0, 1, 2],
+        "half": [0.5, 1.5, 2.5, np.nan],
+        "precise": [0.1, 0.2, 0.3, 0.4],
+        "names": ["a", "b", "c", "d"],
+    })
+    optimized = optimize_dtypes(df)
+    assert optimized["region"].dtype == "category"
+    assert optimized["small"].dtype == np.int32
+    assert optimized["negative"].dtype == np.int32
+    assert optimized["half"].dtype == np.float64
+    assert optimized["precise"].dtype == np.float64
+    assert optimized["names"].dtype == object
+    pd.testing.assert_frame_equal(optimized.astype(df.dtypes.to_dict()), df)
+
+    opted_in = optimize_dtypes(df, downcast_floats=True)
+    assert opted_in["half"].dtype == np.float32
+    assert opted_in["precise"].dtype == np.float64
+
+
+def test_float_aggregates_match_the_source():
+    df = pd.DataFrame({"amount": np.arange(1_000_000, dtype=np.float64) * 0.25})
+    optimized = optimize_dtypes(df)
+    assert optimized["amount"].mean() == df["amount"].mean()
+    assert (optimized["amount"] * optimized["amount"]).sum() == (df["amount"] * df["amount"]).sum()
+
+
+def test_failed_load_releases_its_lock():
+    cache = DatasetCache()
+
+    def broken():
+        raise ValueError("unreadable")
+
+    with pytest.raises(ValueError):
+        cache.get_or_load("bad", 1, broken)
+    assert cache._load_locks == {}
+
+
+def test_arithmetic_on_loaded_frames_does_not_overflow(tmp_path):
+    path = tmp_path / "orders.csv"
+    pd.DataFrame({"qty": [100, 120, 90], "price": [3, 4, 5], "big": [2**40, 1, 2]}).to_csv(path, index=False)
+    loaded = DatasetCache().load_csv(str(path), dataset_id="orders")
+    assert (loaded["qty"] * loaded["price"]).tolist() == [300, 480, 450]
+    assert (loaded["price"] - 10).tolist() == [-7, -6, -5]
+    assert loaded["big"].dtype == np.int64
+
+
+def test_budget_is_split_across_job_workers(monkeypatch):
+    monkeypatch.setenv("DATASET_CACHE_MAX_MB", "512")
+    monkeypatch.setenv("JOB_MAX_WORKERS", "4")
+    assert process_budget_bytes() == 128 * 1024 * 1024
@@ -0,0 +1,151 @@
+"""
+test_dataset_ingestion.py
+-------------------------
+Tests for upload-time ingestion: columnar round trips, profiles, and the
+upload -> ready -> load flow through the routes.
+"""
+
+import io
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services import job_service, dataset_registry
+from app.services.dataset_registry import DatasetRegistry
+from app.services.dataset_cache import optimize_dtypes
+from app.services.dataset_ingestion import build_profile, ingest_dataset_job, load_profile, read_columnar, write_columnar
+from app.services.job_service import JobManager, JobStore
+from app.routes import analysis_routes, dataset_routes, job_routes
+
+
+def test_columnar_round_trip(tmp_path):
+    df = optimize_dtypes(pd.DataFrame({
+        "visits": [1, 2, 3, 4],
+        "amount": [0.1, np.nan, 2.5, 3.0],
+        "region": ["north", "south", "north", None],
+        "email": ["a@x.com", "b@x.com", None, "d@x.com"],
+        "signed_up": pd.to_datetime(["2024-01-01", None, "2024-03-01", "2024-04-01"]),
+        "seen_at": pd.to_datetime(["2024-01-01T10:00"] * 4).tz_localize("Europe/Berlin"),
+        "active": [True, False, True, True],
+        "mixed": [1, "two", 3.0, None],
+    }))
+    write_columnar(df, str(tmp_path / "leads"))
+    loaded = read_columnar(str(tmp_path / "leads"))
+    pd.testing.assert_frame_equal(loaded, df)
+    assert isinstance(np.load(tmp_path / "leads" / "c0.npy", mmap_mode="r"), np.memmap)
+
+    # Rewriting swaps the directory atomically
+    write_columnar(df.head(2), str(tmp_path / "leads"))
+    assert len(read_columnar(str(tmp_path / "leads"))) == 2
+    assert [p.name for p in tmp_path.iterdir()] == ["leads"]
+
+
+def test_profile_summaries():
+    profile = build_profile(optimize_dtypes(pd.DataFrame({
+        "amount": [1.0, 2.0, 3.0, None],
+        "region": ["north", "north", "south", "south"],
+    })))
+    assert profile["rows"] == 4
+    assert profile["fields"]["amount"]["nulls"] == 1
+    assert profile["fields"]["amount"]["mean"] == 2.0
+    assert profile["fields"]["region"]["top"] == [{"value": "north", "count": 2}, {"value": "south", "count": 2}]
+
+
+def test_columnar_copy_keeps_float64(tmp_path):
+    amounts = np.arange(100_000) * 0.25
+    df = optimize_dtypes(pd.DataFrame({"amount": amounts}))
+    write_columnar(df, str(tmp_path / "sales"), build_profile(df))
+    loaded = read_columnar(str(tmp_path / "sales"))
+    assert loaded["amount"].dtype == np.float64
+    assert loaded["amount"].mean() == amounts.mean()
+    assert (tmp_path / "sales" / "profile.json").exists()
+
+
+def test_older_ingest_does_not_replace_newer_copy(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATASET_COLUMNAR_DIR", str(tmp_path / "columnar"))
+    registry = DatasetRegistry(str(tmp_path / "datasets.sqlite3"))
+    paths, versions = {}, {}
+    for name, created_at, rows in (("old", "2025-01-01T00:00:00Z", 2), ("new", "2025-01-02T00:00:00Z", 3)):
+        paths[name] = tmp_path / f"{name}.csv"
+        pd.DataFrame({"amount": range(rows)}).to_csv(paths[name], index=False)
+        versions[name] = registry.register({"dataset_id": "sales", "created_at": created_at, "disk_path": str(paths[name])})
+
+    ingest_dataset_job(None, "sales", str(paths["new"]), "csv", registry_path=registry.path, version_id=versions["new"])
+    result = ingest_dataset_job(None, "sales", str(paths["old"]), "csv", registry_path=registry.path, version_id=versions["old"])
+
+    assert not result["published"]
+    assert registry.get("sales")["version_id"] == versions["new"]
+    assert len(read_columnar(str(tmp_path / "columnar" / "sales"))) == 3
+    assert load_profile("sales")["rows"] == 3
+    assert [p.name for p in (tmp_path / "columnar").iterdir()] == ["sales"]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")), executor="thread")
+    monkeypatch.setattr(job_service, "_manager", manager)
+    monkeypatch.setattr(dataset_registry, "_registry", DatasetRegistry(str(tmp_path / "datasets.sqlite3")))
+    app = FastAPI()
+    app.include_router(dataset_routes.router, prefix="/datasets")
+    app.include_router(analysis_routes.router, prefix="/analysis")
+    app.include_router(job_routes.router, prefix="/jobs")
+    with TestClient(app) as test_client:
+        yield test_client
+    manager.shutdown()
+
+
+def _wait_ready(dataset_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        entry = dataset_registry.get_dataset_registry().get(dataset_id)
+        if entry and entry["status"] != "processing":
+            return entry
+        time.sleep(0.05)
+    raise AssertionError("ingestion did not finish")
+
+
+@pytest.mark.parametrize("filename,content", [
+    ("Sales.csv", "region,amount\nnorth,10\nsouth,20\nnorth,30\n"),
+    ("Sales.json", '{"metadata": {}, "data": [{"region": "north", "amount": 10}, {"region": "south", "amount": 20}, {"region": "north", "amount": 30}]}'),
+])
+def test_upload_ingests_and_routes_load_columnar_copy(client, tmp_path, filename, content):
+    response = client.post("/datasets/upload_dataset", files={"file": (filename, content)}).json()
+    assert response["status"] == "processing" and response["job_id"]
+
+    entry = _wait_ready("sales")
+    assert entry["status"] == "ready", entry
+    assert entry["rows"] == 3 and entry["columns"] == ["region", "amount"]
+    assert entry["disk_path"].endswith(filename.lower().split(".")[-1])
+
+    profile = client.get("/datasets/sales/profile").json()["profile"]
+    assert profile["fields"]["amount"]["max"] == 30
+
+    result = client.post("/analysis/start?wait=true", json={"dataset_id": "sales"}).json()
+    assert result["status"] == "completed"
+    assert result["eda"]["columns"] == ["region", "amount"]
+
+
+def test_xlsx_upload_ingests(client):
+    workbook = io.BytesIO()
+    pd.DataFrame({"region": ["north", "south", "north"], "amount": [10, 20, 30]}).to_excel(workbook, index=False)
+    client.post("/datasets/upload_dataset", files={"file": ("Sales.xlsx", workbook.getvalue())})
+    entry = _wait_ready("sales")
+    assert entry["status"] == "ready", entry
+    assert entry["rows"] == 3 and entry["columns"] == ["region", "amount"]
+    profile = client.get("/datasets/sales/profile").json()["profile"]
+    assert profile["fields"]["amount"]["max"] == 30
+
+
+def test_unsupported_upload_fails(client):
+    client.post("/datasets/upload_dataset", files={"file": ("notes.txt", "hello")})
+    entry = _wait_ready("notes")
+    assert entry["status"] == "failed"
+    assert "Unsupported file type" in entry["error"]
+    client.post("/datasets/upload_dataset", files={"file": ("legacy.xls", b"\xd0\xcf\x11\xe0")})
+    entry = _wait_ready("legacy")
+    assert entry["status"] == "failed" and "Unsupported file type: xls" in entry["error"]
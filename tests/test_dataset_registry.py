@@ -0,0 +1,100 @@
+"""
+test_dataset_registry.py
+------------------------
+Tests for the persistent dataset registry: current-version pointer,
+pagination/filtering, and concurrent writers.
+"""
+
+from multiprocessing import get_context
+
+from app.services.dataset_registry import DatasetRegistry
+
+
+def _register(registry, dataset_id, created_at, status="processing", file_type="csv"):
+    return registry.register({
+        "dataset_id": dataset_id,
+        "filename": f"{dataset_id}.{file_type}",
+        "status": status,
+        "created_at": created_at,
+        "file_type": file_type,
+    })
+
+
+def test_current_version_prefers_ready_then_newest(tmp_path):
+    registry = DatasetRegistry(str(tmp_path / "datasets.sqlite3"))
+    first = _register(registry, "sales", "2025-01-01T00:00:00Z")
+    assert registry.get("sales")["version_id"] == first
+
+    second = _register(registry, "sales", "2025-01-02T00:00:00Z")
+    assert registry.get("sales")["version_id"] == second
+
+    registry.update(first, status="ready", rows=10, columns=["a", "b"])
+    current = registry.get("sales")
+    assert current["version_id"] == first and current["columns"] == ["a", "b"]
+
+    registry.update(second, status="ready")
+    assert registry.get("sales")["version_id"] == second
+    assert len(registry.versions("sales")) == 2
+    assert registry.get("missing") is None
+
+    # Survives reopening (another worker or a restart)
+    assert DatasetRegistry(registry.path).get("sales")["version_id"] == second
+
+
+
+def test_publish_skips_versions_older_than_a_ready_one(tmp_path):
+    registry = DatasetRegistry(str(tmp_path / "datasets.sqlite3"))
+    older = _register(registry, "sales", "2025-01-01T00:00:00Z")
+    newer = _register(registry, "sales", "2025-01-02T00:00:00Z")
+    swaps = []
+
+    assert registry.publish(newer, lambda: swaps.append(newer), status="ready", columnar_path="/c/sales")
+    # The older ingest finishes last: its copy must not replace the newer one
+    assert not registry.publish(older, lambda: swaps.append(older), status="ready", columnar_path="/c/sales")
+    assert swaps == [newer]
+    assert registry.get("sales")["version_id"] == newer
+    assert registry.get_version(older)["status"] == "ready"
+    assert registry.get_version(older)["columnar_path"] is None
+
+def test_list_current_filters_and_paginates(tmp_path):
+    registry = DatasetRegistry(str(tmp_path / "datasets.sqlite3"))
+    for i in range(25):
+        _register(registry, f"ds_{i:02d}", f"2025-01-{i + 1:02d}T00:00:00Z",
+                  status="ready" if i % 2 else "processing", file_type="json" if i % 5 == 0 else "csv")
+    _register(registry, "ds_00", "2025-02-01T00:00:00Z")
+
+    page, total = registry.list_current(limit=10, offset=0)
+    assert total == 25
+    assert [d["dataset_id"] for d in page][:2] == ["ds_00", "ds_24"]
+    assert len(page) == 10
+
+    ready, total_ready = registry.list_current(status="ready")
+    assert total_ready == 12 and all(d["status"] == "ready" for d in ready)
+    # ds_00's current version is the newer csv upload
+    _, total_json = registry.list_current(file_type="json")
+    assert total_json == 4
+    found, _ = registry.list_current(search="ds_1")
+    assert sorted(d["dataset_id"] for d in found) == [f"ds_1{i}" for i in range(10)]
+    # LIKE wildcards in the search term are matched literally
+    assert registry.list_current(search="ds%")[1] == 0
+
+
+def _register_many(path, worker):
+    registry = DatasetRegistry(path)
+    for i in range(20):
+        version = _register(registry, f"w{worker}_{i}", f"2025-01-01T00:00:{i:02d}Z")
+        registry.update(version, status="ready")
+
+
+def test_concurrent_workers(tmp_path):
+    path = str(tmp_path / "datasets.sqlite3")
+    DatasetRegistry(path)
+    ctx = get_context("spawn")
+    processes = [ctx.Process(target=_register_many, args=(path, w)) for w in range(4)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join(60)
+    assert all(p.exitcode == 0 for p in processes)
+    datasets, total = DatasetRegistry(path).list_current(status="ready")
+    assert total == 80
@@ -0,0 +1,215 @@
+"""
+test_eda_profile.py
+-------------------
+Checks the streaming EDA profile: exact moments and correlations against
+pandas, approximate quantiles, distinct counts and top values within their
+bounds, and that profiles of chunks merged across processes match a single
+pass. Also covers EDAAgent and the analysis route's run_eda_agent.
+"""
+
+import importlib
+import json
+import os
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.routes.analysis_routes import run_eda_agent
+from app.services.dataset_ingestion import write_columnar
+from app.services.eda_profile import (
+    QUANTILES,
+    HyperLogLog,
+    MisraGries,
+    profile_columnar,
+    profile_csv,
+    profile_frame,
+)
+
+# app/agents/insight_agent.py shadows the insight_agent directory as a package,
+# so the directory is mounted as a package under another name
+_DIR = os.path.join(os.path.dirname(__file__), "..", "app", "agents", "insight_agent")
+if "harmony_insight" not in sys.modules:
+    _package = types.ModuleType("harmony_insight")
+    _package.__path__ = [_DIR]
+    sys.modules["harmony_insight"] = _package
+eda_agent = importlib.import_module("harmony_insight.eda_agent")
+shared_memory = importlib.import_module("harmony_insight.shared_memory")
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(7)
+    rows = 60000
+    df = pd.DataFrame({
+        "amount": rng.lognormal(3, 1, rows),
+        "units": rng.integers(0, 40, rows),
+        "region": rng.choice(["north", "south", "east", "west"], rows, p=[0.4, 0.3, 0.2, 0.1]),
+        "created": pd.date_range("2024-01-01", periods=rows, freq="h"),
+        "id": np.arange(rows),
+    })
+    df["revenue"] = df["units"] * 12.5 + rng.normal(0, 20, rows)
+    df.loc[df.index % 9 == 0, "amount"] = np.nan
+    df.loc[df.index % 13 == 0, "region"] = None
+    return df
+
+
+def _close_rank(values, estimate, q, tolerance=0.01):
+    # The estimate's rank range (ties included) is within tolerance of q
+    ordered = np.sort(values[~np.isnan(values)])
+    low, high = np.searchsorted(ordered, estimate, "left"), np.searchsorted(ordered, estimate, "right")
+    return low / len(ordered) - tolerance <= q <= high / len(ordered) + tolerance
+
+
+def test_profile_matches_pandas(frame):
+    profile = profile_frame(frame, rows=7000).result()
+    assert profile["rows"] == len(frame) and profile["columns"] == 6
+    assert profile["missing"] == int(frame.isna().sum().sum())
+    for name in ("amount", "units", "revenue"):
+        field, series = profile["fields"][name], frame[name]
+        assert field["kind"] == "numeric"
+        assert field["nulls"] == series.isna().sum()
+        assert field["mean"] == pytest.approx(series.mean(), rel=1e-9)
+        assert field["variance"] == pytest.approx(series.var(), rel=1e-9)
+        assert (field["min"], field["max"]) == (series.min(), series.max())
+        for q in QUANTILES:
+            assert _close_rank(series.to_numpy(dtype=float), field["quantiles"][str(q)], q)
+    created = profile["fields"]["created"]
+    assert created["kind"] == "datetime" and created["min"] == str(frame["created"].min())
+    assert profile["fields"]["id"]["distinct"] == pytest.approx(len(frame), rel=0.03)
+    assert profile["fields"]["units"]["distinct"] == 40
+
+
+def test_top_values(frame):
+    region = profile_frame(frame, rows=5000).result()["fields"]["region"]
+    expected = frame["region"].value_counts()
+    # Four distinct values fit the summary, so counts are exact
+    assert region["top_error"] == 0
+    assert [(t["value"], t["count"]) for t in region["top"]] == list(expected.items())
+    # With fewer counters than values, counts are lower bounds within the error
+    summary = MisraGries(k=2)
+    for start in range(0, len(frame), 5000):
+        summary.update(frame["region"].iloc[start:start + 5000])
+    top = summary.top()
+    assert top[0]["value"] == "north"
+    for entry in top:
+        assert expected[entry["value"]] - summary.error <= entry["count"] <= expected[entry["value"]]
+
+
+def test_correlation(frame):
+    correlation = profile_frame(frame, rows=4000).result()["correlation"]
+    numeric = ["amount", "units", "id", "revenue"]
+    assert correlation["columns"] == numeric
+    np.testing.assert_allclose(np.array(correlation["matrix"], dtype=float), frame[numeric].corr().to_numpy(), atol=1e-9)
+
+
+def test_chunk_merge_matches_single_pass(frame):
+    single = profile_frame(frame, rows=len(frame)).result()
+    parts = [profile_frame(frame.iloc[start:start + 11000], rows=3000) for start in range(0, len(frame), 11000)]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    merged = merged.result()
+    assert merged["rows"] == single["rows"]
+    for name, field in single["fields"].items():
+        other = merged["fields"][name]
+        assert (other["count"], other["nulls"], other["top"]) == (field["count"], field["nulls"], field["top"])
+        if field["kind"] == "numeric":
+            assert other["mean"] == pytest.approx(field["mean"], rel=1e-9)
+            assert other["variance"] == pytest.approx(field["variance"], rel=1e-9)
+            assert (other["min"], other["max"]) == (field["min"], field["max"])
+    np.testing.assert_allclose(
+        np.array(merged["correlation"]["matrix"], dtype=float),
+        np.array(single["correlation"]["matrix"], dtype=float),
+        atol=1e-9,
+    )
+
+
+def test_hyperloglog_merge():
+    left, right, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    left.update(np.arange(0, 30000))
+    right.update(np.arange(20000, 50000))
+    union.update(np.arange(0, 50000))
+    left.merge(right)
+    assert left.estimate() == union.estimate()
+    assert left.estimate() == pytest.approx(50000, rel=0.03)
+    small = HyperLogLog()
+    small.update(np.array(["a", "b", "c", "a"], dtype=object))
+    assert small.estimate() == 3
+
+
+def test_files_profiled_in_worker_processes(frame, tmp_path):
+    expected = profile_frame(frame).result()
+    csv = tmp_path / "data.csv"
+    frame.to_csv(csv, index=False)
+    from_csv = profile_csv(str(csv), rows=8000, workers=2).result()
+    write_columnar(frame, str(tmp_path / "columnar"))
+    from_columnar = profile_columnar(str(tmp_path / "columnar"), rows=8000, workers=3).result()
+    for profile in (from_csv, from_columnar):
+        assert profile["rows"] == len(frame)
+        assert profile["fields"]["amount"]["mean"] == pytest.approx(expected["fields"]["amount"]["mean"], rel=1e-9)
+        assert profile["fields"]["region"]["top"] == expected["fields"]["region"]["top"]
+        assert profile["fields"]["revenue"]["nulls"] == 0
+    assert from_columnar["fields"]["created"]["max"] == expected["fields"]["created"]["max"]
+
+
+def test_mixed_chunks_fall_back_to_text():
+    numbers = profile_frame(pd.DataFrame({"code": [1, 2, 3]}))
+    text = profile_frame(pd.DataFrame({"code": ["A1", "B2"]}))
+    field = numbers.merge(text).result()["fields"]["code"]
+    assert field["kind"] == "text" and field["count"] == 5 and "mean" not in field
+    coerced = profile_frame(pd.DataFrame({"x": [1.5, 2.5]})).update(pd.DataFrame({"x": ["3.5", "n/a", None]}))
+    field = coerced.result()["fields"]["x"]
+    assert (field["count"], field["nulls"], field["invalid"], field["max"]) == (5, 1, 1, 3.5)
+
+
+def test_eda_agent_writes_profile(frame, tmp_path):
+    memory = shared_memory.SharedMemory(str(tmp_path / "memory.sqlite3"))
+    agent = eda_agent.EDAAgent(memory, workers=1)
+    agent.sense(frame)
+    assert agent.plan()["method"] == "frame"
+    profile = agent.act()
+    assert memory.get_memory("eda_profile") == profile
+    assert memory.get_memory("eda_act") == f"Profiled {len(frame)} rows and 6 columns"
+    assert eda_agent.EDAAgent(memory).act() is None
+
+
+def test_run_eda_agent_summary():
+    df = pd.DataFrame({"a": [1, 2, None], "b": ["x", "y", "x"]})
+    eda = run_eda_agent(df)
+    assert eda["summary"] == "3 rows, 2 columns. 1 missing values."
+    assert eda["profile"]["fields"]["b"]["top"][0] == {"value": "x", "count": 2}
+    assert eda["columns"] == ["a", "b"]
+
+
+def test_profile_does_not_depend_on_worker_count(tmp_path):
+    values = [str(i) for i in range(41)]
+    values[30] = "abc"
+    path = tmp_path / "stray.csv"
+    pd.DataFrame({"x": values, "y": np.arange(41) * 2.0, "label": ["a"] * 20 + ["7"] * 21}).to_csv(path, index=False)
+    single = profile_csv(str(path), rows=10, workers=1).result()
+    assert single == profile_csv(str(path), rows=10, workers=3).result()
+    x = single["fields"]["x"]
+    assert (x["kind"], x["invalid"], x["mean"]) == ("numeric", 1, pytest.approx(np.mean([i for i in range(41) if i != 30])))
+    assert single["correlation"]["columns"] == ["x", "y"]
+    # A text column whose later chunks look numeric stays text
+    assert single["fields"]["label"]["top"] == [{"value": "7", "count": 21}, {"value": "a", "count": 20}]
+
+
+def test_columnar_ranges_use_manifest_kinds(frame, tmp_path):
+    write_columnar(frame, str(tmp_path / "columnar"))
+    one = profile_columnar(str(tmp_path / "columnar"), rows=5000, workers=1).result()
+    many = profile_columnar(str(tmp_path / "columnar"), rows=5000, workers=4).result()
+    for name, field in one["fields"].items():
+        other = many["fields"][name]
+        assert (other["kind"], other["count"], other["nulls"], other["top"]) == (
+            field["kind"], field["count"], field["nulls"], field["top"])
+
+
+def test_non_finite_values_are_json_safe():
+    df = pd.DataFrame({"x": [1.0, np.inf, 3.0], "y": [-np.inf, 2.0, 1.0]})
+    eda = run_eda_agent(df)
+    json.dumps(eda["profile"], allow_nan=False)
+    assert eda["profile"]["fields"]["x"]["max"] is None
@@ -0,0 +1,135 @@
+"""
+test_harmony_orchestrator.py
+----------------------------
+Checks HarmonyOrchestrator's dependency-graph execution: independent steps run
+concurrently, results flow to dependents, per-step timeouts, failures and
+cancel() skip downstream steps, and timings land in SharedMemory.
+"""
+
+import functools
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+# app/agents/insight_agent.py shadows the insight_agent directory as a package,
+# so the directory is mounted as a package under another name
+_DIR = os.path.join(os.path.dirname(__file__), "..", "app", "agents", "insight_agent")
+if "harmony_insight" not in sys.modules:
+    _package = types.ModuleType("harmony_insight")
+    _package.__path__ = [_DIR]
+    sys.modules["harmony_insight"] = _package
+orchestrator = importlib.import_module("harmony_insight.orchestrator")
+shared_memory = importlib.import_module("harmony_insight.shared_memory")
+AgentStep = orchestrator.AgentStep
+HarmonyOrchestrator = orchestrator.HarmonyOrchestrator
+
+
+def _sleep_then(value, seconds=0.3):
+    def step(*args):
+        time.sleep(seconds)
+        return value
+    return step
+
+
+def _fail(*args):
+    raise RuntimeError("boom")
+
+
+@pytest.fixture()
+def memory(tmp_path):
+    return shared_memory.SharedMemory(str(tmp_path / "memory.sqlite3"))
+
+
+def test_default_chain_records_timings(memory):
+    record = HarmonyOrchestrator(memory).run()
+    assert record["status"] == "completed"
+    assert record["critical_path"] == [f"{a}.{p}" for a in ("eda", "model", "eval") for p in ("sense", "plan", "act")]
+    assert memory.get_memory("eval_act") == "Executed evaluation actions"
+    runs = memory.get_memory("orchestrator_runs")
+    assert runs[-1]["run_id"] == record["run_id"]
+    timing = runs[-1]["steps"]["model.plan"]
+    assert timing["status"] == "completed" and timing["duration"] >= 0
+    assert timing["started_at"] >= runs[-1]["steps"]["model.sense"]["finished_at"]
+
+
+def test_independent_steps_run_concurrently():
+    steps = [
+        AgentStep("profile_numeric", _sleep_then({"numeric": 2})),
+        AgentStep("profile_text", _sleep_then({"text": 1})),
+        AgentStep("merge", lambda numeric, text: {**numeric, **text}, ["profile_numeric", "profile_text"]),
+    ]
+    record = HarmonyOrchestrator(max_workers=2).run(steps)
+    assert record["status"] == "completed"
+    assert record["results"]["merge"] == {"numeric": 2, "text": 1}
+    assert record["duration"] < 0.55
+    assert record["critical_path"][-1] == "merge" and len(record["critical_path"]) == 2
+
+
+def test_timeouts_and_failures_skip_dependents():
+    steps = [
+        AgentStep("slow", _sleep_then(1, seconds=2), timeout=0.1),
+        AgentStep("after_slow", lambda x: x, ["slow"]),
+        AgentStep("broken", _fail),
+        AgentStep("after_broken", lambda x: x, ["broken"]),
+        AgentStep("fine", lambda: "ok"),
+    ]
+    started = time.monotonic()
+    record = HarmonyOrchestrator(max_workers=3).run(steps)
+    assert time.monotonic() - started < 1.5
+    statuses = {name: t["status"] for name, t in record["steps"].items()}
+    assert statuses == {"slow": "timed_out", "after_slow": "skipped", "broken": "failed",
+                        "after_broken": "skipped", "fine": "completed"}
+    assert record["status"] == "failed"
+    assert "RuntimeError: boom" in record["steps"]["broken"]["error"]
+
+
+def test_cancel_stops_the_run():
+    orchestrator_ = HarmonyOrchestrator(max_workers=1)
+    steps = [AgentStep("first", _sleep_then(1, seconds=0.5)), AgentStep("second", lambda x: x, ["first"])]
+    threading.Timer(0.1, orchestrator_.cancel).start()
+    record = orchestrator_.run(steps)
+    assert record["status"] == "cancelled"
+    assert record["steps"]["first"]["status"] == "cancelled"
+    assert record["steps"]["second"]["status"] == "cancelled"
+
+
+def test_invalid_graphs():
+    with pytest.raises(ValueError, match="cycle"):
+        HarmonyOrchestrator().run([AgentStep("a", _fail, ["b"]), AgentStep("b", _fail, ["a"])])
+    with pytest.raises(ValueError, match="unknown"):
+        HarmonyOrchestrator().run([AgentStep("a", _fail, ["missing"])])
+
+
+def test_process_pool():
+    steps = [AgentStep("power", functools.partial(pow, 2, 10)), AgentStep("negate", abs, ["power"])]
+    record = HarmonyOrchestrator(max_workers=2, use_processes=True).run(steps)
+    assert record["status"] == "completed"
+    assert record["results"] == {"power": 1024, "negate": 1024}
+
+
+def test_cancel_before_run_is_not_lost():
+    orchestrator_ = HarmonyOrchestrator(max_workers=1)
+    orchestrator_.cancel()
+    record = orchestrator_.run([AgentStep("only", _sleep_then(1))])
+    assert record["status"] == "cancelled"
+    assert record["steps"]["only"]["status"] == "cancelled"
+    # The token is per run, so the next run starts fresh
+    assert orchestrator_.run([AgentStep("only", _sleep_then(1, seconds=0))])["status"] == "completed"
+
+
+def test_process_pool_terminates_timed_out_steps():
+    import multiprocessing
+
+    before = set(multiprocessing.active_children())
+    steps = [AgentStep("stuck", functools.partial(time.sleep, 30), timeout=0.5)]
+    record = HarmonyOrchestrator(max_workers=1, use_processes=True).run(steps)
+    assert record["steps"]["stuck"]["status"] == "timed_out"
+    deadline = time.monotonic() + 10
+    while set(multiprocessing.active_children()) - before and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not set(multiprocessing.active_children()) - before
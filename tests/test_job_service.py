@@ -0,0 +1,211 @@
+"""
+test_job_service.py
+-------------------
+Tests for background jobs: routes return a job id immediately, results,
+progress and timings land in the job store, and status is available by
+polling and SSE.
+"""
+
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services import job_service
+from app.services.job_service import JobManager, JobStore
+from app.routes import analysis_routes, forecast_routes, strategy_routes, job_routes, utility_routes
+from app.services.dataset_cache import load_csv
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")), executor="thread", max_workers=2)
+    monkeypatch.setattr(job_service, "_manager", manager)
+    app = FastAPI()
+    app.include_router(analysis_routes.router, prefix="/analysis")
+    app.include_router(forecast_routes.router)
+    app.include_router(strategy_routes.router)
+    app.include_router(job_routes.router, prefix="/jobs")
+    with TestClient(app) as test_client:
+        yield test_client
+    manager.shutdown()
+
+
+def _poll(client, job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed", "cancelled"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+def test_forecast_returns_job_id_and_result(client):
+    queued = client.post("/forecast/generate", json={"dataset_id": "demo"}).json()
+    assert queued["status"] == "queued"
+    job = _poll(client, queued["job_id"])
+    assert job["status"] == "completed"
+    assert job["progress"] == 1.0
+    assert job["result"]["forecast_target"] == "revenue"
+    assert set(job["timings"]) == {"load", "detect_columns", "forecast"}
+    assert job["run_seconds"] is not None
+
+    legacy = client.post("/forecast/generate?wait=true", json={"dataset_id": "demo"}).json()
+    assert legacy == job["result"]
+
+
+def test_failed_job_records_error(client):
+    queued = client.post("/strategy/scan", json={"dataset_id": "missing"}).json()
+    job = _poll(client, queued["job_id"])
+    assert job["status"] == "failed"
+    assert job["error"] == "Invalid or missing dataset ID"
+    assert client.post("/strategy/scan?wait=true", json={"dataset_id": "missing"}).json()["status"] == "failed"
+
+
+def test_analysis_updates_last_run_view_and_streams_events(client, tmp_path):
+    (tmp_path / "data" / "uploads").mkdir(parents=True)
+    (tmp_path / "data" / "uploads" / "sales.csv").write_text("a,b\n1,2\n3,4\n")
+    assert client.get("/analysis/logs").json()["last_analysis_run"] == {"dataset_id": None, "timestamp": None}
+
+    queued = client.post("/analysis/start", json={"dataset_id": "sales"}).json()
+    with client.stream("GET", f"/jobs/{queued['job_id']}/events?poll_seconds=0.05") as response:
+        events = [line for line in response.iter_lines() if line.startswith("event:")]
+    assert events[-1] == "event: done"
+
+    job = client.get(f"/jobs/{queued['job_id']}").json()
+    assert job["result"]["status"] == "completed"
+    assert set(job["timings"]) == {"load", "eda", "modeling", "evaluation", "report"}
+    last_run = client.get("/analysis/logs").json()["last_analysis_run"]
+    assert last_run["dataset_id"] == "sales" and last_run["timestamp"]
+
+    listed = client.get("/jobs/?kind=analysis").json()["jobs"]
+    assert [j["job_id"] for j in listed] == [queued["job_id"]]
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_process_pool_executes_jobs(tmp_path):
+    import asyncio
+
+    manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")), executor="process", max_workers=1)
+
+    async def run():
+        job_id = await manager.submit("forecast", forecast_routes.forecast_job, "demo", params={"dataset_id": "demo"})
+        return await manager.wait(job_id, timeout=60)
+
+    try:
+        job = asyncio.run(run())
+    finally:
+        manager.shutdown()
+    assert job["status"] == "completed"
+    assert job["result"]["forecast_values"][0]["period"] == "2025-Q3"
+
+
+def _load_twice(ctx, path):
+    load_csv(path)
+    return len(load_csv(path))
+
+
+def test_worker_cache_metrics_reach_the_job_store(tmp_path, monkeypatch):
+    import asyncio
+
+    path = tmp_path / "sales.csv"
+    path.write_text("region,amount\nnorth,10\nsouth,20\n")
+    manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")), executor="process", max_workers=1)
+    monkeypatch.setattr(job_service, "_manager", manager)
+
+    async def run():
+        job_id = await manager.submit("analysis", _load_twice, str(path))
+        job = await manager.wait(job_id, timeout=60)
+        return job, await utility_routes.dataset_cache_metrics()
+
+    try:
+        job, metrics = asyncio.run(run())
+    finally:
+        manager.shutdown()
+    assert job["status"] == "completed" and job["result"] == 2
+    worker = next(p for p in metrics["processes"] if p["role"] == "job_worker")
+    assert worker["pid"] != os.getpid()
+    assert (worker["hits"], worker["misses"]) == (1, 1)
+    assert metrics["total"]["hits"] >= 1 and metrics["scope"] == "per_process"
+
+
+def _sleep(ctx, seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_aclose_does_not_wait_for_running_jobs(tmp_path):
+    import asyncio
+
+    manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")), executor="thread", max_workers=1, max_queued=2)
+
+    async def run():
+        running = await manager.submit("analysis", _sleep, 1.0)
+        await manager.submit("analysis", _sleep, 1.0)
+        with pytest.raises(job_service.JobQueueFull):
+            await manager.submit("analysis", _sleep, 1.0)
+        await asyncio.sleep(0.1)
+        start = time.monotonic()
+        await manager.aclose()
+        return running, time.monotonic() - start
+
+    running, seconds = asyncio.run(run())
+    assert seconds < 0.5
+    assert manager.store.get(running)["status"] == "cancelled"
+
+
+def test_cancelled_job_is_not_claimed_by_a_worker(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create("analysis")
+    assert store.update(job_id, expect=("queued",), status="cancelled")
+    calls = []
+    job_service._execute_job(store.path, job_id, lambda ctx: calls.append(ctx), (), {})
+    assert calls == []
+    assert store.get(job_id)["status"] == "cancelled"
+    assert not store.update(job_id, expect=("queued",), status="running")
+
+
+def test_cancel_only_wins_while_queued(tmp_path):
+    import asyncio
+
+    manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")), executor="thread", max_workers=1)
+
+    async def run():
+        running = await manager.submit("analysis", _sleep, 0.3)
+        queued = await manager.submit("analysis", _sleep, 0.3)
+        await asyncio.sleep(0.1)
+        results = await manager.cancel(running), await manager.cancel(queued)
+        return running, queued, results, await manager.wait(running), await manager.wait(queued)
+
+    running, queued, results, running_job, queued_job = asyncio.run(run())
+    manager.shutdown()
+    assert results == (False, True)
+    assert running_job["status"] == "completed"
+    assert queued_job["status"] == "cancelled" and queued_job["started_at"] is None
+
+
+def test_orphaned_jobs_are_failed_on_startup(tmp_path):
+    import subprocess
+    import sys
+
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    orphaned = [
+        store.create("analysis", owner=job_service.process_owner(exited.pid)),
+        store.create("analysis"),
+    ]
+    store.update(orphaned[0], status="running")
+    live = store.create("analysis", owner=job_service.process_owner())
+
+    manager = JobManager(store, executor="thread")
+    assert manager.recover() == 2
+    for job_id in orphaned:
+        job = store.get(job_id)
+        assert job["status"] == "failed" and job["error"] == "interrupted"
+    assert store.get(live)["status"] == "queued"
+    assert store.count_active() == 1
@@ -0,0 +1,181 @@
+"""
+test_lead_graph.py
+------------------
+Checks LeadGraph components, degree, PageRank and shortest paths against a
+brute-force clique graph, and that incremental updates match a rebuild.
+"""
+
+import random
+from collections import deque
+
+import numpy as np
+import pytest
+
+pytest.importorskip("scipy")
+
+from app.services.lead_graph import LeadGraph, lead_domain
+
+
+def _random_leads(n, seed=2, start=0):
+    rng = random.Random(seed)
+    leads = []
+    for i in range(start, start + n):
+        leads.append({
+            "id": f"L{i}",
+            "email": rng.choice([f"a@acme{rng.randrange(30)}.com", "x@gmail.com", None]),
+            "industry": rng.choice([None, "", "SaaS", "Retail", None, None]) if rng.random() < 0.4 else None,
+            "location": f"city{rng.randrange(60)}" if rng.random() < 0.5 else None,
+        })
+    return leads
+
+
+def _random_pairs(ids, count, seed=3):
+    rng = random.Random(seed)
+    return [(rng.choice(ids), rng.choice(ids)) for _ in range(count)]
+
+
+def _brute_adjacency(leads, pairs):
+    # Weighted clique graph: one unit per shared attribute and per interaction
+    ids = list(dict.fromkeys([lead["id"] for lead in leads] + [x for pair in pairs for x in pair]))
+    pos = {lead_id: i for i, lead_id in enumerate(ids)}
+    attrs = {}
+    for lead in leads:
+        keys = {("domain", lead_domain(lead)), ("industry", lead.get("industry")), ("location", lead.get("location"))}
+        attrs.setdefault(lead["id"], set()).update(k for k in keys if k[1] not in (None, ""))
+    adjacency = np.zeros((len(ids), len(ids)))
+    for a in attrs:
+        for b in attrs:
+            if a != b:
+                adjacency[pos[a], pos[b]] += len(attrs[a] & attrs[b])
+    for a, b in pairs:
+        if a != b:
+            adjacency[pos[a], pos[b]] += 1
+            adjacency[pos[b], pos[a]] += 1
+    return ids, adjacency
+
+
+def _brute_components(adjacency):
+    labels = -np.ones(len(adjacency), dtype=int)
+    current = 0
+    for start in range(len(adjacency)):
+        if labels[start] >= 0:
+            continue
+        queue = deque([start])
+        labels[start] = current
+        while queue:
+            node = queue.popleft()
+            for other in np.flatnonzero(adjacency[node]):
+                if labels[other] < 0:
+                    labels[other] = current
+                    queue.append(other)
+        current += 1
+    return labels
+
+
+def _brute_hops(adjacency, source):
+    hops = np.full(len(adjacency), np.inf)
+    hops[source] = 0
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for other in np.flatnonzero(adjacency[node]):
+            if hops[other] == np.inf:
+                hops[other] = hops[node] + 1
+                queue.append(other)
+    return hops
+
+
+def _brute_pagerank(adjacency, alpha=0.85):
+    n = len(adjacency)
+    degree = adjacency.sum(axis=1)
+    ranks = np.full(n, 1.0 / n)
+    for _ in range(500):
+        spread = adjacency.T @ np.divide(ranks, degree, out=np.zeros(n), where=degree > 0)
+        ranks = alpha * spread + (alpha * ranks[degree == 0].sum() + 1 - alpha) / n
+    return ranks
+
+
+def test_analytics_match_brute_force():
+    leads = _random_leads(150)
+    pairs = _random_pairs([lead["id"] for lead in leads], 40)
+    graph = LeadGraph()
+    graph.add_leads(leads)
+    graph.add_interactions(pairs)
+    ids, adjacency = _brute_adjacency(leads, pairs)
+    assert graph.lead_ids == ids
+
+    assert np.array_equal(graph.connected_components(), _brute_components(adjacency))
+    assert np.allclose(graph.degree(), adjacency.sum(axis=1))
+    assert np.allclose(graph.pagerank(tol=1e-14, max_iter=1000), _brute_pagerank(adjacency), atol=1e-9)
+
+    hops = _brute_hops(adjacency, 0)
+    for target in range(1, len(ids)):
+        path = graph.shortest_path(ids[0], ids[target])
+        if not np.isfinite(hops[target]):
+            assert path is None
+            continue
+        assert path["hops"] == hops[target]
+        assert path["path"][0] == ids[0] and path["path"][-1] == ids[target]
+        assert len(path["path"]) == hops[target] + 1 == len(path["via"]) + 1
+        for a, b in zip(path["path"], path["path"][1:]):
+            assert adjacency[ids.index(a), ids.index(b)] > 0
+
+    expected = [ids[j] for j in np.flatnonzero(adjacency[5])]
+    assert graph.connections(ids[5]) == expected
+    assert graph.connections(ids[5], limit=2) == expected[:2]
+
+
+def test_incremental_updates_match_rebuild():
+    first, second = _random_leads(120, seed=5), _random_leads(80, seed=6, start=100)
+    ids = [lead["id"] for lead in first + second]
+    pairs = _random_pairs(ids + ["external-1"], 30, seed=7)
+
+    incremental = LeadGraph()
+    incremental.add_leads(first)
+    incremental.connected_components()
+    incremental.pagerank()
+    incremental.add_leads(second)
+    incremental.add_interactions(pairs[:15])
+    incremental.connected_components()
+    incremental.add_interactions(pairs[15:])
+
+    rebuilt = LeadGraph()
+    rebuilt.add_leads(first + second)
+    rebuilt.add_interactions(pairs)
+
+    assert incremental.lead_ids == rebuilt.lead_ids
+    assert np.array_equal(incremental.connected_components(), rebuilt.connected_components())
+    assert incremental.components() == rebuilt.components()
+    assert np.allclose(incremental.pagerank(tol=1e-13), rebuilt.pagerank(tol=1e-13), atol=1e-10)
+
+
+def test_summary_and_domains():
+    assert lead_domain({"email": "Jane@Example.COM"}) == "example.com"
+    assert lead_domain({"email": "joe@gmail.com"}) is None
+    assert lead_domain({"domain": "acme.io", "email": "x@other.com"}) == "acme.io"
+
+    graph = LeadGraph()
+    graph.add_leads([
+        {"id": 1, "email": "a@acme.com"},
+        {"id": 2, "email": "b@acme.com"},
+        {"id": 3, "location": "Paris"},
+    ])
+    summary = graph.summary(top=2)
+    assert summary["components"] == 2
+    assert summary["largest_component"] == 2
+    assert [entry["id"] for entry in summary["top_influence"]] == [1, 2]
+    assert graph.shortest_path(1, 3) is None
+    assert graph.shortest_path(1, 2) == {"path": [1, 2], "via": ["domain=acme.com"], "hops": 1.0}
+
+
+def test_missing_domains_do_not_link_leads():
+    assert lead_domain({"domain": np.nan, "email": "x@acme.com"}) == "acme.com"
+    assert lead_domain({"domain": np.nan, "email": np.nan}) is None
+    assert lead_domain({"domain": "  ", "email": "joe@gmail.com"}) is None
+
+    graph = LeadGraph()
+    graph.add_leads([
+        {"id": 1, "domain": np.nan, "email": "a@gmail.com"},
+        {"id": 2, "domain": np.nan, "email": "b@yahoo.com"},
+    ])
+    assert graph.summary()["components"] == 2
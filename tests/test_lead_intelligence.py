@@ -0,0 +1,63 @@
+"""
+test_lead_intelligence.py
+-------------------------
+Checks that LeadIntelligenceAgent.score_leads / enrich_leads match score_lead /
+enrich_lead row by row across column dtypes, and the batch output layout.
+Parity on the generated leads is in test_batch_parity.py.
+"""
+
+import numpy as np
+import pandas as pd
+
+from app.agents.lead_intelligence_agent import LeadIntelligenceAgent
+
+
+def _expected_scores(agent, df):
+    records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    return [agent.score_lead(record) for record in records]
+
+
+def test_score_leads_dtype_and_index(make_leads):
+    agent = LeadIntelligenceAgent()
+    df = pd.DataFrame(make_leads("intelligence", 200), index=range(5, 205))
+    scores = agent.score_leads(df)
+    assert scores.dtype == np.int64
+    assert scores.index.equals(df.index)
+
+
+def test_score_leads_column_dtypes():
+    agent = LeadIntelligenceAgent()
+    rng = np.random.default_rng(1)
+    rows = 500
+    df = pd.DataFrame({
+        "title": pd.Series(rng.choice(["CEO", "VP Sales", "Manager", "Analyst"], rows), dtype="string"),
+        "email": pd.Categorical(rng.choice(["a@gmail.com", "b@acme.com"], rows)),
+        "company_size": rng.integers(-10, 3000, rows),
+        "phone": rng.choice(["555", ""], rows),
+    })
+    assert agent.score_leads(df).tolist() == _expected_scores(agent, df)
+    floats = df.assign(company_size=rng.uniform(0, 2000, rows))
+    assert agent.score_leads(floats).tolist() == _expected_scores(agent, floats)
+    strings = df.assign(company_size=rng.choice(["12", " 300 ", "1_000", "12.5", "n/a"], rows))
+    assert agent.score_leads(strings).tolist() == _expected_scores(agent, strings)
+
+
+def test_score_leads_missing_columns_and_empty_frame():
+    agent = LeadIntelligenceAgent()
+    df = pd.DataFrame({"id": [1, 2]})
+    assert agent.score_leads(df).tolist() == [0, 0]
+    assert agent.score_leads(pd.DataFrame()).tolist() == []
+
+
+def test_enrich_leads_matches_enrich_lead(make_leads):
+    agent = LeadIntelligenceAgent()
+    # enrich_lead needs a string email and a numeric company_size
+    leads = [
+        {key: value for key, value in lead.items() if value is not None}
+        for lead in make_leads("intelligence", 1000, seed=9)
+    ]
+    leads = [lead for lead in leads if isinstance(lead.get("email", ""), str)]
+    enriched = agent.enrich_leads(pd.DataFrame(leads).fillna({"company_size": 0, "email": ""}))
+    expected = [agent.enrich_lead(lead) for lead in leads]
+    assert enriched["industry"].tolist() == [lead["industry"] for lead in expected]
+    assert enriched["employee_size"].tolist() == [lead["employee_size"] for lead in expected]
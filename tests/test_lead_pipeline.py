@@ -0,0 +1,51 @@
+"""
+test_lead_pipeline.py
+---------------------
+Checks the fused, column-wise lead pipeline's output layout and the
+/leads/pipeline endpoint (parity with the per-lead chain is in
+test_batch_parity.py).
+"""
+
+import pandas as pd
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import lead_routes
+from app.services.lead_pipeline import OUTPUT_FIELDS, LeadPipeline
+
+
+def test_fused_pipeline_output_shape(make_leads, static_scanner):
+    pipeline = LeadPipeline(scanner=static_scanner)
+    leads = make_leads("pipeline", 300)
+    result = pipeline.run(leads)
+    # Same key order as the per-lead chain, and the input is untouched
+    assert [list(r) for r in result[:50]] == [list(pipeline.run_lead(lead)) for lead in leads[:50]]
+    assert "score" not in leads[0]
+    assert {type(r["score"]) for r in result} == {int}
+    assert {r["market_signal_detected"] for r in result} == {True}
+
+
+def test_run_frame_and_empty_batch(make_leads, static_scanner):
+    pipeline = LeadPipeline(scanner=static_scanner)
+    df = pd.DataFrame(make_leads("pipeline", 200, seed=3))
+    frame = pipeline.run_frame(df)
+    assert set(OUTPUT_FIELDS) <= set(frame.columns)
+    assert "score" not in df.columns
+    assert pipeline.run([]) == []
+
+
+def test_pipeline_endpoint():
+    app = FastAPI()
+    app.include_router(lead_routes.router)
+    client = TestClient(app)
+    leads = [{"id": 1, "title": "CEO", "email": "ceo@software.dev", "company_size": 2000, "phone": "1"},
+             {"id": 2, "email": "x@gmail.com"}]
+    response = client.post("/leads/pipeline", json={"leads": leads})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 2
+    assert body["leads"][0]["score"] == 1
+    assert body["leads"][0]["industry"] == "Technology"
+    assert body["leads"][1]["employee_size"] == "Small Business"
+    assert client.post("/leads/pipeline", json=leads).json()["count"] == 2
+    assert client.post("/leads/pipeline", json={"leads": "nope"}).status_code == 400
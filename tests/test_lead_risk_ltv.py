@@ -0,0 +1,70 @@
+"""
+test_lead_risk_ltv.py
+---------------------
+Checks the column-wise LeadRiskAgent / LtvAgent edge cases (parity with run()
+on generated leads is in test_batch_parity.py), and that lead_store writes
+risk_score and projected_ltv with set-based updates.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from app.agents.lead_risk_agent import LeadRiskAgent
+from app.agents.ltv_agent import LtvAgent
+from app.models.lead import Base
+from app.services.lead_store import bulk_update_leads, update_risk_and_ltv
+
+
+def test_run_frame_accepts_column_dicts():
+    risk, ltv = LeadRiskAgent(), LtvAgent()
+    columns = {"score": [10, 90], "company_size": [3, 4]}
+    assert risk.run_frame(columns).tolist() == [1.0, 0.5]
+    assert ltv.run_frame(columns).tolist() == [300.0, 3600.0]
+
+
+def test_round2_matches_round_at_half_cents():
+    ltv = LtvAgent()
+    # 1000 * size * score / 100 landing on (or next to) half cents
+    sizes = np.array([0.0000125, 0.000002675, 0.00001005, 0.0000101, 0.0000145])
+    df = pd.DataFrame({"company_size": sizes, "score": 100})
+    assert ltv.run_frame(df).tolist() == [ltv.run({"company_size": s, "score": 100}) for s in sizes.tolist()]
+
+
+@pytest.fixture()
+def engine():
+    engine = create_engine("sqlite://")
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO leads (id, name) VALUES " + ", ".join(f"({i}, 'Lead {i}')" for i in range(1, 2501))))
+    statements.clear()
+    engine.statements = statements
+    return engine
+
+
+def test_update_risk_and_ltv_is_set_based(engine, make_leads):
+    leads = make_leads("risk_ltv", 2500)
+    updated = update_risk_and_ltv(engine, pd.DataFrame(leads), chunk_rows=1000)
+    assert updated == 2500
+    # One UPDATE per chunk, none per row
+    assert sum(s.startswith("UPDATE leads SET") for s in engine.statements) == 3
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT id, risk_score, projected_ltv FROM leads ORDER BY id")).all()
+    risk, ltv = LeadRiskAgent(), LtvAgent()
+    assert [r.risk_score for r in rows] == [risk.run(lead) for lead in leads]
+    assert [r.projected_ltv for r in rows] == [ltv.run(lead) for lead in leads]
+
+
+def test_bulk_update_leads_nulls_and_validation(engine):
+    with engine.begin() as conn:
+        assert bulk_update_leads(conn, [1, 2, 9999], {"risk_score": [0.5, np.nan, 1.0]}) == 2
+        row = conn.execute(text("SELECT risk_score, projected_ltv FROM leads WHERE id = 2")).one()
+        assert row.risk_score is None and row.projected_ltv is None
+    assert bulk_update_leads(engine, [], {"risk_score": []}) == 0
+    with pytest.raises(ValueError):
+        bulk_update_leads(engine, [1], {"name": ["x"]})
+    with pytest.raises(ValueError):
+        bulk_update_leads(engine, [1, 2], {"risk_score": [0.1]})
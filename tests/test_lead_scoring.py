@@ -0,0 +1,144 @@
+"""
+test_lead_scoring.py
+--------------------
+Checks that vectorized batch scoring matches the single-lead formula, and that
+/leads/predict/batch accepts JSON, NDJSON, CSV and multipart uploads.
+"""
+
+import json
+import random
+
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import lead_routes
+from app.services.lead_scoring import (
+    STAGE_WEIGHT,
+    INDUSTRY_WEIGHT,
+    classify_score,
+    score_lead,
+    score_leads,
+    parse_batch_summaries,
+)
+
+
+def _random_leads(n, seed=7):
+    rng = random.Random(seed)
+    stages = list(STAGE_WEIGHT) + ["Unknown", "", None]
+    industries = list(INDUSTRY_WEIGHT) + ["Retail", "", None]
+    return [
+        {
+            "lead_name": f"Lead {i}",
+            "company": f"Co {i}",
+            "deal_amount": rng.choice([None, 0, rng.uniform(0, 400000)]),
+            "engagement_score": rng.uniform(0, 100),
+            "industry": rng.choice(industries),
+            "stage": rng.choice(stages),
+        }
+        for i in range(n)
+    ]
+
+
+def test_score_leads_matches_single_lead_formula():
+    leads = _random_leads(2000)
+    scored = score_leads(pd.DataFrame(leads))
+    for lead, score, classification in zip(leads, scored["lead_score"], scored["classification"]):
+        expected = score_lead(lead["deal_amount"], lead["engagement_score"], lead["stage"], lead["industry"])
+        assert score == expected
+        assert classification == classify_score(expected)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    logged = []
+
+    def fake_log_predictions(rows):
+        logged.extend(rows)
+        return len(rows)
+
+    monkeypatch.setattr(lead_routes, "log_predictions", fake_log_predictions)
+    app = FastAPI()
+    app.include_router(lead_routes.router)
+    test_client = TestClient(app)
+    test_client.logged = logged
+    return test_client
+
+
+def _expected(leads):
+    return [
+        round(score_lead(l["deal_amount"], l["engagement_score"], l["stage"], l["industry"]), 2)
+        for l in leads
+    ]
+
+
+def test_batch_endpoint_json_ndjson_csv(client):
+    leads = _random_leads(50)
+    for field in ("industry", "stage"):
+        for lead in leads:
+            lead[field] = lead[field] or "Other"
+    expected = _expected(leads)
+
+    responses = [
+        client.post("/leads/predict/batch", json=leads),
+        client.post(
+            "/leads/predict/batch",
+            content="\n".join(json.dumps(l) for l in leads),
+            headers={"content-type": "application/x-ndjson"},
+        ),
+        client.post(
+            "/leads/predict/batch",
+            files={"file": ("leads.csv", pd.DataFrame(leads).to_csv(index=False), "text/csv")},
+        ),
+    ]
+    for response in responses:
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert body["count"] == 50
+        assert [p["lead_score"] for p in body["predictions"]] == expected
+        assert sum(body["classification_counts"].values()) == 50
+    assert len(client.logged) == 150
+
+
+def test_batch_endpoint_rejects_bad_input(client):
+    response = client.post("/leads/predict/batch", json=[{"lead_name": "x"}])
+    assert response.status_code == 400
+    assert "Missing required fields" in response.json()["detail"]
+
+    lead = dict(_random_leads(1)[0], deal_amount="lots")
+    response = client.post("/leads/predict/batch", json=[lead])
+    assert response.status_code == 400
+
+    for body, content_type in (("5", "application/json"), ("[1, 2]", "application/json"),
+                               ("1\n2", "application/x-ndjson")):
+        response = client.post("/leads/predict/batch", content=body, headers={"content-type": content_type})
+        assert response.status_code == 400, body
+
+
+def test_parse_batch_summaries():
+    assert parse_batch_summaries('Here you go: ["a", "b"]', 2) == ["a", "b"]
+    assert parse_batch_summaries('["a"]', 2) is None
+    assert parse_batch_summaries("no json", 1) is None
+
+
+def test_batch_summaries_bound_concurrency(monkeypatch):
+    import asyncio
+
+    class FakeService:
+        api_key = "test"
+        in_flight = peak = 0
+
+        async def chat_completion(self, messages, **kwargs):
+            FakeService.in_flight += 1
+            FakeService.peak = max(FakeService.peak, FakeService.in_flight)
+            await asyncio.sleep(0.01)
+            FakeService.in_flight -= 1
+            return json.dumps(["ok"] * 2)
+
+    monkeypatch.setattr(lead_routes, "get_openai_service", lambda: FakeService())
+    monkeypatch.setenv("LEAD_SUMMARY_CONCURRENCY", "3")
+    leads = _random_leads(40)
+    summaries = asyncio.run(lead_routes._batch_summaries(leads, [50.0] * 40, batch_size=2))
+    assert summaries == ["ok"] * 40
+    assert FakeService.peak == 3
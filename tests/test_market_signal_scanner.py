@@ -0,0 +1,83 @@
+"""
+test_market_signal_scanner.py
+-----------------------------
+Checks the MarketSignalScanner signal index: the fallback signal matches the
+original nested headline x keyword scan, relevant signals are looked up by
+company/industry token, and headlines are fetched once per TTL window.
+"""
+
+from app.agents.market_signal_scanner import NO_SIGNAL, MarketSignalScanner, SignalIndex, tokenize
+
+
+def legacy_signal(headlines, keywords):
+    for headline in headlines:
+        for keyword in keywords:
+            if keyword.lower() in headline.lower():
+                return headline
+    return NO_SIGNAL
+
+
+class CountingScanner(MarketSignalScanner):
+    def __init__(self, headlines, **kwargs):
+        super().__init__(**kwargs)
+        self.headlines = headlines
+        self.fetches = 0
+
+    def fetch_news_headlines(self):
+        self.fetches += 1
+        return list(self.headlines)
+
+
+def test_fallback_matches_original_scan():
+    scanner = MarketSignalScanner(ttl_seconds=60)
+    expected = legacy_signal(scanner.fetch_news_headlines(), scanner.keywords)
+    lead = scanner.scan_lead({"name": "Jane", "company": "Unrelated Widgets"})
+    assert lead["market_signal"] == expected
+    assert lead["market_signals"] == []
+
+    quiet = CountingScanner(["Markets flat this week."], ttl_seconds=60)
+    assert quiet.scan_lead({"company": "Markets"})["market_signal"] == NO_SIGNAL
+
+
+def test_relevant_signals_by_company_and_industry_tokens():
+    headlines = [
+        "Acme announces layoffs in Europe.",
+        "Globex expands AI partnership with Initech.",
+        "Healthcare M&A activity slows.",
+        "Acme opens new office.",
+    ]
+    index = SignalIndex(headlines, ["AI", "M&A", "layoffs", "partnership"])
+    assert index.matches == [0, 1, 2]
+    assert index.keywords_by_headline[1] == ["AI", "partnership"]
+
+    signals = index.signals_for({"company": "Initech Inc.", "industry": "Healthcare"})
+    assert [s["headline"] for s in signals] == [headlines[1], headlines[2]]
+    # Non-matching headlines are not indexed, and stopwords do not link leads
+    assert index.signals_for({"company": "Acme"})[0]["headline"] == headlines[0]
+    assert len(index.signals_for({"company": "Acme"})) == 1
+    assert index.signals_for({"company": "The Company Inc"}) == []
+    assert tokenize("AT&T Corp.") == ["at&t"]
+
+
+def test_headlines_fetched_once_per_ttl_window():
+    scanner = CountingScanner(["Acme layoffs announced.", "Globex fundraising round."], ttl_seconds=3600)
+    leads = [{"company": "Acme"}, {"company": "Globex"}, {"company": "Other"}] * 50
+    scanned = scanner.scan_leads(leads)
+    scanner.scan_lead({"company": "Acme"})
+    assert scanner.fetches == 1
+    assert [lead["market_signal"] for lead in scanned[:3]] == [
+        "Acme layoffs announced.", "Globex fundraising round.", "Acme layoffs announced."
+    ]
+    assert "market_signal" not in leads[0]
+
+    scanner.keywords.append("round")
+    scanner.scan_lead({})
+    assert scanner.fetches == 2
+    scanner.invalidate()
+    scanner.scan_lead({})
+    assert scanner.fetches == 3
+
+    expiring = CountingScanner(["AI news."], ttl_seconds=0)
+    expiring.scan_leads([{}])
+    expiring.scan_leads([{}])
+    assert expiring.fetches == 2
@@ -0,0 +1,138 @@
+"""
+test_news_feed.py
+-----------------
+Checks the cached news feed: file-backed and HTTP sources, conditional
+requests (ETag / If-Modified-Since), deduplication, incremental merges,
+the TTL, and that MarketSignalScanner reads only the cached snapshot.
+"""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.agents.market_signal_scanner import MarketSignalScanner
+from app.services.news_feed import FileFeedSource, HttpFeedSource, NewsFeed, parse_feed
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0"><channel>
+  <item><title>Acme announces layoffs</title><link>https://news.test/1</link><pubDate>Mon, 05 May 2025 10:00:00 GMT</pubDate></item>
+  <item><title>Globex AI partnership</title><link>https://news.test/2</link></item>
+</channel></rss>"""
+
+
+class FeedServer:
+    def __init__(self):
+        self.body = json.dumps({"articles": [{"title": "Initech fundraising round", "url": "https://news.test/3"}]})
+        self.etag = '"v1"'
+        self.requests = []
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                outer.requests.append(dict(self.headers))
+                if self.headers.get("If-None-Match") == outer.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = outer.body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("ETag", outer.etag)
+                self.send_header("Last-Modified", "Mon, 05 May 2025 10:00:00 GMT")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/feed"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def feed_server():
+    server = FeedServer()
+    yield server
+    server.server.shutdown()
+
+
+def test_parse_formats():
+    assert [i["title"] for i in parse_feed(RSS, "feed.xml")] == ["Acme announces layoffs", "Globex AI partnership"]
+    assert parse_feed(RSS)[0]["url"] == "https://news.test/1"
+    assert parse_feed('["One", {"title": "Two", "link": "u"}]') == [
+        {"title": "One", "url": None, "published": None},
+        {"title": "Two", "url": "u", "published": None},
+    ]
+    assert [i["title"] for i in parse_feed("First\n\n Second \n", "feed.txt")] == ["First", "Second"]
+
+
+def test_file_source_incremental_and_dedup(tmp_path):
+    path = tmp_path / "headlines.txt"
+    path.write_text("Acme announces layoffs\nGlobex AI partnership\n")
+    feed = NewsFeed([FileFeedSource(str(path))], str(tmp_path / "cache" / "feed.json"), ttl_seconds=3600)
+
+    assert feed.refresh_sync()["new_items"] == 2
+    assert feed.headlines() == ["Acme announces layoffs", "Globex AI partnership"]
+    # Within the TTL nothing is fetched; a forced refresh of an unchanged file is not-modified
+    assert feed.refresh_sync() == {"refreshed": False, "new_items": 0}
+    assert feed.refresh_sync(force=True)["new_items"] == 0
+    assert feed.stats["not_modified"] == 1
+
+    # Only new headlines are added; a re-punctuated duplicate is dropped
+    path.write_text("Acme announces layoffs\nGLOBEX: AI partnership!\nInitech expansion plans\n")
+    os.utime(path, ns=(1, 10 ** 18))
+    assert feed.refresh_sync(force=True)["new_items"] == 1
+    assert feed.headlines() == ["Initech expansion plans", "Acme announces layoffs", "Globex AI partnership"]
+
+    # The snapshot survives a new process-level NewsFeed instance
+    reopened = NewsFeed([FileFeedSource(str(path))], feed.cache_path, ttl_seconds=3600)
+    assert reopened.headlines() == feed.headlines()
+    assert reopened.refresh_sync() == {"refreshed": False, "new_items": 0}
+
+
+def test_http_source_conditional_requests(feed_server, tmp_path):
+    # Nothing listens on the discard port, so this source fails every refresh
+    bad = HttpFeedSource("http://127.0.0.1:9/feed", name="broken")
+    feed = NewsFeed([HttpFeedSource(feed_server.url), bad], str(tmp_path / "feed.json"), ttl_seconds=0, max_items=2)
+    result = feed.refresh_sync()
+    assert result["new_items"] == 1 and len(result["errors"]) == 1
+    assert feed.refresh_sync()["new_items"] == 0
+    assert feed_server.requests[-1]["If-None-Match"] == '"v1"'
+    assert feed_server.requests[-1]["If-Modified-Since"] == "Mon, 05 May 2025 10:00:00 GMT"
+    assert feed.stats["not_modified"] == 1
+
+    feed_server.etag = '"v2"'
+    feed_server.body = json.dumps([{"title": "Hooli M&A deal"}, {"title": "Umbrella layoffs"}])
+    assert feed.refresh_sync()["new_items"] == 2
+    # max_items keeps the newest headlines
+    assert feed.headlines() == ["Hooli M&A deal", "Umbrella layoffs"]
+
+    # An evicted headline is still remembered and does not come back as new
+    feed_server.etag = '"v3"'
+    feed_server.body = json.dumps([{"title": "Initech fundraising round", "url": "https://news.test/3"}])
+    assert feed.refresh_sync()["new_items"] == 0
+    assert feed.headlines() == ["Hooli M&A deal", "Umbrella layoffs"]
+    snapshot = feed.load_snapshot()
+    assert len(snapshot["seen_keys"]) == 3 and snapshot["seen_urls"] == ["https://news.test/3"]
+    assert snapshot["refreshed_at_iso"].endswith("Z")
+
+
+def test_scanner_reads_cached_snapshot_only(tmp_path):
+    path = tmp_path / "feed.xml"
+    path.write_text(RSS)
+    feed = NewsFeed([FileFeedSource(str(path))], str(tmp_path / "feed.json"), ttl_seconds=3600)
+    scanner = MarketSignalScanner(ttl_seconds=3600, feed=feed)
+
+    # Nothing cached yet: scanning does not fetch the feed
+    assert scanner.scan_lead({"company": "Acme"})["market_signal"] == "No significant signals detected."
+    assert feed.stats["refreshes"] == 0
+
+    feed.refresh_sync()
+    lead = scanner.scan_lead({"company": "Globex"})
+    assert lead["market_signal"] == "Globex AI partnership"
+    assert [s["headline"] for s in scanner.scan_leads([{"company": "Acme"}])[0]["market_signals"]] == ["Acme announces layoffs"]
@@ -0,0 +1,144 @@
+"""
+test_openai_service.py
+----------------------
+Tests for the async OpenAI service layer: calls are awaited without blocking
+the event loop, share one pooled client, and repeated prompts are served
+from the response cache.
+"""
+
+import time
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.llm_cache import LLMResponseCache, make_cache_key
+from app.services.openai_service import OpenAIService
+
+
+def _completion(content):
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+    }
+
+
+def _service(delay=0.0, calls=None, cache=None):
+    async def handler(request):
+        if calls is not None:
+            calls.append(request)
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json=_completion("ok"))
+
+    return OpenAIService(
+        api_key="test-key",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        cache=cache or LLMResponseCache(),
+    )
+
+
+def test_chat_completion_returns_content():
+    calls = []
+    service = _service(calls=calls)
+    result = asyncio.run(service.chat_completion([{"role": "user", "content": "hi"}], max_tokens=5))
+    assert result == "ok"
+    assert calls[0].headers["authorization"] == "Bearer test-key"
+
+
+def test_concurrent_calls_do_not_serialize():
+    service = _service(delay=0.2)
+
+    async def run_many():
+        return await asyncio.gather(*[service.ask_gpt(f"prompt {i}") for i in range(20)])
+
+    start = time.perf_counter()
+    results = asyncio.run(run_many())
+    assert results == ["ok"] * 20
+    assert time.perf_counter() - start < 1.0
+
+
+def test_missing_api_key_raises(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    with pytest.raises(ValueError):
+        asyncio.run(OpenAIService().generate_completion("hi"))
+
+
+def test_repeated_prompt_is_served_from_cache():
+    calls = []
+    service = _service(calls=calls)
+    messages = [{"role": "user", "content": "score this lead"}]
+
+    async def run_twice():
+        first = await service.chat_completion(messages, agent="lead_score", max_tokens=300)
+        second = await service.chat_completion(messages, agent="lead_score", max_tokens=300)
+        return first, second
+
+    assert asyncio.run(run_twice()) == ("ok", "ok")
+    assert len(calls) == 1
+    assert service.cache.metrics()["memory_hits"] == 1
+
+
+def test_cache_key_normalization():
+    messages = [{"role": "user", "content": "  hello "}]
+    assert make_cache_key("gpt-4", messages, {"max_tokens": 5, "temperature": None}) == \
+        make_cache_key("gpt-4", [{"role": "user", "content": "hello"}], {"max_tokens": 5})
+    assert make_cache_key("gpt-4", messages, {"max_tokens": 5}) != make_cache_key("gpt-4", messages, {"max_tokens": 6})
+
+
+def test_cache_ttl_lru_and_sqlite_tier(tmp_path):
+    cache = LLMResponseCache(max_entries=2, sqlite_path=str(tmp_path / "llm_cache.sqlite"))
+    cache.set("a", "A", ttl=60)
+    cache.set("b", "B", ttl=60)
+    cache.set("c", "C", ttl=60)
+    assert cache.metrics()["evictions"] == 1
+    # "a" was evicted from memory but is still on disk
+    assert cache.get("a") == "A"
+    assert cache.metrics()["disk_hits"] == 1
+
+    cache.set("expired", "X", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("expired") is None
+
+    # A new process sees entries written by another one
+    assert LLMResponseCache(sqlite_path=str(tmp_path / "llm_cache.sqlite")).get("b") == "B"
+
+
+def test_client_is_rebuilt_per_loop_and_old_pool_closed(monkeypatch):
+    pools = []
+
+    def factory():
+        async def handler(request):
+            return httpx.Response(200, json=_completion("ok"))
+
+        pools.append(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        return pools[-1]
+
+    service = OpenAIService(http_client=factory, cache=LLMResponseCache())
+    monkeypatch.setenv("OPENAI_API_KEY", "first-key")
+    assert asyncio.run(service.ask_gpt("one")) == "ok"
+
+    async def rotate_key():
+        await service.ask_gpt("two")
+        monkeypatch.setenv("OPENAI_API_KEY", "second-key")
+        return await service.ask_gpt("three")
+
+    assert asyncio.run(rotate_key()) == "ok"
+    # The first loop's pool is closed; the key change reused the second loop's pool
+    assert len(pools) == 2
+    assert pools[0].is_closed and not pools[1].is_closed
+
+    shared = _service()
+    asyncio.run(shared.ask_gpt("one"))
+    with pytest.raises(RuntimeError):
+        asyncio.run(shared.ask_gpt("two"))
+
+
+def test_cache_hit_does_not_need_api_key(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    cache = LLMResponseCache()
+    messages = [{"role": "user", "content": "hi"}]
+    cache.set(make_cache_key("gpt-4", messages, {}), "cached", ttl=60)
+    assert asyncio.run(OpenAIService(cache=cache).chat_completion(messages)) == "cached"
@@ -0,0 +1,96 @@
+"""
+test_pipeline_log.py
+--------------------
+Tests for the buffered pipeline log writer in etl/pipeline_log.py:
+batching, CSV compatibility, rotation and reading logs back.
+"""
+
+import gzip
+
+import pytest
+
+from etl import pipeline_log
+from etl.pipeline_log import PipelineLog, get_log, query_log
+
+FIELDS = ["timestamp", "source", "status_code"]
+
+
+def test_records_are_buffered_until_flush(tmp_path):
+    log = PipelineLog("webhook_log", FIELDS, str(tmp_path), buffer_size=100)
+    log.write({"source": "stripe", "status_code": 200})
+    log.write({"source": "zapier", "status_code": 500})
+    assert not (tmp_path / "webhook_log.csv").exists()
+
+    log.flush()
+    lines = (tmp_path / "webhook_log.csv").read_text().splitlines()
+    assert lines[0] == "timestamp,source,status_code"
+    assert [line.split(",")[1:] for line in lines[1:]] == [["stripe", "200"], ["zapier", "500"]]
+
+
+def test_full_buffer_forces_flush(tmp_path):
+    log = PipelineLog("connector_log", FIELDS, str(tmp_path), buffer_size=3)
+    for _ in range(3):
+        log.write({"source": "hubspot", "status_code": 200})
+    assert len((tmp_path / "connector_log.csv").read_text().splitlines()) == 4
+
+
+def test_size_rotation_and_query_across_files(tmp_path):
+    log = get_log("rotating_log", FIELDS, str(tmp_path), buffer_size=1, max_bytes=64)
+    for i in range(10):
+        log.write({"source": f"s{i}", "status_code": 200 + i})
+
+    assert len(log.files()) > 1
+    records = list(query_log("rotating_log", str(tmp_path)))
+    assert [r["source"] for r in records] == [f"s{i}" for i in range(10)]
+    assert [r["source"] for r in query_log("rotating_log", str(tmp_path), where={"status_code": 205})] == ["s5"]
+    assert len(list(query_log("rotating_log", str(tmp_path), limit=3))) == 3
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "ndjson.gz"])
+def test_ndjson_formats_round_trip(tmp_path, fmt):
+    log = PipelineLog("events", FIELDS, str(tmp_path), fmt=fmt, buffer_size=100)
+    log.write({"source": "stripe", "status_code": 200})
+    log.flush()
+    log.write({"source": "stripe", "status_code": 400})
+    log.flush()
+
+    if fmt == "ndjson.gz":
+        with gzip.open(log.path, "rt") as f:
+            assert len(f.read().splitlines()) == 2
+    records = list(query_log("events", str(tmp_path)))
+    assert [r["status_code"] for r in records] == [200, 400]
+
+
+def test_flush_all_writes_registered_logs(tmp_path):
+    log = get_log("shutdown_log", FIELDS, str(tmp_path))
+    log.write({"source": "zapier", "status_code": 200})
+    pipeline_log.flush_all()
+    assert (tmp_path / "shutdown_log.csv").exists()
+
+
+def test_failing_flushes_keep_at_most_max_pending(tmp_path):
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    log = PipelineLog("stuck_log", FIELDS, str(blocker), buffer_size=2, max_pending=5)
+    for i in range(12):
+        log.write({"source": f"s{i}", "status_code": 200})
+    assert len(log._buffer) == 5 and log.dropped == 7
+    assert [r["source"] for r in log._buffer] == [f"s{i}" for i in range(7, 12)]
+
+
+def test_query_log_compares_timestamps_in_utc(tmp_path):
+    log = PipelineLog("tz_log", FIELDS, str(tmp_path), fmt="ndjson", buffer_size=100)
+    log.write({"timestamp": "2025-05-05T09:00:00", "source": "naive"})
+    log.write({"timestamp": "2025-05-05T11:30:00+02:00", "source": "offset"})
+    log.write({"timestamp": "2025-05-05T10:00:00Z", "source": "zulu"})
+    log.write({"timestamp": "not a time", "source": "garbage"})
+    log.write({"source": "stamped"})
+    log.flush()
+
+    window = query_log("tz_log", str(tmp_path), since="2025-05-05T09:30:00Z", until="2025-05-05T10:00:00+00:00")
+    assert [r["source"] for r in window] == ["offset"]
+    later = query_log("tz_log", str(tmp_path), since="2025-05-05T10:00:00")
+    assert [r["source"] for r in later] == ["zulu", "stamped"]
+    assert list(query_log("tz_log", str(tmp_path)))[-1]["timestamp"].endswith("+00:00")
+    with pytest.raises(ValueError):
+        list(query_log("tz_log", str(tmp_path), since="yesterday"))
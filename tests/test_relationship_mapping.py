@@ -0,0 +1,120 @@
+"""
+test_relationship_mapping.py
+----------------------------
+Checks the inverted-index RelationshipMappingAgent against the original
+pairwise comparison, with and without a per-lead connection cap.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from app.agents.relationship_mapping_agent import RelationshipIndex, RelationshipMappingAgent
+
+
+def legacy_relationships(leads_list):
+    # The O(n^2) implementation the index replaces
+    relationships = {}
+    for lead in leads_list:
+        lead_id = lead.get("id")
+        connections = []
+        for other_lead in leads_list:
+            if other_lead["id"] != lead_id and (
+                lead.get("industry") == other_lead.get("industry")
+                or lead.get("location") == other_lead.get("location")
+            ):
+                connections.append(other_lead["id"])
+        relationships[lead_id] = {"connections": connections}
+    return relationships
+
+
+def _random_leads(n, seed=4, duplicate_ids=False):
+    rng = random.Random(seed)
+    leads = []
+    for i in range(n):
+        lead = {"id": rng.randrange(n // 2) if duplicate_ids else f"lead-{i}"}
+        if rng.random() < 0.9:
+            lead["industry"] = rng.choice(["SaaS", "Retail", "Fintech", "Health", None])
+        if rng.random() < 0.9:
+            lead["location"] = rng.choice(["NYC", "SF", "Austin", "Berlin", "Paris", "Tokyo"])
+        leads.append(lead)
+    return leads
+
+
+def _lists_from_csr(index, indptr, indices):
+    return [[index.lead_ids[j] for j in indices[indptr[i]:indptr[i + 1]]] for i in range(len(index))]
+
+
+@pytest.mark.parametrize("duplicate_ids", [False, True])
+def test_csr_matches_pairwise_connections(duplicate_ids):
+    leads = _random_leads(300, duplicate_ids=duplicate_ids)
+    index = RelationshipIndex(leads)
+    # The legacy dict keeps only one entry per id, so compare position by position
+    expected = []
+    for lead in leads:
+        expected.append([
+            other["id"] for other in leads
+            if other["id"] != lead["id"] and (
+                lead.get("industry") == other.get("industry") or lead.get("location") == other.get("location")
+            )
+        ])
+    indptr, indices = index.to_csr()
+    assert _lists_from_csr(index, indptr, indices) == expected
+    assert index.degree().tolist() == [len(c) for c in expected]
+    for cap in (0, 1, 5, 40):
+        indptr, indices = index.to_csr(cap)
+        assert _lists_from_csr(index, indptr, indices) == [c[:cap] for c in expected]
+        assert index.degree(cap).tolist() == [min(len(c), cap) for c in expected]
+    for position in (0, 17, 299):
+        assert [index.lead_ids[j] for j in index.neighbors(position, 3)] == expected[position][:3]
+
+
+def test_run_returns_group_membership():
+    leads = _random_leads(120, seed=8)
+    legacy = legacy_relationships(leads)
+    result = RelationshipMappingAgent().run(leads)
+    assert "adjacency" not in result
+    assert result["lead_ids"] == [lead["id"] for lead in leads]
+    for field in ("industry", "location"):
+        groups, codes = result["groups"][field], result["membership"][field]
+        for i, lead in enumerate(leads):
+            members = groups["indices"][groups["indptr"][codes[i]]:groups["indptr"][codes[i] + 1]]
+            assert i in members
+            assert groups["values"][codes[i]] == lead.get(field)
+    assert result["degree"] == [len(legacy[lead["id"]]["connections"]) for lead in leads]
+
+    capped = RelationshipMappingAgent().run(leads, max_connections=3)
+    adjacency = capped["adjacency"]
+    for i, lead in enumerate(leads):
+        ids = [leads[j]["id"] for j in adjacency["indices"][adjacency["indptr"][i]:adjacency["indptr"][i + 1]]]
+        assert ids == legacy[lead["id"]]["connections"][:3]
+
+
+def test_connections_and_custom_fields():
+    leads = [
+        {"id": 1, "industry": "SaaS", "location": "NYC", "domain": "a.com"},
+        {"id": 2, "industry": "Retail", "location": "SF", "domain": "a.com"},
+        {"id": 3, "industry": "SaaS", "location": "LA", "domain": "b.com"},
+    ]
+    index = RelationshipMappingAgent(fields=("domain",)).build_index(leads)
+    assert index.connections(1) == [2]
+    assert index.connections(3) == []
+    assert RelationshipIndex([]).to_csr()[0].tolist() == [0]
+    assert np.array_equal(RelationshipIndex(leads).degree(), [1, 0, 1])
+
+
+def test_nan_matches_nothing_but_none_matches_none():
+    leads = [
+        {"id": "a", "industry": float("nan"), "location": "NYC"},
+        {"id": "b", "industry": float("nan"), "location": "SF"},
+        {"id": "c", "industry": None, "location": "Austin"},
+        {"id": "d", "location": "Berlin"},
+        {"id": "e", "industry": np.nan, "location": "NYC"},
+    ]
+    legacy = legacy_relationships(leads)
+    index = RelationshipIndex(leads)
+    assert [index.connections(lead["id"]) for lead in leads] == [legacy[lead["id"]]["connections"] for lead in leads]
+    assert index.connections("c") == ["d"] and index.connections("b") == []
+    indptr, indices = index.to_csr()
+    assert _lists_from_csr(index, indptr, indices) == [legacy[lead["id"]]["connections"] for lead in leads]
@@ -0,0 +1,186 @@
+"""
+test_rule_engine.py
+-------------------
+Checks that the vectorized rule engine reproduces the original row-by-row
+/optimize scoring, that top-k selection (in memory and across chunks) matches
+a stable sort, and that the Flask /optimize endpoint returns leads best first
+or streams them as NDJSON/CSV.
+"""
+
+import io
+import json
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.rule_engine import Rule, RuleEngine, TopKRows, get_lead_scoring_engine, score_chunks, top_k_indices
+
+
+def legacy_score_lead(row):
+    # The row-wise scoring function /optimize used before the rule engine
+    score = 0
+    if row.get("Lead Source") == "Organic Search":
+        score += 20
+    if row.get("Lead Source") == "Direct Traffic":
+        score += 15
+    if row.get("Lead Source") == "Olark Chat":
+        score += 10
+    for field, threshold, points in (
+        ("TotalVisits", 3, 10),
+        ("Total Time Spent on Website", 300, 15),
+        ("Asymmetrique Activity Score", 15, 10),
+        ("Asymmetrique Profile Score", 15, 10),
+    ):
+        try:
+            if float(row.get(field, 0)) > threshold:
+                score += points
+        except Exception:
+            pass
+    if row.get("Lead Profile") == "Potential Lead":
+        score += 25
+    if row.get("Last Notable Activity") == "Email Opened":
+        score += 15
+    return score
+
+
+def _random_leads(n, seed=11):
+    rng = random.Random(seed)
+    sources = ["Organic Search", "Direct Traffic", "Olark Chat", "Google", "", None]
+    numbers = [0, 2, 3, 3.5, 4, 250, 300, 301.0, 14, 15, 16, "7", "abc", None, float("nan")]
+    return pd.DataFrame({
+        "Lead Source": [rng.choice(sources) for _ in range(n)],
+        "TotalVisits": [rng.choice(numbers) for _ in range(n)],
+        "Total Time Spent on Website": [rng.choice(numbers) for _ in range(n)],
+        "Lead Profile": [rng.choice(["Potential Lead", "Other Leads", None]) for _ in range(n)],
+        "Asymmetrique Activity Score": [rng.choice(numbers) for _ in range(n)],
+        "Last Notable Activity": [rng.choice(["Email Opened", "Modified", None]) for _ in range(n)],
+    })
+
+
+def test_engine_matches_legacy_row_scoring():
+    # Asymmetrique Profile Score is deliberately missing
+    df = _random_leads(2000)
+    expected = df.apply(legacy_score_lead, axis=1).to_numpy()
+    engine = get_lead_scoring_engine()
+    assert np.array_equal(engine.score(df), expected)
+    assert [engine.score_row(row) for _, row in df.iterrows()] == list(expected)
+
+
+def test_engine_handles_csv_dtypes():
+    df = _random_leads(500)
+    parsed = pd.read_csv(io.StringIO(df.to_csv(index=False)))
+    expected = parsed.apply(legacy_score_lead, axis=1).to_numpy()
+    assert np.array_equal(get_lead_scoring_engine().score(parsed), expected)
+    as_category = parsed.astype({"Lead Source": "category"})
+    assert np.array_equal(get_lead_scoring_engine().score(as_category), expected)
+
+
+def test_tiered_thresholds_and_in_rules():
+    engine = RuleEngine([
+        Rule("x", "gt", 10, 1),
+        Rule("x", "ge", 10, 2),
+        Rule("x", "gt", 100, 4),
+        Rule("y", "lt", 0, 8),
+        Rule("y", "le", 0, 16),
+        Rule("tier", "in", ["gold", "silver"], 32),
+        Rule("tier", "eq", "gold", 64),
+    ])
+    df = pd.DataFrame({
+        "x": [5, 10, 11, 101, None],
+        "y": [-1, 0, 1, "bad", 0],
+        "tier": ["gold", "silver", "bronze", None, "gold"],
+    })
+    expected = [engine.score_row(row) for row in df.to_dict(orient="records")]
+    assert engine.score(df).tolist() == expected == [24 + 96, 2 + 16 + 32, 3, 7, 16 + 96]
+
+
+def test_unknown_operator_rejected():
+    with pytest.raises(ValueError):
+        Rule("x", "between", (1, 2), 1)
+
+
+@pytest.mark.parametrize("k", [None, 0, 1, 5, 37, 100, 1000])
+def test_top_k_matches_stable_sort(k):
+    scores = np.random.default_rng(3).integers(0, 12, size=400)
+    full = np.argsort(-scores, kind="stable")
+    expected = full if k is None else full[:k]
+    assert top_k_indices(scores, k).tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize("k,chunksize", [(1, 7), (25, 10), (25, 1000), (0, 50), (500, 33)])
+def test_top_k_rows_across_chunks(k, chunksize):
+    df = _random_leads(300, seed=9)
+    raw = df.to_csv(index=False)
+    expected = pd.read_csv(io.StringIO(raw))
+    expected["Score"] = get_lead_scoring_engine().score(expected)
+    expected = expected.take(top_k_indices(expected["Score"].to_numpy(), k)).reset_index(drop=True)
+
+    best = TopKRows(k)
+    for chunk in score_chunks(pd.read_csv(io.StringIO(raw), chunksize=chunksize), get_lead_scoring_engine()):
+        best.push(chunk)
+    assert best.rows_seen == 300
+    result = best.result()
+    assert result["Score"].tolist() == expected["Score"].tolist()
+    assert result["Lead Source"].fillna("").tolist() == expected["Lead Source"].fillna("").tolist()
+
+
+@pytest.fixture
+def client():
+    backend_server = pytest.importorskip("backend_server")
+    backend_server.app.config["TESTING"] = True
+    return backend_server.app.test_client()
+
+
+def test_optimize_endpoint_json_and_csv(client):
+    df = _random_leads(60, seed=5).fillna({"Lead Source": "Google"})
+    leads = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    expected = pd.DataFrame(leads).apply(legacy_score_lead, axis=1)
+    best_first = sorted(expected.tolist(), reverse=True)
+
+    response = client.post("/optimize", json=leads)
+    assert response.status_code == 200
+    assert [row["Score"] for row in response.get_json()] == best_first
+
+    response = client.post("/optimize?top_k=5", json=leads)
+    assert [row["Score"] for row in response.get_json()] == best_first[:5]
+
+    csv_bytes = pd.DataFrame(leads).to_csv(index=False).encode()
+    response = client.post(
+        "/optimize?top_k=10",
+        data={"file": (io.BytesIO(csv_bytes), "leads.csv")},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 200
+    assert [row["Score"] for row in response.get_json()] == best_first[:10]
+
+
+def test_optimize_endpoint_streams_chunks(client):
+    df = _random_leads(120, seed=21)
+    csv_bytes = df.to_csv(index=False).encode()
+    expected = pd.read_csv(io.BytesIO(csv_bytes)).apply(legacy_score_lead, axis=1).tolist()
+
+    def upload(query):
+        return client.post(
+            f"/optimize?{query}",
+            data={"file": (io.BytesIO(csv_bytes), "leads.csv")},
+            content_type="multipart/form-data",
+        )
+
+    response = upload("format=ndjson&chunksize=25")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row["Score"] for row in rows] == expected
+
+    response = upload("format=csv&chunksize=25")
+    assert response.mimetype == "text/csv"
+    streamed = pd.read_csv(io.StringIO(response.get_data(as_text=True)))
+    assert streamed["Score"].tolist() == expected
+    assert len(streamed.columns) == len(df.columns) + 1
+
+    response = upload("top_k=7&chunksize=10")
+    assert [row["Score"] for row in response.get_json()] == sorted(expected, reverse=True)[:7]
+
+    assert upload("format=xml").status_code == 400
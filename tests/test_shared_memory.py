@@ -0,0 +1,95 @@
+"""
+test_shared_memory.py
+---------------------
+Checks the SQLite-backed SharedMemory used by the Harmony Engine agents:
+writes no longer deadlock, list keys append, the hot-key cache follows
+writes made by other processes, and get_context stays bounded.
+"""
+
+import importlib.util
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+# app/agents/insight_agent.py shadows the insight_agent directory as a package,
+# so the module is loaded from its file
+_PATH = os.path.join(os.path.dirname(__file__), "..", "app", "agents", "insight_agent", "shared_memory.py")
+_spec = importlib.util.spec_from_file_location("harmony_shared_memory", _PATH)
+shared_memory = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(shared_memory)
+SharedMemory = shared_memory.SharedMemory
+
+
+@pytest.fixture()
+def memory(tmp_path):
+    return SharedMemory(str(tmp_path / "memory.sqlite3"))
+
+
+def test_write_and_read_do_not_deadlock(memory):
+    done = threading.Event()
+
+    def write():
+        memory.write_memory("eda_sense", "Sensed data")
+        memory.write_memory("metadata", {"dataset": "leads.csv"})
+        done.set()
+
+    threading.Thread(target=write, daemon=True).start()
+    assert done.wait(5), "write_memory deadlocked"
+    data = memory.read_memory()
+    assert data["eda_sense"] == "Sensed data"
+    assert data["metadata"] == {"dataset": "leads.csv"}
+    assert data["decisions"] == [] and data["logs"] == []
+    assert memory.get_memory("missing", "fallback") == "fallback"
+
+
+def test_one_instance_per_path(tmp_path, memory):
+    assert SharedMemory(memory.path) is memory
+    assert SharedMemory(str(tmp_path / "other.sqlite3")) is not memory
+
+
+def test_lists_append_and_context(memory):
+    memory.write_memory("decisions", [{"step": 1}])
+    memory.append_memory("decisions", {"step": 2})
+    memory.append_memory("insights", "churn is seasonal")
+    for i in range(150):
+        memory.append_memory("logs", f"log {i}")
+    context = memory.get_context()
+    assert context["last_decision"] == {"step": 2}
+    assert context["last_insight"] == "churn is seasonal"
+    assert context["logs"] == [f"log {i}" for i in range(50, 150)]
+    assert memory.get_context(log_limit=2)["logs"] == ["log 148", "log 149"]
+    assert len(memory.read_memory()["logs"]) == 150
+    # Writing a list replaces it
+    memory.write_memory("decisions", [])
+    assert memory.get_context()["last_decision"] is None
+    memory.write_memory("metadata", {"a": 1})
+    with pytest.raises(ValueError):
+        memory.append_memory("metadata", 2)
+
+
+def _append_logs(path, worker, count):
+    memory = SharedMemory(path)
+    for i in range(count):
+        memory.append_memory("logs", f"{worker}:{i}")
+    memory.write_memory(f"worker_{worker}", "done")
+
+
+def test_cache_follows_other_processes(memory):
+    memory.append_memory("logs", "parent")
+    assert memory.get_context()["logs"] == ["parent"]
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_append_logs, args=(memory.path, w, 50)) for w in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+    logs = memory.get_context(log_limit=1000)["logs"]
+    assert len(logs) == 151 and logs[0] == "parent"
+    for w in range(3):
+        # Each worker's appends stay in order
+        assert [log for log in logs if log.startswith(f"{w}:")] == [f"{w}:{i}" for i in range(50)]
+        assert memory.get_memory(f"worker_{w}") == "done"
+    assert memory.read_memory()["logs"] == logs
@@ -0,0 +1,58 @@
+"""
+test_single_flight.py
+---------------------
+Tests for request coalescing: concurrent identical requests share one execution.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight, request_fingerprint
+
+
+def test_concurrent_identical_calls_execute_once():
+    flight = SingleFlight()
+    executions = []
+
+    async def work():
+        executions.append(1)
+        await asyncio.sleep(0.05)
+        return {"analysis": "ok"}
+
+    async def run():
+        key = request_fingerprint("lead_score", {"email": "a@b.com"})
+        return await asyncio.gather(*[flight.do(key, work) for _ in range(10)])
+
+    results = asyncio.run(run())
+    assert len(executions) == 1
+    assert results == [{"analysis": "ok"}] * 10
+    # Callers get independent copies
+    assert results[0] is not results[1]
+    metrics = flight.metrics()
+    assert metrics["by_namespace"]["lead_score"] == {"executions": 1, "coalesced": 9}
+    assert metrics["in_flight"] == 0
+
+
+def test_sequential_calls_are_not_coalesced_and_errors_propagate():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        key = request_fingerprint("insight", {"query": "q"})
+        outcomes = await asyncio.gather(flight.do(key, fail), flight.do(key, fail), return_exceptions=True)
+        with pytest.raises(ValueError):
+            await flight.do(key, fail)
+        return outcomes
+
+    outcomes = asyncio.run(run())
+    assert all(isinstance(o, ValueError) for o in outcomes)
+    assert flight.metrics()["by_namespace"]["insight"] == {"executions": 2, "coalesced": 1}
+
+
+def test_fingerprint_ignores_key_order_and_whitespace():
+    assert request_fingerprint("insight", {"a": 1, "b": " x "}) == request_fingerprint("insight", {"b": "x", "a": 1})
+    assert request_fingerprint("insight", {"a": 1}) != request_fingerprint("ltv", {"a": 1})
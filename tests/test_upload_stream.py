@@ -0,0 +1,94 @@
+"""
+test_upload_stream.py
+---------------------
+Tests for single-pass upload handling: hashing, byte counts, incremental CSV
+sniffing across chunk boundaries, atomic commit and deduplicated re-uploads.
+"""
+
+import hashlib
+import io
+
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services import job_service, dataset_registry
+from app.services.dataset_registry import DatasetRegistry
+from app.services.job_service import JobManager, JobStore
+from app.services.upload_stream import StreamingUpload
+from app.routes import dataset_routes
+
+CSV = (
+    'name,notes,amount\n'
+    'Alice,"multi\nline ""quoted"" note",10\n'
+    'Bob,plain,20\n'
+    'Carol,"comma, inside",30'
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 1 << 20])
+def test_streaming_metadata_matches_full_parse(tmp_path, chunk_size):
+    data = CSV.encode()
+    upload = StreamingUpload(str(tmp_path), "csv")
+    for start in range(0, len(data), chunk_size):
+        upload.write(data[start:start + chunk_size])
+    metadata = upload.finish()
+
+    expected = pd.read_csv(io.BytesIO(data))
+    assert metadata["rows"] == len(expected)
+    assert metadata["columns"] == list(expected.columns)
+    assert metadata["delimiter"] == ","
+    assert metadata["size_bytes"] == len(data)
+    assert metadata["content_hash"] == hashlib.sha256(data).hexdigest()
+
+    final = upload.commit(str(tmp_path / "people.csv"))
+    assert open(final, "rb").read() == data
+    assert [p.name for p in tmp_path.iterdir()] == ["people.csv"]
+
+
+def test_semicolon_delimiter_and_abort(tmp_path):
+    upload = StreamingUpload(str(tmp_path), "csv")
+    upload.write(b"a;b;c\n1;2;3\n4;5;6\n")
+    assert upload.finish()["columns"] == ["a", "b", "c"]
+    upload.abort()
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")), executor="thread")
+    monkeypatch.setattr(job_service, "_manager", manager)
+    monkeypatch.setattr(dataset_registry, "_registry", DatasetRegistry(str(tmp_path / "datasets.sqlite3")))
+    app = FastAPI()
+    app.include_router(dataset_routes.router, prefix="/datasets")
+    with TestClient(app) as test_client:
+        yield test_client
+    manager.shutdown()
+
+
+def test_reupload_is_deduplicated_by_hash(client):
+    first = client.post("/datasets/upload_dataset", files={"file": ("People.csv", CSV)}).json()
+    assert first["rows"] == 3 and first["deduplicated"] is False
+    again = client.post("/datasets/upload_dataset", files={"file": ("People.csv", CSV)}).json()
+    assert again["deduplicated"] is True
+    assert again["version_id"] == first["version_id"]
+
+    changed = client.post("/datasets/upload_dataset", files={"file": ("People.csv", CSV + "\nDan,x,40")}).json()
+    assert changed["deduplicated"] is False and changed["rows"] == 4
+
+    versions = client.get("/datasets/people?versions=true").json()["versions"]
+    assert len(versions) == 2
+    # Each version keeps its own file
+    assert len({v["disk_path"] for v in versions}) == 2
+    assert {v["content_hash"] for v in versions} == {first["content_hash"], changed["content_hash"]}
+
+
+def test_reupload_of_an_older_version_is_not_deduplicated(client):
+    first = client.post("/datasets/upload_dataset", files={"file": ("People.csv", CSV)}).json()
+    client.post("/datasets/upload_dataset", files={"file": ("People.csv", CSV + "\nDan,x,40")})
+    again = client.post("/datasets/upload_dataset", files={"file": ("People.csv", CSV)}).json()
+    assert again["deduplicated"] is False
+    assert again["version_id"] != first["version_id"]
+    assert len(client.get("/datasets/people?versions=true").json()["versions"]) == 3